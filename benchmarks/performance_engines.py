@@ -0,0 +1,427 @@
+"""
+Benchmarks the performance engines of DataProcessingManager
+and checks that all of them produce the same results.
+
+A synthetic user with random pricings and transactions is generated
+in a temporary directory. Each engine is run once from scratch and once
+incrementally from a checkpoint in the middle of the history, and the
+performances of every level are compared against the SQL engine.
+With --workers above 1 the rollup engine is also run with that many worker
+processes, listed as rollup/<workers>.
+
+Usage:
+    python -m benchmarks.performance_engines [--portfolios 4] [--assets 20]
+        [--days 1500] [--transactions 400] [--seed 0] [--workers 1]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+
+from src.api.constants import DB_EXTENSIONS, RESET_DATE
+from src.infrastructure import Database
+from src.application import PERFORMANCE_ENGINES, DataProcessingManager
+from src.domain import *
+
+ANALYSIS_CURRENCY = "pln"
+FOREIGN_CURRENCY = "usd"
+KEY_COLUMNS = {
+    PortfolioAssetPerformance: ["portfolio_id", "asset_id", "date"],
+    PortfolioGroupPerformance: ["portfolio_id", "portfolio_group_id", "date"],
+    PortfolioPerformance: ["portfolio_id", "date"],
+    PortfolioAggregatePerformance: ["portfolio_aggregate_id", "date"],
+}
+
+
+def _build_data_processing_manager(
+    session, performance_engine: str, performance_workers: int = 1
+) -> DataProcessingManager:
+    return DataProcessingManager(
+        adjusted_portfolio_transaction_service=AdjustedPortfolioTransactionService(
+            AdjustedPortfolioTransactionRepository(session)
+        ),
+        portfolio_asset_performance_service=PortfolioAssetPerformanceService(
+            PortfolioAssetPerformanceRepository(session)
+        ),
+        portfolio_group_performance_service=PortfolioGroupPerformanceService(
+            PortfolioGroupPerformanceRepository(session)
+        ),
+        portfolio_performance_service=PortfolioPerformanceService(
+            PortfolioPerformanceRepository(session)
+        ),
+        portfolio_aggregate_performance_service=PortfolioAggregatePerformanceService(
+            PortfolioAggregatePerformanceRepository(session)
+        ),
+        portfolio_service=PortfolioService(PortfolioRepository(session)),
+        asset_service=AssetService(AssetRepository(session)),
+        portfolio_aggregate_service=PortfolioAggregateService(
+            PortfolioAggregateRepository(session)
+        ),
+        calendar_date_service=CalendarDateService(CalendarDateRepository(session)),
+        portfolio_asset_checkpoint_service=PortfolioAssetCheckpointService(
+            PortfolioAssetCheckpointRepository(session)
+        ),
+        performance_state_service=PerformanceStateService(
+            PerformanceStateRepository(session)
+        ),
+        effective_asset_price_service=EffectiveAssetPriceService(
+            EffectiveAssetPriceRepository(session)
+        ),
+        performance_engine=performance_engine,
+        performance_workers=performance_workers,
+    )
+
+
+def _random_walk(rng, size: int, start: float, volatility: float) -> np.ndarray:
+    return start * np.exp(np.cumsum(rng.normal(0.0002, volatility, size)))
+
+
+def _create_synthetic_user(
+    session,
+    portfolio_count: int,
+    asset_count: int,
+    day_count: int,
+    transaction_count: int,
+    seed: int,
+) -> User:
+    rng = np.random.default_rng(seed)
+    dates = [
+        str(date.date())
+        for date in pd.bdate_range(end=pd.Timestamp.today(), periods=day_count)
+    ]
+
+    user = User(session_id=str(uuid.uuid4()))
+    session.add(user)
+    session.flush()
+    session.add(
+        Settings(
+            user_id=user.id,
+            analysis_currency=ANALYSIS_CURRENCY,
+            ohlc_assets="close",
+            ohlc_currencies="typical price",
+            transaction_files={},
+            portfolio_groups={},
+            portfolio_group_assets={},
+        )
+    )
+    portfolio_aggregate = PortfolioAggregate(user_id=user.id)
+    session.add(portfolio_aggregate)
+
+    currency_pair = CurrencyPair(
+        name=f"{FOREIGN_CURRENCY}{ANALYSIS_CURRENCY}",
+        symbol=f"{FOREIGN_CURRENCY}{ANALYSIS_CURRENCY}=x".upper(),
+        first_currency_name=FOREIGN_CURRENCY,
+        second_currency_name=ANALYSIS_CURRENCY,
+        first_pricing_date=dates[0],
+        last_pricing_date=dates[-1],
+    )
+    session.add(currency_pair)
+    session.flush()
+    rates = _random_walk(rng, day_count, 4.0, 0.005)
+    session.add_all(
+        AdjustedCurrencyPairPricing(
+            currency_pair_id=currency_pair.id,
+            date=date,
+            open_price=rate,
+            high_price=rate * 1.005,
+            low_price=rate * 0.995,
+            close_price=rate,
+        )
+        for date, rate in zip(dates, rates)
+    )
+
+    assets = [
+        Asset(
+            name=f"Asset {i}",
+            symbol=f"A{i}",
+            currency=FOREIGN_CURRENCY if i % 2 else ANALYSIS_CURRENCY,
+            first_pricing_date=dates[0],
+            last_pricing_date=dates[-1],
+        )
+        for i in range(asset_count)
+    ]
+    session.add_all(assets)
+    session.flush()
+    for asset in assets:
+        prices = _random_walk(rng, day_count, rng.uniform(10, 500), 0.015)
+        # Leave random gaps to exercise forward-filling of missing prices
+        has_price = rng.random(day_count) > 0.05
+        session.add_all(
+            AdjustedAssetPricing(
+                asset_id=asset.id,
+                date=date,
+                open_price=price,
+                high_price=price * 1.01,
+                low_price=price * 0.99,
+                close_price=price,
+                adj_close_price=price,
+            )
+            for date, price, priced in zip(dates, prices, has_price)
+            if priced
+        )
+    price_by_asset = {
+        asset.id: dict(zip(dates, _random_walk(rng, day_count, 100, 0.015)))
+        for asset in assets
+    }
+
+    for i in range(portfolio_count):
+        portfolio = Portfolio(
+            user_id=user.id,
+            portfolio_aggregate=portfolio_aggregate,
+            name=f"Portfolio {i}",
+        )
+        session.add(portfolio)
+        session.flush()
+        groups = [
+            PortfolioGroup(
+                user_id=user.id, portfolio_id=portfolio.id, name=name, weight=0.5
+            )
+            for name in ("Stocks", "Bonds")
+        ]
+        session.add_all(groups)
+        session.flush()
+        session.add_all(
+            PortfolioGroupAsset(
+                portfolio_group_id=groups[j % len(groups)].id, asset_id=asset.id
+            )
+            for j, asset in enumerate(assets)
+        )
+
+        transaction_file = PortfolioTransactionFile(
+            user_id=user.id,
+            portfolio_id=portfolio.id,
+            name=f"transactions_{i}.csv",
+            currency=ANALYSIS_CURRENCY,
+        )
+        session.add(transaction_file)
+        session.flush()
+        session.add(
+            PortfolioTransaction(
+                portfolio_transaction_file_id=transaction_file.id,
+                asset_id=None,
+                date=dates[0],
+                transaction_type="deposit",
+                quantity=0.0,
+                transaction_value=1_000_000.0,
+                fee_amount=0.0,
+                tax_amount=0.0,
+            )
+        )
+
+        holdings = dict.fromkeys(price_by_asset, 0.0)
+        transaction_dates = sorted(rng.choice(dates[1:], transaction_count))
+        for date in transaction_dates:
+            asset_id = int(rng.choice(list(price_by_asset)))
+            transaction_type = rng.choice(
+                ["buy", "buy", "buy", "sell", "distribution", "fee", "interest"]
+            )
+            quantity = float(rng.integers(1, 50))
+            if transaction_type == "sell" and holdings[asset_id] < quantity:
+                transaction_type = "buy"
+            if transaction_type == "buy":
+                holdings[asset_id] += quantity
+            elif transaction_type == "sell":
+                holdings[asset_id] -= quantity
+            has_asset = transaction_type in ("buy", "sell", "distribution")
+            has_quantity = transaction_type in ("buy", "sell")
+            session.add(
+                PortfolioTransaction(
+                    portfolio_transaction_file_id=transaction_file.id,
+                    asset_id=asset_id if has_asset else None,
+                    date=date,
+                    transaction_type=transaction_type,
+                    quantity=quantity if has_quantity else 0.0,
+                    transaction_value=(
+                        quantity * price_by_asset[asset_id][date]
+                        if has_quantity
+                        else float(rng.uniform(10, 500))
+                    ),
+                    fee_amount=float(rng.uniform(0, 5)),
+                    tax_amount=(
+                        float(rng.uniform(0, 3))
+                        if transaction_type in ("sell", "distribution", "interest")
+                        else 0.0
+                    ),
+                )
+            )
+
+    session.commit()
+    return user
+
+
+def _get_performances(session) -> dict[type, pd.DataFrame]:
+    performances = {}
+    for model, key_columns in KEY_COLUMNS.items():
+        data_frame = pd.read_sql(select(model), session.connection())
+        performances[model] = (
+            data_frame.drop(columns="id")
+            .sort_values(key_columns)
+            .reset_index(drop=True)
+        )
+    return performances
+
+
+def _run_engine(
+    session,
+    user: User,
+    performance_engine: str,
+    checkpoint_date: str,
+    performance_workers: int = 1,
+) -> tuple[float, dict[type, pd.DataFrame]]:
+    # The partitions start from the last pricing dates, so the checkpoint date
+    # of the portfolio aggregate decides where every partition is recalculated from
+    PortfolioAssetCheckpointService(
+        PortfolioAssetCheckpointRepository(session)
+    ).update_checkpoint_dates(user.id)
+    PortfolioAggregateService(PortfolioAggregateRepository(session)).update_one(
+        id=user.portfolio_aggregate.id, checkpoint_date=checkpoint_date
+    )
+    session.commit()
+
+    data_processing_manager = _build_data_processing_manager(
+        session, performance_engine, performance_workers
+    )
+    start = time.perf_counter()
+    data_processing_manager.process_performances(user.id)
+    session.commit()
+    processing_time = time.perf_counter() - start
+
+    return processing_time, _get_performances(session)
+
+
+def _get_max_difference(
+    expected: pd.DataFrame, actual: pd.DataFrame, key_columns: list[str]
+) -> tuple[str, float]:
+    """Returns the column with the largest relative difference and its value."""
+    if len(expected) != len(actual) or not expected[key_columns].equals(
+        actual[key_columns]
+    ):
+        raise AssertionError("The engines produced different sets of rows.")
+
+    differences = {}
+    for column in expected.columns.difference(key_columns):
+        expected_values = expected[column].to_numpy(dtype=float)
+        actual_values = actual[column].to_numpy(dtype=float)
+        if not np.array_equal(np.isnan(expected_values), np.isnan(actual_values)):
+            differences[column] = np.inf
+            continue
+        absolute = np.abs(expected_values - actual_values)
+        scale = np.maximum(np.abs(expected_values), 1.0)
+        differences[column] = np.nanmax(absolute / scale, initial=0.0)
+    column = max(differences, key=differences.get)
+    return column, differences[column]
+
+
+def benchmark_engines(
+    portfolio_count: int,
+    asset_count: int,
+    day_count: int,
+    transaction_count: int,
+    seed: int,
+    workers: int = 1,
+):
+    runs = [(engine, engine, 1) for engine in PERFORMANCE_ENGINES]
+    if workers > 1:
+        runs.append((f"rollup/{workers}", "rollup", workers))
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        try:
+            session_id = str(uuid.uuid4())
+            db = Database(session_id, extension_names=DB_EXTENSIONS)
+            db.create_database()
+            session = db.SessionMaker()
+            try:
+                user = _create_synthetic_user(
+                    session,
+                    portfolio_count,
+                    asset_count,
+                    day_count,
+                    transaction_count,
+                    seed,
+                )
+                data_processing_manager = _build_data_processing_manager(
+                    session, PERFORMANCE_ENGINES[0]
+                )
+                data_processing_manager.process_calendar_dates()
+                data_processing_manager.process_adjusted_portfolio_transactions(user.id)
+                data_processing_manager.process_effective_asset_prices(user.id)
+                session.commit()
+
+                dates = sorted(
+                    {
+                        transaction.date
+                        for transaction in session.scalars(
+                            select(AdjustedPortfolioTransaction)
+                        )
+                    }
+                )
+                results = {}
+                for label, checkpoint_date in (
+                    ("full", RESET_DATE),
+                    ("incremental", dates[len(dates) // 2]),
+                ):
+                    for name, engine, engine_workers in runs:
+                        results[label, name] = _run_engine(
+                            session, user, engine, checkpoint_date, engine_workers
+                        )
+            finally:
+                session.close()
+                db.dispose()
+        finally:
+            os.chdir(cwd)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--portfolios", type=int, default=4)
+    parser.add_argument("--assets", type=int, default=20)
+    parser.add_argument("--days", type=int, default=1500)
+    parser.add_argument("--transactions", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    results = benchmark_engines(
+        args.portfolios,
+        args.assets,
+        args.days,
+        args.transactions,
+        args.seed,
+        args.workers,
+    )
+
+    print(f"{'run':<16}{'engine':<10}{'processing [s]':>16}")
+    for (label, engine), (processing_time, _) in results.items():
+        print(f"{label:<16}{engine:<10}{processing_time:>16.3f}")
+
+    reference_engine = PERFORMANCE_ENGINES[0]
+    print(f"\nMax relative difference against the {reference_engine} engine:")
+    print(f"{'run':<16}{'engine':<10}{'table':<36}{'column':<28}{'difference':>12}")
+    for label in dict.fromkeys(label for label, _ in results):
+        expected = results[label, reference_engine][1]
+        for engine in dict.fromkeys(
+            engine for _, engine in results if engine != reference_engine
+        ):
+            actual = results[label, engine][1]
+            for model, key_columns in KEY_COLUMNS.items():
+                column, difference = _get_max_difference(
+                    expected[model], actual[model], key_columns
+                )
+                print(
+                    f"{label:<16}{engine:<10}{model.__tablename__:<36}"
+                    f"{column:<28}{difference:>12.2e}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Benchmarks data processing and read latency under each SQLite pragma profile.
+
+The user's database is copied to a temporary directory for every run,
+so the original file is never modified.
+
+Usage:
+    python -m benchmarks.pragma_profiles <session_id> [--databases-dir databases]
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from src.api.constants import DB_EXTENSIONS, RESET_DATE
+from src.api.run_processing import process_data
+from src.application import DataProcessingManager
+from src.domain import *
+from src.infrastructure import Database, PRAGMA_PROFILES, get_pragma_profile
+
+
+def _build_data_processing_manager(session) -> DataProcessingManager:
+    return DataProcessingManager(
+        adjusted_portfolio_transaction_service=AdjustedPortfolioTransactionService(
+            AdjustedPortfolioTransactionRepository(session)
+        ),
+        portfolio_asset_performance_service=PortfolioAssetPerformanceService(
+            PortfolioAssetPerformanceRepository(session)
+        ),
+        portfolio_group_performance_service=PortfolioGroupPerformanceService(
+            PortfolioGroupPerformanceRepository(session)
+        ),
+        portfolio_performance_service=PortfolioPerformanceService(
+            PortfolioPerformanceRepository(session)
+        ),
+        portfolio_aggregate_performance_service=PortfolioAggregatePerformanceService(
+            PortfolioAggregatePerformanceRepository(session)
+        ),
+        portfolio_service=PortfolioService(PortfolioRepository(session)),
+        asset_service=AssetService(AssetRepository(session)),
+        portfolio_aggregate_service=PortfolioAggregateService(
+            PortfolioAggregateRepository(session)
+        ),
+        calendar_date_service=CalendarDateService(CalendarDateRepository(session)),
+        portfolio_asset_checkpoint_service=PortfolioAssetCheckpointService(
+            PortfolioAssetCheckpointRepository(session)
+        ),
+        performance_state_service=PerformanceStateService(
+            PerformanceStateRepository(session)
+        ),
+        effective_asset_price_service=EffectiveAssetPriceService(
+            EffectiveAssetPriceRepository(session)
+        ),
+    )
+
+
+def _run_reads(session, user: User):
+    portfolio_performance_service = PortfolioPerformanceService(
+        PortfolioPerformanceRepository(session)
+    )
+    portfolio_group_performance_service = PortfolioGroupPerformanceService(
+        PortfolioGroupPerformanceRepository(session)
+    )
+    portfolio_asset_performance_service = PortfolioAssetPerformanceService(
+        PortfolioAssetPerformanceRepository(session)
+    )
+
+    for portfolio in user.portfolios:
+        portfolio_performance_service.get_performance_by_portfolio_id(
+            portfolio_id=portfolio.id
+        )
+        portfolio_performance_service.get_market_values_by_portfolio_id(
+            portfolio_id=portfolio.id
+        )
+        portfolio_group_performance_service.get_weights_by_portfolio_id(
+            portfolio_id=portfolio.id
+        )
+        portfolio_asset_performance_service.get_assets_status_by_portfolio_id(
+            portfolio_id=portfolio.id
+        )
+
+
+def benchmark_profile(
+    session_id: str,
+    databases_dir: str,
+    profile_name: str,
+    processing_profile_name: str | None,
+    read_repeats: int,
+):
+    source_path = os.path.join(databases_dir, session_id, "cashflower.db")
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.makedirs(os.path.join(tmp_dir, "databases", session_id))
+        # The backup API also picks up pages still sitting in a WAL file
+        with sqlite3.connect(source_path) as source, sqlite3.connect(
+            os.path.join(tmp_dir, "databases", session_id, "cashflower.db")
+        ) as target:
+            source.backup(target)
+        os.chdir(tmp_dir)
+        try:
+            db = Database(
+                session_id,
+                extension_names=DB_EXTENSIONS,
+                pragmas=get_pragma_profile(profile_name),
+            )
+            session = db.SessionMaker()
+            try:
+                user = UserService(UserRepository(session)).get_one_by_session_id(
+                    session_id=session_id
+                )
+                PortfolioAggregateService(
+                    PortfolioAggregateRepository(session)
+                ).update_one(id=user.portfolio_aggregate.id, checkpoint_date=RESET_DATE)
+                session.commit()
+
+                data_processing_manager = _build_data_processing_manager(session)
+                start = time.perf_counter()
+                if processing_profile_name:
+                    with db.pragma_profile(
+                        session, get_pragma_profile(processing_profile_name)
+                    ):
+                        process_data(data_processing_manager, user.id)
+                else:
+                    process_data(data_processing_manager, user.id)
+                session.commit()
+                processing_time = time.perf_counter() - start
+
+                start = time.perf_counter()
+                for _ in range(read_repeats):
+                    _run_reads(session, user)
+                    session.commit()
+                read_time = (time.perf_counter() - start) / read_repeats
+            finally:
+                session.close()
+                db.dispose()
+        finally:
+            os.chdir(cwd)
+
+    return processing_time, read_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("session_id")
+    parser.add_argument("--databases-dir", default="databases")
+    parser.add_argument("--read-repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    databases_dir = os.path.abspath(args.databases_dir)
+    print(f"{'profile':<30}{'processing [s]':>16}{'reads [ms]':>14}")
+    for profile_name in PRAGMA_PROFILES:
+        if profile_name == "processing":
+            continue
+        for processing_profile_name in (None, "processing"):
+            processing_time, read_time = benchmark_profile(
+                args.session_id,
+                databases_dir,
+                profile_name,
+                processing_profile_name,
+                args.read_repeats,
+            )
+            label = profile_name + (
+                f" + {processing_profile_name}" if processing_profile_name else ""
+            )
+            print(f"{label:<30}{processing_time:>16.3f}{read_time * 1000:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
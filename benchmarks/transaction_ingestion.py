@@ -0,0 +1,187 @@
+"""
+Benchmarks the ingestion of transaction files by UpsertManager.
+
+A synthetic user with a single portfolio and transaction file is generated
+in a temporary directory for every row count. The file is upserted once into
+an empty database, once more with the same rows, which are skipped by their hash,
+and once with a single edited row, which replaces all of them.
+
+Usage:
+    python -m benchmarks.transaction_ingestion [--rows 1000 10000 100000]
+        [--assets 50] [--seed 0]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from src.api.constants import DB_EXTENSIONS
+from src.infrastructure import Database
+from src.application import UpsertManager
+from src.domain import *
+from src.dto import TransactionsModel
+
+FILE_NAME = "transactions.csv"
+TRANSACTION_TYPES = ["buy", "sell", "distribution", "deposit", "withdrawal", "fee"]
+
+
+def _build_upsert_manager(session) -> UpsertManager:
+    return UpsertManager(
+        user_service=UserService(UserRepository(session)),
+        settings_service=SettingsService(SettingsRepository(session)),
+        currency_pair_service=CurrencyPairService(CurrencyPairRepository(session)),
+        asset_service=AssetService(AssetRepository(session)),
+        portfolio_aggregate_service=PortfolioAggregateService(
+            PortfolioAggregateRepository(session)
+        ),
+        portfolio_service=PortfolioService(PortfolioRepository(session)),
+        portfolio_group_service=PortfolioGroupService(
+            PortfolioGroupRepository(session)
+        ),
+        portfolio_group_asset_service=PortfolioGroupAssetService(
+            PortfolioGroupAssetRepository(session)
+        ),
+        portfolio_transaction_file_service=PortfolioTransactionFileService(
+            PortfolioTransactionFileRepository(session)
+        ),
+        portfolio_transactions_service=PortfolioTransactionService(
+            PortfolioTransactionRepository(session)
+        ),
+        portfolio_asset_checkpoint_service=PortfolioAssetCheckpointService(
+            PortfolioAssetCheckpointRepository(session)
+        ),
+        effective_asset_price_service=EffectiveAssetPriceService(
+            EffectiveAssetPriceRepository(session)
+        ),
+    )
+
+
+def _create_synthetic_user(session, asset_count: int) -> User:
+    user = User(session_id=str(uuid.uuid4()))
+    session.add(user)
+    session.flush()
+    portfolio_aggregate = PortfolioAggregate(user_id=user.id)
+    session.add(portfolio_aggregate)
+    session.flush()
+    portfolio = Portfolio(
+        user_id=user.id,
+        portfolio_aggregate_id=portfolio_aggregate.id,
+        name="Portfolio",
+    )
+    session.add(portfolio)
+    session.flush()
+    session.add(
+        PortfolioTransactionFile(
+            user_id=user.id,
+            portfolio_id=portfolio.id,
+            name=FILE_NAME,
+            currency="pln",
+        )
+    )
+    session.add_all(
+        Asset(name=f"Asset {i}", symbol=f"A{i}", currency="pln")
+        for i in range(asset_count)
+    )
+    session.flush()
+    return user
+
+
+def _create_transactions(
+    row_count: int, asset_count: int, seed: int
+) -> TransactionsModel:
+    rng = np.random.default_rng(seed)
+    dates = [
+        str(date.date())
+        for date in pd.bdate_range(end=pd.Timestamp.today(), periods=2500)
+    ]
+    transaction_types = rng.choice(TRANSACTION_TYPES, row_count).tolist()
+    asset_symbols = [
+        f"A{i}" if transaction_type in ("buy", "sell", "distribution") else ""
+        for i, transaction_type in zip(
+            rng.integers(0, asset_count, row_count), transaction_types
+        )
+    ]
+    return TransactionsModel(
+        file_name=FILE_NAME,
+        transaction_data=dict(
+            date=sorted(rng.choice(dates, row_count).tolist()),
+            asset_symbol=asset_symbols,
+            transaction_type=transaction_types,
+            quantity=rng.integers(1, 100, row_count).astype(float).tolist(),
+            transaction_value=rng.uniform(10, 10000, row_count).round(2).tolist(),
+            fee_amount=rng.uniform(0, 10, row_count).round(2).tolist(),
+            tax_amount=rng.uniform(0, 10, row_count).round(2).tolist(),
+        ),
+    )
+
+
+def benchmark_rows(row_count: int, asset_count: int, seed: int):
+    transactions = _create_transactions(row_count, asset_count, seed)
+    edited_transactions = transactions.model_copy(deep=True)
+    edited_transactions.transaction_data.transaction_value[row_count // 2] += 1.0
+    session_id = str(uuid.uuid4())
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        try:
+            db = Database(session_id, extension_names=DB_EXTENSIONS)
+            db.create_database()
+            session = db.SessionMaker()
+            try:
+                user = _create_synthetic_user(session, asset_count)
+                session.commit()
+
+                upsert_manager = _build_upsert_manager(session)
+                times = []
+                for upload in (transactions, transactions, edited_transactions):
+                    start = time.perf_counter()
+                    upsert_manager.upsert_portfolio_transactions(
+                        user.id,
+                        [upload],
+                        context=upsert_manager.load_upsert_context(user.id),
+                    )
+                    session.commit()
+                    times.append(time.perf_counter() - start)
+
+                stored_count = session.query(PortfolioTransaction).count()
+                assert (
+                    stored_count == row_count
+                ), f"Expected {row_count} transactions, found {stored_count}."
+            finally:
+                session.close()
+                db.dispose()
+        finally:
+            os.chdir(cwd)
+
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--assets", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'rows':>10}{'insert [s]':>14}{'unchanged [s]':>16}"
+        f"{'edited [s]':>14}{'rows/s':>14}"
+    )
+    for row_count in args.rows:
+        insert_time, unchanged_time, edited_time = benchmark_rows(
+            row_count, args.assets, args.seed
+        )
+        print(
+            f"{row_count:>10}{insert_time:>14.3f}{unchanged_time:>16.3f}"
+            f"{edited_time:>14.3f}{row_count / insert_time:>14.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,28 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 import logging
 import uvicorn
 
 from src.api.middleware import RateLimitMiddleware
 from src.api.routes import router as api_router
+from src.api.utils.db import db_registry
+from src.api.utils.jobs import job_queue
+from src.api.utils.executors import shutdown_executors
+from src.application import shutdown_process_pool
 
 logging.basicConfig(level=logging.INFO)
 
-app = FastAPI(title="Cashflower API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    job_queue.shutdown()
+    shutdown_executors()
+    shutdown_process_pool()
+    db_registry.dispose_all()
+
+
+app = FastAPI(title="Cashflower API", lifespan=lifespan)
 
 
 @app.get("/")
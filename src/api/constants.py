@@ -1,2 +1,42 @@
-DB_EXTENSIONS = {"sqlite-xirr-extension", "sqlite-stddev-extension"}
+import json
+import os
+
+DB_EXTENSIONS = {
+    "sqlite-xirr-extension",
+    "sqlite-stddev-extension",
+    "sqlite-returns-extension",
+}
 RESET_DATE = "1900-01-01"
+DB_REGISTRY_MAX_SIZE = 128
+# Pragma profiles can be switched or tuned per deployment, e.g.
+# DB_PRAGMA_OVERRIDES='{"mmap_size": 0, "busy_timeout": 10000}'
+DB_PRAGMA_PROFILE = os.getenv("DB_PRAGMA_PROFILE", "performance")
+DB_PRAGMA_OVERRIDES = json.loads(os.getenv("DB_PRAGMA_OVERRIDES", "{}"))
+DB_PROCESSING_PRAGMA_PROFILE = os.getenv("DB_PROCESSING_PRAGMA_PROFILE", "processing")
+DB_PROCESSING_PRAGMA_OVERRIDES = json.loads(
+    os.getenv("DB_PROCESSING_PRAGMA_OVERRIDES", "{}")
+)
+# One of "sql", "numpy" or "rollup", see DataProcessingManager. Only the rollup
+# engine continues every level from the stored performance states, the sql engine
+# recalculates the windows of each partition from its first row on every run
+PERFORMANCE_ENGINE = os.getenv("PERFORMANCE_ENGINE", "rollup")
+# Processes the rollup engine calculates the portfolios in, 1 runs them in-process
+PERFORMANCE_WORKERS = int(os.getenv("PERFORMANCE_WORKERS", "1"))
+# Background jobs run in the job executor, which only waits for their stages to run in
+# the executor of their class of work, finished jobs can be polled for an hour
+JOB_RETENTION_SECONDS = 3600
+# Every class of work runs in its own bounded executor and answers 503 with
+# Retry-After when its queue is full, the limits can be tuned per deployment, e.g.
+# EXECUTOR_LIMIT_OVERRIDES='{"processing": {"workers": 4, "queue_size": 8}}'
+EXECUTOR_LIMITS = {
+    "read": {"workers": 16, "queue_size": 64},
+    "processing": {"workers": 2, "queue_size": 4},
+    "download": {"workers": 4, "queue_size": 8},
+    "job": {"workers": 4, "queue_size": 16},
+}
+EXECUTOR_LIMIT_OVERRIDES = json.loads(os.getenv("EXECUTOR_LIMIT_OVERRIDES", "{}"))
+EXECUTOR_RETRY_AFTER_SECONDS = 5
+# Currencies are downloaded only against this currency, e.g. PIVOT_CURRENCY=usd,
+# and the rates in the analysis currency are derived as cross rates.
+# Every currency is downloaded against the analysis currency when it is not set.
+PIVOT_CURRENCY = os.getenv("PIVOT_CURRENCY", "").lower() or None
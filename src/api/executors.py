@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+
+from .utils import get_user
+from .utils.executors import get_executor_metrics
+
+from src.domain import User
+
+router = APIRouter()
+
+
+@router.get(
+    "/executor-metrics",
+    tags=["Monitoring"],
+    summary="Gets the load of the executors of every class of work",
+    description="Returns the running, queued, completed and rejected calls of the read, processing and download executors, with the mean and maximum time the calls waited in the queue. Background jobs are counted in the processing executor.",
+)
+async def executor_metrics(user: User = Depends(get_user)):
+    return get_executor_metrics()
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, status, HTTPException
+
+from .utils import get_session_id, job_queue
+
+router = APIRouter()
+
+
+def _get_job_of_session(job_id: str, session_id: str):
+    job = job_queue.get(job_id)
+    if job is None or job.key != session_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found or user does not have access.",
+        )
+    return job
+
+
+@router.get(
+    "/jobs/{job_id}",
+    tags=["Jobs"],
+    summary="Gets the status of a background job",
+    description="Returns the status, current stage, rows written and elapsed time of a job submitted by the user. Finished jobs are kept for an hour.",
+)
+async def get_job(job_id: str, session_id: str = Depends(get_session_id)):
+    return _get_job_of_session(job_id, session_id).to_dict()
+
+
+@router.delete(
+    "/jobs/{job_id}",
+    tags=["Jobs"],
+    summary="Cancels a background job",
+    description="Cancels a pending job at once, a running job stops before its next stage and its unfinished work is rolled back.",
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def cancel_job(job_id: str, session_id: str = Depends(get_session_id)):
+    _get_job_of_session(job_id, session_id)
+    return job_queue.cancel(job_id).to_dict()
@@ -1,5 +1,4 @@
 from fastapi import APIRouter, Depends, Query
-from fastapi.concurrency import run_in_threadpool
 
 from .utils.user import (
     get_user,
@@ -8,6 +7,7 @@ from .utils.user import (
     validate_asset_in_portfolio,
 )
 from .utils.services import *
+from .utils.executors import read_executor
 
 from src.domain import *
 
@@ -24,7 +24,7 @@ async def get_portfolio_variants(
     user: User = Depends(get_user),
     service: PortfolioAggregateService = Depends(get_portfolio_aggregate_service),
 ):
-    return await run_in_threadpool(service.get_portfolio_variants, user.id)
+    return await read_executor.run(service.get_portfolio_variants, user.id)
 
 
 @router.get(
@@ -38,7 +38,7 @@ async def get_portfolio_aggregate_performance(
         get_portfolio_aggregate_performance_service
     ),
 ):
-    return await run_in_threadpool(
+    return await read_executor.run(
         service.get_performance_by_id,
         portfolio_aggregate_id=user.portfolio_aggregate.id,
     )
@@ -56,7 +56,7 @@ async def get_portfolio_aggregate_performance_status(
         get_portfolio_aggregate_performance_service
     ),
 ):
-    return await run_in_threadpool(
+    return await read_executor.run(
         service.get_performance_status,
         portfolio_aggregate_id=user.portfolio_aggregate.id,
         status_date=status_date,
@@ -72,7 +72,7 @@ async def get_portfolio_performance(
     portfolio: Portfolio = Depends(validate_portfolio_for_user),
     service: PortfolioPerformanceService = Depends(get_portfolio_performance_service),
 ):
-    return await run_in_threadpool(
+    return await read_executor.run(
         service.get_performance_by_portfolio_id, portfolio_id=portfolio.id
     )
 
@@ -87,7 +87,7 @@ async def get_portfolio_performance_status(
     status_date: str = Query(None),
     service: PortfolioPerformanceService = Depends(get_portfolio_performance_service),
 ):
-    return await run_in_threadpool(
+    return await read_executor.run(
         service.get_performance_status,
         portfolio_id=portfolio.id,
         status_date=status_date,
@@ -105,7 +105,7 @@ async def get_portfolio_group_performance(
         get_portfolio_group_performance_service
     ),
 ):
-    return await run_in_threadpool(
+    return await read_executor.run(
         service.get_performance_by_portfolio_group_id,
         portfolio_group_id=portfolio_group.id,
     )
@@ -123,7 +123,7 @@ async def get_portfolio_group_performance_status(
         get_portfolio_group_performance_service
     ),
 ):
-    return await run_in_threadpool(
+    return await read_executor.run(
         service.get_performance_status,
         portfolio_group_id=portfolio_group.id,
         status_date=status_date,
@@ -142,7 +142,7 @@ async def get_portfolio_asset_performance(
         get_portfolio_asset_performance_service
     ),
 ):
-    return await run_in_threadpool(
+    return await read_executor.run(
         service.get_performance_by_portfolio_id_and_asset_id,
         portfolio_id=portfolio.id,
         asset_id=asset.id,
@@ -162,7 +162,7 @@ async def get_portfolio_asset_performance_status(
         get_portfolio_asset_performance_service
     ),
 ):
-    return await run_in_threadpool(
+    return await read_executor.run(
         service.get_performance_status,
         portfolio_id=portfolio.id,
         asset_id=asset.id,
@@ -181,7 +181,7 @@ async def get_portfolio_group_weights(
         get_portfolio_group_performance_service
     ),
 ):
-    return await run_in_threadpool(
+    return await read_executor.run(
         service.get_weights_by_portfolio_id, portfolio_id=portfolio.id
     )
 
@@ -197,7 +197,7 @@ async def get_portfolio_assets_status(
         get_portfolio_asset_performance_service
     ),
 ):
-    return await run_in_threadpool(
+    return await read_executor.run(
         service.get_assets_status_by_portfolio_id, portfolio_id=portfolio.id
     )
 
@@ -211,7 +211,7 @@ async def get_portfolio_groups(
     portfolio: Portfolio = Depends(validate_portfolio_for_user),
     service: PortfolioGroupService = Depends(get_portfolio_group_service),
 ):
-    results = await run_in_threadpool(
+    results = await read_executor.run(
         service.get_portfolio_groups_by_portfolio_id, portfolio_id=portfolio.id
     )
     return [dict(row._mapping) for row in results]
@@ -228,7 +228,7 @@ async def get_model_portfolio_stats(
         get_portfolio_asset_performance_service
     ),
 ):
-    return await run_in_threadpool(
+    return await read_executor.run(
         service.get_pct_changes_stats_by_portfolio_id, portfolio_id=portfolio.id
     )
 
@@ -242,7 +242,7 @@ async def get_portfolio_market_values(
     portfolio: Portfolio = Depends(validate_portfolio_for_user),
     service: PortfolioPerformanceService = Depends(get_portfolio_performance_service),
 ):
-    results = await run_in_threadpool(
+    results = await read_executor.run(
         service.get_market_values_by_portfolio_id, portfolio_id=portfolio.id
     )
     return [dict(row._mapping) for row in results]
@@ -1,5 +1,4 @@
 from fastapi import APIRouter, status, Depends
-from fastapi.concurrency import run_in_threadpool
 
 from .utils.services import (
     get_portfolio_aggregate_service,
@@ -7,7 +6,8 @@ from .utils.services import (
     get_currency_pair_service,
 )
 from .utils import get_user
-from .constants import RESET_DATE
+from .utils.executors import processing_executor
+from .constants import RESET_DATE, PIVOT_CURRENCY
 
 from src.domain import *
 
@@ -34,15 +34,17 @@ def _manage_pricings(
 
     currencies.update(user.settings.transaction_files["currency"])
     analysis_currency = user.settings.analysis_currency
+    # With a pivot currency the analysis currency has its own pair quoted in it
+    quote_currency = PIVOT_CURRENCY or analysis_currency
+    if PIVOT_CURRENCY:
+        currencies.add(analysis_currency)
 
     for currency in currencies:
         currency = currency.lower()
-        if currency == analysis_currency:
+        if currency == quote_currency:
             continue
 
-        currency_pair = currency_pair_service.get_one_by_name(
-            currency + analysis_currency
-        )
+        currency_pair = currency_pair_service.get_one_by_name(currency + quote_currency)
         if currency_pair:
             currency_ids.add(currency_pair.id)
 
@@ -74,12 +76,12 @@ async def reset_checkpoint_date(
     asset_service: AssetService = Depends(get_asset_service),
     currency_pair_service: CurrencyPairService = Depends(get_currency_pair_service),
 ):
-    await run_in_threadpool(
+    await processing_executor.run(
         portfolio_aggregate_service.update_one,
         id=user.portfolio_aggregate.id,
         checkpoint_date=RESET_DATE,
     )
-    await run_in_threadpool(
+    await processing_executor.run(
         _manage_pricings, user, asset_service, currency_pair_service, reset=True
     )
 
@@ -99,9 +101,9 @@ async def reset_user(
     asset_service: AssetService = Depends(get_asset_service),
     currency_pair_service: CurrencyPairService = Depends(get_currency_pair_service),
 ):
-    await run_in_threadpool(
+    await processing_executor.run(
         portfolio_aggregate_service.delete_one, id=user.portfolio_aggregate.id
     )
-    await run_in_threadpool(
+    await processing_executor.run(
         _manage_pricings, user, asset_service, currency_pair_service, reset=False
     )
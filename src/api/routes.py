@@ -6,6 +6,8 @@ from .run_processing import router as run_processing_router
 from .session import router as session_router
 from .performance import router as performance_router
 from .reset import router as reset_checkpoint_date_router
+from .jobs import router as jobs_router
+from .executors import router as executors_router
 
 
 router = APIRouter()
@@ -16,3 +18,5 @@ router.include_router(run_processing_router)
 router.include_router(session_router)
 router.include_router(performance_router)
 router.include_router(reset_checkpoint_date_router)
+router.include_router(jobs_router)
+router.include_router(executors_router)
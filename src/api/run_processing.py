@@ -1,39 +1,110 @@
-from fastapi import APIRouter, Depends
-from fastapi.concurrency import run_in_threadpool
+from typing import Callable
 
-from .utils import get_user, get_data_processing_manager
-from .utils.db import load_db_extensions
+from fastapi import APIRouter, Depends, status
+
+from sqlalchemy.orm import Session
+
+from .utils import (
+    get_session_id,
+    get_user,
+    get_db,
+    get_db_session,
+    get_data_processing_manager,
+    create_with_session,
+)
+from .utils.db import Database, processing_pragmas
+from .utils.executors import processing_executor
+from .utils.jobs import Job, submit_job, job_session
 
 from src.domain import User
 from src.application import DataProcessingManager
 
-
 router = APIRouter()
 
 
-def process_data(data_processing_manager: DataProcessingManager, user_id: int):
-    """A synchronous function that runs all data processing steps."""
+def process_data(
+    data_processing_manager: DataProcessingManager,
+    user_id: int,
+    set_stage: Callable[[str], None] = lambda stage: None,
+):
+    """
+    A synchronous function that runs all data processing steps,
+    reporting each of them to `set_stage` before it starts.
+    """
+    set_stage("calendar_dates")
+    data_processing_manager.process_calendar_dates()
+    set_stage("adjusted_portfolio_transactions")
     data_processing_manager.process_adjusted_portfolio_transactions(user_id)
-    data_processing_manager.process_portfolio_asset_performances(user_id)
-    data_processing_manager.process_portfolio_group_performances(user_id)
-    data_processing_manager.process_portfolio_performances(user_id)
-    data_processing_manager.process_portfolio_aggregate_performances(user_id)
+    set_stage("effective_asset_prices")
+    data_processing_manager.process_effective_asset_prices(user_id)
+    set_stage("performances")
+    data_processing_manager.process_performances(user_id)
+    set_stage("checkpoint_dates")
     data_processing_manager.update_checkpoint_date(user_id)
 
 
+def process_data_with_profile(
+    db: Database,
+    session: Session,
+    data_processing_manager: DataProcessingManager,
+    user_id: int,
+    set_stage: Callable[[str], None] = lambda stage: None,
+):
+    """Runs data processing with the processing pragma profile applied."""
+    with db.pragma_profile(session, processing_pragmas):
+        process_data(data_processing_manager, user_id, set_stage)
+
+
+def run_processing_job(job: Job, db: Database, user_id: int):
+    """
+    Runs data processing in a background job, in a session of its own
+    and in the processing executor.
+    """
+    with job_session(db, job) as session:
+        data_processing_manager = create_with_session(
+            get_data_processing_manager, session
+        )
+        processing_executor.call(
+            process_data_with_profile,
+            db,
+            session,
+            data_processing_manager,
+            user_id,
+            job.set_stage,
+        )
+
+
 @router.post(
     "/run-processing",
     tags=["Processing"],
     summary="Starts data processing",
     description="Starts the full data processing pipeline for the user, including performance calculation for all portfolio levels.",
-    dependencies=[Depends(load_db_extensions)],
 )
 async def run_processing(
+    db: Database = Depends(get_db),
+    session: Session = Depends(get_db_session),
     user: User = Depends(get_user),
     data_processing_manager: DataProcessingManager = Depends(
         get_data_processing_manager
     ),
 ):
     user_id = user.id
-    await run_in_threadpool(process_data, data_processing_manager, user_id)
+    await processing_executor.run(
+        process_data_with_profile, db, session, data_processing_manager, user_id
+    )
     return {"message": "Data processing finished."}
+
+
+@router.post(
+    "/jobs/run-processing",
+    tags=["Jobs"],
+    summary="Starts data processing in the background",
+    description="Submits the full data processing pipeline as a background job and returns it at once. Its progress is polled at /jobs/{job_id}. While a processing job of the user is active, submitting again returns that job.",
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_processing_job(
+    session_id: str = Depends(get_session_id),
+    db: Database = Depends(get_db),
+    user: User = Depends(get_user),
+):
+    return submit_job(session_id, "processing", run_processing_job, db, user.id)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, Body, status, HTTPException
-from fastapi.concurrency import run_in_threadpool
+import hashlib
 
 from .utils import (
     get_session_id,
@@ -7,13 +7,22 @@ from .utils import (
     get_user,
     get_upsert_manager,
     get_download_manager,
+    create_with_session,
 )
+from .utils.services import get_portfolio_transactions_service
 from .utils.db import Database
-from .utils.pricings import download_pricings_logic, PricingDownloadError
+from .utils.executors import read_executor, processing_executor, download_executor
+from .utils.jobs import Job, submit_job, job_session
+from .utils.pricings import (
+    download_pricings,
+    download_pricings_logic,
+    PricingDownloadError,
+)
+from .run_processing import run_processing_job
 
 from src.dto import SettingsDTO
 from src.application import UpsertManager, DownloadManager
-from src.domain import User
+from src.domain import User, PortfolioTransactionService
 
 router = APIRouter()
 
@@ -31,20 +40,44 @@ def _init_user_and_settings(
     return user
 
 
+def _get_settings(
+    user: User, portfolio_transaction_service: PortfolioTransactionService
+) -> dict:
+    """Gets the settings with the transactions rebuilt from the stored ones."""
+    settings = user.settings
+    return {
+        "user_id": settings.user_id,
+        "analysis_currency": settings.analysis_currency,
+        "ohlc_assets": settings.ohlc_assets,
+        "ohlc_currencies": settings.ohlc_currencies,
+        "transaction_files": settings.transaction_files,
+        "transactions": {
+            "items": portfolio_transaction_service.get_transactions_by_user_id(
+                user_id=user.id
+            )
+        },
+        "portfolio_groups": settings.portfolio_groups,
+        "portfolio_group_assets": settings.portfolio_group_assets,
+    }
+
+
+def _get_pricing_download_arguments(settings_dto: SettingsDTO) -> dict:
+    """Gets the assets and currencies to download pricings for."""
+    return {
+        "asset_symbols": set(settings_dto.portfolio_group_assets.asset_symbol),
+        "transaction_file_currencies": set(settings_dto.transaction_files.currency),
+        "analysis_currency": settings_dto.analysis_currency,
+    }
+
+
 async def _trigger_pricing_download(
     download_manager: DownloadManager, settings_dto: SettingsDTO
 ):
     """Downloads all necessary pricings based on user settings."""
-    asset_symbols = set(settings_dto.portfolio_group_assets.asset_symbol)
-    transaction_file_currencies = set(settings_dto.transaction_files.currency)
-    analysis_currency = settings_dto.analysis_currency
-
     try:
         await download_pricings_logic(
             download_manager=download_manager,
-            asset_symbols=asset_symbols,
-            transaction_file_currencies=transaction_file_currencies,
-            analysis_currency=analysis_currency,
+            **_get_pricing_download_arguments(settings_dto),
         )
     except (ValueError, PricingDownloadError) as e:
         raise HTTPException(
@@ -58,27 +91,70 @@ def _upsert_portfolio_structure(
 ):
     """Upserts all portfolio-related data."""
     portfolio_aggregate = upsert_manager.upsert_portfolio_aggregate(user_id=user_id)
+    # The existing rows are loaded once and every stage resolves names against them
+    context = upsert_manager.load_upsert_context(user_id=user_id)
     upsert_manager.upsert_portfolios(
         user_id=user_id,
         portfolio_aggregate_id=portfolio_aggregate.id,
         transaction_files=settings_dto.transaction_files,
+        context=context,
     )
     upsert_manager.upsert_portfolio_groups(
-        user_id=user_id, portfolio_groups=settings_dto.portfolio_groups
+        user_id=user_id, portfolio_groups=settings_dto.portfolio_groups, context=context
     )
     upsert_manager.upsert_portfolio_group_assets(
-        user_id=user_id, portfolio_group_assets=settings_dto.portfolio_group_assets
+        user_id=user_id,
+        portfolio_group_assets=settings_dto.portfolio_group_assets,
+        context=context,
     )
     upsert_manager.upsert_portfolio_transaction_files(
         user_id=user_id,
         portfolio_transaction_files=settings_dto.transaction_files,
         analysis_currency=settings_dto.analysis_currency,
+        context=context,
     )
     upsert_manager.upsert_portfolio_transactions(
-        user_id=user_id, list_of_transactions=settings_dto.transactions.items
+        user_id=user_id,
+        list_of_transactions=settings_dto.transactions.items,
+        context=context,
     )
 
 
+def _get_settings_hash(settings_dto: SettingsDTO) -> str:
+    """Identifies the settings, a job is only attached to for the same ones."""
+    return hashlib.sha256(settings_dto.model_dump_json().encode()).hexdigest()
+
+
+def _run_settings_job(
+    job: Job, session_id: str, db: Database, settings_dto: SettingsDTO
+):
+    """
+    Saves the settings and all related data, downloads the pricings
+    and then processes the data in a background job.
+    The download runs in the download executor, the other stages in the processing one.
+    """
+    with job_session(db, job) as session:
+        upsert_manager = create_with_session(get_upsert_manager, session)
+        download_manager = create_with_session(get_download_manager, session)
+        job.set_stage("settings")
+        user = processing_executor.call(
+            _init_user_and_settings, session_id, db, upsert_manager, settings_dto
+        )
+        user_id = user.id
+        job.set_stage("pricing_download")
+        download_executor.call(
+            download_pricings,
+            download_manager=download_manager,
+            **_get_pricing_download_arguments(settings_dto),
+        )
+        job.set_stage("portfolio_structure")
+        processing_executor.call(
+            _upsert_portfolio_structure, upsert_manager, user_id, settings_dto
+        )
+
+    run_processing_job(job, db, user_id)
+
+
 @router.post(
     "/settings",
     tags=["Settings"],
@@ -93,11 +169,11 @@ async def upsert_pipeline(
     upsert_manager: UpsertManager = Depends(get_upsert_manager),
     download_manager: DownloadManager = Depends(get_download_manager),
 ):
-    user = await run_in_threadpool(
+    user = await processing_executor.run(
         _init_user_and_settings, session_id, db, upsert_manager, settings_dto
     )
     await _trigger_pricing_download(download_manager, settings_dto)
-    await run_in_threadpool(
+    await processing_executor.run(
         _upsert_portfolio_structure, upsert_manager, user.id, settings_dto
     )
 
@@ -111,5 +187,33 @@ async def upsert_pipeline(
     tags=["Settings"],
     summary="Gets the current settings",
 )
-async def get_settings(user: User = Depends(get_user)):
-    return await run_in_threadpool(lambda: user.settings)
+async def get_settings(
+    user: User = Depends(get_user),
+    portfolio_transaction_service: PortfolioTransactionService = Depends(
+        get_portfolio_transactions_service
+    ),
+):
+    return await read_executor.run(_get_settings, user, portfolio_transaction_service)
+
+
+@router.post(
+    "/jobs/settings",
+    tags=["Jobs"],
+    summary="Saves settings and processes the data in the background",
+    description="Submits a background job that creates or updates the settings and all related data, downloads the pricings and runs the data processing pipeline. Its progress is polled at /jobs/{job_id}. While a settings job of the user is active, submitting the same settings again returns that job, and submitting different settings is rejected with 409 until it ends.",
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_settings_job(
+    session_id: str = Depends(get_session_id),
+    db: Database = Depends(get_db),
+    settings_dto: SettingsDTO = Body(...),
+):
+    return submit_job(
+        session_id,
+        "settings",
+        _run_settings_job,
+        session_id,
+        db,
+        settings_dto,
+        payload_hash=_get_settings_hash(settings_dto),
+    )
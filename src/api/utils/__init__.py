@@ -5,9 +5,10 @@ from .managers import (
     get_upsert_manager,
     get_download_manager,
     get_data_processing_manager,
+    create_with_session,
 )
 from .pricings import download_pricings_logic
-
+from .jobs import job_queue
 
 __all__ = [
     "get_session_id",
@@ -17,5 +18,7 @@ __all__ = [
     "get_upsert_manager",
     "get_download_manager",
     "get_data_processing_manager",
+    "create_with_session",
     "download_pricings_logic",
+    "job_queue",
 ]
@@ -1,16 +1,39 @@
 from fastapi import Depends
 
 from .session import get_session_id
-from ..constants import DB_EXTENSIONS
+from ..constants import (
+    DB_EXTENSIONS,
+    DB_REGISTRY_MAX_SIZE,
+    DB_PRAGMA_PROFILE,
+    DB_PRAGMA_OVERRIDES,
+    DB_PROCESSING_PRAGMA_PROFILE,
+    DB_PROCESSING_PRAGMA_OVERRIDES,
+)
 
-from src.infrastructure import Database
+from src.infrastructure import Database, DatabaseRegistry, get_pragma_profile
 
 
-__all__ = ["get_db", "get_db_session", "get_db_validation", "load_db_extensions"]
+__all__ = [
+    "db_registry",
+    "processing_pragmas",
+    "get_db",
+    "get_db_session",
+    "get_db_validation",
+]
+
+
+db_registry = DatabaseRegistry(
+    max_size=DB_REGISTRY_MAX_SIZE,
+    extension_names=DB_EXTENSIONS,
+    pragmas=get_pragma_profile(DB_PRAGMA_PROFILE, DB_PRAGMA_OVERRIDES),
+)
+processing_pragmas = get_pragma_profile(
+    DB_PROCESSING_PRAGMA_PROFILE, DB_PROCESSING_PRAGMA_OVERRIDES
+)
 
 
 def get_db(session_id: str = Depends(get_session_id)):
-    return Database(session_id)
+    return db_registry.get(session_id)
 
 
 def get_db_session(db: Database = Depends(get_db)):
@@ -18,10 +41,4 @@ def get_db_session(db: Database = Depends(get_db)):
 
 
 def get_db_validation(session_id: str = Depends(get_session_id)):
-    db = Database(session_id)
-    return db.path_exists
-
-
-def load_db_extensions(db: Database = Depends(get_db)):
-    """Dependency to load required database extensions."""
-    db.load_extensions(DB_EXTENSIONS)
+    return db_registry.path_exists(session_id)
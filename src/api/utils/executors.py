@@ -0,0 +1,171 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Condition
+from typing import Callable
+import asyncio
+import time
+
+from fastapi import HTTPException, status
+
+from ..constants import (
+    EXECUTOR_LIMITS,
+    EXECUTOR_LIMIT_OVERRIDES,
+    EXECUTOR_RETRY_AFTER_SECONDS,
+)
+
+__all__ = [
+    "BoundedExecutor",
+    "executors",
+    "read_executor",
+    "processing_executor",
+    "download_executor",
+    "job_executor",
+    "get_executor_metrics",
+    "shutdown_executors",
+]
+
+
+class BoundedExecutor:
+    """
+    A thread pool for one class of work with a bounded queue.
+    At most `max_workers` calls run at once and `max_queue_size` more wait
+    for a thread, any further call is rejected with 503 and a Retry-After header
+    instead of queueing without limit. Background jobs, which were admitted already,
+    wait for room in the queue with `call` instead.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        max_queue_size: int,
+        retry_after_seconds: int,
+    ):
+        if max_workers < 1 or max_queue_size < 0:
+            raise ValueError(
+                f"The {name} executor needs at least one worker "
+                f"and a non-negative queue size."
+            )
+
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.retry_after_seconds = retry_after_seconds
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"{name}-executor"
+        )
+        self._lock = Condition()
+        self._admitted = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+
+    async def run(self, function: Callable, *args, **kwargs):
+        """Runs the function in the pool, or rejects it when the queue is full."""
+        return await asyncio.wrap_future(self.submit(function, *args, **kwargs))
+
+    def submit(self, function: Callable, *args, **kwargs) -> Future:
+        """
+        Submits the function to the pool without waiting for it,
+        or rejects it when the queue is full.
+        """
+        with self._lock:
+            if self._admitted >= self.max_workers + self.max_queue_size:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"Too many {self.name} requests. Please try again later.",
+                    headers={"Retry-After": str(self.retry_after_seconds)},
+                )
+            self._admitted += 1
+
+        return self._start(function, *args, **kwargs)
+
+    def call(self, function: Callable, *args, **kwargs):
+        """
+        Runs the function in the pool and waits for its result, waiting for room
+        in the queue when it is full. Only for the stages of background jobs.
+        """
+        with self._lock:
+            self._lock.wait_for(
+                lambda: self._admitted < self.max_workers + self.max_queue_size
+            )
+            self._admitted += 1
+
+        return self._start(function, *args, **kwargs).result()
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            started = self._completed + self._running
+            return {
+                "max_workers": self.max_workers,
+                "max_queue_size": self.max_queue_size,
+                "running": self._running,
+                "queued": self._admitted - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "queue_wait_seconds_mean": (
+                    self._queue_wait_total / started if started else 0.0
+                ),
+                "queue_wait_seconds_max": self._queue_wait_max,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _start(self, function: Callable, *args, **kwargs) -> Future:
+        submitted_at = time.perf_counter()
+        future = self._executor.submit(
+            self._call, submitted_at, function, *args, **kwargs
+        )
+        # A call cancelled before it started is released here as well
+        future.add_done_callback(self._release)
+        return future
+
+    def _call(self, submitted_at: float, function: Callable, *args, **kwargs):
+        queue_wait = time.perf_counter() - submitted_at
+        with self._lock:
+            self._running += 1
+            self._queue_wait_total += queue_wait
+            self._queue_wait_max = max(self._queue_wait_max, queue_wait)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+    def _release(self, future):
+        with self._lock:
+            self._admitted -= 1
+            self._lock.notify()
+
+
+def _create_executors() -> dict[str, BoundedExecutor]:
+    executors = {}
+    for name, limits in EXECUTOR_LIMITS.items():
+        limits = {**limits, **EXECUTOR_LIMIT_OVERRIDES.get(name, {})}
+        executors[name] = BoundedExecutor(
+            name,
+            max_workers=limits["workers"],
+            max_queue_size=limits["queue_size"],
+            retry_after_seconds=EXECUTOR_RETRY_AFTER_SECONDS,
+        )
+    return executors
+
+
+executors = _create_executors()
+read_executor = executors["read"]
+processing_executor = executors["processing"]
+download_executor = executors["download"]
+job_executor = executors["job"]
+
+
+def get_executor_metrics() -> dict[str, dict]:
+    return {name: executor.get_metrics() for name, executor in executors.items()}
+
+
+def shutdown_executors():
+    for executor in executors.values():
+        executor.shutdown()
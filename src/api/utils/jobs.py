@@ -0,0 +1,245 @@
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from threading import Event, Lock
+from typing import Callable
+import logging
+import time
+import uuid
+
+from fastapi import HTTPException, status
+from sqlalchemy import event
+
+from .executors import BoundedExecutor, job_executor
+from ..constants import JOB_RETENTION_SECONDS
+
+from src.infrastructure import Database
+
+__all__ = [
+    "Job",
+    "JobQueue",
+    "JobCancelledError",
+    "JobConflictError",
+    "job_queue",
+    "submit_job",
+    "job_session",
+]
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelledError(Exception):
+    """Raised inside a job at the next stage after its cancellation is requested."""
+
+    pass
+
+
+class JobConflictError(Exception):
+    """
+    Raised when a job of another kind, or of the same kind with another payload,
+    is already active for the same key.
+    """
+
+    def __init__(self, job: "Job"):
+        super().__init__(f"A {job.kind} job is already {job.status} ({job.id}).")
+        self.job = job
+
+
+@dataclass
+class Job:
+    key: str
+    kind: str
+    payload_hash: str | None = None
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    status: str = "pending"
+    stage: str | None = None
+    rows_written: int = 0
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    cancel_requested: Event = field(default_factory=Event, repr=False)
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in ("pending", "running")
+
+    @property
+    def elapsed_seconds(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def set_stage(self, stage: str):
+        """Moves the job to the next stage, a cancelled job stops here."""
+        if self.cancel_requested.is_set():
+            raise JobCancelledError(f"Job {self.id} was cancelled.")
+        self.stage = stage
+
+    def add_rows_written(self, count: int):
+        self.rows_written += count
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "rows_written": self.rows_written,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """
+    Runs long jobs in the given bounded executor, outside the threadpool of the API,
+    a job is rejected with 503 when its queue is full. A job runs each of its stages
+    in the executor of the stage's class of work, so it only holds a processing
+    thread while it processes. At most one job is active per key,
+    a job of the same kind and payload submitted while another one is active
+    attaches to it instead of running twice.
+    Finished jobs can be polled for `retention_seconds` after they end.
+    """
+
+    def __init__(self, executor: BoundedExecutor, retention_seconds: float):
+        self.retention_seconds = retention_seconds
+        self._executor = executor
+        self._jobs: dict[str, Job] = {}
+        self._active_jobs: dict[str, Job] = {}
+        self._futures: dict[str, Future] = {}
+        self._lock = Lock()
+
+    def submit(
+        self,
+        key: str,
+        kind: str,
+        function: Callable[..., None],
+        *args,
+        payload_hash: str | None = None,
+    ) -> tuple[Job, bool]:
+        """
+        Submits `function(job, *args)` unless a job is already active for the key.
+        The payload hash identifies the arguments, only a job with the same one
+        is attached to. Returns the job and whether it was newly created.
+        """
+        with self._lock:
+            self._remove_expired_jobs()
+            active_job = self._active_jobs.get(key)
+            if active_job is not None:
+                if active_job.kind != kind or active_job.payload_hash != payload_hash:
+                    raise JobConflictError(active_job)
+                return active_job, False
+
+            job = Job(key=key, kind=kind, payload_hash=payload_hash)
+            # Submitted first, a job rejected by the executor is not kept
+            future = self._executor.submit(self._run, job, function, args)
+            self._jobs[job.id] = job
+            self._active_jobs[key] = job
+            self._futures[job.id] = future
+            return job, True
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            self._remove_expired_jobs()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Job | None:
+        """
+        Cancels a pending job at once, a running one stops at its next stage.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.is_active:
+                return job
+
+            job.cancel_requested.set()
+            future = self._futures.get(job_id)
+            if future is not None and future.cancel():
+                self._finish(job, "cancelled")
+            return job
+
+    def shutdown(self):
+        """Cancels every active job, the executor is shut down by its owner."""
+        with self._lock:
+            for job in self._active_jobs.values():
+                job.cancel_requested.set()
+            futures = list(self._futures.values())
+        for future in futures:
+            future.cancel()
+
+    def _run(self, job: Job, function: Callable[..., None], args: tuple):
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            function(job, *args)
+        except JobCancelledError:
+            job_status = "cancelled"
+        except Exception as e:
+            logger.exception("Job %s (%s) failed.", job.id, job.kind)
+            job.error = str(e)
+            job_status = "failed"
+        else:
+            job_status = "finished"
+
+        with self._lock:
+            self._finish(job, job_status)
+
+    def _finish(self, job: Job, job_status: str):
+        job.status = job_status
+        job.finished_at = time.time()
+        self._futures.pop(job.id, None)
+        if self._active_jobs.get(job.key) is job:
+            del self._active_jobs[job.key]
+
+    def _remove_expired_jobs(self):
+        expired_before = time.time() - self.retention_seconds
+        for job_id, job in list(self._jobs.items()):
+            if not job.is_active and job.finished_at < expired_before:
+                del self._jobs[job_id]
+
+
+job_queue = JobQueue(executor=job_executor, retention_seconds=JOB_RETENTION_SECONDS)
+
+
+def submit_job(
+    session_id: str,
+    kind: str,
+    function: Callable[..., None],
+    *args,
+    payload_hash: str | None = None,
+):
+    """Submits a job of the user and returns its status."""
+    try:
+        job, created = job_queue.submit(
+            session_id, kind, function, *args, payload_hash=payload_hash
+        )
+    except JobConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    return {**job.to_dict(), "attached": not created}
+
+
+@contextmanager
+def job_session(db: Database, job: Job):
+    """
+    A session of the job's own, committed when the block succeeds.
+    Every row its statements insert, update or delete is counted on the job.
+    """
+    session = db.SessionMaker()
+
+    @event.listens_for(session, "after_begin")
+    def count_rows_written(session, transaction, connection):
+        @event.listens_for(connection, "after_cursor_execute")
+        def add_rows_written(conn, cursor, statement, parameters, context, executemany):
+            if context.isinsert or context.isupdate or context.isdelete:
+                job.add_rows_written(max(cursor.rowcount, 0))
+
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
@@ -1,6 +1,9 @@
 from fastapi import Depends
+from sqlalchemy.orm import Session
+import inspect
 
 from .services import *
+from ..constants import PERFORMANCE_ENGINE, PERFORMANCE_WORKERS, PIVOT_CURRENCY
 
 from src.domain import *
 from src.application import UpsertManager, DownloadManager, DataProcessingManager
@@ -10,6 +13,7 @@ __all__ = [
     "get_upsert_manager",
     "get_download_manager",
     "get_data_processing_manager",
+    "create_with_session",
 ]
 
 
@@ -34,6 +38,12 @@ def get_upsert_manager(
     portfolio_transactions_service: PortfolioTransactionService = Depends(
         get_portfolio_transactions_service
     ),
+    portfolio_asset_checkpoint_service: PortfolioAssetCheckpointService = Depends(
+        get_portfolio_asset_checkpoint_service
+    ),
+    effective_asset_price_service: EffectiveAssetPriceService = Depends(
+        get_effective_asset_price_service
+    ),
 ) -> UpsertManager:
     return UpsertManager(
         user_service=user_service,
@@ -46,6 +56,9 @@ def get_upsert_manager(
         portfolio_group_asset_service=portfolio_group_asset_service,
         portfolio_transaction_file_service=portfolio_transaction_file_service,
         portfolio_transactions_service=portfolio_transactions_service,
+        portfolio_asset_checkpoint_service=portfolio_asset_checkpoint_service,
+        effective_asset_price_service=effective_asset_price_service,
+        pivot_currency=PIVOT_CURRENCY,
     )
 
 
@@ -62,6 +75,7 @@ def get_download_manager(
     adjusted_asset_pricing_service: AdjustedAssetPricingService = Depends(
         get_adjusted_asset_pricing_service
     ),
+    calendar_date_service: CalendarDateService = Depends(get_calendar_date_service),
 ) -> DownloadManager:
     return DownloadManager(
         currency_pair_service=currency_pair_service,
@@ -70,6 +84,8 @@ def get_download_manager(
         asset_pricing_service=asset_pricing_service,
         adjusted_currency_pair_pricing_service=adjusted_currency_pair_pricing_service,
         adjusted_asset_pricing_service=adjusted_asset_pricing_service,
+        calendar_date_service=calendar_date_service,
+        pivot_currency=PIVOT_CURRENCY,
     )
 
 
@@ -94,6 +110,16 @@ def get_data_processing_manager(
     portfolio_aggregate_service: PortfolioAggregateService = Depends(
         get_portfolio_aggregate_service
     ),
+    calendar_date_service: CalendarDateService = Depends(get_calendar_date_service),
+    portfolio_asset_checkpoint_service: PortfolioAssetCheckpointService = Depends(
+        get_portfolio_asset_checkpoint_service
+    ),
+    performance_state_service: PerformanceStateService = Depends(
+        get_performance_state_service
+    ),
+    effective_asset_price_service: EffectiveAssetPriceService = Depends(
+        get_effective_asset_price_service
+    ),
 ) -> DataProcessingManager:
     return DataProcessingManager(
         adjusted_portfolio_transaction_service=adjusted_portfolio_transaction_service,
@@ -104,4 +130,26 @@ def get_data_processing_manager(
         portfolio_service=portfolio_service,
         asset_service=asset_service,
         portfolio_aggregate_service=portfolio_aggregate_service,
+        calendar_date_service=calendar_date_service,
+        portfolio_asset_checkpoint_service=portfolio_asset_checkpoint_service,
+        performance_state_service=performance_state_service,
+        effective_asset_price_service=effective_asset_price_service,
+        performance_engine=PERFORMANCE_ENGINE,
+        pivot_currency=PIVOT_CURRENCY,
+        performance_workers=PERFORMANCE_WORKERS,
+    )
+
+
+def create_with_session(manager_dependency, session: Session):
+    """
+    Creates a manager outside of a request, e.g. in a background job,
+    with all of its services bound to the given session.
+    """
+    return manager_dependency(
+        **{
+            name: parameter.default.dependency(session=session)
+            for name, parameter in inspect.signature(
+                manager_dependency
+            ).parameters.items()
+        }
     )
@@ -1,9 +1,8 @@
-from fastapi.concurrency import run_in_threadpool
+from .executors import download_executor
 
 from src.application import DownloadManager
 
-
-__all__ = ["download_pricings_logic", "PricingDownloadError"]
+__all__ = ["download_pricings", "download_pricings_logic", "PricingDownloadError"]
 
 
 class PricingDownloadError(Exception):
@@ -12,7 +11,7 @@ class PricingDownloadError(Exception):
     pass
 
 
-async def download_pricings_logic(
+def download_pricings(
     download_manager: DownloadManager,
     asset_symbols: set[str],
     transaction_file_currencies: set[str],
@@ -20,15 +19,28 @@ async def download_pricings_logic(
 ):
     """
     Core logic for downloading asset and currency prices.
-    Can be reused by different endpoints.
+    Can be reused by different endpoints and background jobs.
     """
     if not asset_symbols and not transaction_file_currencies:
         raise PricingDownloadError(
             "No assets or currencies found in user settings to download prices for."
         )
 
-    await run_in_threadpool(
-        download_manager.upsert_assets_and_currencies,
+    download_manager.upsert_assets_and_currencies(
+        asset_symbols, transaction_file_currencies, analysis_currency
+    )
+
+
+async def download_pricings_logic(
+    download_manager: DownloadManager,
+    asset_symbols: set[str],
+    transaction_file_currencies: set[str],
+    analysis_currency: str,
+):
+    """Runs `download_pricings` in the executor of network downloads."""
+    await download_executor.run(
+        download_pricings,
+        download_manager,
         asset_symbols,
         transaction_file_currencies,
         analysis_currency,
@@ -34,18 +34,30 @@ get_asset_pricing_service = _create_service_dependency(
     AssetPricingService, AssetPricingRepository
 )
 get_asset_service = _create_service_dependency(AssetService, AssetRepository)
+get_calendar_date_service = _create_service_dependency(
+    CalendarDateService, CalendarDateRepository
+)
 get_currency_pair_pricing_service = _create_service_dependency(
     CurrencyPairPricingService, CurrencyPairPricingRepository
 )
 get_currency_pair_service = _create_service_dependency(
     CurrencyPairService, CurrencyPairRepository
 )
+get_effective_asset_price_service = _create_service_dependency(
+    EffectiveAssetPriceService, EffectiveAssetPriceRepository
+)
+get_performance_state_service = _create_service_dependency(
+    PerformanceStateService, PerformanceStateRepository
+)
 get_portfolio_aggregate_performance_service = _create_service_dependency(
     PortfolioAggregatePerformanceService, PortfolioAggregatePerformanceRepository
 )
 get_portfolio_aggregate_service = _create_service_dependency(
     PortfolioAggregateService, PortfolioAggregateRepository
 )
+get_portfolio_asset_checkpoint_service = _create_service_dependency(
+    PortfolioAssetCheckpointService, PortfolioAssetCheckpointRepository
+)
 get_portfolio_asset_performance_service = _create_service_dependency(
     PortfolioAssetPerformanceService, PortfolioAssetPerformanceRepository
 )
@@ -80,10 +92,14 @@ __all__ = [
     "get_adjusted_portfolio_transaction_service",
     "get_asset_pricing_service",
     "get_asset_service",
+    "get_calendar_date_service",
     "get_currency_pair_pricing_service",
     "get_currency_pair_service",
+    "get_effective_asset_price_service",
+    "get_performance_state_service",
     "get_portfolio_aggregate_performance_service",
     "get_portfolio_aggregate_service",
+    "get_portfolio_asset_checkpoint_service",
     "get_portfolio_asset_performance_service",
     "get_portfolio_group_asset_service",
     "get_portfolio_group_performance_service",
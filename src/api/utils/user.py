@@ -1,8 +1,8 @@
 from fastapi import HTTPException, status, Depends
-from fastapi.concurrency import run_in_threadpool
 
 from .session import get_session_id
 from .services import get_user_service
+from .executors import read_executor
 
 from src.domain import User, UserService, Portfolio, PortfolioGroup, Asset
 
@@ -19,7 +19,7 @@ async def get_user(
     session_id: str = Depends(get_session_id),
     user_service: UserService = Depends(get_user_service),
 ):
-    user = await run_in_threadpool(user_service.get_one_by_session_id, session_id)
+    user = await read_executor.run(user_service.get_one_by_session_id, session_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -48,7 +48,7 @@ async def validate_portfolio_for_user(
     """
     Dependency that checks if the portfolio belongs to the user and returns it.
     """
-    portfolio = await run_in_threadpool(_validate_portfolio_sync, portfolio_id, user)
+    portfolio = await read_executor.run(_validate_portfolio_sync, portfolio_id, user)
     if portfolio:
         return portfolio
 
@@ -72,7 +72,7 @@ async def validate_portfolio_group_for_user(
     """
     Dependency that checks if the portfolio group belongs to the user and returns it.
     """
-    portfolio_group = await run_in_threadpool(
+    portfolio_group = await read_executor.run(
         _validate_portfolio_group_sync, portfolio_group_id, user
     )
     if portfolio_group:
@@ -109,7 +109,7 @@ async def validate_asset_in_portfolio(
     Dependency that checks if an asset exists within a given portfolio and returns it.
     Relies on `validate_portfolio_for_user` to ensure portfolio access is allowed.
     """
-    asset = await run_in_threadpool(
+    asset = await read_executor.run(
         _validate_asset_in_portfolio_sync, asset_id, portfolio, user
     )
     if asset:
@@ -1,9 +1,12 @@
 from .upsert_manager import UpsertManager
 from .download_manager import DownloadManager
-from .data_processing_manager import DataProcessingManager
+from .data_processing_manager import DataProcessingManager, PERFORMANCE_ENGINES
+from .parallel_rollup import shutdown_process_pool
 
 __all__ = [
     "UpsertManager",
     "DownloadManager",
     "DataProcessingManager",
+    "PERFORMANCE_ENGINES",
+    "shutdown_process_pool",
 ]
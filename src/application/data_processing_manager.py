@@ -1,5 +1,24 @@
+import pandas as pd
+
 from src.domain import *
 
+from .performance_rollup_engine import (
+    PORTFOLIO_PERFORMANCE_COLUMNS,
+    calculate_aggregate_rollup,
+)
+from .parallel_rollup import calculate_portfolio_rollups
+
+# The SQL engine runs the window functions of every level in SQLite.
+# The NumPy engine computes the asset level in memory and bulk inserts it,
+# while the rollup engine also derives the group, portfolio and aggregate
+# levels from it in one pass and writes all four tables at the end.
+# With more than one worker the rollup engine calculates the portfolios
+# in separate processes and only the aggregate level in this one.
+# The in-memory engines continue each partition from its state on the day before
+# the checkpoint date, the NumPy engine at the asset level only. The window
+# functions of the SQL engine cannot be seeded, so it reads the whole history.
+PERFORMANCE_ENGINES = ("sql", "numpy", "rollup")
+
 
 class DataProcessingManager:
     def __init__(
@@ -12,7 +31,25 @@ class DataProcessingManager:
         portfolio_service: PortfolioService,
         asset_service: AssetService,
         portfolio_aggregate_service: PortfolioAggregateService,
+        calendar_date_service: CalendarDateService,
+        portfolio_asset_checkpoint_service: PortfolioAssetCheckpointService,
+        performance_state_service: PerformanceStateService,
+        effective_asset_price_service: EffectiveAssetPriceService,
+        performance_engine: str = "rollup",
+        pivot_currency: str | None = None,
+        performance_workers: int = 1,
     ):
+        if performance_engine not in PERFORMANCE_ENGINES:
+            raise ValueError(
+                f"Unknown performance engine '{performance_engine}'. "
+                f"Available engines: {', '.join(PERFORMANCE_ENGINES)}."
+            )
+        if performance_workers < 1:
+            raise ValueError(
+                f"The number of performance workers must be at least 1, "
+                f"got {performance_workers}."
+            )
+
         self.adjusted_portfolio_transaction_service = (
             adjusted_portfolio_transaction_service
         )
@@ -25,12 +62,133 @@ class DataProcessingManager:
         self.portfolio_service = portfolio_service
         self.asset_service = asset_service
         self.portfolio_aggregate_service = portfolio_aggregate_service
+        self.calendar_date_service = calendar_date_service
+        self.portfolio_asset_checkpoint_service = portfolio_asset_checkpoint_service
+        self.performance_state_service = performance_state_service
+        self.effective_asset_price_service = effective_asset_price_service
+        self.performance_engine = performance_engine
+        self.pivot_currency = pivot_currency
+        self.performance_workers = performance_workers
+
+    def process_calendar_dates(self) -> None:
+        self.calendar_date_service.insert_missing_dates()
 
     def process_adjusted_portfolio_transactions(self, user_id: int) -> None:
-        self.adjusted_portfolio_transaction_service.insert_with_select(user_id)
+        self.adjusted_portfolio_transaction_service.insert_with_select(
+            user_id, self.pivot_currency
+        )
+
+    def process_effective_asset_prices(self, user_id: int) -> None:
+        self.effective_asset_price_service.insert_with_select(
+            user_id, self.pivot_currency
+        )
+
+    def process_performances(self, user_id: int) -> None:
+        # Only the states on the day before the checkpoint dates are continued from
+        self.performance_state_service.delete_many_by_user_id_and_date(user_id)
+        if self.performance_engine == "rollup":
+            self.process_performance_rollup(user_id)
+        else:
+            self.process_portfolio_asset_performances(user_id)
+            self.process_portfolio_group_performances(user_id)
+            self.process_portfolio_performances(user_id)
+            self.process_portfolio_aggregate_performances(user_id)
+
+    def process_performance_rollup(self, user_id: int) -> None:
+        # The portfolios are calculated from frames read once in this transaction,
+        # it also holds the rows written by the earlier processing steps
+        portfolio_inputs = {
+            "unit_prices": self.portfolio_asset_performance_service.get_unit_prices(
+                user_id
+            ),
+            "asset_transactions": (
+                self.portfolio_asset_performance_service.get_transactions_by_date(
+                    user_id
+                )
+            ),
+            "asset_history": (
+                self.portfolio_asset_performance_service.get_performance_history(
+                    user_id
+                )
+            ),
+            "asset_states": self.performance_state_service.get_performance_states(
+                user_id, "asset"
+            ),
+            "portfolio_transactions": (
+                self.portfolio_performance_service.get_transactions_by_date(user_id)
+            ),
+            "group_history": (
+                self.portfolio_group_performance_service.get_performance_history(
+                    user_id
+                )
+            ),
+            "portfolio_history": (
+                self.portfolio_performance_service.get_performance_history(user_id)
+            ),
+            "unchanged_asset_performances": (
+                self.portfolio_asset_performance_service.get_unchanged_performances(
+                    user_id
+                )
+            ),
+            "unchanged_group_performances": (
+                self.portfolio_group_performance_service.get_unchanged_performances(
+                    user_id
+                )
+            ),
+            "group_states": self.performance_state_service.get_performance_states(
+                user_id, "group"
+            ),
+            "portfolio_states": self.performance_state_service.get_performance_states(
+                user_id, "portfolio"
+            ),
+        }
+        (
+            asset_performances,
+            group_performances,
+            portfolio_performances,
+            portfolio_states,
+        ) = calculate_portfolio_rollups(portfolio_inputs, self.performance_workers)
+        aggregate_performances, aggregate_states = calculate_aggregate_rollup(
+            portfolio_performances=portfolio_performances,
+            unchanged_portfolio_performances=(
+                self.portfolio_performance_service.get_unchanged_performances(user_id)
+            ),
+            aggregate_history=(
+                self.portfolio_aggregate_performance_service.get_performance_history(
+                    user_id
+                )
+            ),
+            aggregate_states=self.performance_state_service.get_performance_states(
+                user_id, "aggregate"
+            ),
+        )
+
+        # Every level is written only after all of them have been calculated
+        self.portfolio_asset_performance_service.replace_from_checkpoint(
+            user_id, asset_performances
+        )
+        self.portfolio_group_performance_service.replace_from_checkpoint(
+            user_id, group_performances
+        )
+        self.portfolio_performance_service.replace_from_checkpoint(
+            user_id, portfolio_performances[PORTFOLIO_PERFORMANCE_COLUMNS]
+        )
+        self.portfolio_aggregate_performance_service.replace_from_checkpoint(
+            user_id, aggregate_performances
+        )
+        self.performance_state_service.insert_many(
+            pd.concat([portfolio_states, aggregate_states], ignore_index=True)
+        )
 
     def process_portfolio_asset_performances(self, user_id: int) -> None:
-        self.portfolio_asset_performance_service.insert_with_select(user_id)
+        if self.performance_engine == "sql":
+            self.portfolio_asset_performance_service.insert_with_select(user_id)
+        else:
+            asset_states = self.portfolio_asset_performance_service.insert_with_numpy(
+                user_id,
+                self.performance_state_service.get_performance_states(user_id, "asset"),
+            )
+            self.performance_state_service.insert_many(asset_states)
 
     def process_portfolio_group_performances(self, user_id: int) -> None:
         self.portfolio_group_performance_service.insert_with_select(user_id)
@@ -42,4 +200,7 @@ class DataProcessingManager:
         self.portfolio_aggregate_performance_service.insert_with_select(user_id)
 
     def update_checkpoint_date(self, user_id: int) -> None:
+        self.portfolio_asset_checkpoint_service.update_checkpoint_dates(
+            user_id=user_id, pivot_currency=self.pivot_currency
+        )
         self.portfolio_aggregate_service.update_checkpoint_date(user_id=user_id)
@@ -13,6 +13,8 @@ class DownloadManager:
         asset_pricing_service: AssetPricingService,
         adjusted_currency_pair_pricing_service: AdjustedCurrencyPairPricingService,
         adjusted_asset_pricing_service: AdjustedAssetPricingService,
+        calendar_date_service: CalendarDateService,
+        pivot_currency: str | None = None,
     ):
         self.currency_pair_service = currency_pair_service
         self.currency_pair_pricing_service = currency_pair_pricing_service
@@ -22,6 +24,8 @@ class DownloadManager:
             adjusted_currency_pair_pricing_service
         )
         self.adjusted_asset_pricing_service = adjusted_asset_pricing_service
+        self.calendar_date_service = calendar_date_service
+        self.pivot_currency = pivot_currency
 
     def upsert_assets_and_currencies(
         self,
@@ -31,22 +35,33 @@ class DownloadManager:
     ):
         etl_currency_pair_symbols = set()
         etl_asset_symbols = set()
+        # With a pivot currency every currency is downloaded only against it,
+        # the analysis currency included, and cross rates are derived from them
+        quote_currency = self.pivot_currency or analysis_currency
+        if self.pivot_currency:
+            transaction_file_currencies = transaction_file_currencies | {
+                analysis_currency
+            }
 
         for asset_symbol in asset_symbols:
             asset_info = fetch_asset_info(symbol=asset_symbol)
             asset_currency = asset_info["currency"]
             asset_full_name = asset_info["full_name"]
 
-            currency_pair_name = f"{asset_currency}{analysis_currency}".lower()
+            currency_pair_name = f"{asset_currency}{quote_currency}".lower()
             currency_pair_symbol = f"{currency_pair_name}=x"
-            currency_pair = self.currency_pair_service.upsert_one(
-                name=currency_pair_name,
-                symbol=currency_pair_symbol,
-                first_currency_name=asset_currency,
-                second_currency_name=analysis_currency,
-            )
-            if currency_pair:
-                etl_currency_pair_symbols.add(currency_pair_symbol)
+            if not (
+                self.pivot_currency
+                and asset_currency.lower() == self.pivot_currency.lower()
+            ):
+                currency_pair = self.currency_pair_service.upsert_one(
+                    name=currency_pair_name,
+                    symbol=currency_pair_symbol,
+                    first_currency_name=asset_currency,
+                    second_currency_name=quote_currency,
+                )
+                if currency_pair:
+                    etl_currency_pair_symbols.add(currency_pair_symbol)
 
             asset = self.asset_service.upsert_one(
                 symbol=asset_symbol,
@@ -57,12 +72,12 @@ class DownloadManager:
                 etl_asset_symbols.add(asset_symbol)
 
         for currency in transaction_file_currencies:
-            currency_pair_name = f"{currency}{analysis_currency}".lower()
+            currency_pair_name = f"{currency}{quote_currency}".lower()
             currency_pair_symbol = f"{currency_pair_name}=x"
 
             if (
                 currency_pair_symbol in etl_currency_pair_symbols
-                or currency.lower() == analysis_currency.lower()
+                or currency.lower() == quote_currency.lower()
             ):
                 continue
 
@@ -70,11 +85,14 @@ class DownloadManager:
                 symbol=currency_pair_symbol,
                 name=currency_pair_name,
                 first_currency_name=currency,
-                second_currency_name=analysis_currency,
+                second_currency_name=quote_currency,
             )
             if currency_pair:
                 etl_currency_pair_symbols.add(currency_pair_symbol)
 
+        # Adjusted pricings are forward filled along the calendar
+        self.calendar_date_service.insert_missing_dates()
+
         currency_pairs_etl_yfinance(
             symbols=etl_currency_pair_symbols,
             currency_pair_service=self.currency_pair_service,
@@ -0,0 +1,120 @@
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+from typing import Mapping
+
+import pandas as pd
+
+from .performance_rollup_engine import calculate_portfolio_rollup
+
+
+def calculate_portfolio_rollups(
+    inputs: Mapping[str, pd.DataFrame], workers: int
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Runs `calculate_portfolio_rollup` on the inputs split by portfolio_id
+    in a pool of worker processes, or on all of them at once with a single worker.
+    The results are combined in the order of portfolio_id, so they do not depend
+    on the number of workers or the order the portfolios finish in.
+    """
+    if workers <= 1:
+        return calculate_portfolio_rollup(**inputs)
+
+    portfolio_ids = sorted(
+        set(inputs["portfolio_transactions"]["portfolio_id"])
+        | set(inputs["unit_prices"]["portfolio_id"])
+    )
+    inputs_by_portfolio = {
+        name: _split_by_portfolio(data_frame, portfolio_ids)
+        for name, data_frame in inputs.items()
+    }
+    partitions = [
+        {name: inputs_by_portfolio[name][portfolio_id] for name in inputs}
+        for portfolio_id in portfolio_ids
+    ]
+    executor = _process_pool.get(workers)
+    try:
+        results = list(executor.map(_calculate_partition, partitions))
+    except BrokenProcessPool:
+        # A worker died, e.g. killed when running out of memory, possibly
+        # while the pool was idle, so the run is repeated once in a new pool
+        _process_pool.discard(executor)
+        results = list(_process_pool.get(workers).map(_calculate_partition, partitions))
+
+    return tuple(_concat([result[index] for result in results]) for index in range(4))
+
+
+class _ProcessPool:
+    """
+    Holds the pool of worker processes, which is kept for the whole process,
+    so the workers start only once. A broken pool is discarded and replaced
+    by a new one on the next call.
+    """
+
+    def __init__(self):
+        self._executor: ProcessPoolExecutor | None = None
+        self._workers = 0
+        self._lock = Lock()
+
+    def get(self, workers: int) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is not None and self._workers != workers:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            if self._executor is None:
+                # Spawned workers share nothing with the threads of the parent
+                # process, they import the infrastructure first like the entry
+                # points of the app do
+                self._executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=importlib.import_module,
+                    initargs=("src.infrastructure",),
+                )
+                self._workers = workers
+            return self._executor
+
+    def discard(self, executor: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+_process_pool = _ProcessPool()
+
+
+def shutdown_process_pool():
+    """Stops the worker processes, a later calculation starts a new pool."""
+    _process_pool.shutdown()
+
+
+def _calculate_partition(inputs: Mapping[str, pd.DataFrame]):
+    return calculate_portfolio_rollup(**inputs)
+
+
+def _split_by_portfolio(
+    data_frame: pd.DataFrame, portfolio_ids: list[int]
+) -> dict[int, pd.DataFrame]:
+    if data_frame.empty:
+        return {portfolio_id: data_frame for portfolio_id in portfolio_ids}
+
+    data_frames = dict(tuple(data_frame.groupby("portfolio_id", sort=False)))
+    return {
+        portfolio_id: data_frames.get(portfolio_id, data_frame.iloc[:0])
+        for portfolio_id in portfolio_ids
+    }
+
+
+def _concat(data_frames: list[pd.DataFrame]) -> pd.DataFrame:
+    # Empty results of portfolios without rows would only blur the column types
+    non_empty = [data_frame for data_frame in data_frames if not data_frame.empty]
+    return pd.concat(non_empty or data_frames[:1], ignore_index=True)
@@ -0,0 +1,336 @@
+import numpy as np
+import pandas as pd
+
+from src.domain.portfolio_asset_performances.portfolio_asset_performance_engine import (
+    METRIC_COLUMNS,
+    SERIES_COLUMNS,
+    calculate_asset_performances,
+    calculate_performance_metrics,
+    get_states_by_partition,
+)
+
+# Columns of the lower level summed into every group and portfolio aggregate
+SUMMED_COLUMNS = [
+    "market_value",
+    "market_value_adj",
+    "delta_quantity_value_adj",
+    "invested_amount",
+    "invested_amount_total",
+    "asset_disposal_income",
+    "asset_disposal_income_total",
+    "asset_holding_income",
+    "asset_holding_income_total",
+    "investment_income",
+    "investment_income_total",
+    "profit",
+    "profit_total",
+]
+
+# Columns of a portfolio accumulated from its adjusted transactions
+PORTFOLIO_CUMULATIVE_COLUMNS = [
+    "cash_balance",
+    "invested_amount",
+    "invested_amount_total",
+    "asset_disposal_income",
+    "asset_disposal_income_total",
+    "asset_holding_income",
+    "asset_holding_income_total",
+    "interest_income",
+    "interest_income_total",
+    "investment_income",
+    "investment_income_total",
+]
+
+PORTFOLIO_VALUE_COLUMNS = [
+    "market_value",
+    "market_value_adj",
+    "delta_quantity_value_adj",
+]
+
+# Columns identifying the partition of a state on every level
+STATE_KEYS = {
+    "group": ["portfolio_id", "portfolio_group_id"],
+    "portfolio": ["portfolio_id"],
+    "aggregate": ["portfolio_aggregate_id"],
+}
+
+GROUP_PERFORMANCE_COLUMNS = [
+    "portfolio_id",
+    "portfolio_group_id",
+    "date",
+    *SUMMED_COLUMNS,
+    *METRIC_COLUMNS,
+]
+
+PORTFOLIO_PERFORMANCE_COLUMNS = [
+    "portfolio_id",
+    "date",
+    *PORTFOLIO_VALUE_COLUMNS,
+    *PORTFOLIO_CUMULATIVE_COLUMNS,
+    "profit",
+    "profit_total",
+    *METRIC_COLUMNS,
+]
+
+AGGREGATE_PERFORMANCE_COLUMNS = [
+    "portfolio_aggregate_id",
+    "date",
+    *PORTFOLIO_VALUE_COLUMNS,
+    *PORTFOLIO_CUMULATIVE_COLUMNS,
+    "profit",
+    "profit_total",
+    *METRIC_COLUMNS,
+]
+
+
+def calculate_portfolio_rollup(
+    unit_prices: pd.DataFrame,
+    asset_transactions: pd.DataFrame,
+    asset_history: pd.DataFrame,
+    asset_states: pd.DataFrame,
+    portfolio_transactions: pd.DataFrame,
+    group_history: pd.DataFrame,
+    portfolio_history: pd.DataFrame,
+    unchanged_asset_performances: pd.DataFrame,
+    unchanged_group_performances: pd.DataFrame,
+    group_states: pd.DataFrame,
+    portfolio_states: pd.DataFrame,
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Calculates the portfolio asset performances and rolls them up to the group
+    and portfolio levels in one pass, producing the same rows as the
+    `insert_with_select` queries of those levels. The portfolios are independent
+    of each other, so they can be calculated together or one at a time.
+
+    The asset inputs are those of `calculate_asset_performances`.
+    portfolio_transactions holds every calendar date of each portfolio from the
+    checkpoint date onwards with its adjusted transactions summed per date.
+    The histories hold the performances already stored before the checkpoint date.
+    A level can be recalculated from an earlier checkpoint date than some of the
+    partitions below it, the unchanged performances hold their stored rows
+    between the two dates.
+    The states hold the stored states of the partitions on the day before
+    their checkpoint dates, a partition with a state is continued from it.
+    Returns the performances of every level and the states of all of them,
+    the portfolio performances still carry the portfolio_aggregate_id they are
+    rolled up by in `calculate_aggregate_rollup`.
+    """
+    asset_performances, new_asset_states = calculate_asset_performances(
+        unit_prices, asset_transactions, asset_history, asset_states
+    )
+
+    group_keys = ["portfolio_id", "portfolio_group_id"]
+    groups = (
+        pd.concat([asset_performances, unchanged_asset_performances])
+        .groupby([*group_keys, "date"], sort=True)[SUMMED_COLUMNS]
+        .sum()
+        .reset_index()
+    )
+    group_performances, new_group_states = _calculate_level(
+        groups, group_history, group_states, group_keys, "group"
+    )
+
+    portfolio_values = (
+        pd.concat([group_performances, unchanged_group_performances])
+        .groupby(["portfolio_id", "date"])[PORTFOLIO_VALUE_COLUMNS]
+        .sum()
+        .reset_index()
+    )
+    portfolios = portfolio_transactions.merge(
+        portfolio_values, on=["portfolio_id", "date"], how="left"
+    )
+    # A portfolio without any assets has no values to take the type from
+    portfolios[PORTFOLIO_VALUE_COLUMNS] = (
+        portfolios[PORTFOLIO_VALUE_COLUMNS].fillna(0.0).astype(float)
+    )
+    portfolios = portfolios.sort_values(["portfolio_id", "date"], kind="stable")
+    portfolios = _accumulate_portfolio_transactions(
+        portfolios, portfolio_history, portfolio_states
+    )
+    portfolio_performances, new_portfolio_states = _calculate_level(
+        portfolios,
+        portfolio_history,
+        portfolio_states,
+        ["portfolio_id"],
+        "portfolio",
+        PORTFOLIO_CUMULATIVE_COLUMNS,
+    )
+
+    return (
+        asset_performances,
+        group_performances[GROUP_PERFORMANCE_COLUMNS],
+        portfolio_performances[
+            ["portfolio_aggregate_id", *PORTFOLIO_PERFORMANCE_COLUMNS]
+        ],
+        pd.concat(
+            [
+                new_asset_states,
+                pd.DataFrame([*new_group_states, *new_portfolio_states]),
+            ],
+            ignore_index=True,
+        ),
+    )
+
+
+def calculate_aggregate_rollup(
+    portfolio_performances: pd.DataFrame,
+    unchanged_portfolio_performances: pd.DataFrame,
+    aggregate_history: pd.DataFrame,
+    aggregate_states: pd.DataFrame,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Rolls the new portfolio performances of all portfolios up to the portfolio
+    aggregate level, producing the same rows as its `insert_with_select` query.
+    Returns the performances and the states of the level.
+    """
+    # The portfolio rows carry portfolio_aggregate_id from the transactions
+    aggregates = (
+        pd.concat([portfolio_performances, unchanged_portfolio_performances])
+        .groupby(["portfolio_aggregate_id", "date"], sort=True)[
+            [
+                *PORTFOLIO_VALUE_COLUMNS,
+                *PORTFOLIO_CUMULATIVE_COLUMNS,
+                "profit",
+                "profit_total",
+            ]
+        ]
+        .sum()
+        .reset_index()
+    )
+    aggregate_performances, new_aggregate_states = _calculate_level(
+        aggregates,
+        aggregate_history,
+        aggregate_states,
+        ["portfolio_aggregate_id"],
+        "aggregate",
+    )
+
+    return (
+        aggregate_performances[AGGREGATE_PERFORMANCE_COLUMNS],
+        pd.DataFrame(new_aggregate_states),
+    )
+
+
+def _accumulate_portfolio_transactions(
+    portfolios: pd.DataFrame,
+    portfolio_history: pd.DataFrame,
+    portfolio_states: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    Turns the transactions summed per date into running sums per portfolio,
+    continuing from the state or the stored row of the day before the checkpoint date.
+    """
+    portfolios = portfolios.copy()
+    is_first_row = ~portfolios["portfolio_id"].duplicated()
+    if not portfolio_states.empty:
+        seeds = pd.DataFrame(
+            portfolio_states["cumulative_values"].tolist(),
+            index=portfolio_states["portfolio_id"],
+        )
+        for column in PORTFOLIO_CUMULATIVE_COLUMNS:
+            portfolios.loc[is_first_row, column] += (
+                portfolios.loc[is_first_row, "portfolio_id"]
+                .map(seeds[column])
+                .fillna(0.0)
+            )
+    if not portfolio_history.empty:
+        seed_dates = (
+            pd.to_datetime(portfolios.loc[is_first_row, "checkpoint_date"])
+            - pd.Timedelta(days=1)
+        ).dt.strftime("%Y-%m-%d")
+        seeds = portfolio_history.merge(
+            pd.DataFrame(
+                {
+                    "portfolio_id": portfolios.loc[is_first_row, "portfolio_id"],
+                    "date": seed_dates,
+                }
+            ),
+            on=["portfolio_id", "date"],
+        ).set_index("portfolio_id")
+        for column in PORTFOLIO_CUMULATIVE_COLUMNS:
+            portfolios.loc[is_first_row, column] += (
+                portfolios.loc[is_first_row, "portfolio_id"]
+                .map(seeds[column])
+                .fillna(0.0)
+            )
+
+    for column in PORTFOLIO_CUMULATIVE_COLUMNS:
+        portfolios[column] = portfolios.groupby("portfolio_id")[column].cumsum()
+
+    portfolios["profit"] = (
+        portfolios["market_value"]
+        + portfolios["invested_amount"]
+        + portfolios["investment_income"]
+    )
+    portfolios["profit_total"] = (
+        portfolios["market_value"]
+        + portfolios["invested_amount_total"]
+        + portfolios["investment_income_total"]
+    )
+    return portfolios
+
+
+def _calculate_level(
+    rows: pd.DataFrame,
+    history: pd.DataFrame,
+    states: pd.DataFrame,
+    keys: list[str],
+    level: str,
+    cumulative_columns: list[str] | None = None,
+) -> tuple[pd.DataFrame, list[dict]]:
+    if rows.empty:
+        return rows.reindex(columns=[*rows.columns, *METRIC_COLUMNS]), []
+
+    if "profit" not in history:
+        history = history.assign(
+            profit=history["market_value"]
+            + history["invested_amount"]
+            + history["investment_income"],
+            profit_total=history["market_value"]
+            + history["invested_amount_total"]
+            + history["investment_income_total"],
+        )
+    history_by_partition = dict(tuple(history.groupby(keys, sort=False)))
+    states_by_partition = get_states_by_partition(states, keys)
+
+    performances = []
+    partition_states = []
+    for partition_key, partition_rows in rows.groupby(keys, sort=False):
+        state = states_by_partition.get(partition_key)
+        partition_history = (
+            history_by_partition.get(partition_key, history.iloc[:0])
+            if state is None
+            else history.iloc[:0]
+        )
+        series = {
+            column: np.concatenate(
+                (
+                    partition_history[column].to_numpy(),
+                    partition_rows[column].to_numpy(),
+                )
+            )
+            for column in SERIES_COLUMNS
+        }
+        metrics, performance_states = calculate_performance_metrics(
+            series,
+            len(partition_history),
+            state,
+            {
+                column: partition_rows[column].to_numpy()
+                for column in cumulative_columns or []
+            },
+        )
+        performances.append(partition_rows.reset_index(drop=True).assign(**metrics))
+        partition_states.extend(
+            {
+                "level": level,
+                **{
+                    column: partition_rows[column].iloc[0]
+                    for column in STATE_KEYS[level]
+                },
+                **performance_state,
+            }
+            for performance_state in performance_states
+        )
+
+    return pd.concat(performances, ignore_index=True), partition_states
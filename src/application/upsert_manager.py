@@ -1,4 +1,12 @@
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+import hashlib
+import json
+
 from src.domain import *
+from src.domain.portfolio_asset_checkpoints.complex_queries.partition_checkpoints import (
+    DEFAULT_CHECKPOINT_DATE,
+)
 from src.dto import (
     SettingsDTO,
     TransactionFilesModel,
@@ -8,6 +16,61 @@ from src.dto import (
 )
 
 
+def _get_transaction_key(portfolio_transaction: PortfolioTransaction) -> tuple:
+    return (
+        portfolio_transaction.date,
+        portfolio_transaction.transaction_type,
+        portfolio_transaction.quantity,
+        portfolio_transaction.transaction_value,
+        portfolio_transaction.fee_amount,
+        portfolio_transaction.tax_amount,
+    )
+
+
+def _get_record_key(portfolio_transaction: dict) -> tuple:
+    return (
+        portfolio_transaction["date"],
+        portfolio_transaction["transaction_type"],
+        portfolio_transaction["quantity"],
+        portfolio_transaction["transaction_value"],
+        portfolio_transaction["fee_amount"],
+        portfolio_transaction["tax_amount"],
+    )
+
+
+def _get_content_hash(
+    transactions: TransactionsModel, asset_ids: dict[str, int]
+) -> str:
+    """
+    The hash of the transactions of a file and the asset ids their symbols resolve to,
+    so a file is stored again when one of its symbols becomes a known asset.
+    """
+    resolved_asset_ids = {
+        asset_symbol: asset_ids.get(asset_symbol)
+        for asset_symbol in sorted(set(transactions.transaction_data.asset_symbol))
+    }
+    content = transactions.transaction_data.model_dump_json() + json.dumps(
+        resolved_asset_ids
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+@dataclass
+class UpsertContext:
+    """
+    The rows of the user that the upsert stages resolve names against.
+    They are loaded once and every stage adds the rows it inserts,
+    so each stage runs a constant number of queries whatever the number of rows.
+    """
+
+    portfolio_ids: dict[str, int]
+    portfolio_group_ids: dict[tuple[int, str], int]
+    portfolio_group_assets: set[tuple[int, int]]
+    asset_ids: dict[str, int]
+    currency_pair_ids: dict[str, int]
+    portfolio_transaction_files: dict[str, PortfolioTransactionFile]
+
+
 class UpsertManager:
     def __init__(
         self,
@@ -21,6 +84,9 @@ class UpsertManager:
         portfolio_group_asset_service: PortfolioGroupAssetService,
         portfolio_transaction_file_service: PortfolioTransactionFileService,
         portfolio_transactions_service: PortfolioTransactionService,
+        portfolio_asset_checkpoint_service: PortfolioAssetCheckpointService,
+        effective_asset_price_service: EffectiveAssetPriceService,
+        pivot_currency: str | None = None,
     ):
         self.user_service = user_service
         self.settings_service = settings_service
@@ -32,18 +98,44 @@ class UpsertManager:
         self.portfolio_group_asset_service = portfolio_group_asset_service
         self.portfolio_transaction_file_service = portfolio_transaction_file_service
         self.portfolio_transactions_service = portfolio_transactions_service
+        self.portfolio_asset_checkpoint_service = portfolio_asset_checkpoint_service
+        self.effective_asset_price_service = effective_asset_price_service
+        self.pivot_currency = pivot_currency
 
     def upsert_user(self, session_id: str):
         return self.user_service.upsert_one(session_id=session_id)
 
     def upsert_settings(self, user_id: int, settings_dto: SettingsDTO):
+        settings = self.settings_service.get_one(user_id=user_id)
+        if settings and (
+            settings.analysis_currency != settings_dto.analysis_currency
+            or settings.ohlc_assets != settings_dto.ohlc_assets
+            or settings.ohlc_currencies != settings_dto.ohlc_currencies
+        ):
+            # Every value of the user depends on these settings
+            if (
+                settings.ohlc_assets != settings_dto.ohlc_assets
+                or settings.ohlc_currencies != settings_dto.ohlc_currencies
+            ):
+                # The effective prices are kept per analysis currency only
+                self.effective_asset_price_service.delete_many_by_user_id(
+                    user_id=user_id
+                )
+            portfolio_aggregate = self.portfolio_aggregate_service.get_one_by_user_id(
+                user_id=user_id
+            )
+            if portfolio_aggregate:
+                self.portfolio_aggregate_service.update_one(
+                    id=portfolio_aggregate.id,
+                    checkpoint_date=DEFAULT_CHECKPOINT_DATE,
+                )
+
         return self.settings_service.upsert_one(
             user_id=user_id,
             analysis_currency=settings_dto.analysis_currency,
             ohlc_assets=settings_dto.ohlc_assets,
             ohlc_currencies=settings_dto.ohlc_currencies,
             transaction_files=settings_dto.transaction_files.model_dump(),
-            transactions=settings_dto.transactions.model_dump(),
             portfolio_groups=settings_dto.portfolio_groups.model_dump(),
             portfolio_group_assets=settings_dto.portfolio_group_assets.model_dump(),
         )
@@ -57,89 +149,123 @@ class UpsertManager:
         else:
             return self.portfolio_aggregate_service.create_one(user_id=user_id)
 
+    def load_upsert_context(self, user_id: int) -> UpsertContext:
+        portfolio_group_assets = self.portfolio_group_asset_service.get_many_by_user_id(
+            user_id=user_id
+        )
+        return UpsertContext(
+            portfolio_ids=self._get_portfolio_ids(user_id),
+            portfolio_group_ids=self._get_portfolio_group_ids(user_id),
+            portfolio_group_assets={
+                (
+                    portfolio_group_asset.portfolio_group_id,
+                    portfolio_group_asset.asset_id,
+                )
+                for portfolio_group_asset in portfolio_group_assets
+            },
+            asset_ids={
+                asset.symbol: asset.id for asset in self.asset_service.get_all()
+            },
+            currency_pair_ids={
+                currency_pair.name: currency_pair.id
+                for currency_pair in self.currency_pair_service.get_all()
+            },
+            portfolio_transaction_files=self._get_portfolio_transaction_files(user_id),
+        )
+
     def upsert_portfolios(
         self,
         user_id: int,
         portfolio_aggregate_id: int,
         transaction_files: TransactionFilesModel,
+        context: UpsertContext,
     ):
-        for name in set(transaction_files.portfolio_name):
-            portfolio = self.portfolio_service.get_one_by_user_id_and_name(
-                user_id=user_id, name=name
-            )
-            if not portfolio:
-                portfolio = self.portfolio_service.create_one(
-                    user_id=user_id,
-                    portfolio_aggregate_id=portfolio_aggregate_id,
-                    name=name,
-                )
+        new_portfolios = [
+            {
+                "user_id": user_id,
+                "portfolio_aggregate_id": portfolio_aggregate_id,
+                "name": name,
+            }
+            for name in set(transaction_files.portfolio_name)
+            if name not in context.portfolio_ids
+        ]
+        if self.portfolio_service.insert_many(portfolios=new_portfolios):
+            context.portfolio_ids = self._get_portfolio_ids(user_id)
 
         return None
 
     def upsert_portfolio_groups(
-        self, user_id: int, portfolio_groups: PortfolioGroupsModel
+        self,
+        user_id: int,
+        portfolio_groups: PortfolioGroupsModel,
+        context: UpsertContext,
     ):
         portfolio_names = portfolio_groups.portfolio_name
         group_names = portfolio_groups.group_name
         group_weights = portfolio_groups.group_weight
 
+        new_portfolio_groups = {}
         for portfolio_name, group_name, group_weight in zip(
             portfolio_names, group_names, group_weights
         ):
-            portfolio = self.portfolio_service.get_one_by_user_id_and_name(
-                user_id=user_id, name=portfolio_name
-            )
-            if portfolio:
-                portfolio_group = (
-                    self.portfolio_group_service.get_one_by_portfolio_id_and_name(
-                        portfolio_id=portfolio.id, name=group_name
-                    )
+            portfolio_id = context.portfolio_ids.get(portfolio_name)
+            if portfolio_id is None:
+                continue
+
+            key = (portfolio_id, group_name)
+            if key not in context.portfolio_group_ids:
+                new_portfolio_groups.setdefault(
+                    key,
+                    {
+                        "user_id": user_id,
+                        "portfolio_id": portfolio_id,
+                        "name": group_name,
+                        "weight": group_weight,
+                    },
                 )
-                if not portfolio_group:
-                    portfolio_group = self.portfolio_group_service.create_one(
-                        user_id=user_id,
-                        portfolio_id=portfolio.id,
-                        name=group_name,
-                        weight=group_weight,
-                    )
+
+        if self.portfolio_group_service.insert_many(
+            portfolio_groups=list(new_portfolio_groups.values())
+        ):
+            context.portfolio_group_ids = self._get_portfolio_group_ids(user_id)
 
         return None
 
     def upsert_portfolio_group_assets(
-        self, user_id: int, portfolio_group_assets: PortfolioGroupAssetsModel
+        self,
+        user_id: int,
+        portfolio_group_assets: PortfolioGroupAssetsModel,
+        context: UpsertContext,
     ):
         portfolio_names = portfolio_group_assets.portfolio_name
         asset_symbols = portfolio_group_assets.asset_symbol
         group_names = portfolio_group_assets.group_name
 
+        new_portfolio_group_assets = []
         for portfolio_name, asset_symbol, group_name in zip(
             portfolio_names, asset_symbols, group_names
         ):
-            portfolio = self.portfolio_service.get_one_by_user_id_and_name(
-                user_id=user_id, name=portfolio_name
+            portfolio_id = context.portfolio_ids.get(portfolio_name)
+            if portfolio_id is None:
+                continue
+
+            asset_id = context.asset_ids.get(asset_symbol)
+            portfolio_group_id = context.portfolio_group_ids.get(
+                (portfolio_id, group_name)
             )
+            if asset_id is None or portfolio_group_id is None:
+                continue
 
-            if portfolio:
-                asset = self.asset_service.get_one_by_symbol(symbol=asset_symbol)
-                portfolio_group = (
-                    self.portfolio_group_service.get_one_by_portfolio_id_and_name(
-                        portfolio_id=portfolio.id,
-                        name=group_name,
-                    )
+            key = (portfolio_group_id, asset_id)
+            if key not in context.portfolio_group_assets:
+                context.portfolio_group_assets.add(key)
+                new_portfolio_group_assets.append(
+                    {"portfolio_group_id": portfolio_group_id, "asset_id": asset_id}
                 )
 
-                if asset and portfolio_group:
-                    portfolio_group_asset = self.portfolio_group_asset_service.get_one(
-                        portfolio_group_id=portfolio_group.id,
-                        asset_id=asset.id,
-                    )
-                    if not portfolio_group_asset:
-                        portfolio_group_asset = (
-                            self.portfolio_group_asset_service.create_one(
-                                portfolio_group_id=portfolio_group.id,
-                                asset_id=asset.id,
-                            )
-                        )
+        self.portfolio_group_asset_service.insert_many(
+            portfolio_group_assets=new_portfolio_group_assets
+        )
 
         return None
 
@@ -148,90 +274,209 @@ class UpsertManager:
         user_id: int,
         portfolio_transaction_files: TransactionFilesModel,
         analysis_currency: str,
+        context: UpsertContext,
     ):
         file_names = portfolio_transaction_files.file_name
         currencies = portfolio_transaction_files.currency
         portfolio_names = portfolio_transaction_files.portfolio_name
 
+        new_portfolio_transaction_files = {}
+        updated_portfolio_transaction_files = {}
         for file_name, currency, portfolio_name in zip(
             file_names, currencies, portfolio_names
         ):
-            currency_pair_name = currency + analysis_currency
-            currency_pair = (
-                self.currency_pair_service.get_one_by_name(name=currency_pair_name)
-                if currency != analysis_currency
+            # With a pivot currency the file refers to the pair quoted in it
+            quote_currency = self.pivot_currency or analysis_currency
+            currency_pair_id = (
+                context.currency_pair_ids.get(currency + quote_currency)
+                if currency != quote_currency
                 else None
             )
-            currency_pair_id = currency_pair.id if currency_pair else None
 
-            portfolio = self.portfolio_service.get_one_by_user_id_and_name(
-                user_id=user_id, name=portfolio_name
+            portfolio_id = context.portfolio_ids.get(portfolio_name)
+            if portfolio_id is None:
+                continue
+
+            portfolio_transaction_file = context.portfolio_transaction_files.get(
+                file_name
             )
-            if portfolio:
-                portfolio_transaction_file = (
-                    self.portfolio_transaction_file_service.upsert_one(
-                        user_id=user_id,
-                        portfolio_id=portfolio.id,
-                        name=file_name,
-                        currency=currency,
-                        currency_pair_id=currency_pair_id,
-                    )
+            if portfolio_transaction_file is None:
+                portfolio_transaction_file = new_portfolio_transaction_files.setdefault(
+                    file_name,
+                    {"user_id": user_id, "name": file_name, "currency_pair_id": None},
                 )
-                if not portfolio_transaction_file:
-                    return None
+                portfolio_transaction_file["portfolio_id"] = portfolio_id
+                portfolio_transaction_file["currency"] = currency
+                if currency_pair_id is not None:
+                    portfolio_transaction_file["currency_pair_id"] = currency_pair_id
+                continue
+
+            if (
+                portfolio_transaction_file.portfolio_id != portfolio_id
+                or portfolio_transaction_file.currency != currency
+            ):
+                # The transactions of the file are moved or converted,
+                # so both portfolios are recalculated from the beginning
+                for rewound_portfolio_id in {
+                    portfolio_transaction_file.portfolio_id,
+                    portfolio_id,
+                }:
+                    self.portfolio_asset_checkpoint_service.rewind_checkpoint_dates(
+                        portfolio_id=rewound_portfolio_id, date=DEFAULT_CHECKPOINT_DATE
+                    )
+
+            portfolio_transaction_file.portfolio_id = portfolio_id
+            portfolio_transaction_file.currency = currency
+            if currency_pair_id is not None:
+                portfolio_transaction_file.currency_pair_id = currency_pair_id
+            updated_portfolio_transaction_files[file_name] = portfolio_transaction_file
+
+        self.portfolio_transaction_file_service.update_many(
+            portfolio_transaction_files=list(
+                updated_portfolio_transaction_files.values()
+            )
+        )
+        if self.portfolio_transaction_file_service.insert_many(
+            portfolio_transaction_files=list(new_portfolio_transaction_files.values())
+        ):
+            context.portfolio_transaction_files = self._get_portfolio_transaction_files(
+                user_id
+            )
 
         return None
 
     def upsert_portfolio_transactions(
-        self, user_id: int, list_of_transactions: list[TransactionsModel]
+        self,
+        user_id: int,
+        list_of_transactions: list[TransactionsModel],
+        context: UpsertContext,
     ):
+        stored_portfolio_transaction_files = []
         for transactions in list_of_transactions:
-            file_name = transactions.file_name
             transaction_data = transactions.transaction_data
-            portfolio_transaction_file = (
-                self.portfolio_transaction_file_service.get_one_by_user_id_and_name(
-                    user_id=user_id, name=file_name
-                )
+            portfolio_transaction_file = context.portfolio_transaction_files.get(
+                transactions.file_name
             )
             portfolio_transaction_file_id = (
                 portfolio_transaction_file.id if portfolio_transaction_file else None
             )
+            content_hash = _get_content_hash(transactions, context.asset_ids)
+            if (
+                portfolio_transaction_file
+                and portfolio_transaction_file.content_hash == content_hash
+            ):
+                # The same transactions are stored already
+                continue
+
+            old_transactions = defaultdict(Counter)
+            for (
+                portfolio_transaction
+            ) in self.portfolio_transactions_service.get_many_by_file_id(
+                portfolio_transaction_file_id
+            ):
+                old_transactions[portfolio_transaction.asset_id][
+                    _get_transaction_key(portfolio_transaction)
+                ] += 1
+            new_transactions = defaultdict(Counter)
+
             self.portfolio_transactions_service.delete_many_by_file_id(
                 portfolio_transaction_file_id
             )
-            transaction_data_zipped = zip(
-                transaction_data.date,
-                transaction_data.asset_symbol,
-                transaction_data.transaction_type,
-                transaction_data.quantity,
-                transaction_data.transaction_value,
-                transaction_data.fee_amount,
-                transaction_data.tax_amount,
+            portfolio_transactions = [
+                {
+                    "portfolio_transaction_file_id": portfolio_transaction_file_id,
+                    "asset_id": context.asset_ids.get(asset_symbol),
+                    "asset_symbol": asset_symbol,
+                    "date": date,
+                    "transaction_type": transaction_type,
+                    "quantity": quantity,
+                    "transaction_value": transaction_value,
+                    "fee_amount": fee_amount,
+                    "tax_amount": tax_amount,
+                }
+                for (
+                    date,
+                    asset_symbol,
+                    transaction_type,
+                    quantity,
+                    transaction_value,
+                    fee_amount,
+                    tax_amount,
+                ) in zip(
+                    transaction_data.date,
+                    transaction_data.asset_symbol,
+                    transaction_data.transaction_type,
+                    transaction_data.quantity,
+                    transaction_data.transaction_value,
+                    transaction_data.fee_amount,
+                    transaction_data.tax_amount,
+                )
+            ]
+            self.portfolio_transactions_service.insert_many(
+                portfolio_transactions=portfolio_transactions
             )
+            for portfolio_transaction in portfolio_transactions:
+                new_transactions[portfolio_transaction["asset_id"]][
+                    _get_record_key(portfolio_transaction)
+                ] += 1
 
-            for (
-                date,
-                asset_symbol,
-                transaction_type,
-                quantity,
-                transaction_value,
-                fee_amount,
-                tax_amount,
-            ) in transaction_data_zipped:
-                asset = (
-                    self.asset_service.get_one_by_symbol(symbol=asset_symbol)
-                    if asset_symbol
-                    else None
-                )
-                asset_id = asset.id if asset else None
-
-                self.portfolio_transactions_service.create_one(
-                    portfolio_transaction_file_id=portfolio_transaction_file_id,
-                    asset_id=asset_id,
-                    date=date,
-                    transaction_type=transaction_type,
-                    quantity=quantity,
-                    transaction_value=transaction_value,
-                    fee_amount=fee_amount,
-                    tax_amount=tax_amount,
+            if portfolio_transaction_file:
+                self._rewind_changed_partitions(
+                    portfolio_transaction_file.portfolio_id,
+                    old_transactions,
+                    new_transactions,
                 )
+                portfolio_transaction_file.content_hash = content_hash
+                stored_portfolio_transaction_files.append(portfolio_transaction_file)
+
+        self.portfolio_transaction_file_service.update_many(
+            portfolio_transaction_files=stored_portfolio_transaction_files
+        )
+
+    def _get_portfolio_ids(self, user_id: int) -> dict[str, int]:
+        return {
+            portfolio.name: portfolio.id
+            for portfolio in self.portfolio_service.get_many_by_user_id(user_id=user_id)
+        }
+
+    def _get_portfolio_group_ids(self, user_id: int) -> dict[tuple[int, str], int]:
+        return {
+            (portfolio_group.portfolio_id, portfolio_group.name): portfolio_group.id
+            for portfolio_group in self.portfolio_group_service.get_many_by_user_id(
+                user_id=user_id
+            )
+        }
+
+    def _get_portfolio_transaction_files(
+        self, user_id: int
+    ) -> dict[str, PortfolioTransactionFile]:
+        portfolio_transaction_files = (
+            self.portfolio_transaction_file_service.get_many_by_user_id(user_id=user_id)
+        )
+        return {
+            portfolio_transaction_file.name: portfolio_transaction_file
+            for portfolio_transaction_file in portfolio_transaction_files
+        }
+
+    def _rewind_changed_partitions(
+        self,
+        portfolio_id: int,
+        old_transactions: dict[int | None, Counter],
+        new_transactions: dict[int | None, Counter],
+    ):
+        """
+        Moves the checkpoint date of every asset whose transactions changed back
+        to the earliest date on which they differ, the days before it are kept.
+        Every transaction is also a cash flow of the portfolio, so the cash flows
+        (asset id None) are moved with it.
+        """
+        for asset_id in old_transactions.keys() | new_transactions.keys():
+            old = old_transactions.get(asset_id, Counter())
+            new = new_transactions.get(asset_id, Counter())
+            if old == new:
+                continue
+
+            date = min(transaction[0] for transaction in (old - new) + (new - old))
+            self.portfolio_asset_checkpoint_service.rewind_checkpoint_dates(
+                portfolio_id=portfolio_id, date=date, asset_ids=[asset_id, None]
+            )
@@ -4,10 +4,14 @@ from .adjusted_currency_pair_pricings import *
 from .adjusted_portfolio_transactions import *
 from .asset_pricings import *
 from .assets import *
+from .calendar_dates import *
 from .currency_pair_pricings import *
 from .currency_pairs import *
+from .effective_asset_prices import *
+from .performance_states import *
 from .portfolio_aggregate_performances import *
 from .portfolio_aggregates import *
+from .portfolio_asset_checkpoints import *
 from .portfolio_asset_performances import *
 from .portfolio_group_assets import *
 from .portfolio_group_performances import *
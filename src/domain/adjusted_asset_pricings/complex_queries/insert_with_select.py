@@ -5,117 +5,102 @@ from src.domain.adjusted_asset_pricings.adjusted_asset_pricing_model import (
 )
 from src.domain.assets.asset_model import Asset
 from src.domain.asset_pricings.asset_pricing_model import AssetPricing
+from src.domain.calendar_dates.calendar_date_model import CalendarDate
 
 
 def insert_with_select(asset_id):
-    cte_asset_continuous_dates = (
+    start_date = (
         select(
-            Asset.id.label("asset_id"),
             func.max(
                 Asset.first_pricing_date,
                 Asset.last_pricing_date,
-            ).label("date"),
+            )
         )
         .where(Asset.id == asset_id)
-        .cte(name="cte_asset_continuous_dates", recursive=True)
+        .scalar_subquery()
+    )
+    # Days without pricing at the beginning of the processed period are filled
+    # from the last pricing before it, so the series starts there
+    seed_date = func.coalesce(
+        select(func.max(AssetPricing.date))
+        .where(
+            AssetPricing.asset_id == asset_id,
+            AssetPricing.date < start_date,
+        )
+        .scalar_subquery(),
+        start_date,
     )
 
-    cte_asset_continuous_dates = cte_asset_continuous_dates.union_all(
+    cte_asset_continuous_dates = (
         select(
-            cte_asset_continuous_dates.c.asset_id,
-            func.date(cte_asset_continuous_dates.c.date, "+1 day").label("date"),
-        ).where(cte_asset_continuous_dates.c.date < func.date("now"))
+            Asset.id.label("asset_id"),
+            CalendarDate.date,
+        )
+        .join_from(
+            Asset,
+            CalendarDate,
+            CalendarDate.date.between(seed_date, func.date("now")),
+        )
+        .where(Asset.id == asset_id)
+        .cte(name="cte_asset_continuous_dates")
     )
 
-    query = (
+    # Every pricing opens a group which the following days without pricing join
+    cte_1 = (
         select(
             cte_asset_continuous_dates.c.asset_id,
             cte_asset_continuous_dates.c.date,
-            (
-                func.coalesce(
-                    AssetPricing.open_price,
-                    select(AssetPricing.open_price)
-                    .where(
-                        AssetPricing.date < cte_asset_continuous_dates.c.date,
-                        AssetPricing.asset_id == cte_asset_continuous_dates.c.asset_id,
-                    )
-                    .order_by(AssetPricing.date.desc())
-                    .correlate(cte_asset_continuous_dates)
-                    .scalar_subquery(),
-                    0.0,
-                )
-            ).label("open_price"),
-            (
-                func.coalesce(
-                    AssetPricing.high_price,
-                    select(AssetPricing.high_price)
-                    .where(
-                        AssetPricing.date < cte_asset_continuous_dates.c.date,
-                        AssetPricing.asset_id == cte_asset_continuous_dates.c.asset_id,
-                    )
-                    .order_by(AssetPricing.date.desc())
-                    .correlate(cte_asset_continuous_dates)
-                    .scalar_subquery(),
-                    0.0,
-                )
-            ).label("high_price"),
-            (
-                func.coalesce(
-                    AssetPricing.low_price,
-                    select(AssetPricing.low_price)
-                    .where(
-                        AssetPricing.date < cte_asset_continuous_dates.c.date,
-                        AssetPricing.asset_id == cte_asset_continuous_dates.c.asset_id,
-                    )
-                    .order_by(AssetPricing.date.desc())
-                    .correlate(cte_asset_continuous_dates)
-                    .scalar_subquery(),
-                    0.0,
-                )
-            ).label("low_price"),
-            (
-                func.coalesce(
-                    AssetPricing.close_price,
-                    select(AssetPricing.close_price)
-                    .where(
-                        AssetPricing.date < cte_asset_continuous_dates.c.date,
-                        AssetPricing.asset_id == cte_asset_continuous_dates.c.asset_id,
-                    )
-                    .order_by(AssetPricing.date.desc())
-                    .correlate(cte_asset_continuous_dates)
-                    .scalar_subquery(),
-                    0.0,
-                )
-            ).label("close_price"),
-            (
-                func.coalesce(
-                    AssetPricing.adjusted_close_price,
-                    select(AssetPricing.adjusted_close_price)
-                    .where(
-                        AssetPricing.date < cte_asset_continuous_dates.c.date,
-                        AssetPricing.asset_id == cte_asset_continuous_dates.c.asset_id,
-                    )
-                    .order_by(AssetPricing.date.desc())
-                    .correlate(cte_asset_continuous_dates)
-                    .scalar_subquery(),
-                    0.0,
-                )
-            ).label("adj_close_price"),
+            AssetPricing.open_price,
+            AssetPricing.high_price,
+            AssetPricing.low_price,
+            AssetPricing.close_price,
+            AssetPricing.adjusted_close_price.label("adj_close_price"),
+            func.count(AssetPricing.id)
+            .over(order_by=cte_asset_continuous_dates.c.date)
+            .label("pricing_group"),
         )
-        .join_from(
+        .outerjoin_from(
             cte_asset_continuous_dates,
-            Asset,
-            Asset.id == cte_asset_continuous_dates.c.asset_id,
-        )
-        .outerjoin(
             AssetPricing,
             and_(
                 cte_asset_continuous_dates.c.asset_id == AssetPricing.asset_id,
                 cte_asset_continuous_dates.c.date == AssetPricing.date,
             ),
         )
+        .cte(name="cte_1")
     )
 
+    # The pricing of a group is always its first row
+    cte_2 = select(
+        cte_1.c.asset_id,
+        cte_1.c.date,
+        func.first_value(cte_1.c.open_price)
+        .over(partition_by=cte_1.c.pricing_group, order_by=cte_1.c.date)
+        .label("open_price"),
+        func.first_value(cte_1.c.high_price)
+        .over(partition_by=cte_1.c.pricing_group, order_by=cte_1.c.date)
+        .label("high_price"),
+        func.first_value(cte_1.c.low_price)
+        .over(partition_by=cte_1.c.pricing_group, order_by=cte_1.c.date)
+        .label("low_price"),
+        func.first_value(cte_1.c.close_price)
+        .over(partition_by=cte_1.c.pricing_group, order_by=cte_1.c.date)
+        .label("close_price"),
+        func.first_value(cte_1.c.adj_close_price)
+        .over(partition_by=cte_1.c.pricing_group, order_by=cte_1.c.date)
+        .label("adj_close_price"),
+    ).cte(name="cte_2")
+
+    query = select(
+        cte_2.c.asset_id,
+        cte_2.c.date,
+        func.coalesce(cte_2.c.open_price, 0.0).label("open_price"),
+        func.coalesce(cte_2.c.high_price, 0.0).label("high_price"),
+        func.coalesce(cte_2.c.low_price, 0.0).label("low_price"),
+        func.coalesce(cte_2.c.close_price, 0.0).label("close_price"),
+        func.coalesce(cte_2.c.adj_close_price, 0.0).label("adj_close_price"),
+    ).where(cte_2.c.date >= start_date)
+
     return insert(AdjustedAssetPricing).from_select(
         [
             "asset_id",
@@ -7,95 +7,98 @@ from src.domain.adjusted_currency_pair_pricings.adjusted_currency_pair_pricing_m
 from src.domain.currency_pair_pricings.currency_pair_pricing_model import (
     CurrencyPairPricing,
 )
+from src.domain.calendar_dates.calendar_date_model import CalendarDate
 
 
 def insert_with_select(currency_pair_id):
-    cte_currency_pair_continuous_dates = (
+    start_date = (
         select(
-            CurrencyPair.id.label("currency_pair_id"),
             func.max(
                 CurrencyPair.first_pricing_date,
                 CurrencyPair.last_pricing_date,
-            ).label("date"),
+            )
         )
         .where(CurrencyPair.id == currency_pair_id)
-        .cte(name="cte_currency_pair_min_dates", recursive=True)
+        .scalar_subquery()
+    )
+    # Days without pricing at the beginning of the processed period are filled
+    # from the last pricing before it, so the series starts there
+    seed_date = func.coalesce(
+        select(func.max(CurrencyPairPricing.date))
+        .where(
+            CurrencyPairPricing.currency_pair_id == currency_pair_id,
+            CurrencyPairPricing.date < start_date,
+        )
+        .scalar_subquery(),
+        start_date,
     )
 
-    cte_currency_pair_continuous_dates = cte_currency_pair_continuous_dates.union_all(
+    cte_currency_pair_continuous_dates = (
         select(
-            cte_currency_pair_continuous_dates.c.currency_pair_id,
-            func.date(cte_currency_pair_continuous_dates.c.date, "+1 day").label(
-                "date"
-            ),
-        ).where(cte_currency_pair_continuous_dates.c.date < func.date("now"))
+            CurrencyPair.id.label("currency_pair_id"),
+            CalendarDate.date,
+        )
+        .join_from(
+            CurrencyPair,
+            CalendarDate,
+            CalendarDate.date.between(seed_date, func.date("now")),
+        )
+        .where(CurrencyPair.id == currency_pair_id)
+        .cte(name="cte_currency_pair_min_dates")
     )
 
-    query = select(
-        cte_currency_pair_continuous_dates.c.currency_pair_id,
-        cte_currency_pair_continuous_dates.c.date,
-        func.coalesce(
+    # Every pricing opens a group which the following days without pricing join
+    cte_1 = (
+        select(
+            cte_currency_pair_continuous_dates.c.currency_pair_id,
+            cte_currency_pair_continuous_dates.c.date,
             CurrencyPairPricing.open_price,
-            select(CurrencyPairPricing.open_price)
-            .where(
-                CurrencyPairPricing.date < cte_currency_pair_continuous_dates.c.date,
-                CurrencyPairPricing.currency_pair_id
-                == cte_currency_pair_continuous_dates.c.currency_pair_id,
-            )
-            .order_by(CurrencyPairPricing.date.desc())
-            .correlate(cte_currency_pair_continuous_dates)
-            .scalar_subquery(),
-            0.0,
-        ).label("open_price"),
-        func.coalesce(
             CurrencyPairPricing.high_price,
-            select(CurrencyPairPricing.high_price)
-            .where(
-                CurrencyPairPricing.date < cte_currency_pair_continuous_dates.c.date,
-                CurrencyPairPricing.currency_pair_id
-                == cte_currency_pair_continuous_dates.c.currency_pair_id,
-            )
-            .order_by(CurrencyPairPricing.date.desc())
-            .correlate(cte_currency_pair_continuous_dates)
-            .scalar_subquery(),
-            0.0,
-        ).label("high_price"),
-        func.coalesce(
             CurrencyPairPricing.low_price,
-            select(CurrencyPairPricing.low_price)
-            .where(
-                CurrencyPairPricing.date < cte_currency_pair_continuous_dates.c.date,
-                CurrencyPairPricing.currency_pair_id
-                == cte_currency_pair_continuous_dates.c.currency_pair_id,
-            )
-            .order_by(CurrencyPairPricing.date.desc())
-            .correlate(cte_currency_pair_continuous_dates)
-            .scalar_subquery(),
-            0.0,
-        ).label("low_price"),
-        func.coalesce(
             CurrencyPairPricing.close_price,
-            select(CurrencyPairPricing.close_price)
-            .where(
-                CurrencyPairPricing.date < cte_currency_pair_continuous_dates.c.date,
-                CurrencyPairPricing.currency_pair_id
-                == cte_currency_pair_continuous_dates.c.currency_pair_id,
-            )
-            .order_by(CurrencyPairPricing.date.desc())
-            .correlate(cte_currency_pair_continuous_dates)
-            .scalar_subquery(),
-            0.0,
-        ).label("close_price"),
-    ).outerjoin_from(
-        cte_currency_pair_continuous_dates,
-        CurrencyPairPricing,
-        and_(
-            cte_currency_pair_continuous_dates.c.currency_pair_id
-            == CurrencyPairPricing.currency_pair_id,
-            cte_currency_pair_continuous_dates.c.date == CurrencyPairPricing.date,
-        ),
+            func.count(CurrencyPairPricing.id)
+            .over(order_by=cte_currency_pair_continuous_dates.c.date)
+            .label("pricing_group"),
+        )
+        .outerjoin_from(
+            cte_currency_pair_continuous_dates,
+            CurrencyPairPricing,
+            and_(
+                cte_currency_pair_continuous_dates.c.currency_pair_id
+                == CurrencyPairPricing.currency_pair_id,
+                cte_currency_pair_continuous_dates.c.date == CurrencyPairPricing.date,
+            ),
+        )
+        .cte(name="cte_1")
     )
 
+    # The pricing of a group is always its first row
+    cte_2 = select(
+        cte_1.c.currency_pair_id,
+        cte_1.c.date,
+        func.first_value(cte_1.c.open_price)
+        .over(partition_by=cte_1.c.pricing_group, order_by=cte_1.c.date)
+        .label("open_price"),
+        func.first_value(cte_1.c.high_price)
+        .over(partition_by=cte_1.c.pricing_group, order_by=cte_1.c.date)
+        .label("high_price"),
+        func.first_value(cte_1.c.low_price)
+        .over(partition_by=cte_1.c.pricing_group, order_by=cte_1.c.date)
+        .label("low_price"),
+        func.first_value(cte_1.c.close_price)
+        .over(partition_by=cte_1.c.pricing_group, order_by=cte_1.c.date)
+        .label("close_price"),
+    ).cte(name="cte_2")
+
+    query = select(
+        cte_2.c.currency_pair_id,
+        cte_2.c.date,
+        func.coalesce(cte_2.c.open_price, 0.0).label("open_price"),
+        func.coalesce(cte_2.c.high_price, 0.0).label("high_price"),
+        func.coalesce(cte_2.c.low_price, 0.0).label("low_price"),
+        func.coalesce(cte_2.c.close_price, 0.0).label("close_price"),
+    ).where(cte_2.c.date >= start_date)
+
     return insert(AdjustedCurrencyPairPricing).from_select(
         [
             "currency_pair_id",
@@ -37,9 +37,9 @@ class AdjustedPortfolioTransactionService:
             query=query
         )
 
-    def insert_with_select(self, user_id: int):
+    def insert_with_select(self, user_id: int, pivot_currency: str | None = None):
         self.delete_many_by_user_id(user_id)
-        query = insert_with_select(user_id)
+        query = insert_with_select(user_id, pivot_currency)
         return self.adjusted_portfolio_transaction_repository.execute_custom_query(
             query=query
         )
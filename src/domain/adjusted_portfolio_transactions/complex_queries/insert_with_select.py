@@ -13,20 +13,16 @@ from src.domain.adjusted_currency_pair_pricings.adjusted_currency_pair_pricing_m
     AdjustedCurrencyPairPricing,
 )
 from src.domain.settings.settings_model import Settings
+from src.domain.effective_asset_prices.complex_queries.ohlc_prices import (
+    get_ohlc_price,
+)
+from src.domain.effective_asset_prices.complex_queries.exchange_rates import (
+    get_pivot_exchange_rates_cte,
+    get_cross_rate,
+)
 
 
-OHLC_OPTIONS = [
-    "open",
-    "high",
-    "low",
-    "close",
-    "average",
-    "typical price",
-    "weighted close price",
-]
-
-
-def insert_with_select(user_id: int):
+def insert_with_select(user_id: int, pivot_currency: str | None = None):
     cte_1 = (
         select(
             PortfolioTransaction.portfolio_transaction_file_id,
@@ -38,53 +34,6 @@ def insert_with_select(user_id: int):
             PortfolioTransaction.transaction_value,
             PortfolioTransaction.fee_amount,
             PortfolioTransaction.tax_amount,
-            case(
-                (
-                    Settings.ohlc_currencies == OHLC_OPTIONS[0],
-                    AdjustedCurrencyPairPricing.open_price,
-                ),
-                (
-                    Settings.ohlc_currencies == OHLC_OPTIONS[1],
-                    AdjustedCurrencyPairPricing.high_price,
-                ),
-                (
-                    Settings.ohlc_currencies == OHLC_OPTIONS[2],
-                    AdjustedCurrencyPairPricing.low_price,
-                ),
-                (
-                    Settings.ohlc_currencies == OHLC_OPTIONS[3],
-                    AdjustedCurrencyPairPricing.close_price,
-                ),
-                (
-                    Settings.ohlc_currencies == OHLC_OPTIONS[4],
-                    (
-                        AdjustedCurrencyPairPricing.open_price
-                        + AdjustedCurrencyPairPricing.high_price
-                        + AdjustedCurrencyPairPricing.low_price
-                        + AdjustedCurrencyPairPricing.close_price
-                    )
-                    / 4,
-                ),
-                (
-                    Settings.ohlc_currencies == OHLC_OPTIONS[5],
-                    (
-                        AdjustedCurrencyPairPricing.high_price
-                        + AdjustedCurrencyPairPricing.low_price
-                        + AdjustedCurrencyPairPricing.close_price
-                    )
-                    / 3,
-                ),
-                (
-                    Settings.ohlc_currencies == OHLC_OPTIONS[6],
-                    (
-                        AdjustedCurrencyPairPricing.high_price
-                        + AdjustedCurrencyPairPricing.low_price
-                        + (2 * AdjustedCurrencyPairPricing.close_price)
-                    )
-                    / 4,
-                ),
-                else_=0.0,
-            ).label("exchange_rate"),
         )
         .join_from(
             PortfolioTransaction,
@@ -92,7 +41,16 @@ def insert_with_select(user_id: int):
             PortfolioTransactionFile.id
             == PortfolioTransaction.portfolio_transaction_file_id,
         )
-        .outerjoin(
+        .join(Settings, Settings.user_id == PortfolioTransactionFile.user_id)
+        .where(PortfolioTransactionFile.user_id == user_id)
+    )
+
+    if pivot_currency is None:
+        cte_1 = cte_1.add_columns(
+            get_ohlc_price(Settings.ohlc_currencies, AdjustedCurrencyPairPricing).label(
+                "exchange_rate"
+            )
+        ).outerjoin(
             AdjustedCurrencyPairPricing,
             and_(
                 PortfolioTransactionFile.currency_pair_id
@@ -100,9 +58,39 @@ def insert_with_select(user_id: int):
                 PortfolioTransaction.date == AdjustedCurrencyPairPricing.date,
             ),
         )
-        .join(Settings, Settings.user_id == PortfolioTransactionFile.user_id)
-        .where(PortfolioTransactionFile.user_id == user_id)
-    ).cte(name="cte_1")
+    else:
+        cte_pivot_exchange_rates = get_pivot_exchange_rates_cte(user_id, pivot_currency)
+        file_exchange_rates = cte_pivot_exchange_rates.alias("file_exchange_rates")
+        analysis_exchange_rates = cte_pivot_exchange_rates.alias(
+            "analysis_exchange_rates"
+        )
+        cross_rate, _ = get_cross_rate(
+            PortfolioTransactionFile.currency,
+            file_exchange_rates,
+            analysis_exchange_rates,
+            pivot_currency,
+        )
+        cte_1 = (
+            cte_1.add_columns(cross_rate.label("exchange_rate"))
+            .outerjoin(
+                file_exchange_rates,
+                and_(
+                    file_exchange_rates.c.currency
+                    == func.lower(PortfolioTransactionFile.currency),
+                    file_exchange_rates.c.date == PortfolioTransaction.date,
+                ),
+            )
+            .outerjoin(
+                analysis_exchange_rates,
+                and_(
+                    analysis_exchange_rates.c.currency
+                    == func.lower(Settings.analysis_currency),
+                    analysis_exchange_rates.c.date == PortfolioTransaction.date,
+                ),
+            )
+        )
+
+    cte_1 = cte_1.cte(name="cte_1")
 
     cte_2 = select(
         cte_1.c.portfolio_transaction_file_id,
@@ -0,0 +1,9 @@
+from .calendar_date_model import CalendarDate
+from .calendar_date_repository import CalendarDateRepository
+from .calendar_date_service import CalendarDateService
+
+__all__ = [
+    "CalendarDate",
+    "CalendarDateRepository",
+    "CalendarDateService",
+]
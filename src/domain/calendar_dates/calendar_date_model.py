@@ -0,0 +1,13 @@
+from sqlalchemy import String
+from sqlalchemy.orm import mapped_column, Mapped
+
+from src.infrastructure.db import Base
+
+
+class CalendarDate(Base):
+    __tablename__ = "calendar_dates"
+
+    # Clustered on the date, so a date range is read with a single index range scan
+    date: Mapped[str] = mapped_column(String, primary_key=True)
+
+    __table_args__ = {"sqlite_with_rowid": False}
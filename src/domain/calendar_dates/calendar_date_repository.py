@@ -0,0 +1,19 @@
+from .calendar_date_model import CalendarDate
+
+
+class CalendarDateRepository:
+    def __init__(self, session):
+        self.session = session
+
+    def get_all(self):
+        return self.session.query(CalendarDate).all()
+
+    def delete_all(self):
+        deleted_count = self.session.query(CalendarDate).delete()
+        self.session.flush()
+        return deleted_count
+
+    def execute_custom_query(self, query):
+        result = self.session.execute(query)
+        self.session.flush()
+        return result
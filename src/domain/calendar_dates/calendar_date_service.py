@@ -0,0 +1,17 @@
+from .calendar_date_repository import CalendarDateRepository
+from .complex_queries import *
+
+
+class CalendarDateService:
+    def __init__(self, calendar_date_repository: CalendarDateRepository):
+        self.calendar_date_repository = calendar_date_repository
+
+    def get_all(self):
+        return self.calendar_date_repository.get_all()
+
+    def delete_all(self):
+        return self.calendar_date_repository.delete_all()
+
+    def insert_missing_dates(self):
+        query = insert_missing_dates()
+        return self.calendar_date_repository.execute_custom_query(query=query)
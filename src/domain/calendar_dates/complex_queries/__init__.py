@@ -0,0 +1,5 @@
+from .insert_missing_dates import insert_missing_dates
+
+__all__ = [
+    "insert_missing_dates",
+]
@@ -0,0 +1,30 @@
+from sqlalchemy import select, insert, func
+
+from src.domain.calendar_dates.calendar_date_model import CalendarDate
+
+# Matches the default pricing and checkpoint dates, so every date range used
+# during processing is covered by the calendar
+CALENDAR_START_DATE = "1900-01-01"
+
+
+def insert_missing_dates():
+    # Only the days after the last stored date are generated,
+    # so the calendar is built once and then extended by a few rows at a time
+    cte_missing_dates = select(
+        func.coalesce(
+            func.date(func.max(CalendarDate.date), "+1 day"),
+            CALENDAR_START_DATE,
+        ).label("date")
+    ).cte(name="cte_missing_dates", recursive=True)
+
+    cte_missing_dates = cte_missing_dates.union_all(
+        select(func.date(cte_missing_dates.c.date, "+1 day").label("date")).where(
+            cte_missing_dates.c.date < func.date("now")
+        )
+    )
+
+    query = select(cte_missing_dates.c.date).where(
+        cte_missing_dates.c.date <= func.date("now")
+    )
+
+    return insert(CalendarDate).from_select(["date"], query)
@@ -0,0 +1,9 @@
+from .effective_asset_price_model import EffectiveAssetPrice
+from .effective_asset_price_repository import EffectiveAssetPriceRepository
+from .effective_asset_price_service import EffectiveAssetPriceService
+
+__all__ = [
+    "EffectiveAssetPrice",
+    "EffectiveAssetPriceRepository",
+    "EffectiveAssetPriceService",
+]
@@ -0,0 +1,13 @@
+from .insert_with_select import insert_with_select
+from .delete_many import delete_many_by_user_id
+from .ohlc_prices import OHLC_OPTIONS, get_ohlc_price
+from .exchange_rates import get_pivot_exchange_rates_cte, get_cross_rate
+
+__all__ = [
+    "insert_with_select",
+    "delete_many_by_user_id",
+    "OHLC_OPTIONS",
+    "get_ohlc_price",
+    "get_pivot_exchange_rates_cte",
+    "get_cross_rate",
+]
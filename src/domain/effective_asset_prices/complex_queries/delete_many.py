@@ -0,0 +1,11 @@
+from sqlalchemy import delete
+
+from src.domain.effective_asset_prices.effective_asset_price_model import (
+    EffectiveAssetPrice,
+)
+
+
+def delete_many_by_user_id(user_id: int):
+    query = delete(EffectiveAssetPrice).where(EffectiveAssetPrice.user_id == user_id)
+
+    return query
@@ -0,0 +1,55 @@
+from sqlalchemy import select, func, or_
+
+from src.domain.adjusted_currency_pair_pricings.adjusted_currency_pair_pricing_model import (
+    AdjustedCurrencyPairPricing,
+)
+from src.domain.currency_pairs.currency_pair_model import CurrencyPair
+from src.domain.settings.settings_model import Settings
+from src.domain.effective_asset_prices.complex_queries.ohlc_prices import (
+    get_ohlc_price,
+)
+
+
+def get_pivot_exchange_rates_cte(user_id: int, pivot_currency: str):
+    """
+    The exchange rates of every currency quoted in the pivot currency, with the OHLC
+    option of the settings applied. Any cross rate is derived from two of them.
+    """
+    return (
+        select(
+            AdjustedCurrencyPairPricing.id,
+            func.lower(CurrencyPair.first_currency_name).label("currency"),
+            AdjustedCurrencyPairPricing.date,
+            get_ohlc_price(Settings.ohlc_currencies, AdjustedCurrencyPairPricing).label(
+                "exchange_rate"
+            ),
+        )
+        .join_from(
+            CurrencyPair,
+            AdjustedCurrencyPairPricing,
+            AdjustedCurrencyPairPricing.currency_pair_id == CurrencyPair.id,
+        )
+        .join(Settings, Settings.user_id == user_id)
+        .where(func.lower(CurrencyPair.second_currency_name) == pivot_currency.lower())
+    ).cte("cte_pivot_exchange_rates")
+
+
+def get_cross_rate(
+    first_currency, first_exchange_rates, analysis_exchange_rates, pivot_currency
+):
+    """
+    The rate of a currency in the analysis currency derived from their rates
+    in the pivot currency, where the rate of the pivot currency itself is one.
+    Returns the rate and the condition of both rates being known.
+    """
+    is_known = or_(
+        func.lower(first_currency) == pivot_currency.lower(),
+        first_exchange_rates.c.id.is_not(None),
+    ) & or_(
+        func.lower(Settings.analysis_currency) == pivot_currency.lower(),
+        analysis_exchange_rates.c.id.is_not(None),
+    )
+    cross_rate = func.coalesce(
+        first_exchange_rates.c.exchange_rate, 1.0
+    ) / func.coalesce(analysis_exchange_rates.c.exchange_rate, 1.0)
+    return cross_rate, is_known
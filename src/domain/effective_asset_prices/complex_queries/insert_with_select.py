@@ -0,0 +1,170 @@
+from sqlalchemy import select, insert, and_, func, null
+
+from src.domain.effective_asset_prices.effective_asset_price_model import (
+    EffectiveAssetPrice,
+)
+from src.domain.effective_asset_prices.complex_queries.ohlc_prices import (
+    get_ohlc_price,
+)
+from src.domain.effective_asset_prices.complex_queries.exchange_rates import (
+    get_pivot_exchange_rates_cte,
+    get_cross_rate,
+)
+from src.domain.portfolio_groups.portfolio_group_model import PortfolioGroup
+from src.domain.portfolio_group_assets.portfolio_group_asset_model import (
+    PortfolioGroupAsset,
+)
+from src.domain.adjusted_asset_pricings.adjusted_asset_pricing_model import (
+    AdjustedAssetPricing,
+)
+from src.domain.adjusted_currency_pair_pricings.adjusted_currency_pair_pricing_model import (
+    AdjustedCurrencyPairPricing,
+)
+from src.domain.currency_pairs.currency_pair_model import CurrencyPair
+from src.domain.assets.asset_model import Asset
+from src.domain.settings.settings_model import Settings
+
+
+def insert_with_select(user_id: int, pivot_currency: str | None = None):
+    """
+    Inserts the effective prices missing for the assets of the user's portfolios
+    in the current analysis currency, the rows of the pricings downloaded again
+    since the last run included. With a pivot currency the exchange rates are
+    cross rates of the currency pairs quoted in it.
+    """
+    cte_portfolio_assets = (
+        select(PortfolioGroupAsset.asset_id, Asset.currency)
+        .join_from(
+            PortfolioGroup,
+            PortfolioGroupAsset,
+            PortfolioGroupAsset.portfolio_group_id == PortfolioGroup.id,
+        )
+        .join(Asset, Asset.id == PortfolioGroupAsset.asset_id)
+        .where(PortfolioGroup.user_id == user_id)
+        .group_by(Asset.id)
+    ).cte("cte_portfolio_assets")
+
+    query = (
+        select(
+            Settings.user_id,
+            Settings.analysis_currency,
+            AdjustedAssetPricing.asset_id,
+            AdjustedAssetPricing.id.label("adjusted_asset_pricing_id"),
+            AdjustedAssetPricing.date,
+        )
+        .join_from(
+            AdjustedAssetPricing,
+            cte_portfolio_assets,
+            cte_portfolio_assets.c.asset_id == AdjustedAssetPricing.asset_id,
+        )
+        .join(Settings, Settings.user_id == user_id)
+        .where(
+            ~select(EffectiveAssetPrice.id)
+            .where(
+                EffectiveAssetPrice.user_id == user_id,
+                EffectiveAssetPrice.analysis_currency == Settings.analysis_currency,
+                EffectiveAssetPrice.asset_id == AdjustedAssetPricing.asset_id,
+                EffectiveAssetPrice.date == AdjustedAssetPricing.date,
+            )
+            .exists()
+        )
+    )
+
+    if pivot_currency is None:
+        cte_adjusted_currency_pair_pricings = (
+            select(
+                AdjustedCurrencyPairPricing.id,
+                CurrencyPair.first_currency_name,
+                AdjustedCurrencyPairPricing.date,
+                get_ohlc_price(
+                    Settings.ohlc_currencies, AdjustedCurrencyPairPricing
+                ).label("exchange_rate"),
+            )
+            .join_from(
+                CurrencyPair,
+                AdjustedCurrencyPairPricing,
+                AdjustedCurrencyPairPricing.currency_pair_id == CurrencyPair.id,
+            )
+            .join(Settings, Settings.user_id == user_id)
+            .where(
+                and_(
+                    CurrencyPair.first_currency_name.in_(
+                        select(cte_portfolio_assets.c.currency)
+                    ),
+                    CurrencyPair.second_currency_name == Settings.analysis_currency,
+                )
+            )
+        ).cte("cte_adjusted_currency_pair_pricings")
+
+        exchange_rate = cte_adjusted_currency_pair_pricings.c.exchange_rate
+        query = query.add_columns(
+            cte_adjusted_currency_pair_pricings.c.id.label(
+                "adjusted_currency_pair_pricing_id"
+            ),
+            null().label("analysis_currency_pair_pricing_id"),
+        ).join(
+            cte_adjusted_currency_pair_pricings,
+            and_(
+                cte_adjusted_currency_pair_pricings.c.first_currency_name
+                == cte_portfolio_assets.c.currency,
+                cte_adjusted_currency_pair_pricings.c.date == AdjustedAssetPricing.date,
+            ),
+        )
+    else:
+        cte_pivot_exchange_rates = get_pivot_exchange_rates_cte(user_id, pivot_currency)
+        asset_exchange_rates = cte_pivot_exchange_rates.alias("asset_exchange_rates")
+        analysis_exchange_rates = cte_pivot_exchange_rates.alias(
+            "analysis_exchange_rates"
+        )
+
+        exchange_rate, is_known = get_cross_rate(
+            cte_portfolio_assets.c.currency,
+            asset_exchange_rates,
+            analysis_exchange_rates,
+            pivot_currency,
+        )
+        query = (
+            query.add_columns(
+                asset_exchange_rates.c.id.label("adjusted_currency_pair_pricing_id"),
+                analysis_exchange_rates.c.id.label("analysis_currency_pair_pricing_id"),
+            )
+            .outerjoin(
+                asset_exchange_rates,
+                and_(
+                    asset_exchange_rates.c.currency
+                    == func.lower(cte_portfolio_assets.c.currency),
+                    asset_exchange_rates.c.date == AdjustedAssetPricing.date,
+                ),
+            )
+            .outerjoin(
+                analysis_exchange_rates,
+                and_(
+                    analysis_exchange_rates.c.currency
+                    == func.lower(Settings.analysis_currency),
+                    analysis_exchange_rates.c.date == AdjustedAssetPricing.date,
+                ),
+            )
+            .where(is_known)
+        )
+
+    query = query.add_columns(
+        (
+            get_ohlc_price(Settings.ohlc_assets, AdjustedAssetPricing) * exchange_rate
+        ).label("price"),
+        (AdjustedAssetPricing.adj_close_price * exchange_rate).label("adj_close_price"),
+    )
+
+    return insert(EffectiveAssetPrice).from_select(
+        [
+            "user_id",
+            "analysis_currency",
+            "asset_id",
+            "adjusted_asset_pricing_id",
+            "date",
+            "adjusted_currency_pair_pricing_id",
+            "analysis_currency_pair_pricing_id",
+            "price",
+            "adj_close_price",
+        ],
+        query,
+    )
@@ -0,0 +1,40 @@
+from sqlalchemy import case
+
+OHLC_OPTIONS = [
+    "open",
+    "high",
+    "low",
+    "close",
+    "average",
+    "typical price",
+    "weighted close price",
+]
+
+
+def get_ohlc_price(ohlc_option, pricing):
+    """The price of the OHLC option chosen in the settings for a pricing model."""
+    return case(
+        (ohlc_option == OHLC_OPTIONS[0], pricing.open_price),
+        (ohlc_option == OHLC_OPTIONS[1], pricing.high_price),
+        (ohlc_option == OHLC_OPTIONS[2], pricing.low_price),
+        (ohlc_option == OHLC_OPTIONS[3], pricing.close_price),
+        (
+            ohlc_option == OHLC_OPTIONS[4],
+            (
+                pricing.open_price
+                + pricing.high_price
+                + pricing.low_price
+                + pricing.close_price
+            )
+            / 4,
+        ),
+        (
+            ohlc_option == OHLC_OPTIONS[5],
+            (pricing.high_price + pricing.low_price + pricing.close_price) / 3,
+        ),
+        (
+            ohlc_option == OHLC_OPTIONS[6],
+            (pricing.high_price + pricing.low_price + (2 * pricing.close_price)) / 4,
+        ),
+        else_=0.0,
+    )
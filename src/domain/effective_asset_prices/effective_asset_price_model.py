@@ -0,0 +1,64 @@
+from sqlalchemy import Integer, String, Float, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import mapped_column, Mapped
+
+from src.infrastructure.db import Base
+
+
+class EffectiveAssetPrice(Base):
+    """
+    The unit prices of an asset converted to an analysis currency of the user, with
+    the OHLC option of the settings applied. The prices of every analysis currency
+    the user has chosen are kept, so switching back to one only adds the new days.
+    Every row is deleted together with the adjusted pricings it was calculated from,
+    so only the missing rows have to be inserted.
+    """
+
+    __tablename__ = "effective_asset_prices"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    user_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+    asset_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("assets.id", ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+    adjusted_asset_pricing_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("adjusted_asset_pricings.id", ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+    # With a pivot currency the exchange rate is derived from the rates of the asset
+    # currency and the analysis currency, the rate of the pivot currency has no pricing
+    adjusted_currency_pair_pricing_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("adjusted_currency_pair_pricings.id", ondelete="CASCADE"),
+        index=True,
+        nullable=True,
+    )
+    analysis_currency_pair_pricing_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("adjusted_currency_pair_pricings.id", ondelete="CASCADE"),
+        index=True,
+        nullable=True,
+    )
+    analysis_currency: Mapped[str] = mapped_column(String, index=True, nullable=False)
+    date: Mapped[str] = mapped_column(String, index=True, nullable=False)
+    price: Mapped[float] = mapped_column(Float, nullable=False)
+    adj_close_price: Mapped[float] = mapped_column(Float, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id",
+            "analysis_currency",
+            "asset_id",
+            "date",
+            name="uix_user_id_analysis_currency_asset_id_date",
+        ),
+    )
@@ -0,0 +1,19 @@
+from .effective_asset_price_model import EffectiveAssetPrice
+
+
+class EffectiveAssetPriceRepository:
+    def __init__(self, session):
+        self.session = session
+
+    def get_all(self):
+        return self.session.query(EffectiveAssetPrice).all()
+
+    def delete_all(self):
+        deleted_count = self.session.query(EffectiveAssetPrice).delete()
+        self.session.flush()
+        return deleted_count
+
+    def execute_custom_query(self, query):
+        result = self.session.execute(query)
+        self.session.flush()
+        return result
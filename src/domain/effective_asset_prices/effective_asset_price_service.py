@@ -0,0 +1,21 @@
+from .effective_asset_price_repository import EffectiveAssetPriceRepository
+from .complex_queries import *
+
+
+class EffectiveAssetPriceService:
+    def __init__(self, effective_asset_price_repository: EffectiveAssetPriceRepository):
+        self.effective_asset_price_repository = effective_asset_price_repository
+
+    def get_all(self):
+        return self.effective_asset_price_repository.get_all()
+
+    def delete_all(self):
+        return self.effective_asset_price_repository.delete_all()
+
+    def delete_many_by_user_id(self, user_id: int):
+        query = delete_many_by_user_id(user_id)
+        return self.effective_asset_price_repository.execute_custom_query(query=query)
+
+    def insert_with_select(self, user_id: int, pivot_currency: str | None = None):
+        query = insert_with_select(user_id, pivot_currency)
+        return self.effective_asset_price_repository.execute_custom_query(query=query)
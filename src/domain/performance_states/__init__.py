@@ -0,0 +1,9 @@
+from .performance_state_model import PerformanceState
+from .performance_state_repository import PerformanceStateRepository
+from .performance_state_service import PerformanceStateService
+
+__all__ = [
+    "PerformanceState",
+    "PerformanceStateRepository",
+    "PerformanceStateService",
+]
@@ -0,0 +1,10 @@
+from .partition_states import get_checkpoint_partitions, get_state_condition
+from .get_performance_states import get_performance_states
+from .delete_many import delete_many_by_user_id_and_date
+
+__all__ = [
+    "get_checkpoint_partitions",
+    "get_state_condition",
+    "get_performance_states",
+    "delete_many_by_user_id_and_date",
+]
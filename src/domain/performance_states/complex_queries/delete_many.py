@@ -0,0 +1,46 @@
+from sqlalchemy import delete, select, or_, union_all
+
+from src.domain.performance_states.performance_state_model import PerformanceState
+from src.domain.portfolio_aggregates.portfolio_aggregate_model import PortfolioAggregate
+from src.domain.portfolios.portfolio_model import Portfolio
+from src.domain.performance_states.complex_queries.partition_states import (
+    get_checkpoint_partitions,
+    get_state_condition,
+)
+
+
+def delete_many_by_user_id_and_date(user_id: int):
+    """
+    Deletes every state of the user except the ones on the day before
+    the checkpoint dates of their partitions. The later states belong to rows
+    that are recalculated and the earlier ones are not needed anymore.
+    """
+    checkpoint_partitions = get_checkpoint_partitions(user_id)
+    current_states = union_all(
+        *(
+            select(PerformanceState.id).join_from(
+                PerformanceState,
+                cte_checkpoints,
+                get_state_condition(
+                    level, cte_checkpoints.c.checkpoint_date, partition
+                ),
+            )
+            for level, (cte_checkpoints, partition) in checkpoint_partitions.items()
+        )
+    )
+
+    query = delete(PerformanceState).where(
+        or_(
+            PerformanceState.portfolio_id.in_(
+                select(Portfolio.id).where(Portfolio.user_id == user_id)
+            ),
+            PerformanceState.portfolio_aggregate_id.in_(
+                select(PortfolioAggregate.id).where(
+                    PortfolioAggregate.user_id == user_id
+                )
+            ),
+        ),
+        PerformanceState.id.not_in(current_states),
+    )
+
+    return query
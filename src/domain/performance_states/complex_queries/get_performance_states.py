@@ -0,0 +1,21 @@
+from sqlalchemy import select
+
+from src.domain.performance_states.performance_state_model import PerformanceState
+from src.domain.performance_states.complex_queries.partition_states import (
+    get_checkpoint_partitions,
+    get_state_condition,
+)
+
+
+def get_performance_states(user_id: int, level: str):
+    cte_checkpoints, partition = get_checkpoint_partitions(user_id)[level]
+
+    query = select(
+        *(column for column in PerformanceState.__table__.c if column.name != "id")
+    ).join_from(
+        PerformanceState,
+        cte_checkpoints,
+        get_state_condition(level, cte_checkpoints.c.checkpoint_date, partition),
+    )
+
+    return query
@@ -0,0 +1,65 @@
+from sqlalchemy import and_, func
+
+from src.domain.performance_states.performance_state_model import PerformanceState
+from src.domain.portfolio_asset_checkpoints.complex_queries.partition_checkpoints import (
+    get_asset_checkpoints_cte,
+    get_group_checkpoints_cte,
+    get_portfolio_checkpoints_cte,
+    get_aggregate_checkpoints_cte,
+)
+
+
+def get_checkpoint_partitions(user_id: int):
+    """
+    The checkpoint CTE of every performance level together with the state columns
+    identifying its partitions, the CTEs of the lower levels are shared.
+    """
+    cte_asset_checkpoints = get_asset_checkpoints_cte(user_id)
+    cte_group_checkpoints = get_group_checkpoints_cte(user_id, cte_asset_checkpoints)
+    cte_portfolio_checkpoints = get_portfolio_checkpoints_cte(
+        user_id, cte_asset_checkpoints
+    )
+    cte_aggregate_checkpoints = get_aggregate_checkpoints_cte(
+        user_id, cte_portfolio_checkpoints
+    )
+
+    return {
+        "asset": (
+            cte_asset_checkpoints,
+            {
+                "portfolio_group_id": cte_asset_checkpoints.c.portfolio_group_id,
+                "asset_id": cte_asset_checkpoints.c.asset_id,
+            },
+        ),
+        "group": (
+            cte_group_checkpoints,
+            {"portfolio_group_id": cte_group_checkpoints.c.portfolio_group_id},
+        ),
+        "portfolio": (
+            cte_portfolio_checkpoints,
+            {"portfolio_id": cte_portfolio_checkpoints.c.portfolio_id},
+        ),
+        "aggregate": (
+            cte_aggregate_checkpoints,
+            {
+                "portfolio_aggregate_id": (
+                    cte_aggregate_checkpoints.c.portfolio_aggregate_id
+                )
+            },
+        ),
+    }
+
+
+def get_state_condition(level: str, checkpoint_date, partition: dict):
+    """
+    Matches the state of a partition on the day before its checkpoint date,
+    the only state a run can continue the partition from.
+    """
+    return and_(
+        PerformanceState.level == level,
+        PerformanceState.date == func.date(checkpoint_date, "-1 day"),
+        *(
+            getattr(PerformanceState, column) == value
+            for column, value in partition.items()
+        ),
+    )
@@ -0,0 +1,69 @@
+from sqlalchemy import Integer, String, Float, JSON, ForeignKey
+from sqlalchemy.orm import mapped_column, Mapped
+
+from src.infrastructure.db import Base
+
+
+class PerformanceState(Base):
+    """
+    The accumulators of one performance partition after the row of the given date,
+    which let the in-memory engines continue a partition without reading its history.
+    The level decides which of the partition columns are set.
+    """
+
+    __tablename__ = "performance_states"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    level: Mapped[str] = mapped_column(String, index=True, nullable=False)
+    portfolio_aggregate_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("portfolio_aggregates.id", ondelete="CASCADE"),
+        index=True,
+        nullable=True,
+    )
+    portfolio_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("portfolios.id", ondelete="CASCADE"),
+        index=True,
+        nullable=True,
+    )
+    portfolio_group_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("portfolio_groups.id", ondelete="CASCADE"),
+        index=True,
+        nullable=True,
+    )
+    asset_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("assets.id", ondelete="CASCADE"),
+        index=True,
+        nullable=True,
+    )
+    date: Mapped[str] = mapped_column(String, nullable=False)
+    first_date: Mapped[str] = mapped_column(String, nullable=False)
+    row_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    market_value_adj: Mapped[float] = mapped_column(Float, nullable=False)
+    invested_amount: Mapped[float] = mapped_column(Float, nullable=False)
+    invested_amount_total: Mapped[float] = mapped_column(Float, nullable=False)
+    investment_income: Mapped[float] = mapped_column(Float, nullable=False)
+    investment_income_total: Mapped[float] = mapped_column(Float, nullable=False)
+    max_value: Mapped[float] = mapped_column(Float, nullable=False)
+    max_value_total: Mapped[float] = mapped_column(Float, nullable=False)
+    max_profit: Mapped[float] = mapped_column(Float, nullable=False)
+    max_profit_total: Mapped[float] = mapped_column(Float, nullable=False)
+    growth_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    growth_level: Mapped[float] = mapped_column(Float, nullable=False)
+    max_growth_level: Mapped[float] = mapped_column(Float, nullable=False)
+    hpr_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    hpr_mean: Mapped[float] = mapped_column(Float, nullable=False)
+    hpr_m2: Mapped[float] = mapped_column(Float, nullable=False)
+    downside_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    downside_mean: Mapped[float] = mapped_column(Float, nullable=False)
+    downside_m2: Mapped[float] = mapped_column(Float, nullable=False)
+    xirr_rate: Mapped[float] = mapped_column(Float, nullable=True)
+    xirr_rate_total: Mapped[float] = mapped_column(Float, nullable=True)
+    # Non-zero cash flows as [days since first_date, amount] pairs
+    cash_flows: Mapped[list] = mapped_column(JSON, nullable=False)
+    cash_flows_total: Mapped[list] = mapped_column(JSON, nullable=False)
+    # Running sums of the transactions the next rows of the level continue from
+    cumulative_values: Mapped[dict] = mapped_column(JSON, nullable=False)
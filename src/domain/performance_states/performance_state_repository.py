@@ -0,0 +1,27 @@
+from sqlalchemy import insert
+
+from .performance_state_model import PerformanceState
+
+
+class PerformanceStateRepository:
+    def __init__(self, session):
+        self.session = session
+
+    def get_all(self):
+        return self.session.query(PerformanceState).all()
+
+    def insert_many(self, performance_states):
+        if performance_states:
+            self.session.execute(insert(PerformanceState.__table__), performance_states)
+            self.session.flush()
+        return len(performance_states)
+
+    def delete_all(self):
+        deleted_count = self.session.query(PerformanceState).delete()
+        self.session.flush()
+        return deleted_count
+
+    def execute_custom_query(self, query):
+        result = self.session.execute(query)
+        self.session.flush()
+        return result
@@ -0,0 +1,30 @@
+from src.infrastructure.db import read_data_frame, to_records
+
+from .performance_state_repository import PerformanceStateRepository
+from .complex_queries import *
+
+
+class PerformanceStateService:
+    def __init__(self, performance_state_repository: PerformanceStateRepository):
+        self.performance_state_repository = performance_state_repository
+
+    def get_all(self):
+        return self.performance_state_repository.get_all()
+
+    def delete_all(self):
+        return self.performance_state_repository.delete_all()
+
+    def delete_many_by_user_id_and_date(self, user_id: int):
+        query = delete_many_by_user_id_and_date(user_id)
+        return self.performance_state_repository.execute_custom_query(query=query)
+
+    def get_performance_states(self, user_id: int, level: str):
+        query = get_performance_states(user_id, level)
+        return read_data_frame(
+            self.performance_state_repository.execute_custom_query(query=query)
+        )
+
+    def insert_many(self, performance_states):
+        return self.performance_state_repository.insert_many(
+            performance_states=to_records(performance_states)
+        )
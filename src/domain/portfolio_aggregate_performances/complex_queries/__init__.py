@@ -1,5 +1,6 @@
 from .get_performance_status import get_performance_status
 from .insert_with_select import insert_with_select
+from .get_performance_history import get_performance_history
 from .delete_many import (
     delete_many_by_user_id_and_date,
 )
@@ -7,5 +8,6 @@ from .delete_many import (
 __all__ = [
     "get_performance_status",
     "insert_with_select",
+    "get_performance_history",
     "delete_many_by_user_id_and_date",
 ]
@@ -3,18 +3,24 @@ from sqlalchemy import delete, exists
 from src.domain.portfolio_aggregate_performances.portfolio_aggregate_performance_model import (
     PortfolioAggregatePerformance,
 )
-from src.domain.portfolio_aggregates.portfolio_aggregate_model import PortfolioAggregate
+from src.domain.portfolio_asset_checkpoints.complex_queries.partition_checkpoints import (
+    get_aggregate_checkpoints_cte,
+)
 
 
 def delete_many_by_user_id_and_date(user_id: int):
+    cte_aggregate_checkpoints = get_aggregate_checkpoints_cte(user_id)
+
     query = delete(PortfolioAggregatePerformance).where(
         exists().where(
             (
-                PortfolioAggregate.id
+                cte_aggregate_checkpoints.c.portfolio_aggregate_id
                 == PortfolioAggregatePerformance.portfolio_aggregate_id
             )
-            & (PortfolioAggregate.user_id == user_id)
-            & (PortfolioAggregatePerformance.date >= PortfolioAggregate.checkpoint_date)
+            & (
+                PortfolioAggregatePerformance.date
+                >= cte_aggregate_checkpoints.c.checkpoint_date
+            )
         )
     )
 
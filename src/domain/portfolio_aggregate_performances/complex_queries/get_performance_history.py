@@ -0,0 +1,69 @@
+from sqlalchemy import select
+
+from src.domain.portfolio_aggregate_performances.portfolio_aggregate_performance_model import (
+    PortfolioAggregatePerformance,
+)
+from src.domain.portfolio_asset_checkpoints.complex_queries.partition_checkpoints import (
+    get_aggregate_checkpoints_cte,
+)
+from src.domain.performance_states.performance_state_model import PerformanceState
+from src.domain.performance_states.complex_queries.partition_states import (
+    get_state_condition,
+)
+
+
+def get_performance_history(user_id: int):
+    cte_aggregate_checkpoints = get_aggregate_checkpoints_cte(user_id)
+
+    query = (
+        select(
+            PortfolioAggregatePerformance.portfolio_aggregate_id,
+            PortfolioAggregatePerformance.date,
+            PortfolioAggregatePerformance.market_value,
+            PortfolioAggregatePerformance.market_value_adj,
+            PortfolioAggregatePerformance.delta_quantity_value_adj,
+            PortfolioAggregatePerformance.cash_balance,
+            PortfolioAggregatePerformance.invested_amount,
+            PortfolioAggregatePerformance.invested_amount_total,
+            PortfolioAggregatePerformance.asset_disposal_income,
+            PortfolioAggregatePerformance.asset_disposal_income_total,
+            PortfolioAggregatePerformance.asset_holding_income,
+            PortfolioAggregatePerformance.asset_holding_income_total,
+            PortfolioAggregatePerformance.interest_income,
+            PortfolioAggregatePerformance.interest_income_total,
+            PortfolioAggregatePerformance.investment_income,
+            PortfolioAggregatePerformance.investment_income_total,
+            PortfolioAggregatePerformance.profit,
+            PortfolioAggregatePerformance.profit_total,
+        )
+        .join_from(
+            PortfolioAggregatePerformance,
+            cte_aggregate_checkpoints,
+            cte_aggregate_checkpoints.c.portfolio_aggregate_id
+            == PortfolioAggregatePerformance.portfolio_aggregate_id,
+        )
+        .where(
+            PortfolioAggregatePerformance.date
+            < cte_aggregate_checkpoints.c.checkpoint_date,
+            # Partitions with a stored state are continued from it
+            ~select(PerformanceState.id)
+            .where(
+                get_state_condition(
+                    "aggregate",
+                    cte_aggregate_checkpoints.c.checkpoint_date,
+                    {
+                        "portfolio_aggregate_id": (
+                            cte_aggregate_checkpoints.c.portfolio_aggregate_id
+                        )
+                    },
+                )
+            )
+            .exists(),
+        )
+        .order_by(
+            PortfolioAggregatePerformance.portfolio_aggregate_id,
+            PortfolioAggregatePerformance.date,
+        )
+    )
+
+    return query
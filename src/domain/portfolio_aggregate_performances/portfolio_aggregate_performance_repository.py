@@ -1,3 +1,5 @@
+from sqlalchemy import insert
+
 from .portfolio_aggregate_performance_model import PortfolioAggregatePerformance
 
 
@@ -22,6 +24,16 @@ class PortfolioAggregatePerformanceRepository:
             .all()
         )
 
+    def insert_many(self, portfolio_aggregate_performances):
+        if portfolio_aggregate_performances:
+            # A Core insert of the table skips the per-row bookkeeping of ORM bulk inserts
+            self.session.execute(
+                insert(PortfolioAggregatePerformance.__table__),
+                portfolio_aggregate_performances,
+            )
+            self.session.flush()
+        return len(portfolio_aggregate_performances)
+
     def get_all(self):
         return self.session.query(PortfolioAggregatePerformance).all()
 
@@ -1,3 +1,5 @@
+from src.infrastructure.db import read_data_frame, to_records
+
 from .portfolio_aggregate_performance_repository import (
     PortfolioAggregatePerformanceRepository,
 )
@@ -44,6 +46,22 @@ class PortfolioAggregatePerformanceService:
             query=query
         )
 
+    def replace_from_checkpoint(self, user_id: int, performances):
+        self.delete_many_by_user_id_and_date(user_id)
+        return self.portfolio_aggregate_performance_repository.insert_many(
+            portfolio_aggregate_performances=to_records(performances)
+        )
+
+    def get_performance_history(self, user_id: int):
+        return self._read_data_frame(get_performance_history(user_id))
+
+    def _read_data_frame(self, query):
+        return read_data_frame(
+            self.portfolio_aggregate_performance_repository.execute_custom_query(
+                query=query
+            )
+        )
+
     def get_performance_by_id(self, portfolio_aggregate_id):
         return self.portfolio_aggregate_performance_repository.get_many(
             portfolio_aggregate_id=portfolio_aggregate_id
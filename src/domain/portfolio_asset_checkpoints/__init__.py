@@ -0,0 +1,9 @@
+from .portfolio_asset_checkpoint_model import PortfolioAssetCheckpoint
+from .portfolio_asset_checkpoint_repository import PortfolioAssetCheckpointRepository
+from .portfolio_asset_checkpoint_service import PortfolioAssetCheckpointService
+
+__all__ = [
+    "PortfolioAssetCheckpoint",
+    "PortfolioAssetCheckpointRepository",
+    "PortfolioAssetCheckpointService",
+]
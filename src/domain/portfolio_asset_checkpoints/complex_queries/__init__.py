@@ -0,0 +1,19 @@
+from .insert_with_select import insert_with_select
+from .partition_checkpoints import (
+    get_asset_checkpoints_cte,
+    get_group_checkpoints_cte,
+    get_portfolio_checkpoints_cte,
+    get_aggregate_checkpoints_cte,
+)
+from .rewind_checkpoint_dates import rewind_checkpoint_dates
+from .delete_many import delete_many_by_user_id
+
+__all__ = [
+    "insert_with_select",
+    "get_asset_checkpoints_cte",
+    "get_group_checkpoints_cte",
+    "get_portfolio_checkpoints_cte",
+    "get_aggregate_checkpoints_cte",
+    "rewind_checkpoint_dates",
+    "delete_many_by_user_id",
+]
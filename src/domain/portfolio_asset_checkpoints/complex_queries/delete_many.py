@@ -0,0 +1,17 @@
+from sqlalchemy import delete, exists
+
+from src.domain.portfolio_asset_checkpoints.portfolio_asset_checkpoint_model import (
+    PortfolioAssetCheckpoint,
+)
+from src.domain.portfolios.portfolio_model import Portfolio
+
+
+def delete_many_by_user_id(user_id: int):
+    query = delete(PortfolioAssetCheckpoint).where(
+        exists().where(
+            (Portfolio.id == PortfolioAssetCheckpoint.portfolio_id)
+            & (Portfolio.user_id == user_id)
+        )
+    )
+
+    return query
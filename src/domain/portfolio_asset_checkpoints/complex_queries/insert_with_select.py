@@ -0,0 +1,137 @@
+from sqlalchemy import select, insert, func, and_, literal, union_all
+from sqlalchemy.orm import aliased
+
+from src.domain.portfolio_asset_checkpoints.portfolio_asset_checkpoint_model import (
+    PortfolioAssetCheckpoint,
+)
+from src.domain.assets.asset_model import Asset
+from src.domain.currency_pairs.currency_pair_model import CurrencyPair
+from src.domain.portfolios.portfolio_model import Portfolio
+from src.domain.portfolio_groups.portfolio_group_model import PortfolioGroup
+from src.domain.portfolio_group_assets.portfolio_group_asset_model import (
+    PortfolioGroupAsset,
+)
+from src.domain.portfolio_aggregates.portfolio_aggregate_model import PortfolioAggregate
+from src.domain.portfolio_transaction_files.portfolio_transaction_file_model import (
+    PortfolioTransactionFile,
+)
+from src.domain.settings.settings_model import Settings
+
+
+def insert_with_select(user_id: int, pivot_currency: str | None = None):
+    # With a pivot currency the exchange rates are derived from the pair of the
+    # currency and the pair of the analysis currency, both quoted in the pivot
+    # currency, so the earlier of their last pricing dates is taken
+    quote_currency = pivot_currency or Settings.analysis_currency
+    AnalysisCurrencyPair = aliased(CurrencyPair, name="analysis_currency_pairs")
+    currency_pricing_date = (
+        func.min(
+            func.coalesce(
+                CurrencyPair.last_pricing_date, AnalysisCurrencyPair.last_pricing_date
+            ),
+            func.coalesce(
+                AnalysisCurrencyPair.last_pricing_date, CurrencyPair.last_pricing_date
+            ),
+        )
+        if pivot_currency
+        else CurrencyPair.last_pricing_date
+    )
+
+    # The next pricing download reloads every price from the last pricing date,
+    # so an asset is recalculated from the earlier of its own and its currency's
+    asset_checkpoints = (
+        select(
+            Portfolio.id.label("portfolio_id"),
+            PortfolioGroupAsset.asset_id,
+            func.min(
+                func.coalesce(
+                    func.min(
+                        Asset.last_pricing_date,
+                        currency_pricing_date,
+                    ),
+                    Asset.last_pricing_date,
+                    "1900-01-01",
+                )
+            ).label("checkpoint_date"),
+        )
+        .join_from(
+            PortfolioAggregate,
+            Portfolio,
+            Portfolio.portfolio_aggregate_id == PortfolioAggregate.id,
+        )
+        .join(PortfolioGroup, PortfolioGroup.portfolio_id == Portfolio.id)
+        .join(
+            PortfolioGroupAsset,
+            PortfolioGroupAsset.portfolio_group_id == PortfolioGroup.id,
+        )
+        .join(Asset, Asset.id == PortfolioGroupAsset.asset_id)
+        .join(Settings, Settings.user_id == PortfolioAggregate.user_id)
+        .outerjoin(
+            CurrencyPair,
+            and_(
+                CurrencyPair.first_currency_name == Asset.currency,
+                CurrencyPair.second_currency_name == quote_currency,
+            ),
+        )
+    )
+    asset_checkpoints = (
+        _outerjoin_analysis_currency_pair(
+            asset_checkpoints, AnalysisCurrencyPair, pivot_currency
+        )
+        .where(PortfolioAggregate.user_id == user_id)
+        .group_by(Portfolio.id, PortfolioGroupAsset.asset_id)
+    )
+
+    # Cash flows only change with new transactions or reloaded exchange rates
+    # of the transaction files, otherwise just the days from today are added
+    cash_flow_checkpoints = (
+        select(
+            Portfolio.id.label("portfolio_id"),
+            literal(None).label("asset_id"),
+            func.min(
+                func.coalesce(
+                    func.min(currency_pricing_date, func.date("now")),
+                    func.date("now"),
+                )
+            ).label("checkpoint_date"),
+        )
+        .join_from(
+            PortfolioAggregate,
+            Portfolio,
+            Portfolio.portfolio_aggregate_id == PortfolioAggregate.id,
+        )
+        .outerjoin(
+            PortfolioTransactionFile,
+            PortfolioTransactionFile.portfolio_id == Portfolio.id,
+        )
+        .outerjoin(
+            CurrencyPair,
+            CurrencyPair.id == PortfolioTransactionFile.currency_pair_id,
+        )
+        .join(Settings, Settings.user_id == PortfolioAggregate.user_id)
+    )
+    cash_flow_checkpoints = (
+        _outerjoin_analysis_currency_pair(
+            cash_flow_checkpoints, AnalysisCurrencyPair, pivot_currency
+        )
+        .where(PortfolioAggregate.user_id == user_id)
+        .group_by(Portfolio.id)
+    )
+
+    return insert(PortfolioAssetCheckpoint).from_select(
+        ["portfolio_id", "asset_id", "checkpoint_date"],
+        union_all(asset_checkpoints, cash_flow_checkpoints),
+    )
+
+
+def _outerjoin_analysis_currency_pair(query, AnalysisCurrencyPair, pivot_currency):
+    if not pivot_currency:
+        return query
+
+    return query.outerjoin(
+        AnalysisCurrencyPair,
+        and_(
+            AnalysisCurrencyPair.first_currency_name == Settings.analysis_currency,
+            AnalysisCurrencyPair.second_currency_name == pivot_currency,
+        ),
+    )
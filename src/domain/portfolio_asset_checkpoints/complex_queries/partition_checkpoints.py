@@ -0,0 +1,143 @@
+from sqlalchemy import select, func, and_, union_all
+
+from src.domain.portfolio_asset_checkpoints.portfolio_asset_checkpoint_model import (
+    PortfolioAssetCheckpoint,
+)
+from src.domain.portfolio_aggregates.portfolio_aggregate_model import PortfolioAggregate
+from src.domain.portfolios.portfolio_model import Portfolio
+from src.domain.portfolio_groups.portfolio_group_model import PortfolioGroup
+from src.domain.portfolio_group_assets.portfolio_group_asset_model import (
+    PortfolioGroupAsset,
+)
+
+# Partitions without a checkpoint row are calculated from the beginning
+DEFAULT_CHECKPOINT_DATE = "1900-01-01"
+
+# Every level is recalculated from the earliest checkpoint date of the level below,
+# a query that needs several levels passes the lower CTE on, so it is defined once
+
+
+def get_asset_checkpoints_cte(user_id: int):
+    """
+    The checkpoint date of every (portfolio, group, asset) partition.
+    The checkpoint date of the portfolio aggregate caps all of them,
+    so moving it back recalculates every partition of the user.
+    """
+    return (
+        select(
+            Portfolio.portfolio_aggregate_id,
+            Portfolio.id.label("portfolio_id"),
+            PortfolioGroup.id.label("portfolio_group_id"),
+            PortfolioGroupAsset.asset_id,
+            func.min(
+                PortfolioAggregate.checkpoint_date,
+                func.coalesce(
+                    PortfolioAssetCheckpoint.checkpoint_date, DEFAULT_CHECKPOINT_DATE
+                ),
+            ).label("checkpoint_date"),
+        )
+        .join_from(
+            PortfolioAggregate,
+            Portfolio,
+            Portfolio.portfolio_aggregate_id == PortfolioAggregate.id,
+        )
+        .join(PortfolioGroup, PortfolioGroup.portfolio_id == Portfolio.id)
+        .join(
+            PortfolioGroupAsset,
+            PortfolioGroupAsset.portfolio_group_id == PortfolioGroup.id,
+        )
+        .outerjoin(
+            PortfolioAssetCheckpoint,
+            and_(
+                PortfolioAssetCheckpoint.portfolio_id == Portfolio.id,
+                PortfolioAssetCheckpoint.asset_id == PortfolioGroupAsset.asset_id,
+            ),
+        )
+        .where(PortfolioAggregate.user_id == user_id)
+        .cte(name="cte_asset_checkpoints")
+    )
+
+
+def get_group_checkpoints_cte(user_id: int, cte_asset_checkpoints=None):
+    """A group is recalculated from the earliest checkpoint date of its assets."""
+    if cte_asset_checkpoints is None:
+        cte_asset_checkpoints = get_asset_checkpoints_cte(user_id)
+
+    return (
+        select(
+            cte_asset_checkpoints.c.portfolio_aggregate_id,
+            cte_asset_checkpoints.c.portfolio_id,
+            cte_asset_checkpoints.c.portfolio_group_id,
+            func.min(cte_asset_checkpoints.c.checkpoint_date).label("checkpoint_date"),
+        )
+        .group_by(cte_asset_checkpoints.c.portfolio_group_id)
+        .cte(name="cte_group_checkpoints")
+    )
+
+
+def get_portfolio_checkpoints_cte(user_id: int, cte_asset_checkpoints=None):
+    """
+    A portfolio is recalculated from the earliest checkpoint date of its assets
+    and of its cash flows, which are tracked by the row without an asset.
+    """
+    if cte_asset_checkpoints is None:
+        cte_asset_checkpoints = get_asset_checkpoints_cte(user_id)
+
+    cash_flow_checkpoints = (
+        select(
+            Portfolio.portfolio_aggregate_id,
+            Portfolio.id.label("portfolio_id"),
+            func.min(
+                PortfolioAggregate.checkpoint_date,
+                func.coalesce(
+                    PortfolioAssetCheckpoint.checkpoint_date, DEFAULT_CHECKPOINT_DATE
+                ),
+            ).label("checkpoint_date"),
+        )
+        .join_from(
+            PortfolioAggregate,
+            Portfolio,
+            Portfolio.portfolio_aggregate_id == PortfolioAggregate.id,
+        )
+        .outerjoin(
+            PortfolioAssetCheckpoint,
+            and_(
+                PortfolioAssetCheckpoint.portfolio_id == Portfolio.id,
+                PortfolioAssetCheckpoint.asset_id.is_(None),
+            ),
+        )
+        .where(PortfolioAggregate.user_id == user_id)
+    )
+    asset_checkpoints = select(
+        cte_asset_checkpoints.c.portfolio_aggregate_id,
+        cte_asset_checkpoints.c.portfolio_id,
+        cte_asset_checkpoints.c.checkpoint_date,
+    )
+    checkpoints = union_all(cash_flow_checkpoints, asset_checkpoints).subquery()
+
+    return (
+        select(
+            checkpoints.c.portfolio_aggregate_id,
+            checkpoints.c.portfolio_id,
+            func.min(checkpoints.c.checkpoint_date).label("checkpoint_date"),
+        )
+        .group_by(checkpoints.c.portfolio_id)
+        .cte(name="cte_portfolio_checkpoints")
+    )
+
+
+def get_aggregate_checkpoints_cte(user_id: int, cte_portfolio_checkpoints=None):
+    """The portfolio aggregate is recalculated from the earliest portfolio checkpoint date."""
+    if cte_portfolio_checkpoints is None:
+        cte_portfolio_checkpoints = get_portfolio_checkpoints_cte(user_id)
+
+    return (
+        select(
+            cte_portfolio_checkpoints.c.portfolio_aggregate_id,
+            func.min(cte_portfolio_checkpoints.c.checkpoint_date).label(
+                "checkpoint_date"
+            ),
+        )
+        .group_by(cte_portfolio_checkpoints.c.portfolio_aggregate_id)
+        .cte(name="cte_aggregate_checkpoints")
+    )
@@ -0,0 +1,26 @@
+from sqlalchemy import update, func
+
+from src.domain.portfolio_asset_checkpoints.portfolio_asset_checkpoint_model import (
+    PortfolioAssetCheckpoint,
+)
+
+
+def rewind_checkpoint_dates(portfolio_id: int, date: str, asset_ids=None):
+    """
+    Moves the checkpoint dates of a portfolio back to the given date,
+    but never forward. Without asset ids every partition of the portfolio
+    is moved, None in asset_ids stands for its cash flows.
+    """
+    query = update(PortfolioAssetCheckpoint).where(
+        PortfolioAssetCheckpoint.portfolio_id == portfolio_id
+    )
+    if asset_ids is not None:
+        asset_ids = set(asset_ids)
+        condition = PortfolioAssetCheckpoint.asset_id.in_(asset_ids - {None})
+        if None in asset_ids:
+            condition = condition | PortfolioAssetCheckpoint.asset_id.is_(None)
+        query = query.where(condition)
+
+    return query.values(
+        checkpoint_date=func.min(PortfolioAssetCheckpoint.checkpoint_date, date)
+    )
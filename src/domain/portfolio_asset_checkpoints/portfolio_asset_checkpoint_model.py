@@ -0,0 +1,39 @@
+from typing import TYPE_CHECKING
+from sqlalchemy import Integer, String, ForeignKey
+from sqlalchemy.orm import relationship, mapped_column, Mapped
+
+from src.infrastructure.db import Base
+
+if TYPE_CHECKING:
+    from src.domain.portfolios.portfolio_model import Portfolio
+
+
+class PortfolioAssetCheckpoint(Base):
+    """
+    The date from which the performances of one (portfolio, asset) partition
+    are recalculated. A row without an asset tracks the cash flows of the portfolio.
+    Partitions without a row have never been processed.
+    """
+
+    __tablename__ = "portfolio_asset_checkpoints"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    portfolio_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("portfolios.id", ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+    asset_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("assets.id", ondelete="CASCADE"),
+        index=True,
+        nullable=True,
+    )
+    checkpoint_date: Mapped[str] = mapped_column(
+        String, nullable=False, default="1900-01-01"
+    )
+
+    portfolio: Mapped["Portfolio"] = relationship(
+        "Portfolio", back_populates="portfolio_asset_checkpoints"
+    )
@@ -0,0 +1,19 @@
+from .portfolio_asset_checkpoint_model import PortfolioAssetCheckpoint
+
+
+class PortfolioAssetCheckpointRepository:
+    def __init__(self, session):
+        self.session = session
+
+    def get_all(self):
+        return self.session.query(PortfolioAssetCheckpoint).all()
+
+    def delete_all(self):
+        deleted_count = self.session.query(PortfolioAssetCheckpoint).delete()
+        self.session.flush()
+        return deleted_count
+
+    def execute_custom_query(self, query):
+        result = self.session.execute(query)
+        self.session.flush()
+        return result
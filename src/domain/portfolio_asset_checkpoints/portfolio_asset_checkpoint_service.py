@@ -0,0 +1,38 @@
+from .portfolio_asset_checkpoint_repository import PortfolioAssetCheckpointRepository
+from .complex_queries import *
+
+
+class PortfolioAssetCheckpointService:
+    def __init__(
+        self, portfolio_asset_checkpoint_repository: PortfolioAssetCheckpointRepository
+    ):
+        self.portfolio_asset_checkpoint_repository = (
+            portfolio_asset_checkpoint_repository
+        )
+
+    def get_all(self):
+        return self.portfolio_asset_checkpoint_repository.get_all()
+
+    def delete_all(self):
+        return self.portfolio_asset_checkpoint_repository.delete_all()
+
+    def delete_many_by_user_id(self, user_id: int):
+        query = delete_many_by_user_id(user_id)
+        return self.portfolio_asset_checkpoint_repository.execute_custom_query(
+            query=query
+        )
+
+    def update_checkpoint_dates(self, user_id: int, pivot_currency: str | None = None):
+        self.delete_many_by_user_id(user_id)
+        query = insert_with_select(user_id, pivot_currency)
+        return self.portfolio_asset_checkpoint_repository.execute_custom_query(
+            query=query
+        )
+
+    def rewind_checkpoint_dates(self, portfolio_id: int, date: str, asset_ids=None):
+        query = rewind_checkpoint_dates(
+            portfolio_id=portfolio_id, date=date, asset_ids=asset_ids
+        )
+        return self.portfolio_asset_checkpoint_repository.execute_custom_query(
+            query=query
+        )
@@ -1,4 +1,8 @@
 from .insert_with_select import insert_with_select
+from .get_unit_prices import get_unit_prices
+from .get_transactions_by_date import get_transactions_by_date
+from .get_performance_history import get_performance_history
+from .get_unchanged_performances import get_unchanged_performances
 from .get_assets_status_by_portfolio_id import (
     get_assets_status_by_portfolio_id,
 )
@@ -12,6 +16,10 @@ from .delete_many import (
 
 __all__ = [
     "insert_with_select",
+    "get_unit_prices",
+    "get_transactions_by_date",
+    "get_performance_history",
+    "get_unchanged_performances",
     "get_assets_status_by_portfolio_id",
     "get_pct_changes_stats_by_portfolio_id",
     "get_performance_status",
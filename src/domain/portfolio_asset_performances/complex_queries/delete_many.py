@@ -3,17 +3,25 @@ from sqlalchemy import delete, exists
 from src.domain.portfolio_asset_performances.portfolio_asset_performance_model import (
     PortfolioAssetPerformance,
 )
-from src.domain.portfolios.portfolio_model import Portfolio
-from src.domain.portfolio_aggregates.portfolio_aggregate_model import PortfolioAggregate
+from src.domain.portfolio_asset_checkpoints.complex_queries.partition_checkpoints import (
+    get_asset_checkpoints_cte,
+)
 
 
 def delete_many_by_user_id_and_date(user_id: int):
+    cte_asset_checkpoints = get_asset_checkpoints_cte(user_id)
+
     query = delete(PortfolioAssetPerformance).where(
         exists().where(
-            (Portfolio.id == PortfolioAssetPerformance.portfolio_id)
-            & (PortfolioAggregate.id == Portfolio.portfolio_aggregate_id)
-            & (PortfolioAggregate.user_id == user_id)
-            & (PortfolioAssetPerformance.date >= PortfolioAggregate.checkpoint_date)
+            (
+                cte_asset_checkpoints.c.portfolio_group_id
+                == PortfolioAssetPerformance.portfolio_group_id
+            )
+            & (cte_asset_checkpoints.c.asset_id == PortfolioAssetPerformance.asset_id)
+            & (
+                PortfolioAssetPerformance.date
+                >= cte_asset_checkpoints.c.checkpoint_date
+            )
         )
     )
 
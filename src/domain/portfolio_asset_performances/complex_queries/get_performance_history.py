@@ -0,0 +1,82 @@
+from sqlalchemy import select, and_
+
+from src.domain.portfolio_asset_performances.portfolio_asset_performance_model import (
+    PortfolioAssetPerformance,
+)
+from src.domain.portfolios.portfolio_model import Portfolio
+from src.domain.portfolio_aggregates.portfolio_aggregate_model import PortfolioAggregate
+from src.domain.portfolio_asset_checkpoints.complex_queries.partition_checkpoints import (
+    get_asset_checkpoints_cte,
+)
+from src.domain.performance_states.performance_state_model import PerformanceState
+from src.domain.performance_states.complex_queries.partition_states import (
+    get_state_condition,
+)
+
+
+def get_performance_history(user_id: int):
+    cte_asset_checkpoints = get_asset_checkpoints_cte(user_id)
+
+    query = (
+        select(
+            PortfolioAssetPerformance.portfolio_id,
+            PortfolioAssetPerformance.asset_id,
+            PortfolioAssetPerformance.date,
+            PortfolioAssetPerformance.quantity,
+            PortfolioAssetPerformance.market_value,
+            PortfolioAssetPerformance.market_value_adj,
+            PortfolioAssetPerformance.delta_quantity_value_adj,
+            PortfolioAssetPerformance.invested_amount,
+            PortfolioAssetPerformance.invested_amount_total,
+            PortfolioAssetPerformance.asset_disposal_income,
+            PortfolioAssetPerformance.asset_disposal_income_total,
+            PortfolioAssetPerformance.asset_holding_income,
+            PortfolioAssetPerformance.asset_holding_income_total,
+            PortfolioAssetPerformance.investment_income,
+            PortfolioAssetPerformance.investment_income_total,
+        )
+        .join_from(
+            PortfolioAssetPerformance,
+            Portfolio,
+            Portfolio.id == PortfolioAssetPerformance.portfolio_id,
+        )
+        .join(
+            PortfolioAggregate,
+            PortfolioAggregate.id == Portfolio.portfolio_aggregate_id,
+        )
+        .join(
+            cte_asset_checkpoints,
+            and_(
+                cte_asset_checkpoints.c.portfolio_group_id
+                == PortfolioAssetPerformance.portfolio_group_id,
+                cte_asset_checkpoints.c.asset_id == PortfolioAssetPerformance.asset_id,
+            ),
+        )
+        .where(
+            and_(
+                PortfolioAggregate.user_id == user_id,
+                PortfolioAssetPerformance.date
+                < cte_asset_checkpoints.c.checkpoint_date,
+                # Partitions with a stored state are continued from it
+                ~select(PerformanceState.id)
+                .where(
+                    get_state_condition(
+                        "asset",
+                        cte_asset_checkpoints.c.checkpoint_date,
+                        {
+                            "portfolio_group_id": cte_asset_checkpoints.c.portfolio_group_id,
+                            "asset_id": cte_asset_checkpoints.c.asset_id,
+                        },
+                    )
+                )
+                .exists(),
+            )
+        )
+        .order_by(
+            PortfolioAssetPerformance.portfolio_id,
+            PortfolioAssetPerformance.asset_id,
+            PortfolioAssetPerformance.date,
+        )
+    )
+
+    return query
@@ -0,0 +1,90 @@
+from sqlalchemy import select, and_, func
+
+from src.domain.portfolio_aggregates.portfolio_aggregate_model import PortfolioAggregate
+from src.domain.portfolios.portfolio_model import Portfolio
+from src.domain.adjusted_portfolio_transactions.adjusted_portfolio_transaction_model import (
+    AdjustedPortfolioTransaction,
+)
+from src.domain.portfolio_asset_checkpoints.complex_queries.partition_checkpoints import (
+    get_asset_checkpoints_cte,
+)
+
+
+def get_transactions_by_date(user_id: int):
+    cte_asset_checkpoints = get_asset_checkpoints_cte(user_id)
+    # An asset held in several groups of a portfolio shares one checkpoint date
+    checkpoints = (
+        select(
+            cte_asset_checkpoints.c.portfolio_id,
+            cte_asset_checkpoints.c.asset_id,
+            func.min(cte_asset_checkpoints.c.checkpoint_date).label("checkpoint_date"),
+        )
+        .group_by(
+            cte_asset_checkpoints.c.portfolio_id,
+            cte_asset_checkpoints.c.asset_id,
+        )
+        .subquery()
+    )
+
+    query = (
+        select(
+            AdjustedPortfolioTransaction.portfolio_id,
+            AdjustedPortfolioTransaction.asset_id,
+            AdjustedPortfolioTransaction.date,
+            func.sum(AdjustedPortfolioTransaction.quantity).label("quantity"),
+            func.sum(AdjustedPortfolioTransaction.invested_amount).label(
+                "invested_amount"
+            ),
+            func.sum(AdjustedPortfolioTransaction.invested_amount_total).label(
+                "invested_amount_total"
+            ),
+            func.sum(AdjustedPortfolioTransaction.asset_disposal_income).label(
+                "asset_disposal_income"
+            ),
+            func.sum(AdjustedPortfolioTransaction.asset_disposal_income_total).label(
+                "asset_disposal_income_total"
+            ),
+            func.sum(AdjustedPortfolioTransaction.asset_holding_income).label(
+                "asset_holding_income"
+            ),
+            func.sum(AdjustedPortfolioTransaction.asset_holding_income_total).label(
+                "asset_holding_income_total"
+            ),
+            func.sum(AdjustedPortfolioTransaction.investment_income).label(
+                "investment_income"
+            ),
+            func.sum(AdjustedPortfolioTransaction.investment_income_total).label(
+                "investment_income_total"
+            ),
+        )
+        .join_from(
+            AdjustedPortfolioTransaction,
+            Portfolio,
+            Portfolio.id == AdjustedPortfolioTransaction.portfolio_id,
+        )
+        .join(
+            PortfolioAggregate,
+            PortfolioAggregate.id == Portfolio.portfolio_aggregate_id,
+        )
+        .join(
+            checkpoints,
+            and_(
+                checkpoints.c.portfolio_id == AdjustedPortfolioTransaction.portfolio_id,
+                checkpoints.c.asset_id == AdjustedPortfolioTransaction.asset_id,
+            ),
+        )
+        .where(
+            and_(
+                PortfolioAggregate.user_id == user_id,
+                AdjustedPortfolioTransaction.asset_id.is_not(None),
+                AdjustedPortfolioTransaction.date >= checkpoints.c.checkpoint_date,
+            )
+        )
+        .group_by(
+            AdjustedPortfolioTransaction.portfolio_id,
+            AdjustedPortfolioTransaction.asset_id,
+            AdjustedPortfolioTransaction.date,
+        )
+    )
+
+    return query
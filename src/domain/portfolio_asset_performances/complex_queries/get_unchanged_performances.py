@@ -0,0 +1,64 @@
+from sqlalchemy import select, and_
+
+from src.domain.portfolio_asset_performances.portfolio_asset_performance_model import (
+    PortfolioAssetPerformance,
+)
+from src.domain.portfolio_asset_checkpoints.complex_queries.partition_checkpoints import (
+    get_asset_checkpoints_cte,
+    get_group_checkpoints_cte,
+)
+
+
+def get_unchanged_performances(user_id: int):
+    """
+    The stored performances that are kept, but still summed by their group,
+    because the group is recalculated from an earlier checkpoint date.
+    """
+    cte_asset_checkpoints = get_asset_checkpoints_cte(user_id)
+    cte_group_checkpoints = get_group_checkpoints_cte(user_id, cte_asset_checkpoints)
+
+    query = (
+        select(
+            PortfolioAssetPerformance.portfolio_id,
+            PortfolioAssetPerformance.portfolio_group_id,
+            PortfolioAssetPerformance.asset_id,
+            PortfolioAssetPerformance.date,
+            PortfolioAssetPerformance.market_value,
+            PortfolioAssetPerformance.market_value_adj,
+            PortfolioAssetPerformance.delta_quantity_value_adj,
+            PortfolioAssetPerformance.invested_amount,
+            PortfolioAssetPerformance.invested_amount_total,
+            PortfolioAssetPerformance.asset_disposal_income,
+            PortfolioAssetPerformance.asset_disposal_income_total,
+            PortfolioAssetPerformance.asset_holding_income,
+            PortfolioAssetPerformance.asset_holding_income_total,
+            PortfolioAssetPerformance.investment_income,
+            PortfolioAssetPerformance.investment_income_total,
+            PortfolioAssetPerformance.profit,
+            PortfolioAssetPerformance.profit_total,
+        )
+        .join_from(
+            PortfolioAssetPerformance,
+            cte_asset_checkpoints,
+            and_(
+                cte_asset_checkpoints.c.portfolio_group_id
+                == PortfolioAssetPerformance.portfolio_group_id,
+                cte_asset_checkpoints.c.asset_id == PortfolioAssetPerformance.asset_id,
+            ),
+        )
+        .join(
+            cte_group_checkpoints,
+            cte_group_checkpoints.c.portfolio_group_id
+            == PortfolioAssetPerformance.portfolio_group_id,
+        )
+        .where(
+            and_(
+                PortfolioAssetPerformance.date
+                >= cte_group_checkpoints.c.checkpoint_date,
+                PortfolioAssetPerformance.date
+                < cte_asset_checkpoints.c.checkpoint_date,
+            )
+        )
+    )
+
+    return query
@@ -0,0 +1,74 @@
+from sqlalchemy import select, and_, func
+
+from src.domain.portfolio_aggregates.portfolio_aggregate_model import PortfolioAggregate
+from src.domain.portfolios.portfolio_model import Portfolio
+from src.domain.portfolio_groups.portfolio_group_model import PortfolioGroup
+from src.domain.portfolio_group_assets.portfolio_group_asset_model import (
+    PortfolioGroupAsset,
+)
+from src.domain.portfolio_asset_performances.complex_queries.unit_prices import (
+    get_first_transaction_date_cte,
+    get_effective_asset_prices_cte,
+)
+from src.domain.portfolio_asset_checkpoints.complex_queries.partition_checkpoints import (
+    get_asset_checkpoints_cte,
+)
+
+
+def get_unit_prices(user_id: int):
+    cte_first_transaction_date = get_first_transaction_date_cte(user_id)
+    cte_effective_asset_prices = get_effective_asset_prices_cte(user_id)
+    cte_asset_checkpoints = get_asset_checkpoints_cte(user_id)
+
+    query = (
+        select(
+            Portfolio.id.label("portfolio_id"),
+            PortfolioGroup.id.label("portfolio_group_id"),
+            cte_effective_asset_prices.c.asset_id,
+            cte_asset_checkpoints.c.checkpoint_date,
+            cte_effective_asset_prices.c.date,
+            cte_effective_asset_prices.c.price.label("unit_price"),
+            cte_effective_asset_prices.c.adj_close_price.label("unit_price_adj"),
+        )
+        .join_from(
+            PortfolioAggregate,
+            Portfolio,
+            Portfolio.portfolio_aggregate_id == PortfolioAggregate.id,
+        )
+        .join(PortfolioGroup, PortfolioGroup.portfolio_id == Portfolio.id)
+        .join(
+            PortfolioGroupAsset,
+            PortfolioGroupAsset.portfolio_group_id == PortfolioGroup.id,
+        )
+        .join(
+            cte_asset_checkpoints,
+            and_(
+                cte_asset_checkpoints.c.portfolio_group_id == PortfolioGroup.id,
+                cte_asset_checkpoints.c.asset_id == PortfolioGroupAsset.asset_id,
+            ),
+        )
+        .join(
+            cte_effective_asset_prices,
+            cte_effective_asset_prices.c.asset_id == PortfolioGroupAsset.asset_id,
+        )
+        .join(
+            cte_first_transaction_date,
+            and_(
+                cte_first_transaction_date.c.portfolio_id == Portfolio.id,
+                cte_first_transaction_date.c.asset_id
+                == cte_effective_asset_prices.c.asset_id,
+            ),
+        )
+        .where(
+            and_(
+                PortfolioAggregate.user_id == user_id,
+                cte_effective_asset_prices.c.date
+                >= func.max(
+                    cte_first_transaction_date.c.first_transaction_date,
+                    cte_asset_checkpoints.c.checkpoint_date,
+                ),
+            )
+        )
+    )
+
+    return query
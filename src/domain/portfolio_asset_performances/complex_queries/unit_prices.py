@@ -0,0 +1,57 @@
+from sqlalchemy import select, and_, func
+
+from src.domain.portfolio_aggregates.portfolio_aggregate_model import PortfolioAggregate
+from src.domain.portfolios.portfolio_model import Portfolio
+from src.domain.adjusted_portfolio_transactions.adjusted_portfolio_transaction_model import (
+    AdjustedPortfolioTransaction,
+)
+from src.domain.effective_asset_prices.effective_asset_price_model import (
+    EffectiveAssetPrice,
+)
+from src.domain.settings.settings_model import Settings
+
+
+def get_first_transaction_date_cte(user_id: int):
+    return (
+        select(
+            AdjustedPortfolioTransaction.portfolio_id,
+            AdjustedPortfolioTransaction.asset_id,
+            func.min(AdjustedPortfolioTransaction.date).label("first_transaction_date"),
+        )
+        .join_from(
+            AdjustedPortfolioTransaction,
+            Portfolio,
+            Portfolio.id == AdjustedPortfolioTransaction.portfolio_id,
+        )
+        .join(
+            PortfolioAggregate,
+            PortfolioAggregate.id == Portfolio.portfolio_aggregate_id,
+        )
+        .where(PortfolioAggregate.user_id == user_id)
+        .group_by(
+            AdjustedPortfolioTransaction.portfolio_id,
+            AdjustedPortfolioTransaction.asset_id,
+        )
+        .cte("cte_first_transaction_date")
+    )
+
+
+def get_effective_asset_prices_cte(user_id: int):
+    # Shared by both processing engines, so they work on exactly the same unit prices
+    return (
+        select(
+            EffectiveAssetPrice.asset_id,
+            EffectiveAssetPrice.date,
+            EffectiveAssetPrice.price,
+            EffectiveAssetPrice.adj_close_price,
+        )
+        .join_from(
+            EffectiveAssetPrice,
+            Settings,
+            and_(
+                Settings.user_id == EffectiveAssetPrice.user_id,
+                Settings.analysis_currency == EffectiveAssetPrice.analysis_currency,
+            ),
+        )
+        .where(EffectiveAssetPrice.user_id == user_id)
+    ).cte("cte_effective_asset_prices")
@@ -0,0 +1,748 @@
+from typing import Mapping
+
+import numpy as np
+import pandas as pd
+
+# Mirror the constants of the XIRR SQLite extension, so both engines converge to the same rates
+DAYS_PER_YEAR = 365.25
+XIRR_TOLERANCE = 1e-10
+XIRR_DERIVATIVE_TOLERANCE = 1e-15
+XIRR_MAX_ITERATIONS = 100
+XIRR_MIN_RATE = -0.9999
+XIRR_MAX_RATE = 10.0
+XIRR_INITIAL_GUESSES = (0.1, 0.05, 0.2, -0.1, 0.01, 0.5)
+# Rows solved at once, each one allocates a few floats per cash flow per iteration
+XIRR_CHUNK_ROWS = 256
+
+# Columns accumulated from the adjusted transactions over the partition
+CUMULATIVE_COLUMNS = [
+    "quantity",
+    "invested_amount",
+    "invested_amount_total",
+    "asset_disposal_income",
+    "asset_disposal_income_total",
+    "asset_holding_income",
+    "asset_holding_income_total",
+    "investment_income",
+    "investment_income_total",
+]
+
+# Columns calculated by `calculate_performance_metrics` for every performance level
+METRIC_COLUMNS = [
+    "profit_percentage",
+    "profit_percentage_total",
+    "drawdown_value",
+    "drawdown_value_total",
+    "drawdown_profit",
+    "drawdown_profit_total",
+    "hpr",
+    "drawdown",
+    "twrr_rate_daily",
+    "twrr_rate_annualized",
+    "sharpe_ratio_daily",
+    "sharpe_ratio_annualized",
+    "sortino_ratio_daily",
+    "sortino_ratio_annualized",
+    "xirr_rate",
+    "xirr_rate_total",
+]
+
+# Columns of a partition, including its stored history, needed by the shared metrics
+SERIES_COLUMNS = [
+    "date",
+    "market_value",
+    "market_value_adj",
+    "delta_quantity_value_adj",
+    "invested_amount",
+    "invested_amount_total",
+    "asset_disposal_income",
+    "asset_disposal_income_total",
+    "investment_income",
+    "investment_income_total",
+    "profit",
+    "profit_total",
+]
+
+# Days of the last rows of a partition after which its state is stored,
+# the next run continues from the state of the day before its checkpoint date
+STATE_SNAPSHOT_DAYS = 7
+
+PERFORMANCE_COLUMNS = [
+    "portfolio_id",
+    "portfolio_group_id",
+    "asset_id",
+    "date",
+    "unit_price",
+    "unit_price_adj",
+    "quantity",
+    "delta_quantity",
+    "market_value",
+    "market_value_adj",
+    "delta_quantity_value_adj",
+    *CUMULATIVE_COLUMNS[1:],
+    "profit",
+    "profit_total",
+    *METRIC_COLUMNS,
+]
+
+
+def calculate_asset_performances(
+    unit_prices: pd.DataFrame,
+    transactions: pd.DataFrame,
+    history: pd.DataFrame,
+    states: pd.DataFrame,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Calculates the portfolio asset performances from the checkpoint date onwards,
+    producing the same rows as the SQL query of `insert_with_select`.
+
+    unit_prices holds one row per portfolio, asset and date to process,
+    transactions the adjusted transactions summed per portfolio, asset and date,
+    history the performances already stored before the checkpoint date
+    and states the stored states of the partitions on the day before it.
+    A partition with a state is continued from it instead of its history.
+    Returns the performances and the states after the last rows of every partition.
+    """
+    if unit_prices.empty:
+        return pd.DataFrame(columns=PERFORMANCE_COLUMNS), pd.DataFrame()
+
+    keys = ["portfolio_id", "asset_id"]
+    rows = unit_prices.merge(transactions, on=[*keys, "date"], how="left")
+    rows[CUMULATIVE_COLUMNS] = rows[CUMULATIVE_COLUMNS].fillna(0.0)
+    rows = rows.sort_values([*keys, "date"], kind="stable")
+    history_by_partition = dict(tuple(history.groupby(keys, sort=False)))
+    states_by_partition = get_states_by_partition(states, keys)
+
+    performances = []
+    partition_states = []
+    for partition_key, partition_rows in rows.groupby(keys, sort=False):
+        performance, performance_states = _calculate_partition(
+            partition_rows,
+            history_by_partition.get(partition_key, history.iloc[:0]),
+            states_by_partition.get(partition_key),
+        )
+        performances.append(performance)
+        partition_states.extend(
+            {
+                "level": "asset",
+                "portfolio_id": performance["portfolio_id"].iloc[0],
+                "portfolio_group_id": performance["portfolio_group_id"].iloc[0],
+                "asset_id": performance["asset_id"].iloc[0],
+                **state,
+            }
+            for state in performance_states
+        )
+
+    return (
+        pd.concat(performances, ignore_index=True)[PERFORMANCE_COLUMNS],
+        pd.DataFrame(partition_states),
+    )
+
+
+def get_states_by_partition(states: pd.DataFrame, keys: list[str]) -> dict[tuple, dict]:
+    """
+    Indexes the stored states of a level by the key columns of their partitions,
+    as tuples like the keys of `groupby`.
+    """
+    if states.empty:
+        return {}
+
+    return {
+        tuple(state[key] for key in keys): state for state in states.to_dict("records")
+    }
+
+
+def _calculate_partition(
+    rows: pd.DataFrame, history: pd.DataFrame, state: dict | None
+) -> tuple[pd.DataFrame, list[dict]]:
+    checkpoint_date = rows["checkpoint_date"].iloc[0]
+
+    # The running sums continue from the day before the checkpoint date
+    if state is not None:
+        history = history.iloc[:0]
+        seed_values = state["cumulative_values"]
+    else:
+        history = history.sort_values("date", kind="stable")
+        seed_date = (pd.Timestamp(checkpoint_date) - pd.Timedelta(days=1)).strftime(
+            "%Y-%m-%d"
+        )
+        seed = history[history["date"] == seed_date]
+        seed_values = seed[CUMULATIVE_COLUMNS].iloc[-1] if not seed.empty else {}
+
+    performance = {
+        column: rows[column].to_numpy()
+        for column in ["portfolio_id", "portfolio_group_id", "asset_id", "date"]
+    }
+    performance["unit_price"] = rows["unit_price"].to_numpy(float)
+    performance["unit_price_adj"] = rows["unit_price_adj"].to_numpy(float)
+    for column in CUMULATIVE_COLUMNS:
+        start = seed_values[column] if column in seed_values else 0.0
+        performance[column] = np.cumsum(
+            np.concatenate(([start], rows[column].to_numpy(float)))
+        )[1:]
+    performance["delta_quantity"] = rows["quantity"].to_numpy(float)
+    performance["market_value"] = performance["quantity"] * performance["unit_price"]
+    performance["market_value_adj"] = (
+        performance["quantity"] * performance["unit_price_adj"]
+    )
+    performance["delta_quantity_value_adj"] = (
+        performance["delta_quantity"] * performance["unit_price_adj"]
+    )
+
+    # Ratios and running statistics are evaluated over the whole stored history
+    history = history[history["date"] < checkpoint_date]
+    series = {
+        column: np.concatenate((history[column].to_numpy(), performance[column]))
+        for column in SERIES_COLUMNS
+        if column not in ("profit", "profit_total")
+    }
+    series["profit"] = (
+        series["market_value"] + series["invested_amount"] + series["investment_income"]
+    )
+    series["profit_total"] = (
+        series["market_value"]
+        + series["invested_amount_total"]
+        + series["investment_income_total"]
+    )
+    performance["profit"] = series["profit"][len(history) :]
+    performance["profit_total"] = series["profit_total"][len(history) :]
+    metrics, states = calculate_performance_metrics(
+        series,
+        len(history),
+        state,
+        {column: performance[column] for column in CUMULATIVE_COLUMNS},
+    )
+    performance.update(metrics)
+
+    return pd.DataFrame(performance), states
+
+
+def calculate_performance_metrics(
+    series: Mapping[str, np.ndarray],
+    start: int,
+    state: Mapping | None = None,
+    cumulative_values: Mapping[str, np.ndarray] | None = None,
+) -> tuple[dict[str, np.ndarray], list[dict]]:
+    """
+    Calculates the ratios and running statistics of one performance partition
+    ordered by date, shared by every level of portfolio performances.
+
+    series holds the SERIES_COLUMNS of the stored history followed by the new rows,
+    which begin at `start`. With the state of the partition on the day before
+    the new rows, series holds only the new rows and the accumulators continue
+    from the state. The metrics are returned for the new rows only, together with
+    the states after the new rows of the last STATE_SNAPSHOT_DAYS days, which carry
+    the cumulative_values of the level for its running sums.
+    """
+    dates = series["date"]
+    if state is None:
+        state = _get_initial_state(dates[0])
+
+    market_value = series["market_value"].astype(float)
+    market_value_adj = series["market_value_adj"].astype(float)
+    invested_amount = series["invested_amount"].astype(float)
+    invested_amount_total = series["invested_amount_total"].astype(float)
+    investment_income = series["investment_income"].astype(float)
+    investment_income_total = series["investment_income_total"].astype(float)
+    profit = series["profit"].astype(float)
+    profit_total = series["profit_total"].astype(float)
+    new_rows = slice(start, len(market_value))
+    row_number = state["row_count"] + np.arange(1, len(market_value) + 1, dtype=float)
+
+    value = market_value + series["asset_disposal_income"].astype(float)
+    value_total = market_value + series["asset_disposal_income_total"].astype(float)
+    past_maximum_value = _accumulate(np.maximum, value, state["max_value"])
+    past_maximum_value_total = _accumulate(
+        np.maximum, value_total, state["max_value_total"]
+    )
+    past_maximum_profit = _accumulate(np.maximum, profit, state["max_profit"])
+    past_maximum_profit_total = _accumulate(
+        np.maximum, profit_total, state["max_profit_total"]
+    )
+
+    previous_market_value_adj = np.concatenate(
+        ([state["market_value_adj"]], market_value_adj[:-1])
+    )
+    hpr = _zero_if_undefined(
+        _divide(
+            market_value_adj - series["delta_quantity_value_adj"].astype(float),
+            previous_market_value_adj,
+        )
+        - 1
+    )
+
+    cash_flow = (
+        np.diff(invested_amount, prepend=state["invested_amount"]) + investment_income
+    ) - np.concatenate(([state["investment_income"]], investment_income[:-1]))
+    cash_flow_total = (
+        np.diff(invested_amount_total, prepend=state["invested_amount_total"])
+        + investment_income_total
+    ) - np.concatenate(
+        ([state["investment_income_total"]], investment_income_total[:-1])
+    )
+
+    # Growth factors are accumulated as log levels, skipping rates of -1 or below
+    is_growth = hpr > -1
+    level = _accumulate(
+        np.add, np.log1p(np.where(is_growth, hpr, 0.0)), state["growth_level"]
+    )
+    growth_count = _accumulate(np.add, is_growth, state["growth_count"])
+    past_maximum_level = _accumulate(np.maximum, level, state["max_growth_level"])
+    hpr_cumulative = np.where(growth_count > 0, np.exp(level), np.nan)
+    years_passed = row_number / 365.0
+
+    is_non_zero = hpr != 0
+    moments = _calculate_running_moments(
+        hpr, is_non_zero, state["hpr_count"], state["hpr_mean"], state["hpr_m2"]
+    )
+    downside_moments = _calculate_running_moments(
+        hpr,
+        is_non_zero & (hpr < 0),
+        state["downside_count"],
+        state["downside_mean"],
+        state["downside_m2"],
+    )
+    count, mean, _ = moments
+    sharpe_ratio = _calculate_ratio(mean, moments)
+    sortino_ratio = _calculate_ratio(mean, downside_moments)
+    annualization = np.sqrt(count * 365.0 / row_number)
+
+    metrics = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        metrics["profit_percentage"] = _zero_if_undefined(
+            _divide(profit, np.abs(invested_amount))[new_rows]
+        )
+        metrics["profit_percentage_total"] = _zero_if_undefined(
+            _divide(profit_total, np.abs(invested_amount_total))[new_rows]
+        )
+        metrics["drawdown_value"] = _zero_if_undefined(
+            (_divide(value, past_maximum_value) - 1)[new_rows]
+        )
+        metrics["drawdown_value_total"] = _zero_if_undefined(
+            (_divide(value_total, past_maximum_value_total) - 1)[new_rows]
+        )
+        metrics["drawdown_profit"] = _zero_if_undefined(
+            _divide(profit - past_maximum_profit, past_maximum_value)[new_rows]
+        )
+        metrics["drawdown_profit_total"] = _zero_if_undefined(
+            _divide(profit_total - past_maximum_profit_total, past_maximum_value_total)[
+                new_rows
+            ]
+        )
+        metrics["hpr"] = hpr[new_rows]
+        metrics["drawdown"] = np.expm1(level - past_maximum_level)[new_rows]
+        metrics["twrr_rate_daily"] = (hpr_cumulative - 1)[new_rows]
+        metrics["twrr_rate_annualized"] = (
+            np.power(hpr_cumulative, 1.0 / years_passed) - 1
+        )[new_rows]
+        metrics["sharpe_ratio_daily"] = sharpe_ratio[new_rows]
+        metrics["sharpe_ratio_annualized"] = (sharpe_ratio * annualization)[new_rows]
+        metrics["sortino_ratio_daily"] = sortino_ratio[new_rows]
+        metrics["sortino_ratio_annualized"] = (sortino_ratio * annualization)[new_rows]
+
+    days = _get_days(dates)
+    first_day = _get_days([state["first_date"]])[0]
+    metrics["xirr_rate"] = _continue_xirr_rates(
+        days,
+        cash_flow,
+        market_value,
+        start,
+        first_day,
+        state["cash_flows"],
+        state["xirr_rate"],
+    )
+    metrics["xirr_rate_total"] = _continue_xirr_rates(
+        days,
+        cash_flow_total,
+        market_value,
+        start,
+        first_day,
+        state["cash_flows_total"],
+        state["xirr_rate_total"],
+    )
+
+    states = [
+        {
+            "date": dates[row],
+            "first_date": state["first_date"],
+            "row_count": int(row_number[row]),
+            "market_value_adj": float(market_value_adj[row]),
+            "invested_amount": float(invested_amount[row]),
+            "invested_amount_total": float(invested_amount_total[row]),
+            "investment_income": float(investment_income[row]),
+            "investment_income_total": float(investment_income_total[row]),
+            "max_value": float(past_maximum_value[row]),
+            "max_value_total": float(past_maximum_value_total[row]),
+            "max_profit": float(past_maximum_profit[row]),
+            "max_profit_total": float(past_maximum_profit_total[row]),
+            "growth_count": int(growth_count[row]),
+            "growth_level": float(level[row]),
+            "max_growth_level": float(past_maximum_level[row]),
+            "hpr_count": int(moments[0][row]),
+            "hpr_mean": float(moments[1][row]),
+            "hpr_m2": float(moments[2][row]),
+            "downside_count": int(downside_moments[0][row]),
+            "downside_mean": float(downside_moments[1][row]),
+            "downside_m2": float(downside_moments[2][row]),
+            "xirr_rate": float(metrics["xirr_rate"][row - start]),
+            "xirr_rate_total": float(metrics["xirr_rate_total"][row - start]),
+            "cash_flows": _get_cash_flows(
+                state["cash_flows"], days[: row + 1], cash_flow[: row + 1], first_day
+            ),
+            "cash_flows_total": _get_cash_flows(
+                state["cash_flows_total"],
+                days[: row + 1],
+                cash_flow_total[: row + 1],
+                first_day,
+            ),
+            "cumulative_values": {
+                column: float(values[row - start])
+                for column, values in (cumulative_values or {}).items()
+            },
+        }
+        for row in range(start, len(days))
+        if days[row] > days[-1] - STATE_SNAPSHOT_DAYS
+    ]
+
+    return metrics, states
+
+
+def _get_initial_state(first_date: str) -> dict:
+    """The state before the first row of a partition, which every accumulator starts from."""
+    return {
+        "first_date": first_date,
+        "row_count": 0,
+        "market_value_adj": np.nan,
+        "invested_amount": 0.0,
+        "invested_amount_total": 0.0,
+        "investment_income": 0.0,
+        "investment_income_total": 0.0,
+        "max_value": -np.inf,
+        "max_value_total": -np.inf,
+        "max_profit": -np.inf,
+        "max_profit_total": -np.inf,
+        "growth_count": 0,
+        "growth_level": 0.0,
+        "max_growth_level": -np.inf,
+        "hpr_count": 0,
+        "hpr_mean": 0.0,
+        "hpr_m2": 0.0,
+        "downside_count": 0,
+        "downside_mean": 0.0,
+        "downside_m2": 0.0,
+        "xirr_rate": np.nan,
+        "xirr_rate_total": np.nan,
+        "cash_flows": [],
+        "cash_flows_total": [],
+    }
+
+
+def _accumulate(function: np.ufunc, values: np.ndarray, initial) -> np.ndarray:
+    """Accumulates the values in order, continuing from the value of the previous rows."""
+    return function.accumulate(np.concatenate(([initial], values)))[1:]
+
+
+def _get_days(dates) -> np.ndarray:
+    return (
+        pd.to_datetime(np.asarray(dates, dtype=object))
+        .to_numpy("datetime64[D]")
+        .astype(float)
+    )
+
+
+def _get_cash_flows(
+    previous_cash_flows: list,
+    days: np.ndarray,
+    cash_flows: np.ndarray,
+    first_day: float,
+) -> list[list[float]]:
+    """Appends the non-zero cash flows to the ones of the previous rows."""
+    flow_indexes = np.flatnonzero(cash_flows != 0)
+    return [
+        *previous_cash_flows,
+        *(
+            [int(days[index] - first_day), float(cash_flows[index])]
+            for index in flow_indexes
+        ),
+    ]
+
+
+def _divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Divides like SQLite does, returning NaN (NULL) for a zero denominator."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator == 0, np.nan, numerator / denominator)
+
+
+def _zero_if_undefined(values: np.ndarray) -> np.ndarray:
+    """Replaces NaN (NULL) with zero, like `coalesce(value, 0.0)`."""
+    return np.where(np.isnan(values), 0.0, values)
+
+
+def _calculate_ratio(
+    mean: np.ndarray, moments: tuple[np.ndarray, np.ndarray, np.ndarray]
+) -> np.ndarray:
+    """
+    Divides the running mean by the sample standard deviation of the moments,
+    matching the ratios of the `window_stats` SQLite function.
+    Undefined ratios are returned as NaN.
+    """
+    count, _, m2 = moments
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stddev = np.where(count >= 2, np.sqrt(m2 / (count - 1)), np.nan)
+        ratio = mean / stddev
+    ratio[~np.isfinite(ratio)] = np.nan
+    return ratio
+
+
+def _calculate_running_moments(
+    values: np.ndarray,
+    mask: np.ndarray,
+    previous_count: int,
+    previous_mean: float,
+    previous_m2: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculates the running count, mean and sum of squared deviations (Welford's M2)
+    of the masked values, combined with the moments of the previous rows.
+    The mean stays zero until the first value.
+    """
+    new_count = np.cumsum(mask).astype(float)
+    # Shifting by the first value keeps the sums of squares free of cancellation
+    shift = values[mask][0] if mask.any() else 0.0
+    deviations = np.where(mask, values - shift, 0.0)
+    sum_deviations = np.cumsum(deviations)
+    sum_squares = np.cumsum(deviations * deviations)
+    count = previous_count + new_count
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        new_mean = shift + sum_deviations / new_count
+        new_m2 = np.maximum(
+            sum_squares - sum_deviations * sum_deviations / new_count, 0.0
+        )
+        # Chan's formula merges the moments of the previous and the new values
+        delta = new_mean - previous_mean
+        mean = np.where(
+            new_count > 0, previous_mean + delta * (new_count / count), previous_mean
+        )
+        m2 = np.where(
+            new_count > 0,
+            previous_m2 + new_m2 + delta * delta * previous_count * new_count / count,
+            previous_m2,
+        )
+
+    return count, mean, m2
+
+
+def _continue_xirr_rates(
+    days: np.ndarray,
+    cash_flows: np.ndarray,
+    current_values: np.ndarray,
+    start: int,
+    first_day: float,
+    previous_cash_flows: list,
+    previous_rate: float,
+) -> np.ndarray:
+    """
+    Calculates the XIRR rates of the new rows, with the cash flows of the previous rows
+    put in front of the series, starting from the first day of the partition.
+    """
+    previous = np.asarray(previous_cash_flows, dtype=float).reshape(-1, 2)
+    # A stored state without a rate is read back as NULL
+    if previous_rate is None:
+        previous_rate = np.nan
+    return _calculate_xirr_rates(
+        np.concatenate(([first_day], first_day + previous[:, 0], days)),
+        np.concatenate(([0.0], previous[:, 1], cash_flows)),
+        np.concatenate((np.full(len(previous) + 1, np.nan), current_values)),
+        start + len(previous) + 1,
+        previous_rate,
+    )
+
+
+def _calculate_xirr_rates(
+    days: np.ndarray,
+    cash_flows: np.ndarray,
+    current_values: np.ndarray,
+    start: int,
+    previous_rate: float = np.nan,
+) -> np.ndarray:
+    """
+    Calculates the XIRR of every row from `start` onwards, using the non-zero cash flows
+    up to the row and its current value, like the `xirr_pair` SQLite window function.
+    The rows are solved in chunks of XIRR_CHUNK_ROWS with a vectorized Newton-Raphson
+    method, so the memory needed is bounded by the chunk size times the cash flows.
+    previous_rate is the rate of the row before `start`.
+    """
+    rates = np.full(len(days) - start, np.nan)
+    flow_indexes = np.flatnonzero(cash_flows != 0)
+    if len(rates) == 0 or len(flow_indexes) == 0:
+        return rates
+
+    row_indexes = np.arange(start, len(days))
+    flow_values = cash_flows[flow_indexes]
+    flow_years = (days[flow_indexes] - days[0]) / DAYS_PER_YEAR
+    row_years = (days[row_indexes] - days[0]) / DAYS_PER_YEAR
+    row_values = current_values[row_indexes]
+    # Each row discounts the cash flows of the rows up to and including itself
+    flow_counts = np.searchsorted(flow_indexes, row_indexes, side="right")
+
+    has_positive = (_count_flows(flow_values > 0, flow_counts) > 0) | (row_values > 0)
+    has_negative = (_count_flows(flow_values < 0, flow_counts) > 0) | (row_values < 0)
+    solvable = (flow_counts > 0) & has_positive & has_negative
+    is_single_sign_change = _has_single_sign_change(
+        flow_values, flow_counts, row_values
+    )
+
+    for chunk_start in range(0, len(rates), XIRR_CHUNK_ROWS):
+        chunk = slice(chunk_start, chunk_start + XIRR_CHUNK_ROWS)
+        # A chunk continues from the rate of the last row of the chunk before it
+        chunk_previous_rate = rates[chunk_start - 1] if chunk_start else previous_rate
+        rates[chunk] = _calculate_chunk_xirr_rates(
+            flow_values,
+            flow_years,
+            flow_counts[chunk],
+            row_values[chunk],
+            row_years[chunk],
+            solvable[chunk],
+            is_single_sign_change[chunk],
+            chunk_previous_rate,
+        )
+
+    return rates
+
+
+def _calculate_chunk_xirr_rates(
+    flow_values: np.ndarray,
+    flow_years: np.ndarray,
+    flow_counts: np.ndarray,
+    row_values: np.ndarray,
+    row_years: np.ndarray,
+    solvable: np.ndarray,
+    is_single_sign_change: np.ndarray,
+    previous_rate: float,
+) -> np.ndarray:
+    rates = np.full(len(row_values), np.nan)
+    # Only the cash flows reached by the last row of the chunk are discounted
+    flow_count = flow_counts[-1]
+    flow_values = flow_values[:flow_count]
+    flow_years = flow_years[:flow_count]
+    mask = np.arange(flow_count)[None, :] < flow_counts[:, None]
+
+    for initial_guess in XIRR_INITIAL_GUESSES:
+        pending = np.flatnonzero(solvable & np.isnan(rates))
+        if len(pending) == 0:
+            break
+        rates[pending] = _find_roots_newton_raphson(
+            np.full(len(pending), initial_guess),
+            flow_values,
+            flow_years,
+            mask[pending],
+            row_values[pending],
+            row_years[pending],
+        )
+
+    # Rows with a single sign change have a unique root, which the extension may also
+    # reach from the rate of the previous row when none of the initial guesses converges
+    while True:
+        previous_rates = np.concatenate(([previous_rate], rates[:-1]))
+        pending = np.flatnonzero(
+            solvable
+            & is_single_sign_change
+            & np.isnan(rates)
+            & ~np.isnan(previous_rates)
+        )
+        if len(pending) == 0:
+            break
+        rates[pending] = _find_roots_newton_raphson(
+            previous_rates[pending],
+            flow_values,
+            flow_years,
+            mask[pending],
+            row_values[pending],
+            row_years[pending],
+        )
+        if np.isnan(rates[pending]).all():
+            break
+
+    return rates
+
+
+def _count_flows(is_counted: np.ndarray, flow_counts: np.ndarray) -> np.ndarray:
+    """Counts the flows of every row, i.e. its first `flow_counts`, that are counted."""
+    return np.concatenate(([0], np.cumsum(is_counted)))[flow_counts]
+
+
+def _has_single_sign_change(
+    flow_values: np.ndarray, flow_counts: np.ndarray, row_values: np.ndarray
+) -> np.ndarray:
+    flow_signs = np.sign(flow_values)
+    flow_sign_changes = np.concatenate(
+        ([0], np.cumsum(flow_signs[1:] != flow_signs[:-1]))
+    )
+    last_flow_indexes = flow_counts - 1
+    sign_changes = np.where(
+        last_flow_indexes >= 0, flow_sign_changes[last_flow_indexes], 0
+    )
+    last_flow_signs = np.where(last_flow_indexes >= 0, flow_signs[last_flow_indexes], 0)
+    row_signs = np.sign(row_values)
+    sign_changes = sign_changes + (
+        (row_signs != 0) & (last_flow_signs != 0) & (row_signs != last_flow_signs)
+    )
+    return sign_changes == 1
+
+
+def _find_roots_newton_raphson(
+    rates: np.ndarray,
+    flow_values: np.ndarray,
+    flow_years: np.ndarray,
+    mask: np.ndarray,
+    row_values: np.ndarray,
+    row_years: np.ndarray,
+) -> np.ndarray:
+    """
+    Runs the Newton-Raphson method of the XIRR extension for many rows at once.
+    Returns NaN for the rows that do not converge to a rate within the allowed bounds.
+    """
+    rates = rates.astype(float)
+    roots = np.full(len(rates), np.nan)
+    active = np.arange(len(rates))
+
+    with np.errstate(all="ignore"):
+        for _ in range(XIRR_MAX_ITERATIONS):
+            if len(active) == 0:
+                break
+            rate = rates[active]
+            log_growth = np.log1p(rate)[:, None]
+
+            # Masked out cash flows get zero values and times, so they never overflow
+            times = np.where(mask[active], flow_years, 0.0)
+            discounted = np.where(mask[active], flow_values, 0.0) * np.exp(
+                -times * log_growth
+            )
+            current_discounted = row_values[active] * np.exp(
+                -row_years[active] * log_growth[:, 0]
+            )
+            npv = discounted.sum(axis=1) + current_discounted
+            weighted_npv = (discounted * times).sum(axis=1) + (
+                row_years[active] * current_discounted
+            )
+            derivative = -weighted_npv / (1.0 + rate)
+
+            failed = (
+                ~np.isfinite(npv)
+                | ~np.isfinite(weighted_npv)
+                | ~np.isfinite(derivative)
+                | (np.abs(derivative) < XIRR_DERIVATIVE_TOLERANCE)
+            )
+            found = ~failed & (np.abs(npv) < XIRR_TOLERANCE)
+            roots[active[found]] = rate[found]
+
+            new_rate = np.clip(rate - npv / derivative, XIRR_MIN_RATE, XIRR_MAX_RATE)
+            converged = ~failed & ~found & (np.abs(new_rate - rate) < XIRR_TOLERANCE)
+            roots[active[converged]] = new_rate[converged]
+
+            rates[active] = new_rate
+            active = active[~(failed | found | converged)]
+
+    is_valid = (roots > XIRR_MIN_RATE) & (roots < XIRR_MAX_RATE)
+    return np.where(is_valid, roots, np.nan)
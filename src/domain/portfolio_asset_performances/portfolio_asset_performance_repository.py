@@ -1,3 +1,5 @@
+from sqlalchemy import insert
+
 from .portfolio_asset_performance_model import PortfolioAssetPerformance
 
 
@@ -22,6 +24,16 @@ class PortfolioAssetPerformanceRepository:
             .all()
         )
 
+    def insert_many(self, portfolio_asset_performances):
+        if portfolio_asset_performances:
+            # A Core insert of the table skips the per-row bookkeeping of ORM bulk inserts
+            self.session.execute(
+                insert(PortfolioAssetPerformance.__table__),
+                portfolio_asset_performances,
+            )
+            self.session.flush()
+        return len(portfolio_asset_performances)
+
     def get_all(self):
         return self.session.query(PortfolioAssetPerformance).all()
 
@@ -1,4 +1,7 @@
+from src.infrastructure.db import read_data_frame, to_records
+
 from .portfolio_asset_performance_repository import PortfolioAssetPerformanceRepository
+from .portfolio_asset_performance_engine import calculate_asset_performances
 from .complex_queries import *
 
 
@@ -42,6 +45,44 @@ class PortfolioAssetPerformanceService:
             query=query
         )
 
+    def insert_with_numpy(self, user_id: int, states):
+        performances, new_states = self.calculate_with_numpy(user_id, states)
+        self.replace_from_checkpoint(user_id, performances)
+        return new_states
+
+    def calculate_with_numpy(self, user_id: int, states):
+        return calculate_asset_performances(
+            self.get_unit_prices(user_id),
+            self.get_transactions_by_date(user_id),
+            self.get_performance_history(user_id),
+            states,
+        )
+
+    def get_unit_prices(self, user_id: int):
+        return self._read_data_frame(get_unit_prices(user_id))
+
+    def get_transactions_by_date(self, user_id: int):
+        return self._read_data_frame(get_transactions_by_date(user_id))
+
+    def get_performance_history(self, user_id: int):
+        return self._read_data_frame(get_performance_history(user_id))
+
+    def replace_from_checkpoint(self, user_id: int, performances):
+        self.delete_many_by_user_id_and_date(user_id)
+        return self.portfolio_asset_performance_repository.insert_many(
+            portfolio_asset_performances=to_records(performances)
+        )
+
+    def get_unchanged_performances(self, user_id: int):
+        return self._read_data_frame(get_unchanged_performances(user_id))
+
+    def _read_data_frame(self, query):
+        return read_data_frame(
+            self.portfolio_asset_performance_repository.execute_custom_query(
+                query=query
+            )
+        )
+
     def get_performance_by_portfolio_id_and_asset_id(self, portfolio_id, asset_id):
         return self.portfolio_asset_performance_repository.get_many(
             portfolio_id=portfolio_id, asset_id=asset_id
@@ -1,3 +1,7 @@
+from sqlalchemy import insert
+
+from src.domain.portfolio_groups.portfolio_group_model import PortfolioGroup
+
 from .portfolio_group_asset_model import PortfolioGroupAsset
 
 
@@ -11,6 +15,14 @@ class PortfolioGroupAssetRepository:
         self.session.refresh(portfolio_group_asset)
         return portfolio_group_asset
 
+    def insert_many(self, portfolio_group_assets):
+        if portfolio_group_assets:
+            self.session.execute(
+                insert(PortfolioGroupAsset.__table__), portfolio_group_assets
+            )
+            self.session.flush()
+        return len(portfolio_group_assets)
+
     def get_one(self, portfolio_group_id, asset_id):
         return (
             self.session.query(PortfolioGroupAsset)
@@ -21,6 +33,14 @@ class PortfolioGroupAssetRepository:
             .first()
         )
 
+    def get_many_by_user_id(self, user_id):
+        return (
+            self.session.query(PortfolioGroupAsset)
+            .join(PortfolioGroup)
+            .filter(PortfolioGroup.user_id == user_id)
+            .all()
+        )
+
     def get_all(self):
         return self.session.query(PortfolioGroupAsset).all()
 
@@ -19,11 +19,21 @@ class PortfolioGroupAssetService:
             portfolio_group_asset=portfolio_group_asset
         )
 
+    def insert_many(self, portfolio_group_assets: list[dict]):
+        return self.portfolio_group_asset_repository.insert_many(
+            portfolio_group_assets=portfolio_group_assets
+        )
+
     def get_one(self, portfolio_group_id, asset_id):
         return self.portfolio_group_asset_repository.get_one(
             portfolio_group_id=portfolio_group_id, asset_id=asset_id
         )
 
+    def get_many_by_user_id(self, user_id):
+        return self.portfolio_group_asset_repository.get_many_by_user_id(
+            user_id=user_id
+        )
+
     def get_all(self):
         return self.portfolio_group_asset_repository.get_all()
 
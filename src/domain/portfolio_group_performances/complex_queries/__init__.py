@@ -1,6 +1,8 @@
 from .get_performance_status import get_performance_status
 from .get_weights_by_portfolio_id import get_weights_by_portfolio_id
 from .insert_with_select import insert_with_select
+from .get_performance_history import get_performance_history
+from .get_unchanged_performances import get_unchanged_performances
 from .delete_many import (
     delete_many_by_user_id_and_date,
 )
@@ -9,5 +11,7 @@ __all__ = [
     "get_performance_status",
     "get_weights_by_portfolio_id",
     "insert_with_select",
+    "get_performance_history",
+    "get_unchanged_performances",
     "delete_many_by_user_id_and_date",
 ]
@@ -3,17 +3,24 @@ from sqlalchemy import delete, exists
 from src.domain.portfolio_group_performances.portfolio_group_performance_model import (
     PortfolioGroupPerformance,
 )
-from src.domain.portfolios.portfolio_model import Portfolio
-from src.domain.portfolio_aggregates.portfolio_aggregate_model import PortfolioAggregate
+from src.domain.portfolio_asset_checkpoints.complex_queries.partition_checkpoints import (
+    get_group_checkpoints_cte,
+)
 
 
 def delete_many_by_user_id_and_date(user_id: int):
+    cte_group_checkpoints = get_group_checkpoints_cte(user_id)
+
     query = delete(PortfolioGroupPerformance).where(
         exists().where(
-            (Portfolio.id == PortfolioGroupPerformance.portfolio_id)
-            & (PortfolioAggregate.id == Portfolio.portfolio_aggregate_id)
-            & (PortfolioAggregate.user_id == user_id)
-            & (PortfolioGroupPerformance.date >= PortfolioAggregate.checkpoint_date)
+            (
+                cte_group_checkpoints.c.portfolio_group_id
+                == PortfolioGroupPerformance.portfolio_group_id
+            )
+            & (
+                PortfolioGroupPerformance.date
+                >= cte_group_checkpoints.c.checkpoint_date
+            )
         )
     )
 
@@ -0,0 +1,63 @@
+from sqlalchemy import select
+
+from src.domain.portfolio_group_performances.portfolio_group_performance_model import (
+    PortfolioGroupPerformance,
+)
+from src.domain.portfolio_asset_checkpoints.complex_queries.partition_checkpoints import (
+    get_group_checkpoints_cte,
+)
+from src.domain.performance_states.performance_state_model import PerformanceState
+from src.domain.performance_states.complex_queries.partition_states import (
+    get_state_condition,
+)
+
+
+def get_performance_history(user_id: int):
+    cte_group_checkpoints = get_group_checkpoints_cte(user_id)
+
+    query = (
+        select(
+            PortfolioGroupPerformance.portfolio_id,
+            PortfolioGroupPerformance.portfolio_group_id,
+            PortfolioGroupPerformance.date,
+            PortfolioGroupPerformance.market_value,
+            PortfolioGroupPerformance.market_value_adj,
+            PortfolioGroupPerformance.delta_quantity_value_adj,
+            PortfolioGroupPerformance.invested_amount,
+            PortfolioGroupPerformance.invested_amount_total,
+            PortfolioGroupPerformance.asset_disposal_income,
+            PortfolioGroupPerformance.asset_disposal_income_total,
+            PortfolioGroupPerformance.asset_holding_income,
+            PortfolioGroupPerformance.asset_holding_income_total,
+            PortfolioGroupPerformance.investment_income,
+            PortfolioGroupPerformance.investment_income_total,
+            PortfolioGroupPerformance.profit,
+            PortfolioGroupPerformance.profit_total,
+        )
+        .join_from(
+            PortfolioGroupPerformance,
+            cte_group_checkpoints,
+            cte_group_checkpoints.c.portfolio_group_id
+            == PortfolioGroupPerformance.portfolio_group_id,
+        )
+        .where(
+            PortfolioGroupPerformance.date < cte_group_checkpoints.c.checkpoint_date,
+            # Partitions with a stored state are continued from it
+            ~select(PerformanceState.id)
+            .where(
+                get_state_condition(
+                    "group",
+                    cte_group_checkpoints.c.checkpoint_date,
+                    {"portfolio_group_id": cte_group_checkpoints.c.portfolio_group_id},
+                )
+            )
+            .exists(),
+        )
+        .order_by(
+            PortfolioGroupPerformance.portfolio_id,
+            PortfolioGroupPerformance.portfolio_group_id,
+            PortfolioGroupPerformance.date,
+        )
+    )
+
+    return query
@@ -0,0 +1,54 @@
+from sqlalchemy import select, and_
+
+from src.domain.portfolio_group_performances.portfolio_group_performance_model import (
+    PortfolioGroupPerformance,
+)
+from src.domain.portfolio_asset_checkpoints.complex_queries.partition_checkpoints import (
+    get_asset_checkpoints_cte,
+    get_group_checkpoints_cte,
+    get_portfolio_checkpoints_cte,
+)
+
+
+def get_unchanged_performances(user_id: int):
+    """
+    The stored performances that are kept, but still summed by their portfolio,
+    because the portfolio is recalculated from an earlier checkpoint date.
+    """
+    cte_asset_checkpoints = get_asset_checkpoints_cte(user_id)
+    cte_group_checkpoints = get_group_checkpoints_cte(user_id, cte_asset_checkpoints)
+    cte_portfolio_checkpoints = get_portfolio_checkpoints_cte(
+        user_id, cte_asset_checkpoints
+    )
+
+    query = (
+        select(
+            PortfolioGroupPerformance.portfolio_id,
+            PortfolioGroupPerformance.portfolio_group_id,
+            PortfolioGroupPerformance.date,
+            PortfolioGroupPerformance.market_value,
+            PortfolioGroupPerformance.market_value_adj,
+            PortfolioGroupPerformance.delta_quantity_value_adj,
+        )
+        .join_from(
+            PortfolioGroupPerformance,
+            cte_group_checkpoints,
+            cte_group_checkpoints.c.portfolio_group_id
+            == PortfolioGroupPerformance.portfolio_group_id,
+        )
+        .join(
+            cte_portfolio_checkpoints,
+            cte_portfolio_checkpoints.c.portfolio_id
+            == PortfolioGroupPerformance.portfolio_id,
+        )
+        .where(
+            and_(
+                PortfolioGroupPerformance.date
+                >= cte_portfolio_checkpoints.c.checkpoint_date,
+                PortfolioGroupPerformance.date
+                < cte_group_checkpoints.c.checkpoint_date,
+            )
+        )
+    )
+
+    return query
@@ -1,4 +1,4 @@
-from sqlalchemy import insert, select, func, and_
+from sqlalchemy import insert, select, func
 
 from src.domain.portfolio_group_performances.portfolio_group_performance_model import (
     PortfolioGroupPerformance,
@@ -6,16 +6,19 @@ from src.domain.portfolio_group_performances.portfolio_group_performance_model i
 from src.domain.portfolio_asset_performances.portfolio_asset_performance_model import (
     PortfolioAssetPerformance,
 )
-from src.domain.portfolio_aggregates.portfolio_aggregate_model import PortfolioAggregate
-from src.domain.portfolios.portfolio_model import Portfolio
+from src.domain.portfolio_asset_checkpoints.complex_queries.partition_checkpoints import (
+    get_group_checkpoints_cte,
+)
 
 
 def insert_with_select(user_id: int):
+    cte_group_checkpoints = get_group_checkpoints_cte(user_id)
+
     cte_1 = (
         select(
             PortfolioAssetPerformance.portfolio_id,
             PortfolioAssetPerformance.portfolio_group_id,
-            PortfolioAggregate.checkpoint_date,
+            cte_group_checkpoints.c.checkpoint_date,
             PortfolioAssetPerformance.date,
             func.sum(PortfolioAssetPerformance.market_value).label("market_value"),
             func.sum(PortfolioAssetPerformance.market_value_adj).label(
@@ -53,18 +56,12 @@ def insert_with_select(user_id: int):
         )
         .join_from(
             PortfolioAssetPerformance,
-            Portfolio,
-            Portfolio.id == PortfolioAssetPerformance.portfolio_id,
-        )
-        .join(
-            PortfolioAggregate,
-            PortfolioAggregate.id == Portfolio.portfolio_aggregate_id,
+            cte_group_checkpoints,
+            cte_group_checkpoints.c.portfolio_group_id
+            == PortfolioAssetPerformance.portfolio_group_id,
         )
         .where(
-            and_(
-                PortfolioAggregate.user_id == user_id,
-                PortfolioAssetPerformance.date >= PortfolioAggregate.checkpoint_date,
-            )
+            PortfolioAssetPerformance.date >= cte_group_checkpoints.c.checkpoint_date
         )
         .group_by(
             PortfolioAssetPerformance.portfolio_id,
@@ -75,7 +72,7 @@ def insert_with_select(user_id: int):
             select(
                 PortfolioGroupPerformance.portfolio_id,
                 PortfolioGroupPerformance.portfolio_group_id,
-                PortfolioAggregate.checkpoint_date,
+                cte_group_checkpoints.c.checkpoint_date,
                 PortfolioGroupPerformance.date,
                 PortfolioGroupPerformance.market_value,
                 PortfolioGroupPerformance.market_value_adj,
@@ -93,18 +90,12 @@ def insert_with_select(user_id: int):
             )
             .join_from(
                 PortfolioGroupPerformance,
-                Portfolio,
-                Portfolio.id == PortfolioGroupPerformance.portfolio_id,
-            )
-            .join(
-                PortfolioAggregate,
-                PortfolioAggregate.id == Portfolio.portfolio_aggregate_id,
+                cte_group_checkpoints,
+                cte_group_checkpoints.c.portfolio_group_id
+                == PortfolioGroupPerformance.portfolio_group_id,
             )
             .where(
-                and_(
-                    PortfolioAggregate.user_id == user_id,
-                    PortfolioGroupPerformance.date < PortfolioAggregate.checkpoint_date,
-                )
+                PortfolioGroupPerformance.date < cte_group_checkpoints.c.checkpoint_date
             )
         )
         .cte(name="cte_1")
@@ -186,29 +177,22 @@ def insert_with_select(user_id: int):
     cte_3 = select(
         cte_2,
         (
-            func.exp(
-                func.sum(func.ln(1 + cte_2.c.hpr)).over(
-                    partition_by=[cte_2.c.portfolio_id, cte_2.c.portfolio_group_id],
-                    order_by=cte_2.c.date,
-                )
+            func.cumprod1p(cte_2.c.hpr).over(
+                partition_by=[cte_2.c.portfolio_id, cte_2.c.portfolio_group_id],
+                order_by=cte_2.c.date,
             )
         ).label("hpr_cumulative"),
-        (cte_2.c.row_number / 365.0).label("years_passed"),
-        func.nullif(cte_2.c.hpr, 0.0).label("hpr_non_zero"),
         (
-            func.xirr(
-                cte_2.c.date,
-                cte_2.c.cash_flow,
-                cte_2.c.market_value,
-                cte_2.c.checkpoint_date,
-            ).over(
+            func.drawdown(cte_2.c.hpr).over(
                 partition_by=[cte_2.c.portfolio_id, cte_2.c.portfolio_group_id],
                 order_by=cte_2.c.date,
             )
-        ).label("xirr_rate"),
+        ).label("drawdown"),
+        (cte_2.c.row_number / 365.0).label("years_passed"),
         (
-            func.xirr(
+            func.xirr_pair(
                 cte_2.c.date,
+                cte_2.c.cash_flow,
                 cte_2.c.cash_flow_total,
                 cte_2.c.market_value,
                 cte_2.c.checkpoint_date,
@@ -216,116 +200,90 @@ def insert_with_select(user_id: int):
                 partition_by=[cte_2.c.portfolio_id, cte_2.c.portfolio_group_id],
                 order_by=cte_2.c.date,
             )
-        ).label("xirr_rate_total"),
-    ).cte(name="cte_3")
-
-    cte_4 = select(
-        cte_3,
+        ).label("xirr_rates"),
         (
-            func.max(cte_3.c.hpr_cumulative).over(
-                partition_by=[cte_3.c.portfolio_id, cte_3.c.portfolio_group_id],
-                order_by=cte_3.c.date,
-            )
-        ).label("past_maximum_hpr_cumulative"),
-        (
-            func.avg(cte_3.c.hpr_non_zero).over(
-                partition_by=[cte_3.c.portfolio_id, cte_3.c.portfolio_group_id],
-                order_by=cte_3.c.date,
-            )
-        ).label("hpr_non_zero_avg"),
-        (
-            func.stddev(cte_3.c.hpr_non_zero).over(
-                partition_by=[cte_3.c.portfolio_id, cte_3.c.portfolio_group_id],
-                order_by=cte_3.c.date,
-            )
-        ).label("hpr_non_zero_stddev"),
-        (
-            func.stddev(
-                func.iif(cte_3.c.hpr_non_zero < 0, cte_3.c.hpr_non_zero, None)
-            ).over(
-                partition_by=[cte_3.c.portfolio_id, cte_3.c.portfolio_group_id],
-                order_by=cte_3.c.date,
-            )
-        ).label("hpr_non_zero_stddev_d"),
-        (
-            func.count(cte_3.c.hpr_non_zero).over(
-                partition_by=[cte_3.c.portfolio_id, cte_3.c.portfolio_group_id],
-                order_by=cte_3.c.date,
+            func.window_stats(func.nullif(cte_2.c.hpr, 0.0)).over(
+                partition_by=[cte_2.c.portfolio_id, cte_2.c.portfolio_group_id],
+                order_by=cte_2.c.date,
             )
-            * 365.0
-            / cte_3.c.row_number
-        ).label("avg_days_per_year"),
-    ).cte(name="cte_4")
+        ).label("hpr_non_zero_stats"),
+    ).cte(name="cte_3")
 
     query = select(
-        cte_4.c.portfolio_id,
-        cte_4.c.portfolio_group_id,
-        cte_4.c.date,
-        cte_4.c.market_value,
-        cte_4.c.market_value_adj,
-        cte_4.c.delta_quantity_value_adj,
-        cte_4.c.invested_amount,
-        cte_4.c.invested_amount_total,
-        cte_4.c.asset_disposal_income,
-        cte_4.c.asset_disposal_income_total,
-        cte_4.c.asset_holding_income,
-        cte_4.c.asset_holding_income_total,
-        cte_4.c.investment_income,
-        cte_4.c.investment_income_total,
-        cte_4.c.profit,
-        cte_4.c.profit_total,
-        func.coalesce(cte_4.c.profit_percentage, 0.0).label("profit_percentage"),
-        func.coalesce(cte_4.c.profit_percentage_total, 0.0).label(
+        cte_3.c.portfolio_id,
+        cte_3.c.portfolio_group_id,
+        cte_3.c.date,
+        cte_3.c.market_value,
+        cte_3.c.market_value_adj,
+        cte_3.c.delta_quantity_value_adj,
+        cte_3.c.invested_amount,
+        cte_3.c.invested_amount_total,
+        cte_3.c.asset_disposal_income,
+        cte_3.c.asset_disposal_income_total,
+        cte_3.c.asset_holding_income,
+        cte_3.c.asset_holding_income_total,
+        cte_3.c.investment_income,
+        cte_3.c.investment_income_total,
+        cte_3.c.profit,
+        cte_3.c.profit_total,
+        func.coalesce(cte_3.c.profit_percentage, 0.0).label("profit_percentage"),
+        func.coalesce(cte_3.c.profit_percentage_total, 0.0).label(
             "profit_percentage_total"
         ),
         func.coalesce(
-            (cte_4.c.market_value + cte_4.c.asset_disposal_income)
-            / cte_4.c.past_maximum_value
+            (cte_3.c.market_value + cte_3.c.asset_disposal_income)
+            / cte_3.c.past_maximum_value
             - 1,
             0.0,
         ).label("drawdown_value"),
         func.coalesce(
-            (cte_4.c.market_value + cte_4.c.asset_disposal_income_total)
-            / cte_4.c.past_maximum_value_total
+            (cte_3.c.market_value + cte_3.c.asset_disposal_income_total)
+            / cte_3.c.past_maximum_value_total
             - 1,
             0.0,
         ).label("drawdown_value_total"),
         func.coalesce(
-            (cte_4.c.profit - cte_4.c.past_maximum_profit) / cte_4.c.past_maximum_value,
+            (cte_3.c.profit - cte_3.c.past_maximum_profit) / cte_3.c.past_maximum_value,
             0.0,
         ).label("drawdown_profit"),
         func.coalesce(
-            (cte_4.c.profit_total - cte_4.c.past_maximum_profit_total)
-            / cte_4.c.past_maximum_value_total,
+            (cte_3.c.profit_total - cte_3.c.past_maximum_profit_total)
+            / cte_3.c.past_maximum_value_total,
             0.0,
         ).label("drawdown_profit_total"),
-        cte_4.c.hpr,
-        (cte_4.c.hpr_cumulative / cte_4.c.past_maximum_hpr_cumulative - 1).label(
-            "drawdown"
-        ),
-        (cte_4.c.hpr_cumulative - 1).label("twrr_rate_daily"),
-        (func.pow(cte_4.c.hpr_cumulative, 1.0 / cte_4.c.years_passed) - 1).label(
+        cte_3.c.hpr,
+        cte_3.c.drawdown,
+        (cte_3.c.hpr_cumulative - 1).label("twrr_rate_daily"),
+        (func.pow(cte_3.c.hpr_cumulative, 1.0 / cte_3.c.years_passed) - 1).label(
             "twrr_rate_annualized"
         ),
-        (cte_4.c.hpr_non_zero_avg / cte_4.c.hpr_non_zero_stddev).label(
+        func.window_stats_get(cte_3.c.hpr_non_zero_stats, "sharpe").label(
             "sharpe_ratio_daily"
         ),
         (
-            cte_4.c.hpr_non_zero_avg
-            / cte_4.c.hpr_non_zero_stddev
-            * func.pow(cte_4.c.avg_days_per_year, 0.5)
+            func.window_stats_get(cte_3.c.hpr_non_zero_stats, "sharpe")
+            * func.pow(
+                func.window_stats_get(cte_3.c.hpr_non_zero_stats, "count")
+                * 365.0
+                / cte_3.c.row_number,
+                0.5,
+            )
         ).label("sharpe_ratio_annualized"),
-        (cte_4.c.hpr_non_zero_avg / cte_4.c.hpr_non_zero_stddev_d).label(
+        func.window_stats_get(cte_3.c.hpr_non_zero_stats, "sortino").label(
             "sortino_ratio_daily"
         ),
         (
-            cte_4.c.hpr_non_zero_avg
-            / cte_4.c.hpr_non_zero_stddev_d
-            * func.pow(cte_4.c.avg_days_per_year, 0.5)
+            func.window_stats_get(cte_3.c.hpr_non_zero_stats, "sortino")
+            * func.pow(
+                func.window_stats_get(cte_3.c.hpr_non_zero_stats, "count")
+                * 365.0
+                / cte_3.c.row_number,
+                0.5,
+            )
         ).label("sortino_ratio_annualized"),
-        cte_4.c.xirr_rate,
-        cte_4.c.xirr_rate_total,
-    ).where(cte_4.c.date >= cte_4.c.checkpoint_date)
+        func.xirr_pair_rate(cte_3.c.xirr_rates, 0).label("xirr_rate"),
+        func.xirr_pair_rate(cte_3.c.xirr_rates, 1).label("xirr_rate_total"),
+    ).where(cte_3.c.date >= cte_3.c.checkpoint_date)
 
     return insert(PortfolioGroupPerformance).from_select(
         [
@@ -1,3 +1,5 @@
+from sqlalchemy import insert
+
 from .portfolio_group_performance_model import PortfolioGroupPerformance
 
 
@@ -19,6 +21,16 @@ class PortfolioGroupPerformanceRepository:
             .all()
         )
 
+    def insert_many(self, portfolio_group_performances):
+        if portfolio_group_performances:
+            # A Core insert of the table skips the per-row bookkeeping of ORM bulk inserts
+            self.session.execute(
+                insert(PortfolioGroupPerformance.__table__),
+                portfolio_group_performances,
+            )
+            self.session.flush()
+        return len(portfolio_group_performances)
+
     def get_all(self):
         return self.session.query(PortfolioGroupPerformance).all()
 
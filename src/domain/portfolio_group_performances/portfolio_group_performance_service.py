@@ -1,3 +1,5 @@
+from src.infrastructure.db import read_data_frame, to_records
+
 from .portfolio_group_performance_repository import PortfolioGroupPerformanceRepository
 from .complex_queries import *
 
@@ -42,6 +44,25 @@ class PortfolioGroupPerformanceService:
             query=query
         )
 
+    def replace_from_checkpoint(self, user_id: int, performances):
+        self.delete_many_by_user_id_and_date(user_id)
+        return self.portfolio_group_performance_repository.insert_many(
+            portfolio_group_performances=to_records(performances)
+        )
+
+    def get_performance_history(self, user_id: int):
+        return self._read_data_frame(get_performance_history(user_id))
+
+    def get_unchanged_performances(self, user_id: int):
+        return self._read_data_frame(get_unchanged_performances(user_id))
+
+    def _read_data_frame(self, query):
+        return read_data_frame(
+            self.portfolio_group_performance_repository.execute_custom_query(
+                query=query
+            )
+        )
+
     def get_performance_by_portfolio_group_id(self, portfolio_group_id):
         return self.portfolio_group_performance_repository.get_many(
             portfolio_group_id=portfolio_group_id
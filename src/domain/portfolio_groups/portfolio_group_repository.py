@@ -1,3 +1,5 @@
+from sqlalchemy import insert
+
 from .portfolio_group_model import PortfolioGroup
 
 
@@ -11,6 +13,12 @@ class PortfolioGroupRepository:
         self.session.refresh(portfolio_group)
         return portfolio_group
 
+    def insert_many(self, portfolio_groups):
+        if portfolio_groups:
+            self.session.execute(insert(PortfolioGroup.__table__), portfolio_groups)
+            self.session.flush()
+        return len(portfolio_groups)
+
     def get_one(self, id):
         return (
             self.session.query(PortfolioGroup).filter(PortfolioGroup.id == id).first()
@@ -25,6 +33,13 @@ class PortfolioGroupRepository:
             .first()
         )
 
+    def get_many_by_user_id(self, user_id):
+        return (
+            self.session.query(PortfolioGroup)
+            .filter(PortfolioGroup.user_id == user_id)
+            .all()
+        )
+
     def get_all(self):
         return self.session.query(PortfolioGroup).all()
 
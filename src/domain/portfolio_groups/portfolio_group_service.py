@@ -23,6 +23,11 @@ class PortfolioGroupService:
             portfolio_group=portfolio_group
         )
 
+    def insert_many(self, portfolio_groups: list[dict]):
+        return self.portfolio_group_repository.insert_many(
+            portfolio_groups=portfolio_groups
+        )
+
     def get_one(self, id):
         return self.portfolio_group_repository.get_one(id=id)
 
@@ -31,6 +36,9 @@ class PortfolioGroupService:
             portfolio_id=portfolio_id, name=name
         )
 
+    def get_many_by_user_id(self, user_id):
+        return self.portfolio_group_repository.get_many_by_user_id(user_id=user_id)
+
     def get_all(self):
         return self.portfolio_group_repository.get_all()
 
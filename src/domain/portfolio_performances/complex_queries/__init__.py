@@ -1,5 +1,8 @@
 from .get_performance_status import get_performance_status
 from .insert_with_select import insert_with_select
+from .get_transactions_by_date import get_transactions_by_date
+from .get_performance_history import get_performance_history
+from .get_unchanged_performances import get_unchanged_performances
 from .delete_many import (
     delete_many_by_user_id_and_date,
 )
@@ -7,5 +10,8 @@ from .delete_many import (
 __all__ = [
     "get_performance_status",
     "insert_with_select",
+    "get_transactions_by_date",
+    "get_performance_history",
+    "get_unchanged_performances",
     "delete_many_by_user_id_and_date",
 ]
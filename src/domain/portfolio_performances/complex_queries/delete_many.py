@@ -3,17 +3,21 @@ from sqlalchemy import delete, exists
 from src.domain.portfolio_performances.portfolio_performance_model import (
     PortfolioPerformance,
 )
-from src.domain.portfolios.portfolio_model import Portfolio
-from src.domain.portfolio_aggregates.portfolio_aggregate_model import PortfolioAggregate
+from src.domain.portfolio_asset_checkpoints.complex_queries.partition_checkpoints import (
+    get_portfolio_checkpoints_cte,
+)
 
 
 def delete_many_by_user_id_and_date(user_id: int):
+    cte_portfolio_checkpoints = get_portfolio_checkpoints_cte(user_id)
+
     query = delete(PortfolioPerformance).where(
         exists().where(
-            (Portfolio.id == PortfolioPerformance.portfolio_id)
-            & (PortfolioAggregate.id == Portfolio.portfolio_aggregate_id)
-            & (PortfolioAggregate.user_id == user_id)
-            & (PortfolioPerformance.date >= PortfolioAggregate.checkpoint_date)
+            (
+                cte_portfolio_checkpoints.c.portfolio_id
+                == PortfolioPerformance.portfolio_id
+            )
+            & (PortfolioPerformance.date >= cte_portfolio_checkpoints.c.checkpoint_date)
         )
     )
 
@@ -0,0 +1,62 @@
+from sqlalchemy import select
+
+from src.domain.portfolio_performances.portfolio_performance_model import (
+    PortfolioPerformance,
+)
+from src.domain.portfolio_asset_checkpoints.complex_queries.partition_checkpoints import (
+    get_portfolio_checkpoints_cte,
+)
+from src.domain.performance_states.performance_state_model import PerformanceState
+from src.domain.performance_states.complex_queries.partition_states import (
+    get_state_condition,
+)
+
+
+def get_performance_history(user_id: int):
+    cte_portfolio_checkpoints = get_portfolio_checkpoints_cte(user_id)
+
+    query = (
+        select(
+            PortfolioPerformance.portfolio_id,
+            PortfolioPerformance.date,
+            PortfolioPerformance.market_value,
+            PortfolioPerformance.market_value_adj,
+            PortfolioPerformance.delta_quantity_value_adj,
+            PortfolioPerformance.cash_balance,
+            PortfolioPerformance.invested_amount,
+            PortfolioPerformance.invested_amount_total,
+            PortfolioPerformance.asset_disposal_income,
+            PortfolioPerformance.asset_disposal_income_total,
+            PortfolioPerformance.asset_holding_income,
+            PortfolioPerformance.asset_holding_income_total,
+            PortfolioPerformance.interest_income,
+            PortfolioPerformance.interest_income_total,
+            PortfolioPerformance.investment_income,
+            PortfolioPerformance.investment_income_total,
+        )
+        .join_from(
+            PortfolioPerformance,
+            cte_portfolio_checkpoints,
+            cte_portfolio_checkpoints.c.portfolio_id
+            == PortfolioPerformance.portfolio_id,
+        )
+        .where(
+            PortfolioPerformance.date < cte_portfolio_checkpoints.c.checkpoint_date,
+            # Partitions with a stored state are continued from it
+            ~select(PerformanceState.id)
+            .where(
+                get_state_condition(
+                    "portfolio",
+                    cte_portfolio_checkpoints.c.checkpoint_date,
+                    {"portfolio_id": cte_portfolio_checkpoints.c.portfolio_id},
+                )
+            )
+            .exists(),
+        )
+        .order_by(
+            PortfolioPerformance.portfolio_id,
+            PortfolioPerformance.date,
+        )
+    )
+
+    return query
@@ -0,0 +1,78 @@
+from sqlalchemy import select, and_, func
+
+from src.domain.adjusted_portfolio_transactions.adjusted_portfolio_transaction_model import (
+    AdjustedPortfolioTransaction,
+)
+from src.domain.portfolio_asset_checkpoints.complex_queries.partition_checkpoints import (
+    get_portfolio_checkpoints_cte,
+)
+from .portfolio_dates import get_portfolio_continuous_dates_cte
+
+
+def get_transactions_by_date(user_id: int):
+    cte_portfolio_checkpoints = get_portfolio_checkpoints_cte(user_id)
+    cte_portfolio_continuous_dates = get_portfolio_continuous_dates_cte(
+        cte_portfolio_checkpoints
+    )
+
+    query = (
+        select(
+            cte_portfolio_continuous_dates.c.portfolio_id,
+            cte_portfolio_continuous_dates.c.portfolio_aggregate_id,
+            cte_portfolio_continuous_dates.c.checkpoint_date,
+            cte_portfolio_continuous_dates.c.date,
+            func.coalesce(func.sum(AdjustedPortfolioTransaction.cash_flow), 0.0).label(
+                "cash_balance"
+            ),
+            func.coalesce(
+                func.sum(AdjustedPortfolioTransaction.invested_amount), 0.0
+            ).label("invested_amount"),
+            func.coalesce(
+                func.sum(AdjustedPortfolioTransaction.invested_amount_total), 0.0
+            ).label("invested_amount_total"),
+            func.coalesce(
+                func.sum(AdjustedPortfolioTransaction.asset_disposal_income), 0.0
+            ).label("asset_disposal_income"),
+            func.coalesce(
+                func.sum(AdjustedPortfolioTransaction.asset_disposal_income_total), 0.0
+            ).label("asset_disposal_income_total"),
+            func.coalesce(
+                func.sum(AdjustedPortfolioTransaction.asset_holding_income), 0.0
+            ).label("asset_holding_income"),
+            func.coalesce(
+                func.sum(AdjustedPortfolioTransaction.asset_holding_income_total), 0.0
+            ).label("asset_holding_income_total"),
+            func.coalesce(
+                func.sum(AdjustedPortfolioTransaction.interest_income), 0.0
+            ).label("interest_income"),
+            func.coalesce(
+                func.sum(AdjustedPortfolioTransaction.interest_income_total), 0.0
+            ).label("interest_income_total"),
+            func.coalesce(
+                func.sum(AdjustedPortfolioTransaction.investment_income), 0.0
+            ).label("investment_income"),
+            func.coalesce(
+                func.sum(AdjustedPortfolioTransaction.investment_income_total), 0.0
+            ).label("investment_income_total"),
+        )
+        .outerjoin_from(
+            cte_portfolio_continuous_dates,
+            AdjustedPortfolioTransaction,
+            and_(
+                cte_portfolio_continuous_dates.c.portfolio_id
+                == AdjustedPortfolioTransaction.portfolio_id,
+                cte_portfolio_continuous_dates.c.date
+                == AdjustedPortfolioTransaction.date,
+            ),
+        )
+        .group_by(
+            cte_portfolio_continuous_dates.c.portfolio_id,
+            cte_portfolio_continuous_dates.c.date,
+        )
+        .order_by(
+            cte_portfolio_continuous_dates.c.portfolio_id,
+            cte_portfolio_continuous_dates.c.date,
+        )
+    )
+
+    return query
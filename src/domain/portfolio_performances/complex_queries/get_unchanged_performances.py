@@ -0,0 +1,64 @@
+from sqlalchemy import select, and_
+
+from src.domain.portfolio_performances.portfolio_performance_model import (
+    PortfolioPerformance,
+)
+from src.domain.portfolio_asset_checkpoints.complex_queries.partition_checkpoints import (
+    get_portfolio_checkpoints_cte,
+    get_aggregate_checkpoints_cte,
+)
+
+
+def get_unchanged_performances(user_id: int):
+    """
+    The stored performances that are kept, but still summed by the portfolio
+    aggregate, because it is recalculated from an earlier checkpoint date.
+    """
+    cte_portfolio_checkpoints = get_portfolio_checkpoints_cte(user_id)
+    cte_aggregate_checkpoints = get_aggregate_checkpoints_cte(
+        user_id, cte_portfolio_checkpoints
+    )
+
+    query = (
+        select(
+            PortfolioPerformance.portfolio_id,
+            cte_portfolio_checkpoints.c.portfolio_aggregate_id,
+            PortfolioPerformance.date,
+            PortfolioPerformance.market_value,
+            PortfolioPerformance.market_value_adj,
+            PortfolioPerformance.delta_quantity_value_adj,
+            PortfolioPerformance.cash_balance,
+            PortfolioPerformance.invested_amount,
+            PortfolioPerformance.invested_amount_total,
+            PortfolioPerformance.asset_disposal_income,
+            PortfolioPerformance.asset_disposal_income_total,
+            PortfolioPerformance.asset_holding_income,
+            PortfolioPerformance.asset_holding_income_total,
+            PortfolioPerformance.interest_income,
+            PortfolioPerformance.interest_income_total,
+            PortfolioPerformance.investment_income,
+            PortfolioPerformance.investment_income_total,
+            PortfolioPerformance.profit,
+            PortfolioPerformance.profit_total,
+        )
+        .join_from(
+            PortfolioPerformance,
+            cte_portfolio_checkpoints,
+            cte_portfolio_checkpoints.c.portfolio_id
+            == PortfolioPerformance.portfolio_id,
+        )
+        .join(
+            cte_aggregate_checkpoints,
+            cte_aggregate_checkpoints.c.portfolio_aggregate_id
+            == cte_portfolio_checkpoints.c.portfolio_aggregate_id,
+        )
+        .where(
+            and_(
+                PortfolioPerformance.date
+                >= cte_aggregate_checkpoints.c.checkpoint_date,
+                PortfolioPerformance.date < cte_portfolio_checkpoints.c.checkpoint_date,
+            )
+        )
+    )
+
+    return query
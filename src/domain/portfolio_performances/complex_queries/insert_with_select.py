@@ -9,46 +9,22 @@ from src.domain.portfolio_group_performances.portfolio_group_performance_model i
 from src.domain.adjusted_portfolio_transactions.adjusted_portfolio_transaction_model import (
     AdjustedPortfolioTransaction,
 )
-from src.domain.portfolios.portfolio_model import Portfolio
-from src.domain.portfolio_aggregates.portfolio_aggregate_model import PortfolioAggregate
+from src.domain.portfolio_asset_checkpoints.complex_queries.partition_checkpoints import (
+    get_portfolio_checkpoints_cte,
+)
+from .portfolio_dates import get_portfolio_continuous_dates_cte
 
 
 def insert_with_select(user_id: int):
-    cte_portfolio_continuous_dates = (
-        select(
-            AdjustedPortfolioTransaction.portfolio_id,
-            PortfolioAggregate.checkpoint_date,
-            func.max(
-                PortfolioAggregate.checkpoint_date,
-                func.min(AdjustedPortfolioTransaction.date),
-            ).label("date"),
-        )
-        .join_from(
-            AdjustedPortfolioTransaction,
-            Portfolio,
-            Portfolio.id == AdjustedPortfolioTransaction.portfolio_id,
-        )
-        .join(
-            PortfolioAggregate,
-            PortfolioAggregate.id == Portfolio.portfolio_aggregate_id,
-        )
-        .where(PortfolioAggregate.user_id == user_id)
-        .group_by(AdjustedPortfolioTransaction.portfolio_id)
-        .cte(name="cte_portfolio_continuous_dates", recursive=True)
-    )
-
-    cte_portfolio_continuous_dates = cte_portfolio_continuous_dates.union_all(
-        select(
-            cte_portfolio_continuous_dates.c.portfolio_id,
-            cte_portfolio_continuous_dates.c.checkpoint_date,
-            func.date(cte_portfolio_continuous_dates.c.date, "+1 day").label("date"),
-        ).where(cte_portfolio_continuous_dates.c.date < func.date("now"))
+    cte_portfolio_checkpoints = get_portfolio_checkpoints_cte(user_id)
+    cte_portfolio_continuous_dates = get_portfolio_continuous_dates_cte(
+        cte_portfolio_checkpoints
     )
 
     cte_1 = (
         select(
             PortfolioGroupPerformance.portfolio_id,
-            PortfolioAggregate.checkpoint_date,
+            cte_portfolio_checkpoints.c.checkpoint_date,
             PortfolioGroupPerformance.date,
             func.sum(PortfolioGroupPerformance.market_value).label("market_value"),
             func.sum(PortfolioGroupPerformance.market_value_adj).label(
@@ -60,18 +36,13 @@ def insert_with_select(user_id: int):
         )
         .join_from(
             PortfolioGroupPerformance,
-            Portfolio,
-            Portfolio.id == PortfolioGroupPerformance.portfolio_id,
-        )
-        .join(
-            PortfolioAggregate,
-            PortfolioAggregate.id == Portfolio.portfolio_aggregate_id,
+            cte_portfolio_checkpoints,
+            cte_portfolio_checkpoints.c.portfolio_id
+            == PortfolioGroupPerformance.portfolio_id,
         )
         .where(
-            and_(
-                PortfolioAggregate.user_id == user_id,
-                PortfolioGroupPerformance.date >= PortfolioAggregate.checkpoint_date,
-            )
+            PortfolioGroupPerformance.date
+            >= cte_portfolio_checkpoints.c.checkpoint_date
         )
         .group_by(
             PortfolioGroupPerformance.portfolio_id,
@@ -143,7 +114,7 @@ def insert_with_select(user_id: int):
         .union_all(
             select(
                 PortfolioPerformance.portfolio_id,
-                PortfolioAggregate.checkpoint_date,
+                cte_portfolio_checkpoints.c.checkpoint_date,
                 PortfolioPerformance.date,
                 PortfolioPerformance.market_value,
                 PortfolioPerformance.market_value_adj,
@@ -162,19 +133,13 @@ def insert_with_select(user_id: int):
             )
             .join_from(
                 PortfolioPerformance,
-                Portfolio,
-                Portfolio.id == PortfolioPerformance.portfolio_id,
-            )
-            .join(
-                PortfolioAggregate,
-                PortfolioAggregate.id == Portfolio.portfolio_aggregate_id,
+                cte_portfolio_checkpoints,
+                cte_portfolio_checkpoints.c.portfolio_id
+                == PortfolioPerformance.portfolio_id,
             )
             .where(
-                and_(
-                    PortfolioAggregate.user_id == user_id,
-                    PortfolioPerformance.date
-                    == func.date(PortfolioAggregate.checkpoint_date, "-1 day"),
-                )
+                PortfolioPerformance.date
+                == func.date(cte_portfolio_checkpoints.c.checkpoint_date, "-1 day")
             )
         )
     ).cte(name="cte_2")
@@ -258,7 +223,7 @@ def insert_with_select(user_id: int):
         .union_all(
             select(
                 PortfolioPerformance.portfolio_id,
-                PortfolioAggregate.checkpoint_date,
+                cte_portfolio_checkpoints.c.checkpoint_date,
                 PortfolioPerformance.date,
                 PortfolioPerformance.market_value,
                 PortfolioPerformance.market_value_adj,
@@ -277,19 +242,13 @@ def insert_with_select(user_id: int):
             )
             .join_from(
                 PortfolioPerformance,
-                Portfolio,
-                Portfolio.id == PortfolioPerformance.portfolio_id,
-            )
-            .join(
-                PortfolioAggregate,
-                PortfolioAggregate.id == Portfolio.portfolio_aggregate_id,
+                cte_portfolio_checkpoints,
+                cte_portfolio_checkpoints.c.portfolio_id
+                == PortfolioPerformance.portfolio_id,
             )
             .where(
-                and_(
-                    PortfolioAggregate.user_id == user_id,
-                    PortfolioPerformance.date
-                    < func.date(PortfolioAggregate.checkpoint_date, "-1 day"),
-                )
+                PortfolioPerformance.date
+                < func.date(cte_portfolio_checkpoints.c.checkpoint_date, "-1 day")
             )
         )
     ).cte(name="cte_3")
@@ -392,29 +351,22 @@ def insert_with_select(user_id: int):
     cte_5 = select(
         cte_4,
         (
-            func.exp(
-                func.sum(func.ln(1 + cte_4.c.hpr)).over(
-                    partition_by=cte_4.c.portfolio_id,
-                    order_by=cte_4.c.date,
-                )
+            func.cumprod1p(cte_4.c.hpr).over(
+                partition_by=cte_4.c.portfolio_id,
+                order_by=cte_4.c.date,
             )
         ).label("hpr_cumulative"),
-        (cte_4.c.row_number / 365.0).label("years_passed"),
-        func.nullif(cte_4.c.hpr, 0.0).label("hpr_non_zero"),
         (
-            func.xirr(
-                cte_4.c.date,
-                cte_4.c.cash_flow,
-                cte_4.c.market_value,
-                cte_4.c.checkpoint_date,
-            ).over(
+            func.drawdown(cte_4.c.hpr).over(
                 partition_by=cte_4.c.portfolio_id,
                 order_by=cte_4.c.date,
             )
-        ).label("xirr_rate"),
+        ).label("drawdown"),
+        (cte_4.c.row_number / 365.0).label("years_passed"),
         (
-            func.xirr(
+            func.xirr_pair(
                 cte_4.c.date,
+                cte_4.c.cash_flow,
                 cte_4.c.cash_flow_total,
                 cte_4.c.market_value,
                 cte_4.c.checkpoint_date,
@@ -422,118 +374,92 @@ def insert_with_select(user_id: int):
                 partition_by=cte_4.c.portfolio_id,
                 order_by=cte_4.c.date,
             )
-        ).label("xirr_rate_total"),
-    ).cte(name="cte_5")
-
-    cte_6 = select(
-        cte_5,
-        (
-            func.max(cte_5.c.hpr_cumulative).over(
-                partition_by=cte_5.c.portfolio_id,
-                order_by=cte_5.c.date,
-            )
-        ).label("past_maximum_hpr_cumulative"),
-        (
-            func.avg(cte_5.c.hpr_non_zero).over(
-                partition_by=cte_5.c.portfolio_id,
-                order_by=cte_5.c.date,
-            )
-        ).label("hpr_non_zero_avg"),
+        ).label("xirr_rates"),
         (
-            func.stddev(cte_5.c.hpr_non_zero).over(
-                partition_by=cte_5.c.portfolio_id,
-                order_by=cte_5.c.date,
-            )
-        ).label("hpr_non_zero_stddev"),
-        (
-            func.stddev(
-                func.iif(cte_5.c.hpr_non_zero < 0, cte_5.c.hpr_non_zero, None)
-            ).over(
-                partition_by=cte_5.c.portfolio_id,
-                order_by=cte_5.c.date,
-            )
-        ).label("hpr_non_zero_stddev_d"),
-        (
-            func.count(cte_5.c.hpr_non_zero).over(
-                partition_by=cte_5.c.portfolio_id,
-                order_by=cte_5.c.date,
+            func.window_stats(func.nullif(cte_4.c.hpr, 0.0)).over(
+                partition_by=cte_4.c.portfolio_id,
+                order_by=cte_4.c.date,
             )
-            * 365.0
-            / cte_5.c.row_number
-        ).label("avg_days_per_year"),
-    ).cte(name="cte_6")
+        ).label("hpr_non_zero_stats"),
+    ).cte(name="cte_5")
 
     query = select(
-        cte_6.c.portfolio_id,
-        cte_6.c.date,
-        cte_6.c.market_value,
-        cte_6.c.market_value_adj,
-        cte_6.c.delta_quantity_value_adj,
-        cte_6.c.cash_balance,
-        cte_6.c.invested_amount,
-        cte_6.c.invested_amount_total,
-        cte_6.c.asset_disposal_income,
-        cte_6.c.asset_disposal_income_total,
-        cte_6.c.asset_holding_income,
-        cte_6.c.asset_holding_income_total,
-        cte_6.c.interest_income,
-        cte_6.c.interest_income_total,
-        cte_6.c.investment_income,
-        cte_6.c.investment_income_total,
-        cte_6.c.profit,
-        cte_6.c.profit_total,
-        func.coalesce(cte_6.c.profit_percentage, 0.0).label("profit_percentage"),
-        func.coalesce(cte_6.c.profit_percentage_total, 0.0).label(
+        cte_5.c.portfolio_id,
+        cte_5.c.date,
+        cte_5.c.market_value,
+        cte_5.c.market_value_adj,
+        cte_5.c.delta_quantity_value_adj,
+        cte_5.c.cash_balance,
+        cte_5.c.invested_amount,
+        cte_5.c.invested_amount_total,
+        cte_5.c.asset_disposal_income,
+        cte_5.c.asset_disposal_income_total,
+        cte_5.c.asset_holding_income,
+        cte_5.c.asset_holding_income_total,
+        cte_5.c.interest_income,
+        cte_5.c.interest_income_total,
+        cte_5.c.investment_income,
+        cte_5.c.investment_income_total,
+        cte_5.c.profit,
+        cte_5.c.profit_total,
+        func.coalesce(cte_5.c.profit_percentage, 0.0).label("profit_percentage"),
+        func.coalesce(cte_5.c.profit_percentage_total, 0.0).label(
             "profit_percentage_total"
         ),
         func.coalesce(
-            (cte_6.c.market_value + cte_6.c.asset_disposal_income)
-            / cte_6.c.past_maximum_value
+            (cte_5.c.market_value + cte_5.c.asset_disposal_income)
+            / cte_5.c.past_maximum_value
             - 1,
             0.0,
         ).label("drawdown_value"),
         func.coalesce(
-            (cte_6.c.market_value + cte_6.c.asset_disposal_income_total)
-            / cte_6.c.past_maximum_value_total
+            (cte_5.c.market_value + cte_5.c.asset_disposal_income_total)
+            / cte_5.c.past_maximum_value_total
             - 1,
             0.0,
         ).label("drawdown_value_total"),
         func.coalesce(
-            (cte_6.c.profit - cte_6.c.past_maximum_profit) / cte_6.c.past_maximum_value,
+            (cte_5.c.profit - cte_5.c.past_maximum_profit) / cte_5.c.past_maximum_value,
             0.0,
         ).label("drawdown_profit"),
         func.coalesce(
-            (cte_6.c.profit_total - cte_6.c.past_maximum_profit_total)
-            / cte_6.c.past_maximum_value_total,
+            (cte_5.c.profit_total - cte_5.c.past_maximum_profit_total)
+            / cte_5.c.past_maximum_value_total,
             0.0,
         ).label("drawdown_profit_total"),
-        cte_6.c.hpr,
-        (cte_6.c.hpr_cumulative / cte_6.c.past_maximum_hpr_cumulative - 1).label(
-            "drawdown"
-        ),
-        (cte_6.c.hpr_cumulative - 1).label("twrr_rate_daily"),
-        (func.pow(cte_6.c.hpr_cumulative, 1.0 / cte_6.c.years_passed) - 1).label(
+        cte_5.c.hpr,
+        cte_5.c.drawdown,
+        (cte_5.c.hpr_cumulative - 1).label("twrr_rate_daily"),
+        (func.pow(cte_5.c.hpr_cumulative, 1.0 / cte_5.c.years_passed) - 1).label(
             "twrr_rate_annualized"
         ),
-        (cte_6.c.hpr_non_zero_avg / cte_6.c.hpr_non_zero_stddev).label(
+        func.window_stats_get(cte_5.c.hpr_non_zero_stats, "sharpe").label(
             "sharpe_ratio_daily"
         ),
         (
-            cte_6.c.hpr_non_zero_avg
-            / cte_6.c.hpr_non_zero_stddev
-            * func.pow(cte_6.c.avg_days_per_year, 0.5)
+            func.window_stats_get(cte_5.c.hpr_non_zero_stats, "sharpe")
+            * func.pow(
+                func.window_stats_get(cte_5.c.hpr_non_zero_stats, "count")
+                * 365.0
+                / cte_5.c.row_number,
+                0.5,
+            )
         ).label("sharpe_ratio_annualized"),
-        (cte_6.c.hpr_non_zero_avg / cte_6.c.hpr_non_zero_stddev_d).label(
+        func.window_stats_get(cte_5.c.hpr_non_zero_stats, "sortino").label(
             "sortino_ratio_daily"
         ),
         (
-            cte_6.c.hpr_non_zero_avg
-            / cte_6.c.hpr_non_zero_stddev_d
-            * func.pow(cte_6.c.avg_days_per_year, 0.5)
+            func.window_stats_get(cte_5.c.hpr_non_zero_stats, "sortino")
+            * func.pow(
+                func.window_stats_get(cte_5.c.hpr_non_zero_stats, "count")
+                * 365.0
+                / cte_5.c.row_number,
+                0.5,
+            )
         ).label("sortino_ratio_annualized"),
-        cte_6.c.xirr_rate,
-        cte_6.c.xirr_rate_total,
-    ).where(cte_6.c.date >= cte_6.c.checkpoint_date)
+        func.xirr_pair_rate(cte_5.c.xirr_rates, 0).label("xirr_rate"),
+        func.xirr_pair_rate(cte_5.c.xirr_rates, 1).label("xirr_rate_total"),
+    ).where(cte_5.c.date >= cte_5.c.checkpoint_date)
 
     return insert(PortfolioPerformance).from_select(
         [
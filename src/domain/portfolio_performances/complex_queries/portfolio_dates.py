@@ -0,0 +1,52 @@
+from sqlalchemy import select, func
+
+from src.domain.adjusted_portfolio_transactions.adjusted_portfolio_transaction_model import (
+    AdjustedPortfolioTransaction,
+)
+from src.domain.calendar_dates.calendar_date_model import CalendarDate
+
+
+def get_portfolio_continuous_dates_cte(cte_portfolio_checkpoints):
+    """
+    Every calendar date of each portfolio from its first transaction,
+    or its checkpoint date if later, up to today.
+    Shared by the SQL query and the single-pass rollup.
+    """
+    cte_portfolio_start_dates = (
+        select(
+            AdjustedPortfolioTransaction.portfolio_id,
+            cte_portfolio_checkpoints.c.portfolio_aggregate_id,
+            cte_portfolio_checkpoints.c.checkpoint_date,
+            func.max(
+                cte_portfolio_checkpoints.c.checkpoint_date,
+                func.min(AdjustedPortfolioTransaction.date),
+            ).label("date"),
+        )
+        .join_from(
+            AdjustedPortfolioTransaction,
+            cte_portfolio_checkpoints,
+            cte_portfolio_checkpoints.c.portfolio_id
+            == AdjustedPortfolioTransaction.portfolio_id,
+        )
+        .group_by(AdjustedPortfolioTransaction.portfolio_id)
+        .cte(name="cte_portfolio_start_dates")
+    )
+
+    cte_portfolio_continuous_dates = (
+        select(
+            cte_portfolio_start_dates.c.portfolio_id,
+            cte_portfolio_start_dates.c.portfolio_aggregate_id,
+            cte_portfolio_start_dates.c.checkpoint_date,
+            CalendarDate.date,
+        )
+        .join_from(
+            cte_portfolio_start_dates,
+            CalendarDate,
+            CalendarDate.date.between(
+                cte_portfolio_start_dates.c.date, func.date("now")
+            ),
+        )
+        .cte(name="cte_portfolio_continuous_dates")
+    )
+
+    return cte_portfolio_continuous_dates
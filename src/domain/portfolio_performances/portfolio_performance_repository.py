@@ -1,3 +1,5 @@
+from sqlalchemy import insert
+
 from .portfolio_performance_model import PortfolioPerformance
 
 
@@ -19,6 +21,15 @@ class PortfolioPerformanceRepository:
             .all()
         )
 
+    def insert_many(self, portfolio_performances):
+        if portfolio_performances:
+            # A Core insert of the table skips the per-row bookkeeping of ORM bulk inserts
+            self.session.execute(
+                insert(PortfolioPerformance.__table__), portfolio_performances
+            )
+            self.session.flush()
+        return len(portfolio_performances)
+
     def get_all(self):
         return self.session.query(PortfolioPerformance).all()
 
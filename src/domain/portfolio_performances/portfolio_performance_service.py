@@ -1,3 +1,5 @@
+from src.infrastructure.db import read_data_frame, to_records
+
 from .portfolio_performance_repository import PortfolioPerformanceRepository
 from .complex_queries import *
 
@@ -35,6 +37,26 @@ class PortfolioPerformanceService:
         query = insert_with_select(user_id)
         return self.portfolio_performance_repository.execute_custom_query(query=query)
 
+    def replace_from_checkpoint(self, user_id: int, performances):
+        self.delete_many_by_user_id_and_date(user_id)
+        return self.portfolio_performance_repository.insert_many(
+            portfolio_performances=to_records(performances)
+        )
+
+    def get_performance_history(self, user_id: int):
+        return self._read_data_frame(get_performance_history(user_id))
+
+    def get_transactions_by_date(self, user_id: int):
+        return self._read_data_frame(get_transactions_by_date(user_id))
+
+    def get_unchanged_performances(self, user_id: int):
+        return self._read_data_frame(get_unchanged_performances(user_id))
+
+    def _read_data_frame(self, query):
+        return read_data_frame(
+            self.portfolio_performance_repository.execute_custom_query(query=query)
+        )
+
     def get_performance_by_portfolio_id(self, portfolio_id):
         return self.portfolio_performance_repository.get_many(portfolio_id=portfolio_id)
 
@@ -37,6 +37,7 @@ class PortfolioTransactionFile(Base):
         index=True,
         nullable=True,
     )
+    content_hash: Mapped[str] = mapped_column(String, nullable=True)
 
     user: Mapped["User"] = relationship(
         "User", back_populates="portfolio_transaction_files"
@@ -1,3 +1,5 @@
+from sqlalchemy import insert
+
 from .portfolio_transaction_file_model import PortfolioTransactionFile
 
 
@@ -11,6 +13,14 @@ class PortfolioTransactionFileRepository:
         self.session.refresh(portfolio_transaction_file)
         return portfolio_transaction_file
 
+    def insert_many(self, portfolio_transaction_files):
+        if portfolio_transaction_files:
+            self.session.execute(
+                insert(PortfolioTransactionFile.__table__), portfolio_transaction_files
+            )
+            self.session.flush()
+        return len(portfolio_transaction_files)
+
     def get_one(self, id):
         return (
             self.session.query(PortfolioTransactionFile)
@@ -28,12 +38,24 @@ class PortfolioTransactionFileRepository:
             .first()
         )
 
+    def get_many_by_user_id(self, user_id):
+        return (
+            self.session.query(PortfolioTransactionFile)
+            .filter(PortfolioTransactionFile.user_id == user_id)
+            .all()
+        )
+
     def get_all(self):
         return self.session.query(PortfolioTransactionFile).all()
 
     def update_one(self, portfolio_transaction_file):
         return self.session.merge(portfolio_transaction_file)
 
+    def update_many(self, portfolio_transaction_files):
+        self.session.add_all(portfolio_transaction_files)
+        self.session.flush()
+        return portfolio_transaction_files
+
     def delete_one(self, portfolio_transaction_file):
         self.session.delete(portfolio_transaction_file)
         self.session.flush()
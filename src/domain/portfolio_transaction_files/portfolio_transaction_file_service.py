@@ -22,6 +22,11 @@ class PortfolioTransactionFileService:
             portfolio_transaction_file=portfolio_transaction_file
         )
 
+    def insert_many(self, portfolio_transaction_files: list[dict]):
+        return self.portfolio_transaction_file_repository.insert_many(
+            portfolio_transaction_files=portfolio_transaction_files
+        )
+
     def get_one(self, id):
         return self.portfolio_transaction_file_repository.get_one(id=id)
 
@@ -30,6 +35,11 @@ class PortfolioTransactionFileService:
             user_id=user_id, name=name
         )
 
+    def get_many_by_user_id(self, user_id):
+        return self.portfolio_transaction_file_repository.get_many_by_user_id(
+            user_id=user_id
+        )
+
     def get_all(self):
         return self.portfolio_transaction_file_repository.get_all()
 
@@ -55,6 +65,11 @@ class PortfolioTransactionFileService:
                 portfolio_transaction_file=portfolio_transaction_file
             )
 
+    def update_many(self, portfolio_transaction_files: list[PortfolioTransactionFile]):
+        return self.portfolio_transaction_file_repository.update_many(
+            portfolio_transaction_files=portfolio_transaction_files
+        )
+
     def upsert_one(self, user_id, portfolio_id, name, currency, currency_pair_id):
         portfolio_transaction_file = self.get_one_by_user_id_and_name(
             user_id=user_id, name=name
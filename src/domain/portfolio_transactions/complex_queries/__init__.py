@@ -0,0 +1,5 @@
+from .get_transactions_by_user_id import get_transactions_by_user_id
+
+__all__ = [
+    "get_transactions_by_user_id",
+]
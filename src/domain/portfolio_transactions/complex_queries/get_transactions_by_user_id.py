@@ -0,0 +1,35 @@
+from sqlalchemy import select
+
+from src.domain.portfolio_transactions.portfolio_transaction_model import (
+    PortfolioTransaction,
+)
+from src.domain.portfolio_transaction_files.portfolio_transaction_file_model import (
+    PortfolioTransactionFile,
+)
+
+
+def get_transactions_by_user_id(user_id: int):
+    """
+    The transactions of every file of the user in the order they were uploaded.
+    A file without transactions is still returned once, with all its columns null.
+    """
+    return (
+        select(
+            PortfolioTransactionFile.name.label("file_name"),
+            PortfolioTransaction.date,
+            PortfolioTransaction.asset_symbol,
+            PortfolioTransaction.transaction_type,
+            PortfolioTransaction.quantity,
+            PortfolioTransaction.transaction_value,
+            PortfolioTransaction.fee_amount,
+            PortfolioTransaction.tax_amount,
+        )
+        .outerjoin_from(
+            PortfolioTransactionFile,
+            PortfolioTransaction,
+            PortfolioTransactionFile.id
+            == PortfolioTransaction.portfolio_transaction_file_id,
+        )
+        .where(PortfolioTransactionFile.user_id == user_id)
+        .order_by(PortfolioTransactionFile.id, PortfolioTransaction.id)
+    )
@@ -24,6 +24,7 @@ class PortfolioTransaction(Base):
     asset_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("assets.id", ondelete="RESTRICT"), index=True, nullable=True
     )
+    asset_symbol: Mapped[str] = mapped_column(String, nullable=False, default="")
     date: Mapped[str] = mapped_column(String, index=True, nullable=False)
     transaction_type: Mapped[str] = mapped_column(String, nullable=False)
     quantity: Mapped[float] = mapped_column(Float, nullable=False)
@@ -1,3 +1,5 @@
+from sqlalchemy import insert
+
 from .portfolio_transaction_model import PortfolioTransaction
 
 
@@ -11,6 +13,14 @@ class PortfolioTransactionRepository:
         self.session.refresh(portfolio_transaction)
         return portfolio_transaction
 
+    def insert_many(self, portfolio_transactions):
+        if portfolio_transactions:
+            self.session.execute(
+                insert(PortfolioTransaction.__table__), portfolio_transactions
+            )
+            self.session.flush()
+        return len(portfolio_transactions)
+
     def get_one(self, id):
         return (
             self.session.query(PortfolioTransaction)
@@ -21,6 +31,16 @@ class PortfolioTransactionRepository:
     def get_all(self):
         return self.session.query(PortfolioTransaction).all()
 
+    def get_many_by_file_id(self, transaction_file_id: int):
+        return (
+            self.session.query(PortfolioTransaction)
+            .filter(
+                PortfolioTransaction.portfolio_transaction_file_id
+                == transaction_file_id
+            )
+            .all()
+        )
+
     def update_one(self, portfolio_transaction):
         return self.session.merge(portfolio_transaction)
 
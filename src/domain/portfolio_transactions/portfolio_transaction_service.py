@@ -1,5 +1,16 @@
 from .portfolio_transaction_model import PortfolioTransaction
 from .portfolio_transaction_repository import PortfolioTransactionRepository
+from .complex_queries import *
+
+TRANSACTION_DATA_COLUMNS = (
+    "date",
+    "asset_symbol",
+    "transaction_type",
+    "quantity",
+    "transaction_value",
+    "fee_amount",
+    "tax_amount",
+)
 
 
 class PortfolioTransactionService:
@@ -34,12 +45,22 @@ class PortfolioTransactionService:
             portfolio_transaction=portfolio_transaction
         )
 
+    def insert_many(self, portfolio_transactions: list[dict]):
+        return self.portfolio_transaction_repository.insert_many(
+            portfolio_transactions=portfolio_transactions
+        )
+
     def get_one(self, id):
         return self.portfolio_transaction_repository.get_one(id=id)
 
     def get_all(self):
         return self.portfolio_transaction_repository.get_all()
 
+    def get_many_by_file_id(self, transaction_file_id: int):
+        return self.portfolio_transaction_repository.get_many_by_file_id(
+            transaction_file_id
+        )
+
     def delete_one(self, id):
         portfolio_transaction = self.get_one(id=id)
         if portfolio_transaction is None:
@@ -53,3 +74,26 @@ class PortfolioTransactionService:
         return self.portfolio_transaction_repository.delete_many_by_file_id(
             transaction_file_id
         )
+
+    def get_transactions_by_user_id(self, user_id: int) -> list[dict]:
+        """
+        The transactions of the user as they were uploaded, one item per file
+        with the values of each column in a list.
+        """
+        query = get_transactions_by_user_id(user_id)
+        result = self.portfolio_transaction_repository.execute_custom_query(query=query)
+        items = {}
+        for file_name, *values in result:
+            transaction_data = items.setdefault(
+                file_name, {column: [] for column in TRANSACTION_DATA_COLUMNS}
+            )
+            # The date of a transaction is never null, only a file without any is
+            if values[0] is None:
+                continue
+            for column, value in zip(TRANSACTION_DATA_COLUMNS, values):
+                transaction_data[column].append(value)
+
+        return [
+            {"file_name": file_name, "transaction_data": transaction_data}
+            for file_name, transaction_data in items.items()
+        ]
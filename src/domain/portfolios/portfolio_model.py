@@ -13,6 +13,9 @@ if TYPE_CHECKING:
         AdjustedPortfolioTransaction,
     )
     from src.domain.portfolio_groups.portfolio_group_model import PortfolioGroup
+    from src.domain.portfolio_asset_checkpoints.portfolio_asset_checkpoint_model import (
+        PortfolioAssetCheckpoint,
+    )
     from src.domain.portfolio_asset_performances.portfolio_asset_performance_model import (
         PortfolioAssetPerformance,
     )
@@ -60,6 +63,14 @@ class Portfolio(Base):
         cascade="all, delete-orphan",
         passive_deletes=True,
     )
+    portfolio_asset_checkpoints: Mapped[list["PortfolioAssetCheckpoint"]] = (
+        relationship(
+            "PortfolioAssetCheckpoint",
+            back_populates="portfolio",
+            cascade="all, delete-orphan",
+            passive_deletes=True,
+        )
+    )
     portfolio_asset_performances: Mapped[list["PortfolioAssetPerformance"]] = (
         relationship("PortfolioAssetPerformance", back_populates="portfolio")
     )
@@ -1,3 +1,5 @@
+from sqlalchemy import insert
+
 from .portfolio_model import Portfolio
 
 
@@ -11,6 +13,12 @@ class PortfolioRepository:
         self.session.refresh(portfolio)
         return portfolio
 
+    def insert_many(self, portfolios):
+        if portfolios:
+            self.session.execute(insert(Portfolio.__table__), portfolios)
+            self.session.flush()
+        return len(portfolios)
+
     def get_one(self, id):
         return self.session.query(Portfolio).filter(Portfolio.id == id).first()
 
@@ -21,6 +29,9 @@ class PortfolioRepository:
             .first()
         )
 
+    def get_many_by_user_id(self, user_id):
+        return self.session.query(Portfolio).filter(Portfolio.user_id == user_id).all()
+
     def get_all(self):
         return self.session.query(Portfolio).all()
 
@@ -12,6 +12,9 @@ class PortfolioService:
         )
         return self.portfolio_repository.create_one(portfolio=portfolio)
 
+    def insert_many(self, portfolios: list[dict]):
+        return self.portfolio_repository.insert_many(portfolios=portfolios)
+
     def get_one(self, id):
         return self.portfolio_repository.get_one(id=id)
 
@@ -20,6 +23,9 @@ class PortfolioService:
             user_id=user_id, name=name
         )
 
+    def get_many_by_user_id(self, user_id):
+        return self.portfolio_repository.get_many_by_user_id(user_id=user_id)
+
     def get_all(self):
         return self.portfolio_repository.get_all()
 
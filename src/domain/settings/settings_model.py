@@ -17,9 +17,16 @@ class Settings(Base):
     analysis_currency: Mapped[str] = mapped_column(String, nullable=False)
     ohlc_assets: Mapped[str] = mapped_column(String, nullable=False)
     ohlc_currencies: Mapped[str] = mapped_column(String, nullable=False)
-    transaction_files: Mapped[dict] = mapped_column(JSON, nullable=False)
-    transactions: Mapped[dict] = mapped_column(JSON, nullable=False)
-    portfolio_groups: Mapped[dict] = mapped_column(JSON, nullable=False)
-    portfolio_group_assets: Mapped[dict] = mapped_column(JSON, nullable=False)
+    # The lists are read together and only where needed, the transactions
+    # themselves are kept in portfolio_transactions alone
+    transaction_files: Mapped[dict] = mapped_column(
+        JSON, nullable=False, deferred=True, deferred_group="lists"
+    )
+    portfolio_groups: Mapped[dict] = mapped_column(
+        JSON, nullable=False, deferred=True, deferred_group="lists"
+    )
+    portfolio_group_assets: Mapped[dict] = mapped_column(
+        JSON, nullable=False, deferred=True, deferred_group="lists"
+    )
 
     user: Mapped["User"] = relationship("User", back_populates="settings")
@@ -13,7 +13,6 @@ class SettingsService:
         ohlc_assets,
         ohlc_currencies,
         transaction_files,
-        transactions,
         portfolio_groups,
         portfolio_group_assets,
     ):
@@ -23,7 +22,6 @@ class SettingsService:
             ohlc_assets=ohlc_assets,
             ohlc_currencies=ohlc_currencies,
             transaction_files=transaction_files,
-            transactions=transactions,
             portfolio_groups=portfolio_groups,
             portfolio_group_assets=portfolio_group_assets,
         )
@@ -42,7 +40,6 @@ class SettingsService:
         ohlc_assets=None,
         ohlc_currencies=None,
         transaction_files=None,
-        transactions=None,
         portfolio_groups=None,
         portfolio_group_assets=None,
     ):
@@ -58,8 +55,6 @@ class SettingsService:
                 settings.ohlc_currencies = ohlc_currencies
             if transaction_files is not None:
                 settings.transaction_files = transaction_files
-            if transactions is not None:
-                settings.transactions = transactions
             if portfolio_groups is not None:
                 settings.portfolio_groups = portfolio_groups
             if portfolio_group_assets is not None:
@@ -73,7 +68,6 @@ class SettingsService:
         ohlc_assets,
         ohlc_currencies,
         transaction_files,
-        transactions,
         portfolio_groups,
         portfolio_group_assets,
     ):
@@ -85,7 +79,6 @@ class SettingsService:
                 ohlc_assets=ohlc_assets,
                 ohlc_currencies=ohlc_currencies,
                 transaction_files=transaction_files,
-                transactions=transactions,
                 portfolio_groups=portfolio_groups,
                 portfolio_group_assets=portfolio_group_assets,
             )
@@ -96,7 +89,6 @@ class SettingsService:
                 ohlc_assets=ohlc_assets,
                 ohlc_currencies=ohlc_currencies,
                 transaction_files=transaction_files,
-                transactions=transactions,
                 portfolio_groups=portfolio_groups,
                 portfolio_group_assets=portfolio_group_assets,
             )
@@ -1,10 +1,15 @@
 from .db.database import Database
+from .db.database_registry import DatabaseRegistry
+from .db.pragma_profiles import PRAGMA_PROFILES, get_pragma_profile
 
 from .asset_pricings import assets_etl_yfinance
 from .currency_pair_pricings import currency_pairs_etl_yfinance
 
 __all__ = [
     "Database",
+    "DatabaseRegistry",
+    "PRAGMA_PROFILES",
+    "get_pragma_profile",
     "assets_etl_yfinance",
     "currency_pairs_etl_yfinance",
 ]
@@ -2,13 +2,15 @@ from contextlib import redirect_stdout, redirect_stderr
 import yfinance as yf
 import io
 
+from ...yfinance_lock import yfinance_lock
+
 
 def extract_data_yfinance(symbols, start_date):
     # download data from Yahoo Finance API for the ticker for the period from the last date in the table to the latest possible date
     # if the ticker table is empty, download data for the whole available period
     # redirect stdout and stderr to the buffer to avoid printing the data to the console
     buffer = io.StringIO()
-    with redirect_stdout(buffer), redirect_stderr(buffer):
+    with yfinance_lock, redirect_stdout(buffer), redirect_stderr(buffer):
         df_data = yf.download(symbols, start=start_date, group_by="ticker")
     buffer.close()
 
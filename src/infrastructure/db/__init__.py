@@ -1,6 +1,14 @@
 from .database import Database, Base
+from .database_registry import DatabaseRegistry
+from .pragma_profiles import PRAGMA_PROFILES, get_pragma_profile
+from .data_frames import read_data_frame, to_records
 
 __all__ = [
     "Database",
     "Base",
+    "DatabaseRegistry",
+    "PRAGMA_PROFILES",
+    "get_pragma_profile",
+    "read_data_frame",
+    "to_records",
 ]
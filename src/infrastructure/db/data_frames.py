@@ -0,0 +1,23 @@
+import pandas as pd
+
+
+def read_data_frame(result) -> pd.DataFrame:
+    """Builds a DataFrame from the rows and column names of a query result."""
+    return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+
+
+def to_records(data_frame: pd.DataFrame) -> list[dict]:
+    """
+    Converts a DataFrame to the parameters of an executemany insert,
+    with missing values turned into NULL.
+    """
+    columns = [
+        (
+            data_frame[column].astype(object).where(data_frame[column].notna(), None)
+            if data_frame[column].hasnans
+            else data_frame[column]
+        ).tolist()
+        for column in data_frame.columns
+    ]
+    names = data_frame.columns.tolist()
+    return [dict(zip(names, row)) for row in zip(*columns)]
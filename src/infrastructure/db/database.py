@@ -1,25 +1,51 @@
-from typing import Iterable
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterable, Mapping
 from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.orm import sessionmaker, DeclarativeBase, Session
+from threading import Lock
 import platform
 import sqlite3
 import os
 
+from .pragma_profiles import PRAGMA_PROFILES
+from .migrations import migrate_database
+
 
 class Base(DeclarativeBase):
     pass
 
 
 class Database:
-    def __init__(self, id: str):
-        self.db_path = os.path.join("databases", id, "cashflower.db")
-        self.path_exists = os.path.exists(self.db_path)
+    def __init__(
+        self,
+        id: str,
+        extension_names: Iterable[str] = (),
+        pragmas: Mapping[str, str | int] | None = None,
+    ):
+        self.db_path = Database._get_db_path(id)
         self.db_url = f"sqlite:///{self.db_path}"
         self.engine = create_engine(self.db_url)
         self.SessionMaker = sessionmaker(
             autocommit=False, autoflush=False, bind=self.engine
         )
+        self.pragmas = dict(PRAGMA_PROFILES["default"] if pragmas is None else pragmas)
+        self.extension_paths = Database.resolve_extension_paths(
+            frozenset(extension_names)
+        )
+        self._upgrade_lock = Lock()
+        self._upgraded = False
         self._add_sqlite_pragma()
+        self._add_sqlite_extensions()
+
+    @staticmethod
+    def _get_db_path(id: str):
+        return os.path.join("databases", id, "cashflower.db")
+
+    @staticmethod
+    def path_exists_for(id: str) -> bool:
+        """Checks whether the database file exists without creating an engine."""
+        return os.path.exists(Database._get_db_path(id))
 
     def _add_sqlite_pragma(self):
         if "sqlite" in str(self.engine.url):
@@ -27,9 +53,29 @@ class Database:
             @event.listens_for(self.engine, "connect")
             def set_sqlite_pragma(dbapi_connection, connection_record):
                 cursor = dbapi_connection.cursor()
-                cursor.execute("PRAGMA foreign_keys=ON;")
+                for name, value in self.pragmas.items():
+                    cursor.execute(f"PRAGMA {name}={value};")
                 cursor.close()
 
+    @contextmanager
+    def pragma_profile(self, session: Session, pragmas: Mapping[str, str | int]):
+        """
+        Temporarily applies pragmas to the connection bound to the session
+        and restores the previous values on exit.
+        """
+        connection = session.connection()
+        previous_pragmas = {
+            name: connection.exec_driver_sql(f"PRAGMA {name};").scalar()
+            for name in pragmas
+        }
+        for name, value in pragmas.items():
+            connection.exec_driver_sql(f"PRAGMA {name}={value};")
+        try:
+            yield
+        finally:
+            for name, value in previous_pragmas.items():
+                connection.exec_driver_sql(f"PRAGMA {name}={value};")
+
     @staticmethod
     def _get_platform_specific_extension_path(extension_name, base_path="."):
         """
@@ -48,51 +94,63 @@ class Database:
             # Fallback for Linux and other Unix-like systems
             return os.path.join(base_path, f"{extension_name}.so")
 
-    def load_extensions(self, extension_names: Iterable[str]):
-        if "sqlite" in str(self.engine.url):
-            extension_paths = []
-            for extension_name in extension_names:
-                if not isinstance(extension_name, str):
-                    raise TypeError(
-                        f"Expected a string for extension name, got {type(extension_name)}"
-                    )
-                if not extension_name:
-                    raise ValueError("Extension name cannot be an empty string.")
-
-                # Get the platform-specific path for the extension
-                # This assumes the extensions are located in a directory named 'extensions'
-                extension_path = Database._get_platform_specific_extension_path(
-                    extension_name,
-                    base_path=os.path.join(os.path.dirname(__file__), "extensions"),
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def resolve_extension_paths(extension_names: frozenset[str]) -> tuple[str, ...]:
+        """
+        Validates and returns the paths of the compiled extensions.
+        The result is cached, so the filesystem is only checked once per process.
+        """
+        extension_paths = []
+        for extension_name in sorted(extension_names):
+            if not isinstance(extension_name, str):
+                raise TypeError(
+                    f"Expected a string for extension name, got {type(extension_name)}"
+                )
+            if not extension_name:
+                raise ValueError("Extension name cannot be an empty string.")
+
+            # Get the platform-specific path for the extension
+            # This assumes the extensions are located in a directory named 'extensions'
+            extension_path = Database._get_platform_specific_extension_path(
+                extension_name,
+                base_path=os.path.join(os.path.dirname(__file__), "extensions"),
+            )
+
+            if not os.path.exists(extension_path):
+                raise FileNotFoundError(
+                    f"The compiled extension '{extension_path}' was not found. "
+                    f"Please run 'make' to compile it for your system ({platform.system()})."
+                )
+            if not os.path.isfile(extension_path):
+                raise IsADirectoryError(
+                    f"The path '{extension_path}' is not a file. "
+                    f"Please ensure it points to the compiled extension."
                 )
+            if not os.access(extension_path, os.R_OK):
+                raise PermissionError(
+                    f"The extension '{extension_path}' is not readable. "
+                    f"Please check the file permissions."
+                )
+
+            extension_paths.append(extension_path)
+
+        return tuple(extension_paths)
 
-                if not os.path.exists(extension_path):
-                    raise FileNotFoundError(
-                        f"The compiled extension '{extension_path}' was not found. "
-                        f"Please run 'make' to compile it for your system ({platform.system()})."
-                    )
-                if not os.path.isfile(extension_path):
-                    raise IsADirectoryError(
-                        f"The path '{extension_path}' is not a file. "
-                        f"Please ensure it points to the compiled extension."
-                    )
-                if not os.access(extension_path, os.R_OK):
-                    raise PermissionError(
-                        f"The extension '{extension_path}' is not readable. "
-                        f"Please check the file permissions."
-                    )
-
-                extension_paths.append(extension_path)
-
-            # Open a raw DB-API connection to load the extension
-            with self.engine.connect() as conn:
-                dbapi_connection = conn.connection
+    def _add_sqlite_extensions(self):
+        if "sqlite" in str(self.engine.url) and self.extension_paths:
+
+            # Every new pooled connection gets the extensions loaded exactly once
+            @event.listens_for(self.engine, "connect")
+            def load_sqlite_extensions(dbapi_connection, connection_record):
                 dbapi_connection.enable_load_extension(True)
                 try:
-                    for extension_path in extension_paths:
+                    for extension_path in self.extension_paths:
                         dbapi_connection.load_extension(extension_path)
                 except sqlite3.OperationalError as e:
-                    raise f"Error loading extension: {e}"
+                    raise sqlite3.OperationalError(
+                        f"Error loading extension: {e}"
+                    ) from e
                 finally:
                     dbapi_connection.enable_load_extension(False)
 
@@ -107,12 +165,29 @@ class Database:
         finally:
             session.close()
 
+    def dispose(self):
+        """Closes all pooled connections held by the engine."""
+        self.engine.dispose()
+
     def create_database(self):
-        if not self.path_exists:
-            os.makedirs(os.path.dirname(self.db_path))
-            self.path_exists = True
+        # The file is checked on every call, it may have been removed while
+        # the engine was kept alive, then the pooled connections still point to it
+        if not os.path.exists(self.db_path):
+            self.dispose()
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
 
-        Base.metadata.create_all(bind=self.engine)
+        migrate_database(self.engine, Base.metadata)
+        self._upgraded = True
+
+    def upgrade_database(self):
+        """
+        Migrates an existing database to the current schema, once per engine.
+        A database that does not exist yet is left to `create_database`.
+        """
+        with self._upgrade_lock:
+            if not self._upgraded and os.path.exists(self.db_path):
+                migrate_database(self.engine, Base.metadata)
+                self._upgraded = True
 
     def drop_database(self):
         Base.metadata.drop_all(bind=self.engine)
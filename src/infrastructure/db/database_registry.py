@@ -0,0 +1,82 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Iterable, Mapping
+
+from .database import Database
+
+
+class DatabaseRegistry:
+    """
+    Process-wide cache of per-user Database objects.
+    Keeps at most `max_size` engines alive and disposes the least recently
+    used one when the limit is exceeded, which closes its pooled connections.
+    The given extensions are resolved once here and loaded by every engine
+    on each new connection. An existing database is migrated to the current
+    schema the first time it is opened.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        extension_names: Iterable[str] = (),
+        pragmas: Mapping[str, str | int] | None = None,
+    ):
+        if max_size < 1:
+            raise ValueError("Registry size must be a positive integer.")
+
+        self.max_size = max_size
+        self.extension_names = frozenset(extension_names)
+        self.pragmas = pragmas
+        Database.resolve_extension_paths(self.extension_names)
+        self._databases: OrderedDict[str, Database] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, id: str) -> Database:
+        db = self._get_or_create(id)
+        # Outside of the lock, only the requests of this database wait for it
+        db.upgrade_database()
+        return db
+
+    def _get_or_create(self, id: str) -> Database:
+        with self._lock:
+            db = self._databases.get(id)
+            if db is not None:
+                self._databases.move_to_end(id)
+                return db
+
+            db = Database(
+                id, extension_names=self.extension_names, pragmas=self.pragmas
+            )
+            self._databases[id] = db
+            evicted = []
+            while len(self._databases) > self.max_size:
+                _, evicted_db = self._databases.popitem(last=False)
+                evicted.append(evicted_db)
+
+        # Dispose outside of the lock, closing connections may take a while
+        for evicted_db in evicted:
+            evicted_db.dispose()
+
+        return db
+
+    def path_exists(self, id: str) -> bool:
+        return Database.path_exists_for(id)
+
+    def dispose(self, id: str):
+        with self._lock:
+            db = self._databases.pop(id, None)
+        if db is not None:
+            db.dispose()
+
+    def dispose_all(self):
+        with self._lock:
+            databases = list(self._databases.values())
+            self._databases.clear()
+        for db in databases:
+            db.dispose()
+
+    def __len__(self):
+        return len(self._databases)
+
+    def __contains__(self, id: str):
+        return id in self._databases
@@ -0,0 +1,501 @@
+/**
+ * @file sqlite-returns-extension.c
+ * @brief SQLite extension for calculating running returns over a series of periodic rates of return.
+ *
+ * This extension provides the following user-defined aggregate and window functions, each available in
+ * lowercase and uppercase versions:
+ * - cumprod1p(rate): The cumulative growth factor of the rates, i.e. the product of (1 + rate).
+ * - running_max(value): The maximum of the values, e.g. the peak of a value series.
+ * - drawdown(rate): The relative distance of the cumulative growth factor of the current row from
+ *   the highest cumulative growth factor reached so far, i.e. cumprod1p / max(cumprod1p) - 1.
+ *
+ * All of them are computed in a single streaming pass and support the inverse step, so sliding window
+ * frames are handled exactly. Growth factors are accumulated as a compensated sum of log1p(rate). Rates
+ * of -1 or below, whose growth factor is not positive, are skipped, in the same way as `ln()` returns NULL
+ * for them in the `exp(sum(ln(1 + rate)))` expression these functions replace. NULL inputs are ignored.
+ */
+#include <ctype.h>
+#include <math.h>
+#include <sqlite3ext.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+SQLITE_EXTENSION_INIT1
+
+// --- Configuration Constants ---
+
+// The initial capacity for the dynamic array holding the running maxima.
+#define INITIAL_CAPACITY 100
+// The factor by which the capacity of the array is increased when it becomes full.
+#define CAPACITY_GROWTH_FACTOR 2
+
+// --- End of Configuration Constants ---
+
+/**
+ * @struct CompensatedSum
+ * @brief A running sum with Neumaier compensation, which keeps the low-order bits lost by each addition.
+ */
+typedef struct {
+    double sum;          // The running sum.
+    double compensation; // The accumulated rounding error of the running sum.
+} CompensatedSum;
+
+/**
+ * @struct MonotonicDeque
+ * @brief A circular buffer of non-increasing values, whose front is the maximum of the current window frame.
+ *
+ * A new value first drops all smaller values from the back, as they can never become the maximum again
+ * while it stays in the frame. A value leaving the frame is dropped from the front if it is still there,
+ * which is the case exactly when it is equal to the front, because every value that survives is kept in
+ * the order of arrival.
+ */
+typedef struct {
+    double *values;  // A dynamic array of values, used as a circular buffer.
+    size_t count;    // The current number of values stored in the buffer.
+    size_t capacity; // The current allocated capacity of the buffer.
+    size_t head;     // Index of the front (largest) value.
+} MonotonicDeque;
+
+/**
+ * @struct RunningReturnsData
+ * @brief Holds the state for the running return functions.
+ *
+ * The level of a row is the sum of log1p(rate) from the start of the partition up to and including that row,
+ * so the cumulative growth factor between two rows is the exponent of the difference of their levels.
+ * Rows leaving the window frame are accumulated separately, with the same operations in the same order,
+ * which reproduces the level of each leaving row bit for bit.
+ */
+typedef struct {
+    CompensatedSum added_level;   // The level of the newest row in the window frame.
+    CompensatedSum removed_level; // The level of the last row that left the window frame.
+    size_t growth_count;          // The number of positive growth factors in the window frame.
+    MonotonicDeque maxima;        // The running maxima of the values or levels in the window frame.
+} RunningReturnsData;
+
+/**
+ * @struct ReturnsFunctionGroup
+ * @brief Defines a group of related functions to be registered with the same callbacks.
+ */
+typedef struct {
+    const char **names; // Array of function names/aliases.
+    size_t name_count;  // Number of names in the array.
+    void (*xStep)(sqlite3_context *, int, sqlite3_value **);
+    void (*xFinal)(sqlite3_context *); // Pointer to the xFinal function.
+    void (*xValue)(sqlite3_context *); // Pointer to the xValue function.
+    void (*xInverse)(sqlite3_context *, int, sqlite3_value **);
+} ReturnsFunctionGroup;
+
+// --- Forward Declarations ---
+
+// SQLite Callback Functions
+static void cumprod1p_step(sqlite3_context *context, int argc, sqlite3_value **argv);
+static void cumprod1p_inverse(sqlite3_context *context, int argc, sqlite3_value **argv);
+static void cumprod1p_value(sqlite3_context *context);
+static void running_max_step(sqlite3_context *context, int argc, sqlite3_value **argv);
+static void running_max_inverse(sqlite3_context *context, int argc, sqlite3_value **argv);
+static void running_max_value(sqlite3_context *context);
+static void drawdown_step(sqlite3_context *context, int argc, sqlite3_value **argv);
+static void drawdown_inverse(sqlite3_context *context, int argc, sqlite3_value **argv);
+static void drawdown_value(sqlite3_context *context);
+static void returns_destroy(void *pAggregate);
+
+// Helper Functions
+static RunningReturnsData *get_step_context(sqlite3_context *context, int argc, sqlite3_value **argv, double *out_value);
+static void add_growth(RunningReturnsData *data, double rate);
+static void compensated_add(CompensatedSum *sum, double value);
+static double compensated_total(const CompensatedSum *sum);
+static int deque_push(MonotonicDeque *deque, double value);
+static void deque_remove(MonotonicDeque *deque, double value);
+static int grow_deque(MonotonicDeque *deque);
+static void set_result(sqlite3_context *context, double result);
+
+// Extension Initialization
+static int register_returns_function_group(sqlite3 *db, const ReturnsFunctionGroup *group);
+
+// --- SQLite Callback Functions ---
+
+/**
+ * @brief The "step" function of `cumprod1p`, called for each row in the aggregate or window frame.
+ * @param context The SQLite function context.
+ * @param argc The number of arguments.
+ * @param argv The argument values.
+ */
+static void cumprod1p_step(sqlite3_context *context, int argc, sqlite3_value **argv) {
+    double rate;
+    RunningReturnsData *ctx = get_step_context(context, argc, argv, &rate);
+    if (!ctx)
+        return;
+    add_growth(ctx, rate);
+}
+
+/**
+ * @brief The "inverse" function of `cumprod1p`, called when a row moves out of a window frame.
+ * @param context The SQLite function context.
+ * @param argc The number of arguments.
+ * @param argv The argument values of the row leaving the window.
+ */
+static void cumprod1p_inverse(sqlite3_context *context, int argc, sqlite3_value **argv) {
+    RunningReturnsData *ctx = (RunningReturnsData *)sqlite3_aggregate_context(context, 0);
+    if (!ctx || sqlite3_value_type(argv[0]) == SQLITE_NULL)
+        return;
+
+    double rate = sqlite3_value_double(argv[0]);
+    if (rate > -1.0) {
+        compensated_add(&ctx->removed_level, log1p(rate));
+        ctx->growth_count--;
+    }
+}
+
+/**
+ * @brief The "value" and "final" function of `cumprod1p`.
+ *
+ * Returns NULL if the window frame has no positive growth factor, like `exp(sum(ln(1 + rate)))` would.
+ * @param context The SQLite function context.
+ */
+static void cumprod1p_value(sqlite3_context *context) {
+    RunningReturnsData *ctx = (RunningReturnsData *)sqlite3_aggregate_context(context, 0);
+    if (!ctx || ctx->growth_count == 0) {
+        sqlite3_result_null(context);
+        return;
+    }
+    set_result(context, exp(compensated_total(&ctx->added_level) - compensated_total(&ctx->removed_level)));
+}
+
+/**
+ * @brief The "step" function of `running_max`, called for each row in the aggregate or window frame.
+ * @param context The SQLite function context.
+ * @param argc The number of arguments.
+ * @param argv The argument values.
+ */
+static void running_max_step(sqlite3_context *context, int argc, sqlite3_value **argv) {
+    double value;
+    RunningReturnsData *ctx = get_step_context(context, argc, argv, &value);
+    if (!ctx)
+        return;
+    if (deque_push(&ctx->maxima, value) != SQLITE_OK)
+        sqlite3_result_error_nomem(context);
+}
+
+/**
+ * @brief The "inverse" function of `running_max`, called when a row moves out of a window frame.
+ * @param context The SQLite function context.
+ * @param argc The number of arguments.
+ * @param argv The argument values of the row leaving the window.
+ */
+static void running_max_inverse(sqlite3_context *context, int argc, sqlite3_value **argv) {
+    RunningReturnsData *ctx = (RunningReturnsData *)sqlite3_aggregate_context(context, 0);
+    if (!ctx || sqlite3_value_type(argv[0]) == SQLITE_NULL)
+        return;
+    deque_remove(&ctx->maxima, sqlite3_value_double(argv[0]));
+}
+
+/**
+ * @brief The "value" and "final" function of `running_max`.
+ * @param context The SQLite function context.
+ */
+static void running_max_value(sqlite3_context *context) {
+    RunningReturnsData *ctx = (RunningReturnsData *)sqlite3_aggregate_context(context, 0);
+    if (!ctx || ctx->maxima.count == 0) {
+        sqlite3_result_null(context);
+        return;
+    }
+    set_result(context, ctx->maxima.values[ctx->maxima.head]);
+}
+
+/**
+ * @brief The "step" function of `drawdown`, called for each row in the aggregate or window frame.
+ *
+ * Adds the rate to the level and pushes the new level, which stands for the cumulative growth factor
+ * of the row, to the running maxima.
+ * @param context The SQLite function context.
+ * @param argc The number of arguments.
+ * @param argv The argument values.
+ */
+static void drawdown_step(sqlite3_context *context, int argc, sqlite3_value **argv) {
+    double rate;
+    RunningReturnsData *ctx = get_step_context(context, argc, argv, &rate);
+    if (!ctx)
+        return;
+    add_growth(ctx, rate);
+    if (deque_push(&ctx->maxima, compensated_total(&ctx->added_level)) != SQLITE_OK)
+        sqlite3_result_error_nomem(context);
+}
+
+/**
+ * @brief The "inverse" function of `drawdown`, called when a row moves out of a window frame.
+ *
+ * Recomputes the level of the leaving row from its rate and drops it from the running maxima.
+ * @param context The SQLite function context.
+ * @param argc The number of arguments.
+ * @param argv The argument values of the row leaving the window.
+ */
+static void drawdown_inverse(sqlite3_context *context, int argc, sqlite3_value **argv) {
+    RunningReturnsData *ctx = (RunningReturnsData *)sqlite3_aggregate_context(context, 0);
+    if (!ctx || sqlite3_value_type(argv[0]) == SQLITE_NULL)
+        return;
+
+    double rate = sqlite3_value_double(argv[0]);
+    if (rate > -1.0) {
+        compensated_add(&ctx->removed_level, log1p(rate));
+        ctx->growth_count--;
+    }
+    deque_remove(&ctx->maxima, compensated_total(&ctx->removed_level));
+}
+
+/**
+ * @brief The "value" and "final" function of `drawdown`.
+ *
+ * Returns expm1(level - maximum level), which equals the cumulative growth factor divided by its
+ * running maximum, minus one.
+ * @param context The SQLite function context.
+ */
+static void drawdown_value(sqlite3_context *context) {
+    RunningReturnsData *ctx = (RunningReturnsData *)sqlite3_aggregate_context(context, 0);
+    if (!ctx || ctx->maxima.count == 0) {
+        sqlite3_result_null(context);
+        return;
+    }
+    set_result(context, expm1(compensated_total(&ctx->added_level) - ctx->maxima.values[ctx->maxima.head]));
+}
+
+/**
+ * @brief Destructor for the aggregate context.
+ *
+ * This function is registered with SQLite and is guaranteed to be called,
+ * even if the query is aborted or encounters an error. It ensures that all
+ * dynamically allocated memory within the context is freed, preventing memory leaks.
+ * @param pAggregate The aggregate context to be destroyed.
+ */
+static void returns_destroy(void *pAggregate) {
+    RunningReturnsData *ctx = (RunningReturnsData *)pAggregate;
+    if (ctx && ctx->maxima.values) {
+        free(ctx->maxima.values);
+        ctx->maxima.values = NULL;
+    }
+}
+
+// --- Helper Functions ---
+
+/**
+ * @brief Common processing logic for the xStep function of all running return functions.
+ *
+ * SQLite zero-fills a newly allocated aggregate context, which is a valid empty state,
+ * so no further initialization is needed.
+ * @param context The SQLite function context.
+ * @param argc The number of arguments.
+ * @param argv The argument values.
+ * @param out_value Pointer to store the numeric value of the argument.
+ * @return The context, or NULL if the row is ignored or an error has been reported.
+ */
+static RunningReturnsData *get_step_context(sqlite3_context *context, int argc, sqlite3_value **argv, double *out_value) {
+    if (argc != 1) {
+        sqlite3_result_error(context, "Running return functions require exactly 1 argument", -1);
+        return NULL;
+    }
+
+    RunningReturnsData *ctx = (RunningReturnsData *)sqlite3_aggregate_context(context, sizeof(RunningReturnsData));
+    if (!ctx) {
+        sqlite3_result_error_nomem(context);
+        return NULL;
+    }
+
+    int value_type = sqlite3_value_type(argv[0]);
+    if (value_type == SQLITE_NULL)
+        return NULL; // Ignore NULLs.
+
+    if (value_type != SQLITE_INTEGER && value_type != SQLITE_FLOAT) {
+        sqlite3_result_error(context, "Invalid data type, expected numeric value.", -1);
+        return NULL;
+    }
+
+    *out_value = sqlite3_value_double(argv[0]);
+    return ctx;
+}
+
+/**
+ * @brief Adds the growth factor of a rate to the level, skipping rates whose growth factor is not positive.
+ * @param data The running returns data structure.
+ * @param rate The periodic rate of return.
+ */
+static void add_growth(RunningReturnsData *data, double rate) {
+    if (rate <= -1.0)
+        return;
+    compensated_add(&data->added_level, log1p(rate));
+    data->growth_count++;
+}
+
+/**
+ * @brief Adds a value to a compensated sum using the Neumaier variant of Kahan summation.
+ * @param sum The compensated sum.
+ * @param value The value to add.
+ */
+static void compensated_add(CompensatedSum *sum, double value) {
+    double total = sum->sum + value;
+    if (fabs(sum->sum) >= fabs(value)) {
+        sum->compensation += (sum->sum - total) + value;
+    } else {
+        sum->compensation += (value - total) + sum->sum;
+    }
+    sum->sum = total;
+}
+
+/**
+ * @brief Returns the value of a compensated sum.
+ * @param sum The compensated sum.
+ * @return The running sum corrected by its accumulated rounding error.
+ */
+static double compensated_total(const CompensatedSum *sum) {
+    return sum->sum + sum->compensation;
+}
+
+/**
+ * @brief Pushes a value to the back of the monotonic deque, dropping all smaller values before it.
+ * @param deque The monotonic deque.
+ * @param value The value to push.
+ * @return SQLITE_OK on success, SQLITE_NOMEM on memory allocation failure.
+ */
+static int deque_push(MonotonicDeque *deque, double value) {
+    while (deque->count > 0) {
+        size_t back = (deque->head + deque->count - 1) % deque->capacity;
+        if (deque->values[back] >= value)
+            break;
+        deque->count--;
+    }
+
+    if (deque->count >= deque->capacity) {
+        if (grow_deque(deque) != SQLITE_OK)
+            return SQLITE_NOMEM;
+    }
+
+    deque->values[(deque->head + deque->count) % deque->capacity] = value;
+    deque->count++;
+    return SQLITE_OK;
+}
+
+/**
+ * @brief Removes a value leaving the window frame from the front of the monotonic deque, if it is still there.
+ * @param deque The monotonic deque.
+ * @param value The value leaving the window frame.
+ */
+static void deque_remove(MonotonicDeque *deque, double value) {
+    if (deque->count == 0 || deque->values[deque->head] != value)
+        return;
+    deque->head = (deque->head + 1) % deque->capacity;
+    deque->count--;
+}
+
+/**
+ * @brief Grows the buffer of the monotonic deque, or allocates it on first use.
+ *
+ * This function allocates a new, larger buffer and copies the existing elements
+ * from the old circular buffer into a contiguous block at the start of the new one.
+ * @param deque The monotonic deque to grow.
+ * @return SQLITE_OK on success, SQLITE_NOMEM on memory allocation failure.
+ */
+static int grow_deque(MonotonicDeque *deque) {
+    size_t new_capacity = deque->capacity ? deque->capacity * CAPACITY_GROWTH_FACTOR : INITIAL_CAPACITY;
+    double *new_values = (double *)malloc(new_capacity * sizeof(double));
+    if (!new_values) {
+        return SQLITE_NOMEM;
+    }
+    // Copy existing data to the new, larger buffer.
+    for (size_t i = 0; i < deque->count; i++) {
+        new_values[i] = deque->values[(deque->head + i) % deque->capacity];
+    }
+    if (deque->values) {
+        free(deque->values);
+        deque->values = NULL;
+    }
+    deque->values = new_values;
+    deque->capacity = new_capacity;
+    deque->head = 0;
+    return SQLITE_OK;
+}
+
+/**
+ * @brief Helper to set the result, handling NAN/INF values.
+ * @param context The SQLite function context.
+ * @param result The double result to set.
+ */
+static void set_result(sqlite3_context *context, double result) {
+    if (isnan(result) || isinf(result)) {
+        sqlite3_result_null(context);
+    } else {
+        sqlite3_result_double(context, result);
+    }
+}
+
+// --- Extension Initialization ---
+
+/**
+ * @brief Helper function to register a group of running return functions (lowercase and uppercase).
+ * @param db The database connection.
+ * @param group The function group to register.
+ * @return SQLITE_OK on success, or an error code on failure.
+ */
+static int register_returns_function_group(sqlite3 *db, const ReturnsFunctionGroup *group) {
+    int rc = SQLITE_OK;
+    int flags = SQLITE_UTF8 | SQLITE_DETERMINISTIC | SQLITE_INNOCUOUS;
+
+    for (size_t i = 0; i < group->name_count; i++) {
+        const char *name = group->names[i];
+        rc = sqlite3_create_window_function(db, name, 1, flags, 0, group->xStep, group->xFinal, group->xValue, group->xInverse, returns_destroy);
+        if (rc != SQLITE_OK)
+            return rc;
+
+        // Create and register the uppercase version.
+        size_t name_len = strlen(name);
+        char *upper_name = (char *)malloc(name_len + 1);
+        if (!upper_name)
+            return SQLITE_NOMEM;
+        for (size_t j = 0; j < name_len; j++) {
+            upper_name[j] = toupper((unsigned char)name[j]);
+        }
+        upper_name[name_len] = '\0';
+
+        rc = sqlite3_create_window_function(db, upper_name, 1, flags, 0, group->xStep, group->xFinal, group->xValue, group->xInverse, returns_destroy);
+        if (upper_name) {
+            free(upper_name);
+            upper_name = NULL;
+        }
+        if (rc != SQLITE_OK)
+            return rc;
+    }
+    return SQLITE_OK;
+}
+
+/**
+ * @brief The main entry point for the SQLite extension.
+ *
+ * This function is called by SQLite when the extension is loaded. It registers
+ * all the running return functions.
+ *
+ * @param db The database connection.
+ * @param pzErrMsg A pointer to an error message string.
+ * @param pApi A pointer to the SQLite API routines.
+ * @return SQLITE_OK on success, or an error code on failure.
+ */
+int sqlite3_extension_init(sqlite3 *db, char **pzErrMsg, const sqlite3_api_routines *pApi) {
+    int rc = SQLITE_OK;
+    SQLITE_EXTENSION_INIT2(pApi);
+
+    const char *cumprod1p_names[] = {"cumprod1p"};
+    const char *running_max_names[] = {"running_max"};
+    const char *drawdown_names[] = {"drawdown"};
+
+    ReturnsFunctionGroup functions_to_register[] = {
+        {cumprod1p_names, sizeof(cumprod1p_names) / sizeof(cumprod1p_names[0]), cumprod1p_step, cumprod1p_value, cumprod1p_value, cumprod1p_inverse},
+        {running_max_names, sizeof(running_max_names) / sizeof(running_max_names[0]), running_max_step, running_max_value, running_max_value, running_max_inverse},
+        {drawdown_names, sizeof(drawdown_names) / sizeof(drawdown_names[0]), drawdown_step, drawdown_value, drawdown_value, drawdown_inverse}};
+
+    size_t num_groups = sizeof(functions_to_register) / sizeof(functions_to_register[0]);
+    for (size_t i = 0; i < num_groups; i++) {
+        rc = register_returns_function_group(db, &functions_to_register[i]);
+        if (rc != SQLITE_OK) {
+            return rc;
+        }
+    }
+
+    return rc;
+}
@@ -5,6 +5,11 @@
  * This extension provides `stddev`, `variance`, and their aliases as user-defined aggregate
  * and window functions. It is optimized for window function performance by using a circular
  * buffer to efficiently manage the sliding window of data.
+ *
+ * It also provides `window_stats(value)`, which computes the count, mean, sample standard deviation and
+ * sample standard deviation of the negative values (the downside deviation) in one pass, returning them
+ * packed into a BLOB. Individual components, as well as the Sharpe-style (mean / stddev) and Sortino-style
+ * (mean / downside stddev) ratios, are unpacked with the scalar `window_stats_get(packed, component)`.
  */
 #include <ctype.h>
 #include <math.h>
@@ -25,6 +30,8 @@ SQLITE_EXTENSION_INIT1
 #define MIN_COUNT_POPULATION 1
 // The minimum number of data points required for sample statistics.
 #define MIN_COUNT_SAMPLE 2
+// The number of doubles packed into the result of the WINDOW_STATS function.
+#define WINDOW_STATS_SIZE 4
 
 // --- End of Configuration Constants ---
 
@@ -49,6 +56,24 @@ typedef struct {
     double sum_sq;   // Running sum of the squares of all values.
 } WindowStatsData;
 
+/**
+ * @struct WelfordStatsData
+ * @brief Holds the state of the `window_stats` function.
+ *
+ * The count, mean and sum of squared deviations from the mean (M2) are updated with Welford's algorithm,
+ * once for all values and once for the negative values only. SQLite passes the row leaving a window frame
+ * to the inverse function, which reverses the update, so no values are buffered and the state has the same
+ * constant size for any frame. SQLite zero-fills the aggregate context, which is a valid empty state.
+ */
+typedef struct {
+    size_t count;          // The number of values in the window frame.
+    double mean;           // The mean of the values.
+    double m2;             // The sum of squared deviations of the values from their mean.
+    size_t downside_count; // The number of negative values in the window frame.
+    double downside_mean;  // The mean of the negative values.
+    double downside_m2;    // The sum of squared deviations of the negative values from their mean.
+} WelfordStatsData;
+
 /**
  * @struct StatsFunctionGroup
  * @brief Defines a group of related statistical functions to be registered.
@@ -71,6 +96,7 @@ static double calculate_variance_sample(const WindowStatsData *data);
 static double calculate_variance_population(const WindowStatsData *data);
 static double calculate_stddev_sample(const WindowStatsData *data);
 static double calculate_stddev_population(const WindowStatsData *data);
+static double calculate_welford_stddev_sample(size_t count, double m2);
 
 // SQLite Callback Functions
 static void stats_step(sqlite3_context *context, int argc, sqlite3_value **argv);
@@ -84,6 +110,11 @@ static void stddev_pop_final(sqlite3_context *context);
 static void variance_samp_final(sqlite3_context *context);
 static void variance_pop_final(sqlite3_context *context);
 static void stats_destroy(void *pAggregate);
+static void window_stats_step(sqlite3_context *context, int argc, sqlite3_value **argv);
+static void window_stats_inverse(sqlite3_context *context, int argc, sqlite3_value **argv);
+static void window_stats_value(sqlite3_context *context);
+static void window_stats_final(sqlite3_context *context);
+static void window_stats_get(sqlite3_context *context, int argc, sqlite3_value **argv);
 
 // Helper Functions
 static double get_circular_value(const WindowStatsData *data, size_t logical_index);
@@ -94,6 +125,8 @@ static int grow_stats_buffer(WindowStatsData *data);
 static void set_result(sqlite3_context *context, double result);
 static void stats_value_helper(sqlite3_context *context, stats_func func, int min_count);
 static void stats_final_helper(sqlite3_context *context, stats_func func, int min_count);
+static void welford_add(size_t *count, double *mean, double *m2, double value);
+static void welford_remove(size_t *count, double *mean, double *m2, double value);
 
 // Extension Initialization
 static int register_stats_function_group(sqlite3 *db, const StatsFunctionGroup *group);
@@ -152,6 +185,19 @@ static double calculate_stddev_population(const WindowStatsData *data) {
     return isnan(variance) ? NAN : sqrt(variance);
 }
 
+/**
+ * @brief Calculate the sample standard deviation from a Welford state.
+ * @param count The number of values.
+ * @param m2 The sum of squared deviations of the values from their mean.
+ * @return The calculated sample standard deviation, or NAN if count < 2.
+ */
+static double calculate_welford_stddev_sample(size_t count, double m2) {
+    if (count < MIN_COUNT_SAMPLE)
+        return NAN;
+    // Removing values may leave a tiny negative rounding residue instead of zero.
+    return sqrt(fmax(m2, 0.0) / (count - 1));
+}
+
 // --- SQLite Callback Functions ---
 
 /**
@@ -260,6 +306,134 @@ static void stats_destroy(void *pAggregate) {
     }
 }
 
+/**
+ * @brief The "step" function of `window_stats`, called for each row in the aggregate or window frame.
+ * @param context The SQLite function context.
+ * @param argc The number of arguments.
+ * @param argv The argument values.
+ */
+static void window_stats_step(sqlite3_context *context, int argc, sqlite3_value **argv) {
+    if (argc != 1) {
+        sqlite3_result_error(context, "Statistics functions require exactly 1 argument", -1);
+        return;
+    }
+
+    WelfordStatsData *ctx = (WelfordStatsData *)sqlite3_aggregate_context(context, sizeof(WelfordStatsData));
+    if (!ctx) {
+        sqlite3_result_error_nomem(context);
+        return;
+    }
+
+    int value_type = sqlite3_value_type(argv[0]);
+    if (value_type == SQLITE_NULL)
+        return; // Ignore NULLs.
+
+    if (value_type != SQLITE_INTEGER && value_type != SQLITE_FLOAT) {
+        sqlite3_result_error(context, "Invalid data type, expected numeric value.", -1);
+        return;
+    }
+
+    double value = sqlite3_value_double(argv[0]);
+    welford_add(&ctx->count, &ctx->mean, &ctx->m2, value);
+    if (value < 0)
+        welford_add(&ctx->downside_count, &ctx->downside_mean, &ctx->downside_m2, value);
+}
+
+/**
+ * @brief The "inverse" function of `window_stats`, called when a row moves out of a window frame.
+ *
+ * Unlike `stats_inverse`, it reverses the Welford update with the value of the row leaving the frame,
+ * which SQLite passes in `argv`, so no buffer of past values is needed.
+ * @param context The SQLite function context.
+ * @param argc The number of arguments.
+ * @param argv The argument values of the row leaving the window.
+ */
+static void window_stats_inverse(sqlite3_context *context, int argc, sqlite3_value **argv) {
+    WelfordStatsData *ctx = (WelfordStatsData *)sqlite3_aggregate_context(context, 0);
+    if (!ctx || ctx->count == 0)
+        return;
+
+    // Ignore NULL values leaving the window, consistent with how they are ignored on entry.
+    if (sqlite3_value_type(argv[0]) == SQLITE_NULL)
+        return;
+
+    double value = sqlite3_value_double(argv[0]);
+    welford_remove(&ctx->count, &ctx->mean, &ctx->m2, value);
+    if (value < 0)
+        welford_remove(&ctx->downside_count, &ctx->downside_mean, &ctx->downside_m2, value);
+}
+
+/**
+ * @brief The "value" function of `window_stats`, packing the statistics of the current window frame.
+ *
+ * The BLOB holds the count, the mean, the sample standard deviation and the sample standard deviation
+ * of the negative values, in this order, with NAN standing for a statistic that is not defined.
+ * @param context The SQLite function context.
+ */
+static void window_stats_value(sqlite3_context *context) {
+    WelfordStatsData *ctx = (WelfordStatsData *)sqlite3_aggregate_context(context, 0);
+    if (!ctx) {
+        sqlite3_result_null(context);
+        return;
+    }
+
+    double packed[WINDOW_STATS_SIZE];
+    packed[0] = (double)ctx->count;
+    packed[1] = ctx->count > 0 ? ctx->mean : NAN;
+    packed[2] = calculate_welford_stddev_sample(ctx->count, ctx->m2);
+    packed[3] = calculate_welford_stddev_sample(ctx->downside_count, ctx->downside_m2);
+    sqlite3_result_blob(context, packed, sizeof(packed), SQLITE_TRANSIENT);
+}
+
+/**
+ * @brief The "final" function of `window_stats`. There is no buffer to clean up, so it reuses the value logic.
+ * @param context The SQLite function context.
+ */
+static void window_stats_final(sqlite3_context *context) {
+    window_stats_value(context);
+}
+
+/**
+ * @brief Scalar function `window_stats_get(packed, component)` that unpacks one statistic from the result of `window_stats`.
+ *
+ * The component is one of 'count', 'mean', 'stddev', 'stddev_downside', 'sharpe' (mean / stddev)
+ * or 'sortino' (mean / stddev_downside). Undefined statistics and ratios are returned as NULL.
+ * @param context The SQLite function context.
+ * @param argc The number of arguments.
+ * @param argv The argument values.
+ */
+static void window_stats_get(sqlite3_context *context, int argc, sqlite3_value **argv) {
+    if (sqlite3_value_type(argv[0]) == SQLITE_NULL || sqlite3_value_type(argv[1]) == SQLITE_NULL) {
+        sqlite3_result_null(context);
+        return;
+    }
+    if (sqlite3_value_type(argv[0]) != SQLITE_BLOB || sqlite3_value_bytes(argv[0]) != (int)(WINDOW_STATS_SIZE * sizeof(double))) {
+        sqlite3_result_error(context, "Argument 1 (packed) must be a value returned by window_stats.", -1);
+        return;
+    }
+
+    double packed[WINDOW_STATS_SIZE];
+    memcpy(packed, sqlite3_value_blob(argv[0]), sizeof(packed));
+    double count = packed[0], mean = packed[1], stddev = packed[2], stddev_downside = packed[3];
+
+    const char *component = (const char *)sqlite3_value_text(argv[1]);
+    if (strcmp(component, "count") == 0) {
+        set_result(context, count);
+    } else if (strcmp(component, "mean") == 0) {
+        set_result(context, mean);
+    } else if (strcmp(component, "stddev") == 0) {
+        set_result(context, stddev);
+    } else if (strcmp(component, "stddev_downside") == 0) {
+        set_result(context, stddev_downside);
+    } else if (strcmp(component, "sharpe") == 0) {
+        set_result(context, mean / stddev);
+    } else if (strcmp(component, "sortino") == 0) {
+        set_result(context, mean / stddev_downside);
+    } else {
+        sqlite3_result_error(context, "Argument 2 (component) must be one of 'count', 'mean', 'stddev', 'stddev_downside', 'sharpe' or 'sortino'.", -1);
+    }
+}
+
 // --- Helper Functions ---
 
 /**
@@ -361,6 +535,41 @@ static void set_result(sqlite3_context *context, double result) {
     }
 }
 
+/**
+ * @brief Adds a value to a Welford state.
+ * @param count Pointer to the number of values.
+ * @param mean Pointer to the mean of the values.
+ * @param m2 Pointer to the sum of squared deviations of the values from their mean.
+ * @param value The value to add.
+ */
+static void welford_add(size_t *count, double *mean, double *m2, double value) {
+    (*count)++;
+    double delta = value - *mean;
+    *mean += delta / *count;
+    *m2 += delta * (value - *mean);
+}
+
+/**
+ * @brief Removes a value from a Welford state by reversing `welford_add`.
+ * @param count Pointer to the number of values.
+ * @param mean Pointer to the mean of the values.
+ * @param m2 Pointer to the sum of squared deviations of the values from their mean.
+ * @param value The value to remove.
+ */
+static void welford_remove(size_t *count, double *mean, double *m2, double value) {
+    if (*count <= 1) {
+        // Reset instead of dividing by zero, which also drops any accumulated rounding error.
+        *count = 0;
+        *mean = 0.0;
+        *m2 = 0.0;
+        return;
+    }
+    (*count)--;
+    double delta = value - *mean;
+    *mean -= delta / *count;
+    *m2 -= delta * (value - *mean);
+}
+
 /**
  * @brief Generic "value" function for statistical calculations.
  * @param context The SQLite function context.
@@ -471,5 +680,14 @@ int sqlite3_extension_init(sqlite3 *db, char **pzErrMsg, const sqlite3_api_routi
         }
     }
 
+    // `window_stats` keeps its own state, so it is registered with its own callbacks.
+    // SQLite matches function names case-insensitively.
+    int flags = SQLITE_UTF8 | SQLITE_DETERMINISTIC | SQLITE_INNOCUOUS;
+    rc = sqlite3_create_window_function(db, "window_stats", 1, flags, 0, window_stats_step, window_stats_final, window_stats_value, window_stats_inverse, 0);
+    if (rc != SQLITE_OK) {
+        return rc;
+    }
+    rc = sqlite3_create_function(db, "window_stats_get", 2, flags, 0, window_stats_get, 0, 0);
+
     return rc;
 }
\ No newline at end of file
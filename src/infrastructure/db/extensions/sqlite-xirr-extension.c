@@ -8,10 +8,24 @@
  * - xirr_unique(): Returns only the unique, valid solutions from xirr_all, separated by pipes.
  * - xirr_scan(): Scans a wide range of rates to find all possible solutions, then returns them sorted and pipe-separated.
  *
+ * Additionally, xirr_pair(date, value_a, value_b, [current_value], [start_date]) solves the XIRR of two cash flow series
+ * that share their dates and the current value in a single window pass. It returns both rates packed into a BLOB,
+ * which is unpacked with the scalar xirr_pair_rate(packed, index), where index 0 selects the rate of `value_a`
+ * and index 1 the rate of `value_b`.
+ *
  * All functions are implemented as efficient aggregate and window functions. When used as window functions,
  * they can take an optional `start_date` argument. If provided, the functions will return NULL for all rows
  * where the date is earlier than `start_date`, and will only begin performing calculations for rows on or after `start_date`.
  * Importantly, the calculation itself always uses the complete, unfiltered set of cash flows within the current window frame.
+ *
+ * Zero cash flows do not change the NPV, so they are not stored at all, and consecutive flows sharing the same date
+ * are merged into a single entry. The cost of each NPV evaluation therefore depends on the number of distinct
+ * non-zero flow dates rather than on the number of rows in the window frame.
+ *
+ * The year fraction of every stored flow is computed once, when the flow is added, and the NPV together with its
+ * derivative is evaluated in a single pass in log space, so each Newton-Raphson iteration costs one log1p() call
+ * plus one exp() call per flow. Building with `-DXIRR_VECTORIZE=1 -O3 -fopenmp-simd -lmvec` additionally lets the
+ * compiler vectorize that loop using the SIMD exp() variants of glibc on x86-64.
  */
 #include <ctype.h>
 #include <math.h>
@@ -51,6 +65,18 @@ SQLITE_EXTENSION_INIT1
 #define INITIAL_CAPACITY 100
 // The factor by which the capacity of arrays is increased when they become full.
 #define CAPACITY_GROWTH_FACTOR 2
+// The number of rates packed into the result of the XIRR_PAIR function.
+#define XIRR_PAIR_SIZE 2
+// Set to 1 at compile time to mark the NPV kernel loop for SIMD vectorization.
+#ifndef XIRR_VECTORIZE
+#define XIRR_VECTORIZE 0
+#endif
+
+#if XIRR_VECTORIZE && defined(__x86_64__) && defined(__GLIBC__)
+// Exposes the libmvec vector variants of exp(), which glibc otherwise only declares under -ffast-math.
+// -ffast-math itself is avoided because it would break the non-finite checks of the NPV kernel.
+__attribute__((__simd__("notinbranch"))) double exp(double);
+#endif
 
 // --- Data Structures ---
 
@@ -59,16 +85,21 @@ SQLITE_EXTENSION_INIT1
  *
  * This structure holds cash flow data (dates and values). A circular buffer is used
  * to efficiently add and remove elements from the start and end of the window frame
- * without needing to shift elements in memory.
+ * without needing to shift elements in memory. Only non-zero flows are stored, and consecutive
+ * flows with the same date share one entry whose `row_counts` tracks how many rows were merged into it,
+ * so that the inverse step can remove them one by one.
  * @param dates Pointer to the array of dates (as days since an epoch).
+ * @param years Pointer to the array of the same dates expressed in years since the epoch, cached for discounting.
  * @param values Pointer to the array of cash flow values.
+ * @param row_counts Pointer to the array of the number of window rows merged into each entry.
  * @param count The current number of items in the buffer.
  * @param capacity The total allocated capacity of the buffer.
  * @param head The index of the first (oldest) item in the circular buffer.
  * @param tail The index where the next new element will be inserted.
  */
 typedef struct {
-    double *dates, *values;
+    double *dates, *years, *values;
+    size_t *row_counts;
     size_t count, capacity;
     size_t head, tail;
 } XirrData;
@@ -78,7 +109,9 @@ typedef struct {
  *
  * This structure holds all the state required for an aggregate or window function call,
  * including the circular buffer for cash flows and any optional user-provided parameters.
- * @param data The circular buffer holding the cash flow data for the current window frame.
+ * @param data The circular buffer holding the non-zero cash flow data for the current window frame.
+ * @param frame_dates The circular buffer holding the dates of all non-NULL rows in the current window frame,
+ *                    used only to determine the discounting baseline.
  * @param current_value The final cash flow value for the current window frame (often from an optional argument).
  * @param current_row_date The date of the current row being processed by the window function.
  * @param custom_starting_rates An array of user-provided initial guesses for the Newton-Raphson method.
@@ -88,15 +121,26 @@ typedef struct {
  *                               For rows with a date before this, the function returns NULL. The calculation itself, however,
  *                               still uses all cash flows in the current window frame.
  * @param start_date_set A flag (0 or 1) indicating whether a custom `calculation_start_date` has been provided by the user.
+ * @param previous_rate The rate converged for the previous row of the window, used as a warm start for the next row.
+ * @param previous_rate_set A flag (0 or 1) indicating whether `previous_rate` holds a valid converged rate.
+ * @param pair_data The circular buffer holding the non-zero cash flows of the second series of the `xirr_pair` function.
+ * @param pair_previous_rate The warm start rate of the second series of the `xirr_pair` function.
+ * @param pair_previous_rate_set A flag (0 or 1) indicating whether `pair_previous_rate` holds a valid converged rate.
  */
 typedef struct {
     XirrData data;
+    XirrData frame_dates;
     double current_value, current_row_date;
     double *custom_starting_rates;
     size_t num_custom_rates;
     char *scan_config_str;
     double calculation_start_date;
     int start_date_set;
+    double previous_rate;
+    int previous_rate_set;
+    XirrData pair_data;
+    double pair_previous_rate;
+    int pair_previous_rate_set;
 } XirrWindowContext;
 
 /**
@@ -127,14 +171,17 @@ typedef struct {
 
 // Core Calculation Logic
 static double *select_starting_rates(const XirrWindowContext *ctx, size_t *out_num_starts);
-static double calculate_single_xirr(const XirrWindowContext *ctx);
+static double calculate_single_xirr(XirrWindowContext *ctx);
+static double calculate_series_xirr(const XirrWindowContext *ctx, const XirrData *data, double *previous_rate, int *previous_rate_set);
 static XirrCalcResult calculate_all_xirr_solutions(const XirrWindowContext *ctx);
 static char *calculate_xirr_scan(sqlite3_context *context, const XirrWindowContext *ctx);
 
 // SQLite Callback Functions
 static void xirr_step_unified(sqlite3_context *context, int argc, sqlite3_value **argv);
 static void xirr_scan_step(sqlite3_context *context, int argc, sqlite3_value **argv);
+static void xirr_pair_step(sqlite3_context *context, int argc, sqlite3_value **argv);
 static void xirr_inverse_unified(sqlite3_context *context, int argc, sqlite3_value **argv);
+static void xirr_pair_inverse(sqlite3_context *context, int argc, sqlite3_value **argv);
 static void xirr_final(sqlite3_context *context);
 static void xirr_value(sqlite3_context *context);
 static void xirr_all_final(sqlite3_context *context);
@@ -143,10 +190,15 @@ static void xirr_unique_final(sqlite3_context *context);
 static void xirr_unique_value(sqlite3_context *context);
 static void xirr_scan_final(sqlite3_context *context);
 static void xirr_scan_value(sqlite3_context *context);
+static void xirr_pair_final(sqlite3_context *context);
+static void xirr_pair_value(sqlite3_context *context);
+static void xirr_pair_rate_func(sqlite3_context *context, int argc, sqlite3_value **argv);
 static void xirr_destroy(void *pAggregate);
 
 // Helper Function Implementations
 static bool has_positive_and_negative(const XirrData *data, double current_value);
+static bool has_single_sign_change(const XirrData *data, double current_value);
+static bool is_valid_rate(double rate);
 static double get_base_date(const XirrData *data, double current_row_date);
 static int is_leap_year(int year);
 static int days_in_month(int year, int month);
@@ -154,13 +206,16 @@ static double date_to_days_from_components(int year, int month, int day);
 static bool parse_date_string(const char *date_str, double *out_days);
 static bool parse_custom_rates(const char *rates_str, double **out_rates, size_t *out_count);
 static bool parse_scan_config(const char *config_str, double *start, double *end, double *step);
-static double calculate_npv(double rate, const XirrData *data, double current_row_date, double current_value, double base_date);
-static double calculate_npv_derivative(double rate, const XirrData *data, double current_row_date, double current_value, double base_date);
+static double calculate_npv_and_derivative(double rate, const XirrData *data, double current_row_date, double current_value, double base_date, double *out_derivative);
+static void accumulate_discounted_flows(const double *years, const double *values, size_t count, double base_years, double log_growth, double *npv, double *weighted_npv);
 static void get_circular_data(const XirrData *data, size_t logical_index, double *date, double *value);
 static void add_to_circular_buffer(XirrData *data, double date, double value);
-static void remove_from_circular_buffer(XirrData *data);
+static bool merge_into_last_entry(XirrData *data, double date, double value);
+static void remove_from_circular_buffer(XirrData *data, double value);
+static int store_cash_flow(XirrData *data, double date, double value);
 static int init_xirr_data(XirrData *data);
 static int grow_xirr_buffer(XirrData *data);
+static void free_xirr_data(XirrData *data);
 static void set_result_double(sqlite3_context *context, double result);
 static int compare_doubles_desc(const void *a, const void *b);
 static char *format_rates_to_string(double *rates, size_t count, int include_empty, int filter_unique, int sort_desc);
@@ -363,71 +418,76 @@ static bool parse_scan_config(const char *config_str, double *start, double *end
 }
 
 /**
- * @brief Calculates the Net Present Value (NPV) for a given discount rate and series of cash flows.
+ * @brief Calculates the Net Present Value (NPV) and its derivative with respect to the rate in a single pass.
+ *
+ * Each flow is discounted by (1 + rate)^-t = exp(-t * log1p(rate)), so the logarithm is taken once per call
+ * and every flow costs a single exp(). The derivative of each discounted flow is -t / (1 + rate) times the
+ * flow itself, which lets both sums share the same discount factors. The year fractions cached in the buffer
+ * are measured from the epoch, so they are shifted by the year fraction of `base_date`, which may move as the
+ * window frame slides.
  * @param rate The discount rate to apply.
  * @param data The circular buffer containing the historical cash flows.
  * @param current_row_date The date of the current row being processed.
  * @param current_value The value of the current row.
  * @param base_date The earliest date in the entire cash flow series, used as the reference for discounting.
- * @return The calculated NPV.
+ * @param out_derivative Pointer to store the derivative of the NPV, or NULL if it is not needed.
+ * @return The calculated NPV, or NAN if it is not a finite number.
  */
-static double calculate_npv(double rate, const XirrData *data, double current_row_date, double current_value, double base_date) {
-    double npv = 0.0;
-
-    for (size_t i = 0; i < data->count; i++) {
-        double date, value;
-        get_circular_data(data, i, &date, &value);
-        // Calculate the time difference in years from the first cash flow.
-        double years = (date - base_date) / DAYS_PER_YEAR;
-        // Calculate the discount factor.
-        double factor = pow(1.0 + rate, years);
-        if (isinf(factor) || isnan(factor))
-            return NAN;
-        // Add the discounted cash flow to the total NPV.
-        npv += value / factor;
-    }
+static double calculate_npv_and_derivative(double rate, const XirrData *data, double current_row_date, double current_value, double base_date, double *out_derivative) {
+    double log_growth = log1p(rate);
+    double base_years = base_date / DAYS_PER_YEAR;
+    double npv = 0.0, weighted_npv = 0.0;
+
+    // The circular buffer holds at most two contiguous segments: from the head to the end of the arrays,
+    // and from the start of the arrays up to the tail. Each one is a plain loop the compiler can vectorize.
+    size_t first_count = data->capacity - data->head;
+    if (first_count > data->count)
+        first_count = data->count;
+    accumulate_discounted_flows(data->years + data->head, data->values + data->head, first_count, base_years, log_growth, &npv, &weighted_npv);
+    accumulate_discounted_flows(data->years, data->values, data->count - first_count, base_years, log_growth, &npv, &weighted_npv);
 
     // Also include the value from the optional `current_value` argument, discounted appropriately.
     double current_years = (current_row_date - base_date) / DAYS_PER_YEAR;
-    double current_factor = pow(1.0 + rate, current_years);
-    if (isinf(current_factor) || isnan(current_factor))
+    double current_discounted = current_value * exp(-current_years * log_growth);
+    npv += current_discounted;
+    weighted_npv += current_years * current_discounted;
+
+    if (!isfinite(npv) || !isfinite(weighted_npv)) {
+        if (out_derivative)
+            *out_derivative = NAN;
         return NAN;
-    npv += current_value / current_factor;
+    }
 
+    if (out_derivative)
+        *out_derivative = -weighted_npv / (1.0 + rate);
     return npv;
 }
 
 /**
- * @brief Calculates the derivative of the NPV function with respect to the rate.
- *
- * This is required for the Newton-Raphson method, which uses the derivative to find the root of the NPV function.
- * @param rate The discount rate.
- * @param data The circular buffer containing cash flows.
- * @param current_row_date The date of the current row.
- * @param current_value The value of the current row.
- * @param base_date The earliest date in the cash flow series.
- * @return The calculated derivative.
+ * @brief Adds a contiguous run of discounted cash flows to the NPV sums.
+ * @param years The year fractions of the flows, measured from the epoch.
+ * @param values The cash flow values.
+ * @param count The number of flows in the run.
+ * @param base_years The year fraction of the discounting baseline, measured from the epoch.
+ * @param log_growth The natural logarithm of (1 + rate).
+ * @param npv Pointer to the running sum of discounted flows.
+ * @param weighted_npv Pointer to the running sum of discounted flows weighted by their year fraction from the baseline.
  */
-static double calculate_npv_derivative(double rate, const XirrData *data, double current_row_date, double current_value, double base_date) {
-    double derivative = 0.0;
+static void accumulate_discounted_flows(const double *years, const double *values, size_t count, double base_years, double log_growth, double *npv, double *weighted_npv) {
+    double npv_sum = 0.0, weighted_sum = 0.0;
 
-    for (size_t i = 0; i < data->count; i++) {
-        double date, value;
-        get_circular_data(data, i, &date, &value);
-        double years = (date - base_date) / DAYS_PER_YEAR;
-        double factor = pow(1.0 + rate, years + 1.0);
-        if (isinf(factor) || isnan(factor))
-            return NAN;
-        derivative -= years * value / factor;
+#if XIRR_VECTORIZE
+#pragma omp simd reduction(+ : npv_sum, weighted_sum)
+#endif
+    for (size_t i = 0; i < count; i++) {
+        double t = years[i] - base_years;
+        double discounted = values[i] * exp(-t * log_growth);
+        npv_sum += discounted;
+        weighted_sum += t * discounted;
     }
 
-    double current_years = (current_row_date - base_date) / DAYS_PER_YEAR;
-    double current_factor = pow(1.0 + rate, current_years + 1.0);
-    if (isinf(current_factor) || isnan(current_factor))
-        return NAN;
-    derivative -= current_years * current_value / current_factor;
-
-    return derivative;
+    *npv += npv_sum;
+    *weighted_npv += weighted_sum;
 }
 
 /**
@@ -453,24 +513,82 @@ static void get_circular_data(const XirrData *data, size_t logical_index, double
 static void add_to_circular_buffer(XirrData *data, double date, double value) {
     // Add the new data at the tail position.
     data->dates[data->tail] = date;
+    data->years[data->tail] = date / DAYS_PER_YEAR;
     data->values[data->tail] = value;
+    data->row_counts[data->tail] = 1;
     // Move the tail forward, wrapping around if necessary.
     data->tail = (data->tail + 1) % data->capacity;
     data->count++;
 }
 
 /**
- * @brief Removes the oldest cash flow from the front of the circular buffer.
+ * @brief Merges a cash flow into the newest entry of the circular buffer if both share the same date.
  * @param data The XirrData struct.
+ * @param date The date of the cash flow.
+ * @param value The value of the cash flow.
+ * @return `true` if the flow was merged, `false` if it needs a new entry.
  */
-static void remove_from_circular_buffer(XirrData *data) {
+static bool merge_into_last_entry(XirrData *data, double date, double value) {
+    if (data->count == 0)
+        return false;
+
+    size_t last_idx = (data->tail + data->capacity - 1) % data->capacity;
+    if (data->dates[last_idx] != date)
+        return false;
+
+    data->values[last_idx] += value;
+    data->row_counts[last_idx]++;
+    return true;
+}
+
+/**
+ * @brief Removes the oldest cash flow row from the front of the circular buffer.
+ *
+ * If several rows were merged into the oldest entry, only this row's value is subtracted from it,
+ * and the entry itself is dropped once its last row leaves the window.
+ * @param data The XirrData struct.
+ * @param value The value of the row leaving the window.
+ */
+static void remove_from_circular_buffer(XirrData *data, double value) {
     if (data->count == 0)
         return;
+
+    if (data->row_counts[data->head] > 1) {
+        data->values[data->head] -= value;
+        data->row_counts[data->head]--;
+        return;
+    }
+
     // Move the head forward, effectively "removing" the oldest element without shifting memory.
     data->head = (data->head + 1) % data->capacity;
     data->count--;
 }
 
+/**
+ * @brief Stores a non-zero cash flow, merging it into the newest entry if both share the same date.
+ * @param data The XirrData struct.
+ * @param date The date of the cash flow.
+ * @param value The value of the cash flow.
+ * @return SQLITE_OK on success, SQLITE_NOMEM on memory allocation failure.
+ */
+static int store_cash_flow(XirrData *data, double date, double value) {
+    // Zero flows do not contribute to the NPV, and flows sharing a date are merged into one entry.
+    if (value == 0.0 || merge_into_last_entry(data, date, value)) {
+        return SQLITE_OK;
+    }
+
+    // Grow the circular buffer if it's full.
+    if (data->count >= data->capacity) {
+        if (grow_xirr_buffer(data) != SQLITE_OK) {
+            return SQLITE_NOMEM;
+        }
+    }
+
+    // Add the cash flow to the buffer.
+    add_to_circular_buffer(data, date, value);
+    return SQLITE_OK;
+}
+
 /**
  * @brief Initializes the XirrData structure, allocating initial memory for the buffers.
  * @param data The XirrData struct to initialize.
@@ -482,16 +600,26 @@ static int init_xirr_data(XirrData *data) {
     data->head = 0;
     data->tail = 0;
     data->dates = (double *)malloc(data->capacity * sizeof(double));
+    data->years = (double *)malloc(data->capacity * sizeof(double));
     data->values = (double *)malloc(data->capacity * sizeof(double));
-    if (!data->dates || !data->values) {
+    data->row_counts = (size_t *)malloc(data->capacity * sizeof(size_t));
+    if (!data->dates || !data->years || !data->values || !data->row_counts) {
         if (data->dates) {
             free(data->dates);
             data->dates = NULL;
         }
+        if (data->years) {
+            free(data->years);
+            data->years = NULL;
+        }
         if (data->values) {
             free(data->values);
             data->values = NULL;
         }
+        if (data->row_counts) {
+            free(data->row_counts);
+            data->row_counts = NULL;
+        }
         return SQLITE_NOMEM;
     }
     return SQLITE_OK;
@@ -508,17 +636,27 @@ static int init_xirr_data(XirrData *data) {
 static int grow_xirr_buffer(XirrData *data) {
     size_t new_capacity = data->capacity * CAPACITY_GROWTH_FACTOR;
     double *new_dates = (double *)malloc(new_capacity * sizeof(double));
+    double *new_years = (double *)malloc(new_capacity * sizeof(double));
     double *new_values = (double *)malloc(new_capacity * sizeof(double));
+    size_t *new_row_counts = (size_t *)malloc(new_capacity * sizeof(size_t));
 
-    if (!new_dates || !new_values) {
+    if (!new_dates || !new_years || !new_values || !new_row_counts) {
         if (new_dates) {
             free(new_dates);
             new_dates = NULL;
         }
+        if (new_years) {
+            free(new_years);
+            new_years = NULL;
+        }
         if (new_values) {
             free(new_values);
             new_values = NULL;
         }
+        if (new_row_counts) {
+            free(new_row_counts);
+            new_row_counts = NULL;
+        }
         return SQLITE_NOMEM;
     }
 
@@ -528,27 +666,63 @@ static int grow_xirr_buffer(XirrData *data) {
     // and part at the beginning). This loop correctly linearizes the data
     // into the new, larger, contiguous buffer.
     for (size_t i = 0; i < data->count; i++) {
+        size_t phys_idx = (data->head + i) % data->capacity;
         get_circular_data(data, i, &new_dates[i], &new_values[i]);
+        new_years[i] = data->years[phys_idx];
+        new_row_counts[i] = data->row_counts[phys_idx];
     }
 
     if (data->dates) {
         free(data->dates);
         data->dates = NULL;
     }
+    if (data->years) {
+        free(data->years);
+        data->years = NULL;
+    }
     if (data->values) {
         free(data->values);
         data->values = NULL;
     }
+    if (data->row_counts) {
+        free(data->row_counts);
+        data->row_counts = NULL;
+    }
 
     // Update the data pointers and reset head/tail for the new, larger linear layout.
     data->dates = new_dates;
+    data->years = new_years;
     data->values = new_values;
+    data->row_counts = new_row_counts;
     data->capacity = new_capacity;
     data->head = 0;
     data->tail = data->count;
     return SQLITE_OK;
 }
 
+/**
+ * @brief Releases the memory held by the buffers of an XirrData structure.
+ * @param data The XirrData struct to free.
+ */
+static void free_xirr_data(XirrData *data) {
+    if (data->dates) {
+        free(data->dates);
+        data->dates = NULL;
+    }
+    if (data->years) {
+        free(data->years);
+        data->years = NULL;
+    }
+    if (data->values) {
+        free(data->values);
+        data->values = NULL;
+    }
+    if (data->row_counts) {
+        free(data->row_counts);
+        data->row_counts = NULL;
+    }
+}
+
 /**
  * @brief Sets the SQLite result to a double value, handling non-finite cases (NAN, INF) by returning NULL.
  * @param context SQLite context.
@@ -707,8 +881,8 @@ static char *format_rates_to_string(double *rates, size_t count, int include_emp
 static double find_root_newton_raphson(double start_rate, const XirrData *data, double current_row_date, double current_value, double base_date) {
     double rate = start_rate;
     for (int i = 0; i < XIRR_MAX_ITERATIONS; i++) {
-        double npv = calculate_npv(rate, data, current_row_date, current_value, base_date);
-        double npv_derivative = calculate_npv_derivative(rate, data, current_row_date, current_value, base_date);
+        double npv_derivative;
+        double npv = calculate_npv_and_derivative(rate, data, current_row_date, current_value, base_date, &npv_derivative);
 
         // Stop if the calculation results in non-finite numbers or if the derivative is too close to zero (which would cause division by zero).
         if (isnan(npv) || isinf(npv) || isnan(npv_derivative) || isinf(npv_derivative) || fabs(npv_derivative) < XIRR_DERIVATIVE_TOLERANCE) {
@@ -766,8 +940,8 @@ static bool has_positive_and_negative(const XirrData *data, double current_value
 }
 
 /**
- * @brief Finds the earliest date in the cash flow series to use as the discounting baseline (t=0).
- * @param data The circular buffer of cash flows.
+ * @brief Finds the earliest date in the window frame to use as the discounting baseline (t=0).
+ * @param data The circular buffer of frame dates.
  * @param current_row_date The date of the current row being processed.
  * @return The earliest date as a double representing days since the epoch.
  */
@@ -805,40 +979,116 @@ static double *select_starting_rates(const XirrWindowContext *ctx, size_t *out_n
     return default_initial_guesses;
 }
 
+/**
+ * @brief Checks if the chronological cash flow series changes sign exactly once.
+ *
+ * By Descartes' rule of signs such a series has exactly one rate above -100% at which the NPV is zero,
+ * so any converging starting point leads to the same solution.
+ * @param data The circular buffer of cash flows, ordered by date.
+ * @param current_value The final cash flow value for the current window.
+ * @return `true` if there is exactly one sign change, `false` otherwise.
+ */
+static bool has_single_sign_change(const XirrData *data, double current_value) {
+    int sign_changes = 0;
+    double previous_value = 0.0;
+
+    for (size_t i = 0; i <= data->count; i++) {
+        double date, value;
+        if (i < data->count) {
+            get_circular_data(data, i, &date, &value);
+        } else {
+            value = current_value;
+        }
+        if (value == 0.0)
+            continue;
+        if (previous_value != 0.0 && (value > 0) != (previous_value > 0)) {
+            if (++sign_changes > 1)
+                return false;
+        }
+        previous_value = value;
+    }
+    return sign_changes == 1;
+}
+
+/**
+ * @brief Checks whether a rate returned by the Newton-Raphson method is a usable solution.
+ * @param rate The rate to check.
+ * @return `true` if the rate is finite and strictly within the allowed bounds, `false` otherwise.
+ */
+static bool is_valid_rate(double rate) {
+    return !isnan(rate) && !isinf(rate) && rate > XIRR_MIN_RATE && rate < XIRR_MAX_RATE;
+}
+
 /**
  * @brief Finds a single, stable XIRR solution using the Newton-Raphson method.
  *
  * For window functions, if a `calculation_start_date` is set, this function will return NAN
  * for any row with a date before `calculation_start_date`. Otherwise, it calculates the XIRR
  * using all cash flows in the current window.
- * @param ctx The window context with all cash flow data.
+ *
+ * Consecutive rows of a window frame usually differ by a single cash flow, so the rate converged
+ * for the previous row is tried first as a warm start. The starting rates are only used as a
+ * fallback when there is no previous rate or it fails to converge. Warm starts are only used when
+ * the solution is unique, so they never change which root is returned, and are skipped when custom
+ * starting rates are provided, so that the user's guesses keep full control over the search.
+ * @param ctx The window context with all cash flow data. The converged rate is stored in it for the next row.
  * @return The calculated XIRR, or NAN if a solution is not found or inputs are invalid.
  */
-static double calculate_single_xirr(const XirrWindowContext *ctx) {
+static double calculate_single_xirr(XirrWindowContext *ctx) {
+    return calculate_series_xirr(ctx, &ctx->data, &ctx->previous_rate, &ctx->previous_rate_set);
+}
+
+/**
+ * @brief Calculates a single XIRR value for one cash flow series of the window context.
+ *
+ * The series shares the frame dates, the current value and the calculation start date of the context,
+ * which lets the `xirr_pair` function solve two series over the same window pass.
+ * @param ctx The window context containing the shared window state.
+ * @param data The circular buffer holding the non-zero cash flows of the series.
+ * @param previous_rate Pointer to the warm start rate of the series, updated with the result.
+ * @param previous_rate_set Pointer to the flag indicating whether `previous_rate` holds a valid converged rate.
+ * @return The calculated XIRR value, or NAN if no solution is found.
+ */
+static double calculate_series_xirr(const XirrWindowContext *ctx, const XirrData *data, double *previous_rate, int *previous_rate_set) {
     // For window functions, return NULL if the current row's date is before the specified start date.
     if (ctx->start_date_set && ctx->current_row_date < ctx->calculation_start_date) {
         return NAN;
     }
     // A valid XIRR requires at least one cash flow and a mix of positive and negative flows.
-    if (ctx->data.count == 0 || !has_positive_and_negative(&ctx->data, ctx->current_value)) {
+    if (data->count == 0 || !has_positive_and_negative(data, ctx->current_value)) {
         return NAN;
     }
 
+    double base_date = get_base_date(&ctx->frame_dates, ctx->current_row_date);
+    bool use_warm_start = *previous_rate_set && !(ctx->custom_starting_rates && ctx->num_custom_rates > 0) &&
+                          has_single_sign_change(data, ctx->current_value);
+
+    if (use_warm_start) {
+        double rate = find_root_newton_raphson(*previous_rate, data, ctx->current_row_date, ctx->current_value, base_date);
+        if (is_valid_rate(rate)) {
+            *previous_rate = rate;
+            return rate;
+        }
+    }
+
     size_t num_starts;
     double *starting_rates = select_starting_rates(ctx, &num_starts);
-    double base_date = get_base_date(&ctx->data, ctx->current_row_date);
 
     double result_rate = NAN;
     for (size_t start_idx = 0; start_idx < num_starts; start_idx++) {
-        double rate = find_root_newton_raphson(starting_rates[start_idx], &ctx->data, ctx->current_row_date, ctx->current_value, base_date);
+        double rate = find_root_newton_raphson(starting_rates[start_idx], data, ctx->current_row_date, ctx->current_value, base_date);
 
         // Accept the first valid, finite rate found.
-        if (!isnan(rate) && !isinf(rate) && rate > XIRR_MIN_RATE && rate < XIRR_MAX_RATE) {
+        if (is_valid_rate(rate)) {
             result_rate = rate;
             break; // Found a stable rate, stop searching.
         }
     }
 
+    // Remember the result for the next row, or fall back to the starting rates if nothing converged.
+    *previous_rate = result_rate;
+    *previous_rate_set = !isnan(result_rate);
+
     return result_rate;
 }
 
@@ -866,7 +1116,7 @@ static XirrCalcResult calculate_all_xirr_solutions(const XirrWindowContext *ctx)
 
     size_t num_starts;
     double *starting_rates = select_starting_rates(ctx, &num_starts);
-    double base_date = get_base_date(&ctx->data, ctx->current_row_date);
+    double base_date = get_base_date(&ctx->frame_dates, ctx->current_row_date);
 
     result.rates = (double *)malloc(num_starts * sizeof(double));
     if (!result.rates) {
@@ -911,15 +1161,15 @@ static char *calculate_xirr_scan(sqlite3_context *context, const XirrWindowConte
     double *found_rates = NULL;
     size_t found_count = 0, found_capacity = 0;
 
-    double base_date = get_base_date(&ctx->data, ctx->current_row_date);
-    double prev_npv = calculate_npv(scan_start, &ctx->data, ctx->current_row_date, ctx->current_value, base_date);
+    double base_date = get_base_date(&ctx->frame_dates, ctx->current_row_date);
+    double prev_npv = calculate_npv_and_derivative(scan_start, &ctx->data, ctx->current_row_date, ctx->current_value, base_date, NULL);
 
     // Scan a range of interest rates to find potential IRR solutions.
     // The strategy is to detect a sign change in the Net Present Value (NPV)
     // between two consecutive steps. A sign change (e.g., from + to -) implies
     // that a root of the NPV function, which is an IRR, exists between those two points.
     for (double r = scan_start + scan_step; r <= scan_end; r += scan_step) {
-        double current_npv = calculate_npv(r, &ctx->data, ctx->current_row_date, ctx->current_value, base_date);
+        double current_npv = calculate_npv_and_derivative(r, &ctx->data, ctx->current_row_date, ctx->current_value, base_date, NULL);
         if (prev_npv * current_npv < 0) {
             // Use Newton-Raphson to precisely locate the root within this small interval.
             // We start the search from the midpoint of the interval where the sign change occurred.
@@ -975,10 +1225,20 @@ static char *calculate_xirr_scan(sqlite3_context *context, const XirrWindowConte
 static void init_xirr_window_context(XirrWindowContext *ctx) {
     ctx->data.values = NULL;
     ctx->data.dates = NULL;
+    ctx->data.years = NULL;
+    ctx->data.row_counts = NULL;
     ctx->data.count = 0;
     ctx->data.capacity = 0;
     ctx->data.head = 0;
     ctx->data.tail = 0;
+    ctx->frame_dates.values = NULL;
+    ctx->frame_dates.dates = NULL;
+    ctx->frame_dates.years = NULL;
+    ctx->frame_dates.row_counts = NULL;
+    ctx->frame_dates.count = 0;
+    ctx->frame_dates.capacity = 0;
+    ctx->frame_dates.head = 0;
+    ctx->frame_dates.tail = 0;
     ctx->current_value = 0.0;
     ctx->current_row_date = 0.0;
     ctx->custom_starting_rates = NULL;
@@ -986,6 +1246,18 @@ static void init_xirr_window_context(XirrWindowContext *ctx) {
     ctx->scan_config_str = NULL;
     ctx->calculation_start_date = 0.0;
     ctx->start_date_set = 0;
+    ctx->previous_rate = 0.0;
+    ctx->previous_rate_set = 0;
+    ctx->pair_data.values = NULL;
+    ctx->pair_data.dates = NULL;
+    ctx->pair_data.years = NULL;
+    ctx->pair_data.row_counts = NULL;
+    ctx->pair_data.count = 0;
+    ctx->pair_data.capacity = 0;
+    ctx->pair_data.head = 0;
+    ctx->pair_data.tail = 0;
+    ctx->pair_previous_rate = 0.0;
+    ctx->pair_previous_rate_set = 0;
 }
 
 /**
@@ -1008,7 +1280,7 @@ static int xirr_step_common(sqlite3_context *context, int argc, sqlite3_value **
     // Initialize the context on the first call for this window.
     if (ctx->data.values == NULL) {
         init_xirr_window_context(ctx);
-        if (init_xirr_data(&ctx->data) != SQLITE_OK) {
+        if (init_xirr_data(&ctx->data) != SQLITE_OK || init_xirr_data(&ctx->frame_dates) != SQLITE_OK) {
             sqlite3_result_error_nomem(context);
             return SQLITE_NOMEM;
         }
@@ -1042,17 +1314,21 @@ static int xirr_step_common(sqlite3_context *context, int argc, sqlite3_value **
     double value = sqlite3_value_double(argv[1]);
     // --- End Argument Validation ---
 
-    // Grow the circular buffer if it's full.
-    if (ctx->data.count >= ctx->data.capacity) {
-        if (grow_xirr_buffer(&ctx->data) != SQLITE_OK) {
+    ctx->current_row_date = date_days; // Set for window function logic
+
+    // Every row date is kept to preserve the discounting baseline, even when its flow is not stored.
+    if (ctx->frame_dates.count >= ctx->frame_dates.capacity) {
+        if (grow_xirr_buffer(&ctx->frame_dates) != SQLITE_OK) {
             sqlite3_result_error_nomem(context);
             return SQLITE_NOMEM;
         }
     }
+    add_to_circular_buffer(&ctx->frame_dates, date_days, 0.0);
 
-    // Add the cash flow to the buffer and set current row date.
-    add_to_circular_buffer(&ctx->data, date_days, value);
-    ctx->current_row_date = date_days; // Set for window function logic
+    if (store_cash_flow(&ctx->data, date_days, value) != SQLITE_OK) {
+        sqlite3_result_error_nomem(context);
+        return SQLITE_NOMEM;
+    }
 
     return SQLITE_OK;
 }
@@ -1206,22 +1482,102 @@ static void xirr_scan_step(sqlite3_context *context, int argc, sqlite3_value **a
     }
 }
 
+/**
+ * @brief Step function for `xirr_pair`.
+ *
+ * Both series share the date, the current value and the start date, so the date is parsed and the frame date
+ * stored once per row, while the two flows are stored in their own circular buffers. A row with a NULL date
+ * or a NULL in either series is ignored by both of them.
+ * @param context The SQLite function context.
+ * @param argc The number of arguments passed to the function.
+ * @param argv The array of argument values.
+ */
+static void xirr_pair_step(sqlite3_context *context, int argc, sqlite3_value **argv) {
+    if (argc < 3 || argc > 5) {
+        sqlite3_result_error(context, "XIRR_PAIR requires 3 to 5 arguments: xirr_pair(date, value_a, value_b, [current_value], [start_date]).", -1);
+        return;
+    }
+
+    // Validate arg 3 before anything is stored, so that both series always receive the same rows.
+    int pair_value_type = sqlite3_value_type(argv[2]);
+    if (pair_value_type != SQLITE_NULL && pair_value_type != SQLITE_FLOAT && pair_value_type != SQLITE_INTEGER) {
+        sqlite3_result_error(context, "Argument 3 (value_b) must be a number.", -1);
+        return;
+    }
+
+    // The common step handles the date and the first series. A NULL in the second series is passed
+    // to it in place of the first value, so that the row is skipped by the first series as well.
+    sqlite3_value *common_argv[] = {argv[0], pair_value_type == SQLITE_NULL ? argv[2] : argv[1]};
+    if (xirr_step_common(context, 2, common_argv) != SQLITE_OK) {
+        return;
+    }
+
+    XirrWindowContext *ctx = (XirrWindowContext *)sqlite3_aggregate_context(context, 0);
+    if (!ctx)
+        return;
+
+    if (ctx->pair_data.values == NULL && init_xirr_data(&ctx->pair_data) != SQLITE_OK) {
+        sqlite3_result_error_nomem(context);
+        return;
+    }
+
+    // --- Optional Argument Validation ---
+    if (argc > 3) {
+        int arg_type = sqlite3_value_type(argv[3]);
+        if (arg_type == SQLITE_FLOAT || arg_type == SQLITE_INTEGER) {
+            ctx->current_value = sqlite3_value_double(argv[3]);
+        } else if (arg_type != SQLITE_NULL) {
+            sqlite3_result_error(context, "Argument 4 (current_value) must be a number.", -1);
+            return;
+        }
+    }
+    if (argc > 4 && sqlite3_value_type(argv[4]) != SQLITE_NULL) {
+        double date_days_opt;
+        if (sqlite3_value_type(argv[4]) != SQLITE_TEXT || !parse_date_string((const char *)sqlite3_value_text(argv[4]), &date_days_opt)) {
+            sqlite3_result_error(context, "Argument 5 (start_date) must be a text string in 'YYYY-MM-DD' format.", -1);
+            return;
+        }
+        ctx->calculation_start_date = date_days_opt;
+        ctx->start_date_set = 1;
+    }
+
+    if (sqlite3_value_type(argv[0]) == SQLITE_NULL || sqlite3_value_type(argv[1]) == SQLITE_NULL || pair_value_type == SQLITE_NULL) {
+        return;
+    }
+
+    // The common step has already validated the date and set it as the current row date.
+    if (store_cash_flow(&ctx->pair_data, ctx->current_row_date, sqlite3_value_double(argv[2])) != SQLITE_OK) {
+        sqlite3_result_error_nomem(context);
+    }
+}
+
 /**
  * @brief Unified inverse function for all XIRR variants (for window functions).
  *
  * This is called when a row moves out of the window frame. It removes the oldest
- * cash flow from the circular buffer to keep the window's data current.
+ * cash flow from the circular buffer to keep the window's data current. Rows that were
+ * never stored by the step function (NULL or zero flows) are ignored.
  * @param context The SQLite function context.
  * @param argc The number of arguments passed to the function.
  * @param argv The array of argument values for the row leaving the window.
  */
 static void xirr_inverse_unified(sqlite3_context *context, int argc, sqlite3_value **argv) {
     XirrWindowContext *ctx = (XirrWindowContext *)sqlite3_aggregate_context(context, 0);
-    if (ctx && ctx->data.values && ctx->data.count > 0) {
-        remove_from_circular_buffer(&ctx->data);
-        if (ctx->data.count == 0) {
-            ctx->current_value = 0.0;
-        }
+    if (argc < 2 || sqlite3_value_type(argv[0]) == SQLITE_NULL || sqlite3_value_type(argv[1]) == SQLITE_NULL) {
+        return;
+    }
+    if (!ctx || !ctx->data.values) {
+        return;
+    }
+
+    remove_from_circular_buffer(&ctx->frame_dates, 0.0);
+    if (ctx->frame_dates.count == 0) {
+        ctx->current_value = 0.0;
+    }
+
+    double value = sqlite3_value_double(argv[1]);
+    if (value != 0.0) {
+        remove_from_circular_buffer(&ctx->data, value);
     }
 }
 
@@ -1372,6 +1728,91 @@ static void xirr_scan_value(sqlite3_context *context) {
     xirr_scan_final(context);
 }
 
+/**
+ * @brief Inverse function for `xirr_pair` (for window functions).
+ *
+ * Removes the row leaving the window frame from the shared frame dates and from both series,
+ * ignoring the rows that were skipped by the step function.
+ * @param context The SQLite function context.
+ * @param argc The number of arguments passed to the function.
+ * @param argv The array of argument values for the row leaving the window.
+ */
+static void xirr_pair_inverse(sqlite3_context *context, int argc, sqlite3_value **argv) {
+    if (argc < 3 || sqlite3_value_type(argv[2]) == SQLITE_NULL) {
+        return;
+    }
+
+    xirr_inverse_unified(context, argc, argv);
+
+    XirrWindowContext *ctx = (XirrWindowContext *)sqlite3_aggregate_context(context, 0);
+    if (!ctx || !ctx->pair_data.values || sqlite3_value_type(argv[0]) == SQLITE_NULL || sqlite3_value_type(argv[1]) == SQLITE_NULL) {
+        return;
+    }
+
+    double value = sqlite3_value_double(argv[2]);
+    if (value != 0.0) {
+        remove_from_circular_buffer(&ctx->pair_data, value);
+    }
+}
+
+/**
+ * @brief Final callback for `xirr_pair`.
+ *
+ * Solves both series and packs their rates into a BLOB of `XIRR_PAIR_SIZE` doubles, with NAN standing
+ * for a series without a solution. Returns NULL if neither series has a solution.
+ * @param context The SQLite function context.
+ */
+static void xirr_pair_final(sqlite3_context *context) {
+    XirrWindowContext *ctx = (XirrWindowContext *)sqlite3_aggregate_context(context, 0);
+    if (!ctx) {
+        return;
+    }
+
+    double rates[XIRR_PAIR_SIZE];
+    rates[0] = calculate_single_xirr(ctx);
+    rates[1] = calculate_series_xirr(ctx, &ctx->pair_data, &ctx->pair_previous_rate, &ctx->pair_previous_rate_set);
+
+    if (isnan(rates[0]) && isnan(rates[1])) {
+        sqlite3_result_null(context);
+        return;
+    }
+    sqlite3_result_blob(context, rates, sizeof(rates), SQLITE_TRANSIENT);
+}
+
+/**
+ * @brief Value callback for `xirr_pair` (window function mode).
+ * @param context The SQLite function context.
+ */
+static void xirr_pair_value(sqlite3_context *context) {
+    xirr_pair_final(context);
+}
+
+/**
+ * @brief Scalar function `xirr_pair_rate(packed, index)` that unpacks one rate from the result of `xirr_pair`.
+ * @param context The SQLite function context.
+ * @param argc The number of arguments passed to the function.
+ * @param argv The array of argument values.
+ */
+static void xirr_pair_rate_func(sqlite3_context *context, int argc, sqlite3_value **argv) {
+    if (sqlite3_value_type(argv[0]) == SQLITE_NULL || sqlite3_value_type(argv[1]) == SQLITE_NULL) {
+        sqlite3_result_null(context);
+        return;
+    }
+    if (sqlite3_value_type(argv[0]) != SQLITE_BLOB || sqlite3_value_bytes(argv[0]) != (int)(XIRR_PAIR_SIZE * sizeof(double))) {
+        sqlite3_result_error(context, "Argument 1 (packed) must be a value returned by xirr_pair.", -1);
+        return;
+    }
+    int index = sqlite3_value_int(argv[1]);
+    if (index < 0 || index >= XIRR_PAIR_SIZE) {
+        sqlite3_result_error(context, "Argument 2 (index) must be 0 or 1.", -1);
+        return;
+    }
+
+    double rates[XIRR_PAIR_SIZE];
+    memcpy(rates, sqlite3_value_blob(argv[0]), sizeof(rates));
+    set_result_double(context, rates[index]);
+}
+
 /**
  * @brief Destructor for the aggregate context.
  *
@@ -1383,14 +1824,9 @@ static void xirr_scan_value(sqlite3_context *context) {
 static void xirr_destroy(void *pAggregate) {
     XirrWindowContext *ctx = (XirrWindowContext *)pAggregate;
     if (ctx) {
-        if (ctx->data.dates) {
-            free(ctx->data.dates);
-            ctx->data.dates = NULL;
-        }
-        if (ctx->data.values) {
-            free(ctx->data.values);
-            ctx->data.values = NULL;
-        }
+        free_xirr_data(&ctx->frame_dates);
+        free_xirr_data(&ctx->data);
+        free_xirr_data(&ctx->pair_data);
         if (ctx->custom_starting_rates) {
             free(ctx->custom_starting_rates);
             ctx->custom_starting_rates = NULL;
@@ -1454,12 +1890,14 @@ int sqlite3_extension_init(sqlite3 *db, char **pzErrMsg, const sqlite3_api_routi
     const char *xirr_all_names[] = {"xirr_all"};
     const char *xirr_unique_names[] = {"xirr_unique"};
     const char *xirr_scan_names[] = {"xirr_scan"};
+    const char *xirr_pair_names[] = {"xirr_pair"};
 
     XirrFunctionGroup functions_to_register[] = {
         {xirr_names, sizeof(xirr_names) / sizeof(xirr_names[0]), xirr_step_unified, xirr_final, xirr_value, xirr_inverse_unified},
         {xirr_all_names, sizeof(xirr_all_names) / sizeof(xirr_all_names[0]), xirr_step_unified, xirr_all_final, xirr_all_value, xirr_inverse_unified},
         {xirr_unique_names, sizeof(xirr_unique_names) / sizeof(xirr_unique_names[0]), xirr_step_unified, xirr_unique_final, xirr_unique_value, xirr_inverse_unified},
-        {xirr_scan_names, sizeof(xirr_scan_names) / sizeof(xirr_scan_names[0]), xirr_scan_step, xirr_scan_final, xirr_scan_value, xirr_inverse_unified}};
+        {xirr_scan_names, sizeof(xirr_scan_names) / sizeof(xirr_scan_names[0]), xirr_scan_step, xirr_scan_final, xirr_scan_value, xirr_inverse_unified},
+        {xirr_pair_names, sizeof(xirr_pair_names) / sizeof(xirr_pair_names[0]), xirr_pair_step, xirr_pair_final, xirr_pair_value, xirr_pair_inverse}};
 
     size_t num_groups = sizeof(functions_to_register) / sizeof(functions_to_register[0]);
     for (size_t i = 0; i < num_groups; i++) {
@@ -1469,5 +1907,8 @@ int sqlite3_extension_init(sqlite3 *db, char **pzErrMsg, const sqlite3_api_routi
         }
     }
 
+    // The accessor is a plain scalar function. SQLite matches function names case-insensitively.
+    rc = sqlite3_create_function(db, "xirr_pair_rate", 2, SQLITE_UTF8 | SQLITE_DETERMINISTIC | SQLITE_INNOCUOUS, 0, xirr_pair_rate_func, 0, 0);
+
     return rc;
 }
\ No newline at end of file
@@ -0,0 +1,162 @@
+from typing import Callable
+from sqlalchemy import Connection, Engine, MetaData
+import json
+
+
+def _create_tables(*table_names: str) -> Callable[[Connection, MetaData], None]:
+    def create_tables(connection: Connection, metadata: MetaData):
+        metadata.create_all(
+            connection, tables=[metadata.tables[name] for name in table_names]
+        )
+
+    return create_tables
+
+
+def _has_column(connection: Connection, table_name: str, column_name: str) -> bool:
+    columns = connection.exec_driver_sql(f"PRAGMA table_info({table_name});")
+    return any(column.name == column_name for column in columns)
+
+
+def _add_column(
+    table_name: str, column_name: str, definition: str
+) -> Callable[[Connection, MetaData], None]:
+    def add_column(connection: Connection, metadata: MetaData):
+        # A table created by an earlier migration has the current columns already
+        if not _has_column(connection, table_name, column_name):
+            connection.exec_driver_sql(
+                f"ALTER TABLE {table_name} ADD COLUMN {column_name} {definition};"
+            )
+
+    return add_column
+
+
+def _backfill_asset_symbols(connection: Connection, metadata: MetaData):
+    # The raw symbols were only kept in the transactions of the settings,
+    # whose rows were inserted in the same order as the stored transactions
+    for user_id, transactions in connection.exec_driver_sql(
+        "SELECT user_id, transactions FROM settings;"
+    ):
+        for item in json.loads(transactions).get("items", []):
+            asset_symbols = item["transaction_data"]["asset_symbol"]
+            transaction_ids = connection.exec_driver_sql(
+                "SELECT portfolio_transactions.id FROM portfolio_transactions "
+                "JOIN portfolio_transaction_files ON portfolio_transaction_files.id "
+                "= portfolio_transactions.portfolio_transaction_file_id "
+                "WHERE portfolio_transaction_files.user_id = ? "
+                "AND portfolio_transaction_files.name = ? "
+                "ORDER BY portfolio_transactions.id;",
+                (user_id, item["file_name"]),
+            ).scalars()
+            transaction_ids = list(transaction_ids)
+            if transaction_ids and len(transaction_ids) == len(asset_symbols):
+                connection.exec_driver_sql(
+                    "UPDATE portfolio_transactions SET asset_symbol = ? WHERE id = ?;",
+                    list(zip(asset_symbols, transaction_ids)),
+                )
+
+    # Rows that could not be matched keep at least the symbol of their asset
+    connection.exec_driver_sql(
+        "UPDATE portfolio_transactions SET asset_symbol = "
+        "(SELECT symbol FROM assets WHERE assets.id = portfolio_transactions.asset_id) "
+        "WHERE asset_symbol = '' AND asset_id IS NOT NULL;"
+    )
+
+
+def _drop_settings_transactions(connection: Connection, metadata: MetaData):
+    # The column is NOT NULL, so the table is rebuilt without it
+    connection.exec_driver_sql("""
+        CREATE TABLE settings_new (
+            user_id INTEGER NOT NULL,
+            analysis_currency VARCHAR NOT NULL,
+            ohlc_assets VARCHAR NOT NULL,
+            ohlc_currencies VARCHAR NOT NULL,
+            transaction_files JSON NOT NULL,
+            portfolio_groups JSON NOT NULL,
+            portfolio_group_assets JSON NOT NULL,
+            PRIMARY KEY (user_id),
+            FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE
+        );
+        """)
+    connection.exec_driver_sql("""
+        INSERT INTO settings_new
+        SELECT
+            user_id,
+            analysis_currency,
+            ohlc_assets,
+            ohlc_currencies,
+            transaction_files,
+            portfolio_groups,
+            portfolio_group_assets
+        FROM settings;
+        """)
+    connection.exec_driver_sql("DROP TABLE settings;")
+    connection.exec_driver_sql("ALTER TABLE settings_new RENAME TO settings;")
+
+
+def _move_transactions_out_of_settings(connection: Connection, metadata: MetaData):
+    has_settings_transactions = _has_column(connection, "settings", "transactions")
+    if not _has_column(connection, "portfolio_transactions", "asset_symbol"):
+        connection.exec_driver_sql(
+            "ALTER TABLE portfolio_transactions "
+            "ADD COLUMN asset_symbol VARCHAR NOT NULL DEFAULT '';"
+        )
+        if has_settings_transactions:
+            _backfill_asset_symbols(connection, metadata)
+    if has_settings_transactions:
+        _drop_settings_transactions(connection, metadata)
+
+
+# The migration at index i brings a database from version i to version i + 1
+MIGRATIONS: list[Callable[[Connection, MetaData], None]] = [
+    _create_tables(
+        "calendar_dates",
+        "portfolio_asset_checkpoints",
+        "performance_states",
+        "effective_asset_prices",
+    ),
+    _add_column("portfolio_transaction_files", "content_hash", "VARCHAR"),
+    _move_transactions_out_of_settings,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def _get_version(connection: Connection) -> int:
+    return connection.exec_driver_sql("PRAGMA user_version;").scalar()
+
+
+def _has_tables(connection: Connection) -> bool:
+    return (
+        connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' LIMIT 1;"
+        ).scalar()
+        is not None
+    )
+
+
+def migrate_database(engine: Engine, metadata: MetaData):
+    """
+    Brings the database to the current schema version, which is kept in
+    PRAGMA user_version. An empty database gets the current schema at once,
+    an older one runs the migrations it is missing in a single transaction.
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        if _get_version(connection) >= SCHEMA_VERSION and _has_tables(connection):
+            return
+
+        # The write lock is taken at once, so another process opening the same
+        # database waits and then sees the version this one has written
+        connection.exec_driver_sql("BEGIN IMMEDIATE;")
+        try:
+            version = _get_version(connection)
+            if not _has_tables(connection):
+                metadata.create_all(connection)
+            else:
+                for migration in MIGRATIONS[version:]:
+                    migration(connection, metadata)
+            connection.exec_driver_sql(
+                f"PRAGMA user_version = {max(version, SCHEMA_VERSION)};"
+            )
+            connection.exec_driver_sql("COMMIT;")
+        except Exception:
+            connection.exec_driver_sql("ROLLBACK;")
+            raise
@@ -0,0 +1,47 @@
+from typing import Mapping
+
+# Named sets of SQLite pragmas applied to every new connection.
+# Negative cache_size values are in KiB, mmap_size is in bytes and
+# busy_timeout is in milliseconds.
+PRAGMA_PROFILES = {
+    "default": {
+        "foreign_keys": "ON",
+    },
+    "performance": {
+        "foreign_keys": "ON",
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 268435456,  # 256 MiB
+        "cache_size": -65536,  # 64 MiB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # Connection-local pragmas raised only for the duration of data processing
+    "processing": {
+        "mmap_size": 1073741824,  # 1 GiB
+        "cache_size": -262144,  # 256 MiB
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def get_pragma_profile(
+    name: str, overrides: Mapping[str, str | int] | None = None
+) -> dict[str, str | int]:
+    if name not in PRAGMA_PROFILES:
+        raise ValueError(
+            f"Unknown pragma profile '{name}'. "
+            f"Available profiles: {', '.join(PRAGMA_PROFILES)}."
+        )
+
+    pragmas = dict(PRAGMA_PROFILES[name])
+    if overrides:
+        pragmas.update(overrides)
+
+    for pragma_name, value in pragmas.items():
+        if not pragma_name.isidentifier():
+            raise ValueError(f"Invalid pragma name '{pragma_name}'.")
+        if not str(value).lstrip("-").isalnum():
+            raise ValueError(f"Invalid value '{value}' for pragma '{pragma_name}'.")
+
+    return pragmas
@@ -0,0 +1,5 @@
+from threading import Lock
+
+# yfinance keeps the frames of a download in module globals and the downloads
+# redirect the process-wide stdout and stderr, so only one download runs at a time
+yfinance_lock = Lock()
@@ -11,6 +11,7 @@ URL = os.getenv("API_URL", "http://127.0.0.1:8000")
 HEADER_SESSION_ID = "x-session-id"  # Header for session ID authentication
 
 CACHE_TTL = 60 * 10  # 10 minutes in seconds
+JOB_POLL_INTERVAL_SECONDS = 0.5  # How often a background job of the API is polled
 
 ###################################################################
 # SETTINGS CONSTANTS
@@ -3,6 +3,7 @@ from streamlit.runtime.uploaded_file_manager import UploadedFile
 import pandas as pd
 import requests
 import json
+import time
 
 from streamlit_ui.constants import *
 
@@ -196,8 +197,8 @@ def save_settings_and_load_data() -> None:
     """
     Saves current settings and triggers data processing.
 
-    This function sends the current settings to the backend to be saved,
-    and then initiates the data processing pipeline.
+    This function submits the current settings to the backend as a background job,
+    which saves them and runs the data processing pipeline, and waits for it.
     It also increments a session-specific counter to force a refresh of cached data.
     """
     # Increment refresh counter to invalidate session-specific cache
@@ -242,23 +243,68 @@ def save_settings_and_load_data() -> None:
     }
 
     response = requests.post(
-        f"{URL}/settings",
+        f"{URL}/jobs/settings",
         json=settings,
         headers={HEADER_SESSION_ID: st.session_state.get("session_id")},
     )
+    if response.status_code == 409:
+        st.warning(
+            "Different settings are still being saved. "
+            "Please wait for them to finish and save again."
+        )
+        st.stop()
     if not response.ok:
         st.error(f"Failed to save settings. Error: {response.text}")
         st.stop()
 
-    response = requests.post(
-        f"{URL}/run-processing",
-        headers={HEADER_SESSION_ID: st.session_state.get("session_id")},
-    )
-    if not response.ok:
-        st.error(f"Failed to run data processing. Error: {response.text}")
+    job = response.json()
+    if job["attached"]:
+        st.info("These settings are already being saved, waiting for that job.")
+    job = wait_for_job(job, st.session_state.get("session_id"))
+    if job["status"] != "finished":
+        st.error(
+            f"Failed to save settings and run data processing. "
+            f"Error: {job['error'] or job['status']}"
+        )
         st.stop()
 
 
+def wait_for_job(job: dict, session_id: str) -> dict:
+    """
+    Polls a background job of the API until it is no longer pending or running,
+    showing its current stage in the meantime.
+
+    Parameters
+    ----------
+    job : dict
+        The job as returned by the API when it was submitted.
+    session_id : str
+        The session ID the job was submitted with.
+
+    Returns
+    -------
+    dict
+        The job in its final state.
+    """
+    progress = st.empty()
+    while job["status"] in ("pending", "running"):
+        progress.info(
+            f"Processing data: {job['stage'] or 'waiting'} "
+            f"({job['rows_written']} rows written, {job['elapsed_seconds']:.0f} s)"
+        )
+        time.sleep(JOB_POLL_INTERVAL_SECONDS)
+        response = requests.get(
+            f"{URL}/jobs/{job['job_id']}",
+            headers={HEADER_SESSION_ID: session_id},
+        )
+        if not response.ok:
+            job = {**job, "status": "failed", "error": response.text}
+            break
+        job = response.json()
+    progress.empty()
+    return job
+
+
 def reset_settings() -> None:
     """
     Resets all settings in the session state to their default values.
@@ -0,0 +1,399 @@
+-- The schema of a database created before the migrations were added (PRAGMA user_version 0),
+-- as the models of that version created it, for the tests of the migrations.
+CREATE TABLE users (
+    id INTEGER NOT NULL,
+    session_id VARCHAR NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE INDEX ix_users_id ON users (id);
+CREATE UNIQUE INDEX ix_users_session_id ON users (session_id);
+CREATE TABLE assets (
+    id INTEGER NOT NULL,
+    name VARCHAR NOT NULL,
+    symbol VARCHAR NOT NULL,
+    currency VARCHAR NOT NULL,
+    first_pricing_date VARCHAR NOT NULL,
+    last_pricing_date VARCHAR NOT NULL,
+    PRIMARY KEY (id),
+    UNIQUE (symbol)
+);
+CREATE INDEX ix_assets_id ON assets (id);
+CREATE TABLE currency_pairs (
+    id INTEGER NOT NULL,
+    name VARCHAR NOT NULL,
+    symbol VARCHAR NOT NULL,
+    first_currency_name VARCHAR NOT NULL,
+    second_currency_name VARCHAR NOT NULL,
+    first_pricing_date VARCHAR NOT NULL,
+    last_pricing_date VARCHAR NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uix_currency_names UNIQUE (first_currency_name, second_currency_name),
+    UNIQUE (name),
+    UNIQUE (symbol)
+);
+CREATE INDEX ix_currency_pairs_id ON currency_pairs (id);
+CREATE TABLE adjusted_asset_pricings (
+    id INTEGER NOT NULL,
+    asset_id INTEGER NOT NULL,
+    date VARCHAR NOT NULL,
+    open_price FLOAT NOT NULL,
+    high_price FLOAT NOT NULL,
+    low_price FLOAT NOT NULL,
+    close_price FLOAT NOT NULL,
+    adj_close_price FLOAT NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uix_asset_id_date UNIQUE (asset_id, date),
+    FOREIGN KEY(asset_id) REFERENCES assets (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_adjusted_asset_pricings_date ON adjusted_asset_pricings (date);
+CREATE INDEX ix_adjusted_asset_pricings_asset_id ON adjusted_asset_pricings (asset_id);
+CREATE INDEX ix_adjusted_asset_pricings_id ON adjusted_asset_pricings (id);
+CREATE TABLE asset_pricings (
+    id INTEGER NOT NULL,
+    asset_id INTEGER NOT NULL,
+    date VARCHAR NOT NULL,
+    open_price FLOAT NOT NULL,
+    high_price FLOAT NOT NULL,
+    low_price FLOAT NOT NULL,
+    close_price FLOAT NOT NULL,
+    adjusted_close_price FLOAT NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uix_asset_id_date UNIQUE (asset_id, date),
+    FOREIGN KEY(asset_id) REFERENCES assets (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_asset_pricings_date ON asset_pricings (date);
+CREATE INDEX ix_asset_pricings_id ON asset_pricings (id);
+CREATE INDEX ix_asset_pricings_asset_id ON asset_pricings (asset_id);
+CREATE TABLE adjusted_currency_pair_pricings (
+    id INTEGER NOT NULL,
+    currency_pair_id INTEGER NOT NULL,
+    date VARCHAR NOT NULL,
+    open_price FLOAT NOT NULL,
+    high_price FLOAT NOT NULL,
+    low_price FLOAT NOT NULL,
+    close_price FLOAT NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uix_currency_pair_id_date UNIQUE (currency_pair_id, date),
+    FOREIGN KEY(currency_pair_id) REFERENCES currency_pairs (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_adjusted_currency_pair_pricings_date ON adjusted_currency_pair_pricings (date);
+CREATE INDEX ix_adjusted_currency_pair_pricings_id ON adjusted_currency_pair_pricings (id);
+CREATE INDEX ix_adjusted_currency_pair_pricings_currency_pair_id ON adjusted_currency_pair_pricings (currency_pair_id);
+CREATE TABLE currency_pair_pricings (
+    id INTEGER NOT NULL,
+    currency_pair_id INTEGER NOT NULL,
+    date VARCHAR NOT NULL,
+    open_price FLOAT NOT NULL,
+    high_price FLOAT NOT NULL,
+    low_price FLOAT NOT NULL,
+    close_price FLOAT NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uix_currency_pair_id_date UNIQUE (currency_pair_id, date),
+    FOREIGN KEY(currency_pair_id) REFERENCES currency_pairs (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_currency_pair_pricings_currency_pair_id ON currency_pair_pricings (currency_pair_id);
+CREATE INDEX ix_currency_pair_pricings_id ON currency_pair_pricings (id);
+CREATE INDEX ix_currency_pair_pricings_date ON currency_pair_pricings (date);
+CREATE TABLE settings (
+    user_id INTEGER NOT NULL,
+    analysis_currency VARCHAR NOT NULL,
+    ohlc_assets VARCHAR NOT NULL,
+    ohlc_currencies VARCHAR NOT NULL,
+    transaction_files JSON NOT NULL,
+    transactions JSON NOT NULL,
+    portfolio_groups JSON NOT NULL,
+    portfolio_group_assets JSON NOT NULL,
+    PRIMARY KEY (user_id),
+    FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE
+);
+CREATE TABLE portfolio_aggregates (
+    id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    checkpoint_date VARCHAR NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_portfolio_aggregates_id ON portfolio_aggregates (id);
+CREATE INDEX ix_portfolio_aggregates_user_id ON portfolio_aggregates (user_id);
+CREATE TABLE portfolio_aggregate_performances (
+    id INTEGER NOT NULL,
+    portfolio_aggregate_id INTEGER NOT NULL,
+    date VARCHAR NOT NULL,
+    market_value FLOAT NOT NULL,
+    market_value_adj FLOAT NOT NULL,
+    delta_quantity_value_adj FLOAT NOT NULL,
+    cash_balance FLOAT NOT NULL,
+    invested_amount FLOAT NOT NULL,
+    invested_amount_total FLOAT NOT NULL,
+    asset_disposal_income FLOAT NOT NULL,
+    asset_disposal_income_total FLOAT NOT NULL,
+    asset_holding_income FLOAT NOT NULL,
+    asset_holding_income_total FLOAT NOT NULL,
+    interest_income FLOAT NOT NULL,
+    interest_income_total FLOAT NOT NULL,
+    investment_income FLOAT NOT NULL,
+    investment_income_total FLOAT NOT NULL,
+    profit FLOAT NOT NULL,
+    profit_total FLOAT NOT NULL,
+    profit_percentage FLOAT NOT NULL,
+    profit_percentage_total FLOAT NOT NULL,
+    drawdown_value FLOAT NOT NULL,
+    drawdown_value_total FLOAT NOT NULL,
+    drawdown_profit FLOAT NOT NULL,
+    drawdown_profit_total FLOAT NOT NULL,
+    hpr FLOAT NOT NULL,
+    drawdown FLOAT NOT NULL,
+    twrr_rate_daily FLOAT NOT NULL,
+    twrr_rate_annualized FLOAT,
+    sharpe_ratio_daily FLOAT,
+    sharpe_ratio_annualized FLOAT,
+    sortino_ratio_daily FLOAT,
+    sortino_ratio_annualized FLOAT,
+    xirr_rate FLOAT,
+    xirr_rate_total FLOAT,
+    PRIMARY KEY (id),
+    CONSTRAINT uix_portfolio_aggregate_id_date UNIQUE (portfolio_aggregate_id, date),
+    FOREIGN KEY(portfolio_aggregate_id) REFERENCES portfolio_aggregates (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_portfolio_aggregate_performances_date ON portfolio_aggregate_performances (date);
+CREATE INDEX ix_portfolio_aggregate_performances_id ON portfolio_aggregate_performances (id);
+CREATE INDEX ix_portfolio_aggregate_performances_portfolio_aggregate_id ON portfolio_aggregate_performances (portfolio_aggregate_id);
+CREATE TABLE portfolios (
+    id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    portfolio_aggregate_id INTEGER NOT NULL,
+    name VARCHAR NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uix_portfolio_aggregate_id_name UNIQUE (portfolio_aggregate_id, name),
+    FOREIGN KEY(user_id) REFERENCES users (id),
+    FOREIGN KEY(portfolio_aggregate_id) REFERENCES portfolio_aggregates (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_portfolios_user_id ON portfolios (user_id);
+CREATE INDEX ix_portfolios_id ON portfolios (id);
+CREATE INDEX ix_portfolios_portfolio_aggregate_id ON portfolios (portfolio_aggregate_id);
+CREATE TABLE portfolio_transaction_files (
+    id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    portfolio_id INTEGER NOT NULL,
+    name VARCHAR NOT NULL,
+    currency VARCHAR NOT NULL,
+    currency_pair_id INTEGER,
+    PRIMARY KEY (id),
+    CONSTRAINT uix_user_id_portfolio_id_name UNIQUE (user_id, portfolio_id, name),
+    FOREIGN KEY(user_id) REFERENCES users (id),
+    FOREIGN KEY(portfolio_id) REFERENCES portfolios (id) ON DELETE CASCADE,
+    FOREIGN KEY(currency_pair_id) REFERENCES currency_pairs (id) ON DELETE RESTRICT
+);
+CREATE INDEX ix_portfolio_transaction_files_portfolio_id ON portfolio_transaction_files (portfolio_id);
+CREATE INDEX ix_portfolio_transaction_files_currency_pair_id ON portfolio_transaction_files (currency_pair_id);
+CREATE INDEX ix_portfolio_transaction_files_id ON portfolio_transaction_files (id);
+CREATE INDEX ix_portfolio_transaction_files_user_id ON portfolio_transaction_files (user_id);
+CREATE TABLE portfolio_performances (
+    id INTEGER NOT NULL,
+    portfolio_id INTEGER NOT NULL,
+    date VARCHAR NOT NULL,
+    market_value FLOAT NOT NULL,
+    market_value_adj FLOAT NOT NULL,
+    delta_quantity_value_adj FLOAT NOT NULL,
+    cash_balance FLOAT NOT NULL,
+    invested_amount FLOAT NOT NULL,
+    invested_amount_total FLOAT NOT NULL,
+    asset_disposal_income FLOAT NOT NULL,
+    asset_disposal_income_total FLOAT NOT NULL,
+    asset_holding_income FLOAT NOT NULL,
+    asset_holding_income_total FLOAT NOT NULL,
+    interest_income FLOAT NOT NULL,
+    interest_income_total FLOAT NOT NULL,
+    investment_income FLOAT NOT NULL,
+    investment_income_total FLOAT NOT NULL,
+    profit FLOAT NOT NULL,
+    profit_total FLOAT NOT NULL,
+    profit_percentage FLOAT NOT NULL,
+    profit_percentage_total FLOAT NOT NULL,
+    drawdown_value FLOAT NOT NULL,
+    drawdown_value_total FLOAT NOT NULL,
+    drawdown_profit FLOAT NOT NULL,
+    drawdown_profit_total FLOAT NOT NULL,
+    hpr FLOAT NOT NULL,
+    drawdown FLOAT NOT NULL,
+    twrr_rate_daily FLOAT NOT NULL,
+    twrr_rate_annualized FLOAT,
+    sharpe_ratio_daily FLOAT,
+    sharpe_ratio_annualized FLOAT,
+    sortino_ratio_daily FLOAT,
+    sortino_ratio_annualized FLOAT,
+    xirr_rate FLOAT,
+    xirr_rate_total FLOAT,
+    PRIMARY KEY (id),
+    CONSTRAINT uix_portfolio_id_date UNIQUE (portfolio_id, date),
+    FOREIGN KEY(portfolio_id) REFERENCES portfolios (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_portfolio_performances_id ON portfolio_performances (id);
+CREATE INDEX ix_portfolio_performances_date ON portfolio_performances (date);
+CREATE INDEX ix_portfolio_performances_portfolio_id ON portfolio_performances (portfolio_id);
+CREATE TABLE portfolio_groups (
+    id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    portfolio_id INTEGER NOT NULL,
+    name VARCHAR NOT NULL,
+    weight FLOAT NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uix_portfolio_id_name UNIQUE (portfolio_id, name),
+    FOREIGN KEY(user_id) REFERENCES users (id),
+    FOREIGN KEY(portfolio_id) REFERENCES portfolios (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_portfolio_groups_id ON portfolio_groups (id);
+CREATE INDEX ix_portfolio_groups_user_id ON portfolio_groups (user_id);
+CREATE INDEX ix_portfolio_groups_portfolio_id ON portfolio_groups (portfolio_id);
+CREATE TABLE adjusted_portfolio_transactions (
+    id INTEGER NOT NULL,
+    portfolio_transaction_file_id INTEGER NOT NULL,
+    portfolio_id INTEGER NOT NULL,
+    asset_id INTEGER,
+    date VARCHAR NOT NULL,
+    transaction_type VARCHAR NOT NULL,
+    quantity FLOAT NOT NULL,
+    transaction_value FLOAT NOT NULL,
+    fee_amount FLOAT NOT NULL,
+    tax_amount FLOAT NOT NULL,
+    cash_flow FLOAT NOT NULL,
+    invested_amount FLOAT NOT NULL,
+    invested_amount_total FLOAT NOT NULL,
+    asset_disposal_income FLOAT NOT NULL,
+    asset_disposal_income_total FLOAT NOT NULL,
+    asset_holding_income FLOAT NOT NULL,
+    asset_holding_income_total FLOAT NOT NULL,
+    interest_income FLOAT NOT NULL,
+    interest_income_total FLOAT NOT NULL,
+    investment_income FLOAT NOT NULL,
+    investment_income_total FLOAT NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(portfolio_transaction_file_id) REFERENCES portfolio_transaction_files (id) ON DELETE CASCADE,
+    FOREIGN KEY(portfolio_id) REFERENCES portfolios (id),
+    FOREIGN KEY(asset_id) REFERENCES assets (id) ON DELETE RESTRICT
+);
+CREATE INDEX ix_adjusted_portfolio_transactions_asset_id ON adjusted_portfolio_transactions (asset_id);
+CREATE INDEX ix_adjusted_portfolio_transactions_id ON adjusted_portfolio_transactions (id);
+CREATE INDEX ix_adjusted_portfolio_transactions_portfolio_id ON adjusted_portfolio_transactions (portfolio_id);
+CREATE INDEX ix_adjusted_portfolio_transactions_date ON adjusted_portfolio_transactions (date);
+CREATE INDEX ix_adjusted_portfolio_transactions_portfolio_transaction_file_id ON adjusted_portfolio_transactions (portfolio_transaction_file_id);
+CREATE TABLE portfolio_transactions (
+    id INTEGER NOT NULL,
+    portfolio_transaction_file_id INTEGER NOT NULL,
+    asset_id INTEGER,
+    date VARCHAR NOT NULL,
+    transaction_type VARCHAR NOT NULL,
+    quantity FLOAT NOT NULL,
+    transaction_value FLOAT NOT NULL,
+    fee_amount FLOAT NOT NULL,
+    tax_amount FLOAT NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(portfolio_transaction_file_id) REFERENCES portfolio_transaction_files (id) ON DELETE CASCADE,
+    FOREIGN KEY(asset_id) REFERENCES assets (id) ON DELETE RESTRICT
+);
+CREATE INDEX ix_portfolio_transactions_date ON portfolio_transactions (date);
+CREATE INDEX ix_portfolio_transactions_asset_id ON portfolio_transactions (asset_id);
+CREATE INDEX ix_portfolio_transactions_portfolio_transaction_file_id ON portfolio_transactions (portfolio_transaction_file_id);
+CREATE INDEX ix_portfolio_transactions_id ON portfolio_transactions (id);
+CREATE TABLE portfolio_group_performances (
+    id INTEGER NOT NULL,
+    portfolio_id INTEGER NOT NULL,
+    portfolio_group_id INTEGER NOT NULL,
+    date VARCHAR NOT NULL,
+    market_value FLOAT NOT NULL,
+    market_value_adj FLOAT NOT NULL,
+    delta_quantity_value_adj FLOAT NOT NULL,
+    invested_amount FLOAT NOT NULL,
+    invested_amount_total FLOAT NOT NULL,
+    asset_disposal_income FLOAT NOT NULL,
+    asset_disposal_income_total FLOAT NOT NULL,
+    asset_holding_income FLOAT NOT NULL,
+    asset_holding_income_total FLOAT NOT NULL,
+    investment_income FLOAT NOT NULL,
+    investment_income_total FLOAT NOT NULL,
+    profit FLOAT NOT NULL,
+    profit_total FLOAT NOT NULL,
+    profit_percentage FLOAT NOT NULL,
+    profit_percentage_total FLOAT NOT NULL,
+    drawdown_value FLOAT NOT NULL,
+    drawdown_value_total FLOAT NOT NULL,
+    drawdown_profit FLOAT NOT NULL,
+    drawdown_profit_total FLOAT NOT NULL,
+    hpr FLOAT NOT NULL,
+    drawdown FLOAT NOT NULL,
+    twrr_rate_daily FLOAT NOT NULL,
+    twrr_rate_annualized FLOAT,
+    sharpe_ratio_daily FLOAT,
+    sharpe_ratio_annualized FLOAT,
+    sortino_ratio_daily FLOAT,
+    sortino_ratio_annualized FLOAT,
+    xirr_rate FLOAT,
+    xirr_rate_total FLOAT,
+    PRIMARY KEY (id),
+    CONSTRAINT uix_portfolio_group_id_date UNIQUE (portfolio_group_id, date),
+    FOREIGN KEY(portfolio_id) REFERENCES portfolios (id),
+    FOREIGN KEY(portfolio_group_id) REFERENCES portfolio_groups (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_portfolio_group_performances_id ON portfolio_group_performances (id);
+CREATE INDEX ix_portfolio_group_performances_date ON portfolio_group_performances (date);
+CREATE INDEX ix_portfolio_group_performances_portfolio_group_id ON portfolio_group_performances (portfolio_group_id);
+CREATE INDEX ix_portfolio_group_performances_portfolio_id ON portfolio_group_performances (portfolio_id);
+CREATE TABLE portfolio_asset_performances (
+    id INTEGER NOT NULL,
+    portfolio_id INTEGER NOT NULL,
+    portfolio_group_id INTEGER NOT NULL,
+    asset_id INTEGER NOT NULL,
+    date VARCHAR NOT NULL,
+    unit_price FLOAT NOT NULL,
+    unit_price_adj FLOAT NOT NULL,
+    quantity INTEGER NOT NULL,
+    delta_quantity INTEGER NOT NULL,
+    market_value FLOAT NOT NULL,
+    market_value_adj FLOAT NOT NULL,
+    delta_quantity_value_adj FLOAT NOT NULL,
+    invested_amount FLOAT NOT NULL,
+    invested_amount_total FLOAT NOT NULL,
+    asset_disposal_income FLOAT NOT NULL,
+    asset_disposal_income_total FLOAT NOT NULL,
+    asset_holding_income FLOAT NOT NULL,
+    asset_holding_income_total FLOAT NOT NULL,
+    investment_income FLOAT NOT NULL,
+    investment_income_total FLOAT NOT NULL,
+    profit FLOAT NOT NULL,
+    profit_total FLOAT NOT NULL,
+    profit_percentage FLOAT NOT NULL,
+    profit_percentage_total FLOAT NOT NULL,
+    drawdown_value FLOAT NOT NULL,
+    drawdown_value_total FLOAT NOT NULL,
+    drawdown_profit FLOAT NOT NULL,
+    drawdown_profit_total FLOAT NOT NULL,
+    hpr FLOAT NOT NULL,
+    drawdown FLOAT NOT NULL,
+    twrr_rate_daily FLOAT NOT NULL,
+    twrr_rate_annualized FLOAT,
+    sharpe_ratio_daily FLOAT,
+    sharpe_ratio_annualized FLOAT,
+    sortino_ratio_daily FLOAT,
+    sortino_ratio_annualized FLOAT,
+    xirr_rate FLOAT,
+    xirr_rate_total FLOAT,
+    PRIMARY KEY (id),
+    CONSTRAINT uix_portfolio_id_asset_id_date UNIQUE (portfolio_id, asset_id, date),
+    FOREIGN KEY(portfolio_id) REFERENCES portfolios (id),
+    FOREIGN KEY(portfolio_group_id) REFERENCES portfolio_groups (id) ON DELETE CASCADE,
+    FOREIGN KEY(asset_id) REFERENCES assets (id) ON DELETE RESTRICT
+);
+CREATE INDEX ix_portfolio_asset_performances_id ON portfolio_asset_performances (id);
+CREATE INDEX ix_portfolio_asset_performances_portfolio_group_id ON portfolio_asset_performances (portfolio_group_id);
+CREATE INDEX ix_portfolio_asset_performances_date ON portfolio_asset_performances (date);
+CREATE INDEX ix_portfolio_asset_performances_portfolio_id ON portfolio_asset_performances (portfolio_id);
+CREATE INDEX ix_portfolio_asset_performances_asset_id ON portfolio_asset_performances (asset_id);
+CREATE TABLE portfolio_groups_assets (
+    portfolio_group_id INTEGER NOT NULL,
+    asset_id INTEGER NOT NULL,
+    PRIMARY KEY (portfolio_group_id, asset_id),
+    FOREIGN KEY(portfolio_group_id) REFERENCES portfolio_groups (id) ON DELETE CASCADE,
+    FOREIGN KEY(asset_id) REFERENCES assets (id) ON DELETE RESTRICT
+);
+CREATE INDEX ix_portfolio_groups_assets_portfolio_group_id ON portfolio_groups_assets (portfolio_group_id);
+CREATE INDEX ix_portfolio_groups_assets_asset_id ON portfolio_groups_assets (asset_id);
@@ -0,0 +1,156 @@
+"""
+Checks that a database created before the migrations, in the baseline schema with
+the transactions kept in the settings, is migrated when the registry opens it and
+exports the same settings afterwards.
+"""
+
+import json
+import sqlite3
+import uuid
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from src.api.utils.db import db_registry
+from src.infrastructure import Database
+from src.infrastructure.db.migrations import SCHEMA_VERSION
+
+BASELINE_SCHEMA = Path(__file__).with_name("baseline_schema.sql")
+
+TRANSACTIONS = {
+    "items": [
+        {
+            "file_name": "broker.csv",
+            "transaction_data": {
+                "date": ["2024-01-02", "2024-01-03", "2024-02-01", "2024-03-01"],
+                # UNLISTED was never downloaded, so its rows have no asset
+                "asset_symbol": ["", "AAA", "UNLISTED", "AAA"],
+                "transaction_type": ["deposit", "buy", "buy", "sell"],
+                "quantity": [0.0, 10.0, 5.0, 4.0],
+                "transaction_value": [1000.0, 500.0, 120.5, 230.0],
+                "fee_amount": [0.0, 1.0, 0.5, 1.0],
+                "tax_amount": [0.0, 0.0, 0.0, 2.3],
+            },
+        },
+        {
+            "file_name": "empty.csv",
+            "transaction_data": {
+                "date": [],
+                "asset_symbol": [],
+                "transaction_type": [],
+                "quantity": [],
+                "transaction_value": [],
+                "fee_amount": [],
+                "tax_amount": [],
+            },
+        },
+    ]
+}
+
+SETTINGS = {
+    "user_id": 1,
+    "analysis_currency": "usd",
+    "ohlc_assets": "close",
+    "ohlc_currencies": "close",
+    "transaction_files": {
+        "file_name": ["broker.csv", "empty.csv"],
+        "currency": ["usd", "usd"],
+        "portfolio_name": ["Main", "Main"],
+    },
+    "transactions": TRANSACTIONS,
+    "portfolio_groups": {
+        "portfolio_name": ["Main"],
+        "group_name": ["Stocks"],
+        "group_weight": [1.0],
+    },
+    "portfolio_group_assets": {
+        "portfolio_name": ["Main"],
+        "asset_symbol": ["AAA"],
+        "group_name": ["Stocks"],
+    },
+}
+
+
+def _create_baseline_database(session_id: str):
+    """Creates the database of the user as the baseline version stored it."""
+    db_path = Path(Database._get_db_path(session_id))
+    db_path.parent.mkdir(parents=True)
+    connection = sqlite3.connect(db_path)
+    try:
+        connection.executescript(BASELINE_SCHEMA.read_text())
+        connection.execute(
+            "INSERT INTO users (id, session_id) VALUES (1, ?);", (session_id,)
+        )
+        connection.execute(
+            "INSERT INTO assets VALUES "
+            "(1, 'AAA Inc.', 'AAA', 'usd', '2024-01-02', '2024-03-01');"
+        )
+        connection.execute(
+            "INSERT INTO settings VALUES (?, ?, ?, ?, ?, ?, ?, ?);",
+            (
+                SETTINGS["user_id"],
+                SETTINGS["analysis_currency"],
+                SETTINGS["ohlc_assets"],
+                SETTINGS["ohlc_currencies"],
+                json.dumps(SETTINGS["transaction_files"]),
+                json.dumps(SETTINGS["transactions"]),
+                json.dumps(SETTINGS["portfolio_groups"]),
+                json.dumps(SETTINGS["portfolio_group_assets"]),
+            ),
+        )
+        connection.execute(
+            "INSERT INTO portfolio_aggregates VALUES (1, 1, '2024-01-02');"
+        )
+        connection.execute("INSERT INTO portfolios VALUES (1, 1, 1, 'Main');")
+        connection.execute(
+            "INSERT INTO portfolio_transaction_files VALUES "
+            "(1, 1, 1, 'broker.csv', 'usd', NULL), (2, 1, 1, 'empty.csv', 'usd', NULL);"
+        )
+        transaction_data = TRANSACTIONS["items"][0]["transaction_data"]
+        asset_ids = {"AAA": 1}
+        connection.executemany(
+            "INSERT INTO portfolio_transactions (portfolio_transaction_file_id, "
+            "asset_id, date, transaction_type, quantity, transaction_value, "
+            "fee_amount, tax_amount) VALUES (1, ?, ?, ?, ?, ?, ?, ?);",
+            [
+                (asset_ids.get(row[1]), row[0], *row[2:])
+                for row in zip(*transaction_data.values())
+            ],
+        )
+        connection.commit()
+    finally:
+        connection.close()
+
+
+@pytest.fixture
+def session_id(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    session_id = str(uuid.uuid4())
+    _create_baseline_database(session_id)
+    return session_id
+
+
+def test_registry_migrates_baseline_database(session_id):
+    db = db_registry.get(session_id)
+
+    with db.engine.connect() as connection:
+        version = connection.exec_driver_sql("PRAGMA user_version;").scalar()
+        asset_symbols = connection.exec_driver_sql(
+            "SELECT asset_symbol FROM portfolio_transactions ORDER BY id;"
+        ).scalars()
+        settings_columns = [
+            column.name
+            for column in connection.exec_driver_sql("PRAGMA table_info(settings);")
+        ]
+
+    assert version == SCHEMA_VERSION
+    assert list(asset_symbols) == ["", "AAA", "UNLISTED", "AAA"]
+    assert "transactions" not in settings_columns
+
+    with TestClient(app) as client:
+        response = client.get("/settings", headers={"X-Session-ID": session_id})
+
+    assert response.status_code == 200
+    assert response.json() == SETTINGS
@@ -0,0 +1,103 @@
+"""
+Checks that the performance engines of DataProcessingManager produce the same
+performances as the SQL engine on the synthetic user of the benchmark, when run
+from scratch and when continued incrementally from a checkpoint.
+"""
+
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from benchmarks.performance_engines import (
+    KEY_COLUMNS,
+    _build_data_processing_manager,
+    _create_synthetic_user,
+    _get_max_difference,
+    _run_engine,
+)
+from src.api.constants import DB_EXTENSIONS, RESET_DATE
+from src.infrastructure import Database
+from src.application import PERFORMANCE_ENGINES
+from src.domain import AdjustedPortfolioTransaction
+
+REFERENCE_ENGINE = "sql"
+# The largest relative difference allowed against the reference engine,
+# the engines only differ in the order of their floating point operations
+TOLERANCE = 1e-9
+ENGINE_RUNS = [(engine, 1) for engine in PERFORMANCE_ENGINES] + [("rollup", 2)]
+
+
+@pytest.fixture(scope="module")
+def session(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(tmp_path_factory.mktemp("performance_engines"))
+        db = Database(str(uuid.uuid4()), extension_names=DB_EXTENSIONS)
+        db.create_database()
+        session = db.SessionMaker()
+        try:
+            yield session
+        finally:
+            session.close()
+            db.dispose()
+
+
+@pytest.fixture(scope="module")
+def user(session):
+    user = _create_synthetic_user(
+        session,
+        portfolio_count=2,
+        asset_count=6,
+        day_count=400,
+        transaction_count=120,
+        seed=0,
+    )
+    data_processing_manager = _build_data_processing_manager(session, REFERENCE_ENGINE)
+    data_processing_manager.process_calendar_dates()
+    data_processing_manager.process_adjusted_portfolio_transactions(user.id)
+    data_processing_manager.process_effective_asset_prices(user.id)
+    session.commit()
+    return user
+
+
+@pytest.fixture(scope="module")
+def expected_performances(session, user):
+    _, performances = _run_engine(session, user, REFERENCE_ENGINE, RESET_DATE)
+    return performances
+
+
+@pytest.fixture(scope="module")
+def checkpoint_date(session, user) -> str:
+    dates = sorted(set(session.scalars(select(AdjustedPortfolioTransaction.date))))
+    return dates[len(dates) // 2]
+
+
+def _assert_performances_match(expected, actual):
+    for model, key_columns in KEY_COLUMNS.items():
+        column, difference = _get_max_difference(
+            expected[model], actual[model], key_columns
+        )
+        assert (
+            difference <= TOLERANCE
+        ), f"{model.__tablename__}.{column} differs by {difference:.2e}."
+
+
+@pytest.mark.parametrize(
+    "engine, workers",
+    [run for run in ENGINE_RUNS if run != (REFERENCE_ENGINE, 1)],
+)
+def test_full_run_matches_reference_engine(
+    session, user, expected_performances, engine, workers
+):
+    _, actual = _run_engine(session, user, engine, RESET_DATE, workers)
+    _assert_performances_match(expected_performances, actual)
+
+
+@pytest.mark.parametrize("engine, workers", ENGINE_RUNS)
+def test_incremental_run_matches_full_run(
+    session, user, expected_performances, checkpoint_date, engine, workers
+):
+    # The full run writes the performances and states the incremental one continues
+    _run_engine(session, user, engine, RESET_DATE, workers)
+    _, actual = _run_engine(session, user, engine, checkpoint_date, workers)
+    _assert_performances_match(expected_performances, actual)
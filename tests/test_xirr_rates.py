@@ -0,0 +1,97 @@
+"""
+Checks that the XIRR rates of the numpy engine match the `xirr_pair` SQLite window
+function on a partition with many rows and cash flows, within bounded memory.
+"""
+
+import tracemalloc
+import uuid
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.api.constants import DB_EXTENSIONS
+from src.infrastructure import Database
+from src.domain.portfolio_asset_performances.portfolio_asset_performance_engine import (
+    XIRR_CHUNK_ROWS,
+    _calculate_xirr_rates,
+    _get_days,
+)
+
+ROW_COUNT = 5000
+FLOW_COUNT = 1500
+# The largest absolute difference allowed against the extension
+TOLERANCE = 1e-9
+# Far below the hundreds of megabytes of solving every row against every flow at once
+MAX_PEAK_MEMORY = 64 * 1024 * 1024
+
+
+@pytest.fixture(scope="module")
+def session(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(tmp_path_factory.mktemp("xirr_rates"))
+        db = Database(str(uuid.uuid4()), extension_names=DB_EXTENSIONS)
+        db.create_database()
+        session = db.SessionMaker()
+        try:
+            yield session
+        finally:
+            session.close()
+            db.dispose()
+
+
+@pytest.fixture(scope="module")
+def partition() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    cash_flows = np.zeros(ROW_COUNT)
+    flow_indexes = rng.choice(np.arange(1, ROW_COUNT), FLOW_COUNT - 1, replace=False)
+    cash_flows[[0, *flow_indexes]] = rng.normal(-100.0, 60.0, FLOW_COUNT)
+    growth = np.exp(rng.normal(0.0002, 0.01, ROW_COUNT).cumsum())
+    return pd.DataFrame(
+        {
+            "date": pd.date_range("2000-01-01", periods=ROW_COUNT).strftime("%Y-%m-%d"),
+            "cash_flow": cash_flows,
+            "market_value": np.cumsum(-cash_flows) * growth,
+        }
+    )
+
+
+def _get_extension_rates(session, partition: pd.DataFrame) -> np.ndarray:
+    connection = session.connection()
+    connection.exec_driver_sql(
+        "CREATE TEMP TABLE xirr_rows (date TEXT, cash_flow REAL, market_value REAL);"
+    )
+    connection.exec_driver_sql(
+        "INSERT INTO xirr_rows VALUES (?, ?, ?);",
+        list(partition.itertuples(index=False, name=None)),
+    )
+    rates = connection.exec_driver_sql("""
+        SELECT xirr_pair_rate(
+            xirr_pair(date, cash_flow, cash_flow, market_value) OVER (ORDER BY date),
+            0
+        )
+        FROM xirr_rows
+        ORDER BY date;
+        """).scalars()
+    return np.array([np.nan if rate is None else rate for rate in rates])
+
+
+def test_xirr_rates_match_extension(session, partition):
+    assert ROW_COUNT > XIRR_CHUNK_ROWS
+
+    tracemalloc.start()
+    try:
+        rates = _calculate_xirr_rates(
+            _get_days(partition["date"]),
+            partition["cash_flow"].to_numpy(),
+            partition["market_value"].to_numpy(),
+            0,
+        )
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    np.testing.assert_allclose(
+        rates, _get_extension_rates(session, partition), rtol=0, atol=TOLERANCE
+    )
+    assert peak_memory < MAX_PEAK_MEMORY